@@ -2,8 +2,9 @@
 from flask import Blueprint
 import os
 import requests
-import concurrent.futures
 import datetime
+import threading
+import time
 from dotenv import load_dotenv
 try:
     from . import polygon_api
@@ -12,16 +13,24 @@ except Exception:
 from services.db_manager import (
     get_all_tickers,
     get_tickers_missing_prices,
-    upsert_stock_price,
+    bulk_upsert_stock_prices,
     get_last_update,
     set_last_update,
     get_sector_map,
     get_sector_records,
     upsert_stock_sector,
-    get_stock_prices_df,
+    count_price_dates_since,
+    get_trading_calendar,
+    get_price_coverage,
     get_app_setting,
     set_app_setting,
 )
+from api.rate_limit import (
+    AdaptiveConcurrency,
+    TokenBucket,
+    fetch_concurrently,
+    raise_for_retryable_status,
+)
 
 # Kept as a Blueprint name for historical imports; no HTTP routes remain.
 finnhub_api = Blueprint("finnhub_api", __name__)
@@ -75,40 +84,231 @@ def _is_generic_sector(value):
     return str(value).strip().lower() in GENERIC_SECTORS
 
 
+class FinnhubQuoteClient:
+    """
+    Finnhub ``/quote`` client with keep-alive, a per-minute quota and adaptive
+    concurrency.
+
+    Requests go through one pooled ``requests.Session``. A token bucket keeps
+    any 60s window within ``per_minute`` calls (a quarter of the quota as burst,
+    the rest as steady rate), ``AdaptiveConcurrency`` halves requests in flight
+    on 429 and grows them back on success, and 429/5xx are retried with
+    jittered backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        url: str = FINNHUB_QUOTE_URL,
+        per_minute: int | None = None,
+        max_concurrency: int | None = None,
+        max_retries: int = 3,
+        timeout: float = 10,
+        session: requests.Session | None = None,
+    ):
+        self.api_key = api_key
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        per_minute = per_minute or max(1, _env_int("FINNHUB_QUOTES_PER_MINUTE", 60))
+        max_concurrency = max_concurrency or max(1, _env_int("FINNHUB_QUOTE_MAX_CONCURRENCY", 8))
+        burst = max(1.0, per_minute / 4)
+        self.bucket = TokenBucket((per_minute - burst) / 60.0, capacity=burst)
+        self.concurrency = AdaptiveConcurrency(max(1, max_concurrency // 2), max_concurrency)
+        self.max_workers = max_concurrency
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def _get_quote(self, ticker: str) -> dict:
+        params = {"symbol": ticker, "token": self.api_key or _get_finnhub_api_key()}
+        response = self.session.get(self.url, params=params, timeout=self.timeout)
+        raise_for_retryable_status(response)
+        data = response.json()
+        price = data.get("c") if isinstance(data, dict) else None
+        # Unknown symbols come back as HTTP 200 with all-zero fields.
+        if price is None or float(price) <= 0:
+            raise ValueError(f"no quote in response: {str(data)[:200]}")
+        ts = data.get("t")
+        return {"price": float(price), "timestamp": int(ts) if ts else None}
+
+    def fetch_quotes(self, tickers) -> dict:
+        """
+        Quote ``tickers`` concurrently. Returns ``{ticker: {"price", "timestamp",
+        "latency_ms", "attempts", "error"}}``; ``price`` is None when ``error`` is set.
+        """
+        fetched = fetch_concurrently(
+            tickers,
+            self._get_quote,
+            max_workers=self.max_workers,
+            bucket=self.bucket,
+            concurrency=self.concurrency,
+            max_retries=self.max_retries,
+        )
+        results = {}
+        for ticker, latency in fetched["latency_ms"].items():
+            quote = fetched["results"].get(ticker) or {}
+            results[ticker] = {
+                "price": quote.get("price"),
+                "timestamp": quote.get("timestamp"),
+                "latency_ms": latency,
+                "attempts": fetched["attempts"].get(ticker, 0),
+                "error": fetched["failures"].get(ticker),
+            }
+        return results
+
+
+_quote_client: FinnhubQuoteClient | None = None
+_quote_client_lock = threading.Lock()
+
+
+def get_quote_client() -> FinnhubQuoteClient:
+    """Process-wide quote client, so the session and rate limits are shared."""
+    global _quote_client
+    with _quote_client_lock:
+        if _quote_client is None:
+            _quote_client = FinnhubQuoteClient()
+        return _quote_client
+
+
+class QuoteCache:
+    """
+    In-process quote cache keyed by ticker with a TTL.
+
+    ``get_many`` serves fresh entries from memory and fetches the rest with one
+    ``fetch_many`` call. A ticker already being fetched by another thread is
+    not requested again: the caller waits for that fetch and shares its result.
+    Only successful quotes are cached; hits come back with ``"cached": True``.
+    ``stats()`` reports hit, miss and coalesced counts.
+    """
+
+    def __init__(self, ttl_seconds: float, clock=time.monotonic):
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._entries: dict = {}
+        self._in_flight: dict = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def get_many(self, tickers, fetch_many) -> dict:
+        """Return ``{ticker: result}``; ``fetch_many(tickers)`` returns the same shape."""
+        results = {}
+        owned = []
+        waiting = {}
+        with self._lock:
+            now = self._clock()
+            for ticker in dict.fromkeys(tickers):
+                entry = self._entries.get(ticker)
+                if entry is not None and now - entry[0] < self.ttl_seconds:
+                    results[ticker] = {**entry[1], "cached": True}
+                    self._stats["hits"] += 1
+                elif ticker in self._in_flight:
+                    waiting[ticker] = self._in_flight[ticker]
+                    self._stats["coalesced"] += 1
+                else:
+                    self._in_flight[ticker] = {"event": threading.Event(), "result": None}
+                    owned.append(ticker)
+                    self._stats["misses"] += 1
+
+        fetched = {}
+        if owned:
+            try:
+                fetched = fetch_many(owned) or {}
+            finally:
+                with self._lock:
+                    now = self._clock()
+                    for ticker in owned:
+                        result = fetched.get(ticker) or {"price": None, "error": "fetch failed"}
+                        if result.get("price") is not None:
+                            self._entries[ticker] = (now, result)
+                        flight = self._in_flight.pop(ticker)
+                        flight["result"] = result
+                        flight["event"].set()
+            results.update({t: fetched.get(t) or {"price": None, "error": "fetch failed"} for t in owned})
+
+        for ticker, flight in waiting.items():
+            flight["event"].wait()
+            results[ticker] = flight["result"]
+        return results
+
+    def invalidate(self, tickers=None) -> None:
+        with self._lock:
+            if tickers is None:
+                self._entries.clear()
+            else:
+                for ticker in tickers:
+                    self._entries.pop(ticker, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = sum(self._stats.values())
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "in_flight": len(self._in_flight),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+_quote_cache: QuoteCache | None = None
+
+
+def get_quote_cache() -> QuoteCache:
+    """Process-wide quote cache (TTL from ``FINNHUB_QUOTE_CACHE_TTL`` seconds, default 60)."""
+    global _quote_cache
+    with _quote_client_lock:
+        if _quote_cache is None:
+            _quote_cache = QuoteCache(max(0, _env_int("FINNHUB_QUOTE_CACHE_TTL", 60)))
+        return _quote_cache
+
+
+def _cached_quotes(tickers) -> dict:
+    return get_quote_cache().get_many(tickers, get_quote_client().fetch_quotes)
+
+
 def fetch_finnhub_quote(ticker):
     """
     Calls Finnhub's /quote endpoint for a single ticker and returns a tuple (ticker, current_price).
     The Finnhub quote returns a JSON object with key "c" for the current price.
     """
-    params = {
-        "symbol": ticker,
-        "token": _get_finnhub_api_key(),
-    }
-    response = requests.get(FINNHUB_QUOTE_URL, params=params)
-    data = response.json()
-    try:
-        current_price = data.get("c")
-        if current_price is None:
-            raise ValueError("Missing 'c' value")
-        return ticker, float(current_price)
-    except (KeyError, ValueError) as e:
-        print(f"Error fetching price for {ticker}: {e} - Response: {data}")
-        return ticker, None
+    result = _cached_quotes([ticker])[ticker]
+    if result.get("error"):
+        print(f"Error fetching price for {ticker}: {result['error']}")
+    return ticker, result["price"]
+
 
 def fetch_stock_prices_batch(tickers):
     """
-    Fetches Finnhub quotes for a list of tickers concurrently.
-    Returns a dictionary mapping ticker -> current_price.
+    Fetches Finnhub quotes for a list of tickers concurrently, serving recent
+    quotes from the shared ``QuoteCache``.
+    Returns a dictionary mapping ticker -> current_price (None on failure).
     """
-    batch_prices = {}
-    # Using a thread pool to perform requests concurrently
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        # Submit a task for each ticker.
-        future_to_ticker = {executor.submit(fetch_finnhub_quote, ticker): ticker for ticker in tickers}
-        for future in concurrent.futures.as_completed(future_to_ticker):
-            ticker, price = future.result()
-            batch_prices[ticker] = price
-    return batch_prices
+    client = get_quote_client()
+    results = _cached_quotes(tickers)
+    failed = {t: r["error"] for t, r in results.items() if r.get("error")}
+    for ticker, error in failed.items():
+        print(f"Error fetching price for {ticker}: {error}")
+    latencies = sorted(
+        r["latency_ms"] for r in results.values() if not r.get("cached") and r.get("latency_ms") is not None
+    )
+    if results:
+        cached = sum(1 for r in results.values() if r.get("cached"))
+        timing = (
+            f"; fetched p50 {latencies[len(latencies) // 2]:.0f}ms / max {latencies[-1]:.0f}ms"
+            if latencies
+            else ""
+        )
+        print(
+            f"[Finnhub] {len(results) - len(failed)}/{len(results)} quote(s), {cached} from cache"
+            f"{timing} (concurrency limit {client.concurrency.limit})."
+        )
+    return {ticker: r["price"] for ticker, r in results.items()}
+
 
 def fetch_company_profile(ticker):
     params = {
@@ -239,13 +439,15 @@ def update_stock_prices(forceUpdate: bool = False):
     print(f"[Finnhub] Fetching prices for {len(tickers)} tickers on {today}...")
     batch_prices = fetch_stock_prices_batch(tickers)
 
+    rows = []
     for ticker in tickers:
         price = batch_prices.get(ticker)
         if price is not None:
-            upsert_stock_price(ticker, today, price)
-            print(f"[Finnhub] Upserted price for {ticker}: {price}")
+            rows.append((ticker, today, price))
+            print(f"[Finnhub] Upserting price for {ticker}: {price}")
         else:
             print(f"[Finnhub] Price for {ticker} not available.")
+    bulk_upsert_stock_prices(rows)
     set_last_update(today)
     backfill_held_price_history()
 
@@ -260,6 +462,16 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+def _env_float(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
 def _env_truthy(name: str, default: bool = False) -> bool:
     raw = (os.getenv(name) or "").strip().lower()
     if not raw:
@@ -268,14 +480,37 @@ def _env_truthy(name: str, default: bool = False) -> bool:
 
 
 def _distinct_price_dates(lookback_days: int) -> int:
-    df = get_stock_prices_df()
-    if df is None or df.empty:
-        return 0
     cutoff = (
         datetime.date.today() - datetime.timedelta(days=max(lookback_days, 1))
     ).isoformat()
-    dates = df["date"].astype(str).str[:10]
-    return int(dates[dates >= cutoff].nunique())
+    return count_price_dates_since(cutoff)
+
+
+# Missing days closer together than this many calendar days share one Yahoo
+# request; the stored closes in between are dropped before writing.
+BACKFILL_RANGE_MERGE_DAYS = 7
+
+
+def _missing_ranges(missing: list[str]) -> list[tuple[str, str]]:
+    """Collapse sorted missing YYYY-MM-DD days into inclusive (first, last) ranges."""
+    ranges: list[list[str]] = []
+    for day in missing:
+        if ranges:
+            gap = datetime.date.fromisoformat(day) - datetime.date.fromisoformat(ranges[-1][1])
+            if gap.days <= BACKFILL_RANGE_MERGE_DAYS:
+                ranges[-1][1] = day
+                continue
+        ranges.append([day, day])
+    return [(first, last) for first, last in ranges]
+
+
+def _backfill_coverage(tickers: list[str], lookback: int) -> tuple[list[str], dict]:
+    """Trading calendar for the lookback window (ending yesterday) and per-ticker coverage."""
+    today = datetime.date.today()
+    calendar = get_trading_calendar(
+        today - datetime.timedelta(days=lookback), today - datetime.timedelta(days=1)
+    )
+    return calendar, get_price_coverage(tickers, calendar)
 
 
 def backfill_held_price_history(
@@ -286,9 +521,22 @@ def backfill_held_price_history(
     """
     Fill missing daily closes for held tickers so quant metrics have a series.
 
-    Uses Yahoo chart data (same source as SPY beta). Automatic runs happen at most
-    once per day unless coverage is still thin. Disable auto with
-    ``PRICE_HISTORY_BACKFILL=0``. Pass ``force=True`` (admin button) to run anytime.
+    Uses Yahoo chart data (same source as SPY beta). Coverage is checked per
+    ticker against the SPY trading calendar (``get_price_coverage``) and only the
+    missing day ranges are requested. Older stored closes are not rewritten, but
+    the last ``PRICE_HISTORY_REFRESH_DAYS`` (default 2) trading days are always
+    refetched and overwritten: ``update_stock_prices`` stores the live quote under
+    today's date, and that intraday price must give way to the real close.
+    Automatic runs fill every gap only for tickers with fewer than
+    ``PRICE_HISTORY_MIN_DATES`` stored dates in the window or a missing trading
+    day since their first stored close, and run at most once per day.
+    Disable auto with ``PRICE_HISTORY_BACKFILL=0``. Pass ``force=True`` (admin
+    button) to fill every gap anytime.
+
+    Tickers are fetched on ``PRICE_HISTORY_BACKFILL_WORKERS`` threads behind a
+    token bucket (``PRICE_HISTORY_BACKFILL_RPS`` / ``_BURST``); 429 and 5xx
+    responses are retried with jittered backoff. The result carries per-ticker
+    ``latency_ms``, ``attempts`` and ``failures``.
     """
     lookback = (
         lookback_days
@@ -317,20 +565,44 @@ def backfill_held_price_history(
         }
 
     min_dates = _env_int("PRICE_HISTORY_MIN_DATES", 15)
+    refresh_days = max(0, _env_int("PRICE_HISTORY_REFRESH_DAYS", 2))
     today = datetime.date.today().isoformat()
     env_force = _env_truthy("PRICE_HISTORY_BACKFILL_FORCE", default=False)
     force = bool(force or env_force)
     last = (get_app_setting("last_price_history_backfill") or "").strip()
     distinct = _distinct_price_dates(lookback)
 
+    tickers = [str(t).upper().strip() for t in (get_all_tickers() or []) if str(t).strip()]
+    if not tickers:
+        set_app_setting("last_price_history_backfill", today)
+        return {
+            "upserted": 0,
+            "skipped": True,
+            "reason": "no held tickers",
+            "lookback_days": lookback,
+            "distinct_dates": distinct,
+            "tickers": 0,
+        }
+
+    thin = set(tickers)
     if not force:
-        if distinct >= min_dates:
+        calendar, coverage = _backfill_coverage(tickers, lookback)
+        # ``last_date`` is no signal for recent gaps: update_stock_prices writes today's
+        # quote just before calling this. Any calendar day missing since the ticker's
+        # first stored close is a gap (days before it are covered by ``min_dates``).
+        thin = {
+            t
+            for t in tickers
+            if len(coverage[t]["present"]) < min_dates
+            or any(d >= (coverage[t]["first_date"] or "") for d in coverage[t]["missing"])
+        }
+        if not thin and (last == today or not refresh_days):
             if last != today:
                 set_app_setting("last_price_history_backfill", today)
             return {
                 "upserted": 0,
                 "skipped": True,
-                "reason": f"already have {distinct} distinct date(s) (≥{min_dates})",
+                "reason": f"coverage complete (≥{min_dates} date(s) per ticker, no recent gaps)",
                 "lookback_days": lookback,
                 "distinct_dates": distinct,
                 "tickers": 0,
@@ -344,57 +616,105 @@ def backfill_held_price_history(
                 "distinct_dates": distinct,
                 "tickers": 0,
             }
-
-    tickers = [str(t).upper().strip() for t in (get_all_tickers() or []) if str(t).strip()]
-    if not tickers:
-        set_app_setting("last_price_history_backfill", today)
-        return {
-            "upserted": 0,
-            "skipped": True,
-            "reason": "no held tickers",
-            "lookback_days": lookback,
-            "distinct_dates": distinct,
-            "tickers": 0,
-        }
+        # Complete tickers still get their most recent days refreshed (see below).
 
     from api.quant_risk import ensure_benchmark_history, fetch_yahoo_history
 
     end = datetime.datetime.now(datetime.timezone.utc)
     start = end - datetime.timedelta(days=lookback)
-    upserted = 0
 
     try:
         ensure_benchmark_history("SPY", start, end + datetime.timedelta(days=1))
     except Exception as exc:
         print(f"[Prices] SPY history backfill failed: {exc}")
 
+    # Re-read coverage now that the SPY calendar is current.
+    calendar, coverage = _backfill_coverage(tickers, lookback)
+    recent = set(calendar[-refresh_days:]) if refresh_days else set()
+    ranges = {
+        t: _missing_ranges(sorted(recent.union(coverage[t]["missing"] if t in thin else ())))
+        for t in tickers
+    }
+    tickers = [t for t in tickers if ranges[t]]
+    if not tickers:
+        set_app_setting("last_price_history_backfill", today)
+        return {
+            "upserted": 0,
+            "skipped": True,
+            "reason": "no missing trading days",
+            "lookback_days": lookback,
+            "distinct_dates": distinct,
+            "tickers": 0,
+        }
+
     print(
-        f"[Prices] Backfilling up to {lookback}d of daily closes for "
-        f"{len(tickers)} ticker(s) (have {distinct} distinct date(s), want ≥{min_dates}"
+        f"[Prices] Backfilling {sum(len(coverage[t]['missing']) for t in tickers if t in thin)} "
+        f"missing day(s), refreshing the last {len(recent)}, in "
+        f"{sum(len(ranges[t]) for t in tickers)} range(s) for {len(tickers)} "
+        f"ticker(s) over {lookback}d (have {distinct} distinct date(s), want ≥{min_dates}"
         f"{', forced' if force else ''})…"
     )
+
+    def _fetch_missing(ticker: str):
+        candles = []
+        errors = []
+        for first, last_day in ranges[ticker]:
+            range_start = datetime.datetime.fromisoformat(first).replace(tzinfo=datetime.timezone.utc)
+            range_end = datetime.datetime.fromisoformat(last_day).replace(
+                tzinfo=datetime.timezone.utc
+            ) + datetime.timedelta(days=1)
+            got, error = fetch_yahoo_history(ticker, range_start, range_end)
+            if error:
+                errors.append(f"{first}..{last_day}: {str(error)[:200]}")
+            elif got:
+                candles.extend(got)
+        return candles, "; ".join(errors) or None
+
+    workers = max(1, _env_int("PRICE_HISTORY_BACKFILL_WORKERS", 4))
+    bucket = TokenBucket(
+        _env_float("PRICE_HISTORY_BACKFILL_RPS", 4.0),
+        capacity=max(1, _env_int("PRICE_HISTORY_BACKFILL_BURST", workers)),
+    )
+    fetched = fetch_concurrently(
+        tickers,
+        _fetch_missing,
+        max_workers=workers,
+        bucket=bucket,
+        max_retries=max(0, _env_int("PRICE_HISTORY_BACKFILL_RETRIES", 3)),
+    )
+    failures = dict(fetched["failures"])
+    for ticker, reason in failures.items():
+        print(f"[Prices] History backfill failed for {ticker}: {reason}")
+
+    rows = []
     for ticker in tickers:
-        try:
-            candles, error = fetch_yahoo_history(ticker, start, end)
-            if error or not candles:
+        if ticker not in fetched["results"]:
+            continue
+        candles, error = fetched["results"][ticker]
+        if error:
+            print(f"[Prices] History backfill failed for {ticker}: {error}")
+            failures[ticker] = error
+        if not candles:
+            if not error:
                 print(f"[Prices] No Yahoo history for {ticker}")
+                failures[ticker] = "no history"
+            continue
+        for ts, close in candles:
+            if close is None:
                 continue
-            for ts, close in candles:
-                if close is None:
-                    continue
-                try:
-                    px = float(close)
-                except (TypeError, ValueError):
-                    continue
-                if px <= 0:
-                    continue
-                date_str = datetime.datetime.fromtimestamp(
-                    ts, tz=datetime.timezone.utc
-                ).date().isoformat()
-                upsert_stock_price(ticker, date_str, px)
-                upserted += 1
-        except Exception as exc:
-            print(f"[Prices] History backfill failed for {ticker}: {exc}")
+            try:
+                px = float(close)
+            except (TypeError, ValueError):
+                continue
+            if px <= 0:
+                continue
+            date_str = datetime.datetime.fromtimestamp(
+                ts, tz=datetime.timezone.utc
+            ).date().isoformat()
+            if date_str in coverage[ticker]["present"] and date_str not in recent:
+                continue
+            rows.append((ticker, date_str, px))
+    upserted = bulk_upsert_stock_prices(rows)
 
     set_app_setting("last_price_history_backfill", today)
     distinct_after = _distinct_price_dates(lookback)
@@ -405,8 +725,14 @@ def backfill_held_price_history(
     return {
         "upserted": upserted,
         "skipped": False,
-        "reason": None,
+        "reason": f"{len(failures)} ticker(s) failed" if failures else None,
         "lookback_days": lookback,
         "distinct_dates": distinct_after,
         "tickers": len(tickers),
+        "ranges": sum(len(ranges[t]) for t in tickers),
+        "missing_days": {t: len(coverage[t]["missing"]) for t in tickers},
+        "workers": workers,
+        "latency_ms": fetched["latency_ms"],
+        "attempts": fetched["attempts"],
+        "failures": failures,
     }
@@ -366,6 +366,11 @@ def _build_context() -> tuple[str, list[dict[str, Any]]]:
         lines.append(
             f"  top_sector={ts}, hhi={p.get('hhi')}, diversification_ratio={p.get('diversification_ratio')}"
         )
+        if p.get("var_95_pct") is not None:
+            lines.append(
+                f"  one_day_var_95_pct={p.get('var_95_pct')}, cvar_95_pct={p.get('cvar_95_pct')}, "
+                f"var_99_pct={p.get('var_99_pct')}, monte_carlo_var_95_pct={p.get('mc_var_95_pct')}"
+            )
         lines.append(f"  snapshot_recorded_utc={rec.get('created_at_utc')}")
         lines.append("")
 
@@ -6,7 +6,7 @@ Run manually or on a schedule:
 
 Outputs under data/news_digest/: latest.json, latest.md. Each run also **upserts** rows into
 ``news_digest_articles`` (SQLite) keyed by normalized URL so you can keep history and query via
-``GET /api/news_articles`` (pagination and filters for the UI next). Rows include
+``GET /api/news_articles`` (pagination, filters and ``?q=`` full-text search). Rows include
 ``first_seen_at_utc`` (when we first stored the article), optional ``summary`` (NULL until a future
 summarization pipeline — see TODO in ``db_manager``). Pruning: set ``NEWS_DIGEST_RETENTION_DAYS``
 (default **90**, ``0`` disables) to drop rows whose ``first_seen_at_utc`` is older than that many days.
@@ -17,11 +17,17 @@ positions (see ``portfolio_ticker_universe``). Matching text is built from the R
 **description/summary**, **content** blocks when present, URL path words, and — when the feed omits a
 body (notably **Yahoo Finance** ``rssindex``, which often has **no** ``description`` in the XML) —
 an optional **HTTP fetch** of the article URL to read ``og:description`` / meta description (see
-``NEWS_DIGEST_FETCH_ARTICLE_SNIPPET``). Stored ``summary`` holds that combined text for re-tagging.
+``NEWS_DIGEST_FETCH_ARTICLE_SNIPPET``; up to ``NEWS_DIGEST_SNIPPET_WORKERS`` pages at once, each read only
+up to ``</head>``). Stored ``summary`` holds that combined text for re-tagging.
 Each digest run re-enriches items from the feeds; after persisting, stored rows for **today and
 yesterday** in ``NEWS_DIGEST_TZ`` are **re-tagged** from the DB so holdings added after a story first
 appeared still get badges on Refresh.
 
+Feeds are fetched concurrently over one keep-alive session (``NEWS_DIGEST_FEED_WORKERS``, default
+8). Each feed's ``ETag`` / ``Last-Modified`` and parsed items are kept in ``news_feed_http_cache``, so
+the next run sends a conditional GET and an unchanged feed (304) is not downloaded or parsed again.
+Per-feed status, latency and bytes are reported under ``feed_stats`` in the digest.
+
 Scheduling (when the Flask app runs): set NEWS_DIGEST_TZ (default America/New_York),
 NEWS_DIGEST_HOUR (default 6), NEWS_DIGEST_WINDOW_MINUTES (default 5). Automatic runs
 are skipped if latest.json is already from "today" in that timezone. Disable
@@ -30,6 +36,8 @@ background threads with NEWS_DIGEST_DISABLE_SCHEDULER=1 (e.g. tests).
 
 from __future__ import annotations
 
+import codecs
+import concurrent.futures
 import hashlib
 import html
 import json
@@ -37,14 +45,17 @@ import logging
 import os
 import re
 import threading
+import time
 from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
 import feedparser
 import requests
+import requests.adapters
 
 _LOG = logging.getLogger(__name__)
 _digest_run_lock = threading.Lock()
@@ -140,6 +151,25 @@ def _article_snippet_fetch_enabled() -> bool:
     )
 
 
+def _env_workers(name: str, n_tasks: int) -> int:
+    """Thread count from env ``name`` (default 8), clamped to ``[1, n_tasks]``."""
+    raw = (os.getenv(name) or "8").strip()
+    try:
+        n = int(raw)
+    except ValueError:
+        n = 8
+    return max(1, min(n, n_tasks))
+
+
+def _http_session(pool_size: int) -> requests.Session:
+    """Keep-alive session shared by one run's concurrent downloads."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def _max_article_snippet_fetches_per_digest() -> int:
     raw = (os.getenv("NEWS_DIGEST_MAX_ARTICLE_SNIPPET_FETCHES") or "50").strip()
     try:
@@ -201,21 +231,81 @@ def _fill_article_snippets_for_items(
     else:
         ordered = need
 
-    remaining = max_fetches
-    for it in ordered:
-        if remaining <= 0:
-            break
-        link = (it.get("link") or "").strip()
-        fetched = _fetch_article_snippet_from_url(link)
-        if fetched:
-            it["summary_text"] = fetched
-            remaining -= 1
+    urls = [(it.get("link") or "").strip() for it in ordered]
+    for i, fetched in _fetch_article_snippets(urls, max_fetches):
+        ordered[i]["summary_text"] = fetched
 
 
-def _fetch_article_snippet_from_url(url: str) -> str:
+def _fetch_article_snippets(urls: list[str], max_fetches: int) -> Iterator[tuple[int, str]]:
+    """
+    Yield ``(index, snippet)`` for the first ``max_fetches`` URLs (in list order) whose snippet
+    fetch succeeds — the same ones a serial loop would fill — using up to
+    ``NEWS_DIGEST_SNIPPET_WORKERS`` (default 8) concurrent requests over one session.
+
+    A URL is only started while successes plus in-flight fetches are below the budget, so no
+    successful fetch is wasted, failures free a slot for the next URL, and no URL past the one
+    a serial loop would stop at is requested.
+    """
+    if max_fetches <= 0 or not urls:
+        return
+    workers = _env_workers("NEWS_DIGEST_SNIPPET_WORKERS", min(len(urls), max_fetches))
+    results: dict[int, str] = {}
+    running: dict[concurrent.futures.Future[str], int] = {}
+    next_i = done_i = 0
+    hits = 0  # successful fetches so far, including ones not yet yielded
+    with _http_session(workers) as session, concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        while done_i < len(urls):
+            while next_i < len(urls) and len(running) < workers and hits + len(running) < max_fetches:
+                running[pool.submit(_fetch_article_snippet_from_url, urls[next_i], session)] = next_i
+                next_i += 1
+            if not running:
+                break
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in finished:
+                fetched = fut.result()
+                hits += bool(fetched)
+                results[running.pop(fut)] = fetched
+            # Hand out results in list order, as the serial loop filled them.
+            while done_i in results:
+                fetched = results.pop(done_i)
+                if fetched:
+                    yield done_i, fetched
+                done_i += 1
+
+
+class _HeadMetaParser(HTMLParser):
+    """Collects ``<meta>`` ``property`` / ``name`` → ``content`` until the document head ends."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta: dict[tuple[str, str], str] = {}
+        self.head_done = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "meta":
+            a = dict(attrs)
+            for key in ("property", "name"):
+                if a.get(key):
+                    self.meta.setdefault((key, a[key]), a.get("content") or "")
+        elif tag == "body":
+            self.head_done = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.head_done = True
+
+
+_SNIPPET_META = (("property", "og:description"), ("name", "twitter:description"), ("name", "description"))
+_SNIPPET_MAX_BYTES = 800_000
+
+
+def _fetch_article_snippet_from_url(url: str, http: Any = None) -> str:
     """
     When RSS has no body, load the article HTML and take ``og:description`` / meta description.
     Yahoo Finance's top news RSS often omits ``<description>`` in the feed XML.
+
+    The response is streamed through ``_HeadMetaParser`` and the download stops at ``</head>``
+    (or ``<body>``), so the article body is never transferred or parsed.
     """
     u = (url or "").strip()
     if not u.startswith(("http://", "https://")):
@@ -223,37 +313,72 @@ def _fetch_article_snippet_from_url(url: str) -> str:
     if not _article_snippet_fetch_enabled():
         return ""
     try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        return ""
-    try:
-        r = requests.get(
+        with (http or requests).get(
             u,
             headers={
                 "User-Agent": _user_agent(),
                 "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
             },
             timeout=18,
-        )
-        r.raise_for_status()
-        raw = r.text[:800_000]
-        soup = BeautifulSoup(raw, "lxml")
-        for attrs in (
-            {"property": "og:description"},
-            {"name": "twitter:description"},
-            {"name": "description"},
-        ):
-            tag = soup.find("meta", attrs=attrs)
-            if tag and tag.get("content"):
-                t = str(tag["content"]).strip()
-                if len(t) > 12:
-                    return re.sub(r"\s+", " ", t)[:12000]
+            stream=True,
+        ) as r:
+            r.raise_for_status()
+            content_type = r.headers.get("Content-Type") or ""
+            charset = (r.encoding if "charset=" in content_type.lower() else None) or "utf-8"
+            try:
+                decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+            except LookupError:  # unknown charset label in the header
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            parser = _HeadMetaParser()
+            read = 0
+            for chunk in r.iter_content(chunk_size=16_384):
+                parser.feed(decoder.decode(chunk))
+                read += len(chunk)
+                if parser.head_done or read >= _SNIPPET_MAX_BYTES:
+                    break
+        for key in _SNIPPET_META:
+            t = parser.meta.get(key, "").strip()
+            if len(t) > 12:
+                return re.sub(r"\s+", " ", t)[:12000]
     except Exception as exc:
         _LOG.debug("article snippet fetch failed for %s: %s", u, exc)
     return ""
 
 
 _TICKER_TOKEN_RE = re.compile(r"\b([A-Z0-9]{1,5}(?:\.[A-Z])?)\b")
+_DOLLAR_TICKER_RE = re.compile(r"\$([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", re.IGNORECASE)
+_EXCHANGE_TICKER_RE = re.compile(
+    r"(?:NYSE|NASDAQ|AMEX|OTC|BATS)\s*:\s*([A-Z0-9]{1,5}(?:\.[A-Z])?)\b",
+    re.IGNORECASE,
+)
+_PAREN_TICKER_RE = re.compile(r"\(([A-Z0-9]{1,5}(?:\.[A-Z])?)\)")
+# Exchange name lengths, longest first (NASDAQ, NYSE/AMEX/BATS, OTC); none is a suffix of another.
+_EXCHANGE_NAME_LENGTHS = (6, 4, 3)
+
+
+def _exchange_ticker_mentions(text: str) -> list[str]:
+    """
+    Symbols ``_EXCHANGE_TICKER_RE.finditer(text)`` would find, trying the pattern only where a
+    colon is preceded by an exchange name instead of at every position of the text.
+    """
+    out: list[str] = []
+    end = 0
+    colon = text.find(":")
+    while colon != -1:
+        name_end = colon
+        while name_end > end and text[name_end - 1].isspace():
+            name_end -= 1
+        for length in _EXCHANGE_NAME_LENGTHS:
+            start = name_end - length
+            if start < end:
+                continue
+            m = _EXCHANGE_TICKER_RE.match(text, start)
+            if m and m.start(1) > colon:
+                out.append(m.group(1))
+                end = m.end()
+                break
+        colon = text.find(":", colon + 1)
+    return out
 
 
 def _url_path_as_search_text(link: str) -> str:
@@ -282,52 +407,69 @@ def matching_text_for_ticker_enrichment(title: str, summary: str, link: str = ""
     return re.sub(r"\s+", " ", blob.strip())
 
 
+class TickerMatcher:
+    """
+    ``match_tickers_from_universe`` compiled for one universe: build it once per holdings
+    snapshot and reuse it across articles (see ``ticker_matcher``).
+
+    Bare uppercase tokens are collected with one ``findall`` and intersected with the
+    universe's multi-letter symbols, so the many words that are not holdings cost no Python
+    work. Exchange prefixes are only tried at colons (see ``_exchange_ticker_mentions``).
+    """
+
+    __slots__ = ("universe", "_symbols", "_bare_symbols")
+
+    def __init__(self, universe: dict[str, str]) -> None:
+        self.universe = dict(universe)
+        self._symbols = frozenset(self.universe)
+        # Single-letter tickers (F, C, …) only via $ / exchange / parens.
+        self._bare_symbols = frozenset(s for s in self.universe if len(s) > 1)
+
+    def match(self, text: str) -> tuple[list[str], dict[str, str]]:
+        # Whitespace runs need no collapsing: every pattern treats any run of \s alike.
+        text = (text or "").strip()
+        if not text or not self.universe:
+            return [], {}
+        found = set(self._bare_symbols.intersection(_TICKER_TOKEN_RE.findall(text.upper())))
+        explicit = _exchange_ticker_mentions(text) if ":" in text else []
+        if "$" in text:
+            explicit += _DOLLAR_TICKER_RE.findall(text)
+        if "(" in text:
+            explicit += _PAREN_TICKER_RE.findall(text)
+        found.update(s for s in map(str.upper, explicit) if s in self._symbols)
+        ordered = sorted(found)
+        return ordered, {s: self.universe[s] for s in ordered}
+
+
+_matcher_lock = threading.Lock()
+_cached_matcher: TickerMatcher | None = None
+
+
+def ticker_matcher(universe: dict[str, str]) -> TickerMatcher:
+    """The ``TickerMatcher`` for ``universe``, rebuilt only when the universe's contents change."""
+    global _cached_matcher
+    with _matcher_lock:
+        if _cached_matcher is None or _cached_matcher.universe != universe:
+            _cached_matcher = TickerMatcher(universe)
+        return _cached_matcher
+
+
 def match_tickers_from_universe(
     text: str,
-    universe: dict[str, str],
+    universe: dict[str, str] | TickerMatcher,
 ) -> tuple[list[str], dict[str, str]]:
     """
     Find mentions of symbols that exist in ``universe`` (from DB holdings: ``portfolio_ticker_universe``).
     Uses ``$SYM``, ``NYSE: SYM``, ``(SYM)``, and bare tokens (length ≥2 in universe, plus class shares like BRK.A).
     Single-letter tickers only via ``$`` / exchange / parentheses.
-    """
-    text = re.sub(r"\s+", " ", (text or "").strip())
-    if not text or not universe:
-        return [], {}
-    found: set[str] = set()
-
-    for m in re.finditer(r"\$([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text, flags=re.IGNORECASE):
-        sym = m.group(1).upper()
-        if sym in universe:
-            found.add(sym)
-
-    for m in re.finditer(
-        r"(?:NYSE|NASDAQ|AMEX|OTC|BATS)\s*:\s*([A-Z0-9]{1,5}(?:\.[A-Z])?)\b",
-        text,
-        flags=re.IGNORECASE,
-    ):
-        sym = m.group(1).upper()
-        if sym in universe:
-            found.add(sym)
-
-    for m in re.finditer(r"\(([A-Z0-9]{1,5}(?:\.[A-Z])?)\)", text):
-        sym = m.group(1).upper()
-        if sym in universe:
-            found.add(sym)
-
-    u = text.upper()
-    for m in _TICKER_TOKEN_RE.finditer(u):
-        sym = m.group(1)
-        if sym not in universe:
-            continue
-        # Single-letter tickers (F, C, …) only via $ / exchange / parens above.
-        if len(sym) == 1:
-            continue
-        found.add(sym)
 
-    ordered = sorted(found)
-    companies = {s: universe[s] for s in ordered}
-    return ordered, companies
+    Pass a ``TickerMatcher`` when matching many texts against the same universe.
+    """
+    if not isinstance(universe, TickerMatcher):
+        if not universe:
+            return [], {}
+        universe = ticker_matcher(universe)
+    return universe.match(text)
 
 
 def _infer_categories(text: str) -> list[str]:
@@ -506,7 +648,7 @@ def _infer_categories(text: str) -> list[str]:
     return sorted(cats)
 
 
-def enrich_news_item(item: dict[str, Any], universe: dict[str, str] | None = None) -> None:
+def enrich_news_item(item: dict[str, Any], universe: dict[str, str] | TickerMatcher | None = None) -> None:
     """Mutate item with ``categories``, ``tickers``, and ``ticker_companies`` from title + summary + link slug."""
     title = (item.get("title") or "").strip()
     summary = (item.get("summary_text") or "").strip()
@@ -531,19 +673,12 @@ def _user_agent() -> str:
         return DEFAULT_UA
 
 
-def _fetch_and_parse_feed(source_name: str, url: str) -> tuple[list[dict[str, Any]], str | None]:
-    """Return (items, error_message_or_none). RSS body only; HTML snippet fetch happens in ``collect_digest``."""
-    headers = {
-        "User-Agent": _user_agent(),
-        "Accept": "application/rss+xml, application/xml, text/xml, */*",
-    }
-    try:
-        r = requests.get(url, headers=headers, timeout=25)
-        r.raise_for_status()
-    except requests.RequestException as exc:
-        return [], f"{source_name}: {exc}"
+FEED_TIMEOUT_SECONDS = 25
+_FEED_ACCEPT = "application/rss+xml, application/xml, text/xml, */*"
 
-    parsed = feedparser.parse(r.content)
+
+def _parse_feed_items(source_name: str, url: str, content: bytes) -> tuple[list[dict[str, Any]], str | None]:
+    parsed = feedparser.parse(content)
     items: list[dict[str, Any]] = []
     for entry in getattr(parsed, "entries", []) or []:
         title = (entry.get("title") or "").strip()
@@ -576,6 +711,104 @@ def _fetch_and_parse_feed(source_name: str, url: str) -> tuple[list[dict[str, An
     return items, None
 
 
+def _header_str(response: Any, name: str) -> str | None:
+    value = getattr(response, "headers", {}).get(name)
+    return value if isinstance(value, str) and value else None
+
+
+def _fetch_feed(
+    source_name: str,
+    url: str,
+    http: Any = None,
+    cached: dict[str, Any] | None = None,
+    user_agent: str | None = None,
+) -> dict[str, Any]:
+    """
+    Download one feed with ``http`` (a ``requests.Session``; default ``requests``).
+
+    When ``cached`` (a ``news_feed_http_cache`` row) has items, the request is conditional
+    (``If-None-Match`` / ``If-Modified-Since``) and a 304 reuses those items without parsing.
+    Returns ``items``, ``error``, ``stats`` (status, latency, bytes) and, after a full
+    download, the ``etag`` / ``last_modified`` to store.
+    """
+    headers = {"User-Agent": user_agent or _user_agent(), "Accept": _FEED_ACCEPT}
+    if cached and cached.get("items"):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    out: dict[str, Any] = {"items": [], "error": None, "etag": None, "last_modified": None}
+    stats: dict[str, Any] = {
+        "source": source_name,
+        "url": url,
+        "status": None,
+        "not_modified": False,
+        "latency_ms": None,
+        "bytes": 0,
+        "items": 0,
+    }
+    out["stats"] = stats
+    t0 = time.perf_counter()
+    try:
+        r = (http or requests).get(url, headers=headers, timeout=FEED_TIMEOUT_SECONDS)
+        status = getattr(r, "status_code", None)
+        stats["status"] = status if isinstance(status, int) else None
+        if status == 304 and cached and cached.get("items"):
+            stats["not_modified"] = True
+            out["items"] = [dict(it) for it in cached["items"]]
+        else:
+            r.raise_for_status()
+            content = r.content
+            stats["bytes"] = len(content)
+            out["items"], out["error"] = _parse_feed_items(source_name, url, content)
+            out["etag"] = _header_str(r, "ETag")
+            out["last_modified"] = _header_str(r, "Last-Modified")
+    except requests.RequestException as exc:
+        out["error"] = f"{source_name}: {exc}"
+    stats["latency_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    stats["items"] = len(out["items"])
+    return out
+
+
+def _fetch_and_parse_feed(source_name: str, url: str) -> tuple[list[dict[str, Any]], str | None]:
+    """Return (items, error_message_or_none). RSS body only; HTML snippet fetch happens in ``collect_digest``."""
+    res = _fetch_feed(source_name, url)
+    return res["items"], res["error"]
+
+
+def _fetch_feeds(feeds: list[tuple[str, str]]) -> list[dict[str, Any]]:
+    """
+    Fetch ``feeds`` concurrently (``NEWS_DIGEST_FEED_WORKERS``, default 8) over one session,
+    in ``feeds`` order. Validators and items of full downloads are stored for the next run.
+    """
+    if not feeds:
+        return []
+    try:
+        from services import db_manager
+
+        cache: dict[str, dict[str, Any]] | None = db_manager.get_news_feed_cache([u for _, u in feeds])
+    except Exception as exc:
+        _LOG.warning("news feed cache unavailable, fetching in full: %s", exc)
+        cache = None
+    workers = _env_workers("NEWS_DIGEST_FEED_WORKERS", len(feeds))
+    user_agent = _user_agent()
+    with _http_session(workers) as session, concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(
+            pool.map(
+                lambda feed: _fetch_feed(feed[0], feed[1], session, (cache or {}).get(feed[1]), user_agent),
+                feeds,
+            )
+        )
+    if cache is not None:
+        for (_, url), res in zip(feeds, results):
+            if res["error"] is None and not res["stats"]["not_modified"] and (res["etag"] or res["last_modified"]):
+                try:
+                    db_manager.store_news_feed_cache(url, res["etag"], res["last_modified"], res["items"])
+                except Exception as exc:
+                    _LOG.warning("news feed cache store failed for %s: %s", url, exc)
+    return results
+
+
 def _dedupe_key(item: dict[str, Any]) -> str:
     link = (item.get("link") or "").strip()
     title = (item.get("title") or "").strip()
@@ -594,12 +827,13 @@ def collect_digest(
     feeds = feeds or DEFAULT_FEEDS
     batches: list[list[dict[str, Any]]] = []
     errors: list[str] = []
+    feed_stats: list[dict[str, Any]] = []
 
-    for source_name, url in feeds:
-        batch, err = _fetch_and_parse_feed(source_name, url)
-        if err:
-            errors.append(err)
-        batches.append(batch)
+    for res in _fetch_feeds(feeds):
+        if res["error"]:
+            errors.append(res["error"])
+        batches.append(res["items"])
+        feed_stats.append(res["stats"])
 
     # Round-robin so the max_items cap is not filled by only the first feed.
     all_items: list[dict[str, Any]] = []
@@ -628,8 +862,9 @@ def collect_digest(
     )
 
     universe, ticker_stats = portfolio_ticker_universe()
+    matcher = ticker_matcher(universe)
     for it in unique:
-        enrich_news_item(it, universe)
+        enrich_news_item(it, matcher)
 
     generated_at = datetime.now(timezone.utc).isoformat()
     return {
@@ -637,6 +872,7 @@ def collect_digest(
         "feed_count": len(feeds),
         "item_count": len(unique),
         "errors": errors,
+        "feed_stats": feed_stats,
         "items": unique,
         "enrichment": "keywords_v1",
         "ticker_match_source": "portfolio",
@@ -702,13 +938,14 @@ def retag_stored_articles_for_local_date(local_date: str) -> int:
     rows = db_manager.list_news_digest_articles_for_local_date(local_date)
     if not rows:
         return 0
+    matcher = ticker_matcher(universe)
     processed = 0
     for row in rows:
         title = (row.get("title") or "").strip()
         summary = (row.get("summary") or "").strip()
         link = (row.get("link") or row.get("url") or "").strip()
         blob = matching_text_for_ticker_enrichment(title, summary, link)
-        tickers, companies = match_tickers_from_universe(blob, universe)
+        tickers, companies = match_tickers_from_universe(blob, matcher)
         url = row.get("url") or ""
         if not url:
             continue
@@ -745,17 +982,11 @@ def _backfill_null_summaries_after_digest(budget: int | None = None) -> int:
     rows = db_manager.recent_news_digest_articles_with_null_summary(days=2)
     if not rows:
         return 0
+    urls = [u for u in ((row.get("url") or "").strip() for row in rows) if u]
     filled = 0
-    for row in rows:
-        if filled >= max_fetches:
-            break
-        url = (row.get("url") or "").strip()
-        if not url:
-            continue
-        snippet = _fetch_article_snippet_from_url(url)
-        if snippet:
-            db_manager.update_news_digest_article_summary(url, snippet)
-            filled += 1
+    for i, snippet in _fetch_article_snippets(urls, max_fetches):
+        db_manager.update_news_digest_article_summary(urls[i], snippet)
+        filled += 1
     if filled:
         _LOG.info("news_digest: backfilled %d null summary/summaries from HTML snippets", filled)
     return filled
@@ -1,20 +1,47 @@
 """
 Quant risk summary: volatility, drawdown, beta, sector concentration.
-Used by the /quant/risk_summary Flask route.
+Used by the /quant/risk_summary and /quant/risk_series Flask routes.
 """
-import math
 import datetime as dt
+import math
+import threading
 from typing import Any, Dict, Optional
 
 import pandas as pd
 import requests
 
+from api import risk_engine
+from api.rate_limit import raise_for_retryable_status
 from services import db_manager
 
+TRADING_DAYS = risk_engine.TRADING_DAYS
+
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+
+_yahoo_session: Optional[requests.Session] = None
+
+
+def _get_yahoo_session() -> requests.Session:
+    """Shared keep-alive session for Yahoo chart calls (safe for concurrent GETs)."""
+    global _yahoo_session
+    if _yahoo_session is None:
+        session = requests.Session()
+        session.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                "Accept": "application/json,text/plain,*/*",
+            }
+        )
+        _yahoo_session = session
+    return _yahoo_session
+
 
 def fetch_yahoo_history(symbol: str, start_date: dt.datetime, end_date: dt.datetime):
-    """Return (list of (ts, close), error_data or None)."""
-    url = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+    """
+    Return (list of (ts, close), error_data or None).
+
+    Raises ``RetryableHTTPError`` on 429 / 5xx so callers can back off and retry.
+    """
     params = {
         "period1": int(start_date.timestamp()),
         "period2": int(end_date.timestamp()),
@@ -22,11 +49,8 @@ def fetch_yahoo_history(symbol: str, start_date: dt.datetime, end_date: dt.datet
         "events": "div,splits",
         "includePrePost": "false",
     }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Accept": "application/json,text/plain,*/*",
-    }
-    resp = requests.get(url.format(symbol=symbol), params=params, headers=headers, timeout=20)
+    resp = _get_yahoo_session().get(YAHOO_CHART_URL.format(symbol=symbol), params=params, timeout=20)
+    raise_for_retryable_status(resp)
     data = resp.json()
     try:
         result = data["chart"]["result"][0]
@@ -47,11 +71,12 @@ def ensure_benchmark_history(symbol: str, start_date: dt.datetime, end_date: dt.
     candles, error = fetch_yahoo_history(symbol, start_date, end_date)
     if error:
         return series
-    for ts, close in candles or []:
-        if close is None:
-            continue
-        date_str = dt.datetime.fromtimestamp(ts, tz=dt.timezone.utc).date().isoformat()
-        db_manager.upsert_benchmark_price(symbol, date_str, float(close), source="Yahoo")
+    rows = [
+        (symbol, dt.datetime.fromtimestamp(ts, tz=dt.timezone.utc).date().isoformat(), float(close))
+        for ts, close in candles or []
+        if close is not None
+    ]
+    db_manager.bulk_upsert_benchmark_prices(rows, source="Yahoo")
     return db_manager.get_benchmark_price_series(symbol)
 
 
@@ -68,26 +93,12 @@ def compute_risk_summary() -> Dict[str, Any]:
         "hhi": None,
         "diversification_ratio": None,
     }
-    df = db_manager.get_portfolio_value_history()
-    if df.empty or len(df) < 2:
+    bounds = db_manager.get_portfolio_value_daily_bounds()
+    if bounds["rows"] < 2:
         return empty
 
-    df = df.sort_values("date").copy()
-    df["returns"] = df["portfolio_value"].pct_change()
-    returns = df["returns"].dropna()
-    volatility_raw = None
-    volatility = None
-    if not returns.empty:
-        volatility_raw = float(returns.std() * math.sqrt(252))
-        volatility = volatility_raw * 100
-
-    running_max = df["portfolio_value"].cummax()
-    drawdown = df["portfolio_value"] / running_max - 1
-    max_drawdown = float(drawdown.min() * 100) if not drawdown.empty else None
-
-    start_date = df["date"].min()
-    end_date = df["date"].max() + dt.timedelta(days=1)
-    last_updated = df["date"].max().date()
+    start_date = dt.datetime.fromisoformat(bounds["first_date"])
+    end_date = dt.datetime.fromisoformat(bounds["last_date"]) + dt.timedelta(days=1)
     today = dt.datetime.now(dt.timezone.utc).date()
     wd = today.weekday()
     last_business_day = (
@@ -96,7 +107,6 @@ def compute_risk_summary() -> Dict[str, Any]:
         else today - dt.timedelta(days=1) if wd == 5
         else today
     )
-    fresh = last_updated >= last_business_day
 
     top_sector = None
     top_sector_pct = None
@@ -133,36 +143,24 @@ def compute_risk_summary() -> Dict[str, Any]:
                         hhi = float(sum(v**2 for v in normalized.values()))
             except Exception:
                 pass
-        price_df = db_manager.get_stock_prices_df()
-        if not price_df.empty and "weight" in value_df.columns and volatility_raw is not None:
-            price_df = price_df.copy()
-            price_df["date"] = pd.to_datetime(price_df["date"])
-            price_df["closing_price"] = pd.to_numeric(price_df["closing_price"], errors="coerce")
-            price_df = price_df.sort_values(["ticker", "date"])
-            price_df["returns"] = price_df.groupby("ticker")["closing_price"].pct_change()
-            vol_by_ticker = price_df.groupby("ticker")["returns"].std() * math.sqrt(252)
-            vol_by_ticker = vol_by_ticker.dropna()
-            if not vol_by_ticker.empty:
-                weights = value_df.set_index("ticker")["weight"]
-                aligned = vol_by_ticker.to_frame("vol").join(weights.to_frame("weight"), how="inner")
-                if not aligned.empty:
-                    weighted_avg_vol = float((aligned["vol"] * aligned["weight"]).sum())
-                    if weighted_avg_vol > 0:
-                        diversification_ratio = float(volatility_raw / weighted_avg_vol)
-
-    beta = None
-    spy = ensure_benchmark_history("SPY", start_date, end_date)
-    if not spy.empty:
-        spy = spy.sort_values("date").copy()
-        spy["returns"] = spy["closing_price"].pct_change()
-        merged = pd.merge(
-            df[["date", "returns"]],
-            spy[["date", "returns"]].rename(columns={"returns": "spy_returns"}),
-            on="date",
-            how="inner",
-        ).dropna()
-        if len(merged) >= 3 and merged["spy_returns"].var() != 0:
-            beta = float(merged["returns"].cov(merged["spy_returns"]) / merged["spy_returns"].var())
+
+    # SPY must be current before the engine folds new days into its state.
+    ensure_benchmark_history("SPY", start_date, end_date)
+    held = value_df["ticker"].dropna().tolist() if not value_df.empty else []
+    risk = risk_engine.current_metrics(held, today)
+    volatility_raw = risk["volatility"]
+    volatility = volatility_raw * 100 if volatility_raw is not None else None
+    max_drawdown = risk["max_drawdown"] * 100 if risk["max_drawdown"] is not None else None
+    beta = risk["beta"]
+    last_updated = dt.date.fromisoformat(risk["last_date"] or bounds["last_date"])
+    fresh = last_updated >= last_business_day
+
+    if "weight" in value_df.columns and volatility_raw is not None:
+        weights = value_df.set_index("ticker")["weight"]
+        vols = risk["ticker_volatility"]
+        weighted_avg_vol = float(sum(vols[t] * float(w) for t, w in weights.items() if t in vols))
+        if weighted_avg_vol > 0:
+            diversification_ratio = float(volatility_raw / weighted_avg_vol)
 
     def rnd(x: Optional[float], d: int) -> Optional[float]:
         return round(x, d) if x is not None else None
@@ -180,6 +178,86 @@ def compute_risk_summary() -> Dict[str, Any]:
     }
 
 
+RISK_SERIES_WINDOWS = (21, 63, 252)
+# One entry per (windows, risk-free rate), dropped wholesale when the price data version moves.
+_risk_series_cache: Dict[str, Any] = {"version": None, "entries": {}}
+_risk_series_lock = threading.Lock()
+
+
+def _series_values(values: pd.Series, scale: float = 1.0) -> list:
+    arr = values.to_numpy(dtype="float64") * scale
+    return [round(float(x), 4) if math.isfinite(x) else None for x in arr]
+
+
+def _build_risk_series(windows: tuple, risk_free_rate: float) -> Dict[str, Any]:
+    pv = db_manager.get_portfolio_value_daily()
+    if len(pv) < 2:
+        return {"dates": [], "windows": {str(w): {} for w in windows}}
+    values = pv.set_index("date")["portfolio_value"]
+    returns = values.pct_change()
+    spy = db_manager.get_benchmark_price_series("SPY")
+    if spy.empty:
+        spy_returns = pd.Series(float("nan"), index=values.index)
+    else:
+        spy_returns = spy.set_index("date")["closing_price"].pct_change().reindex(values.index)
+    # Beta only uses dates where both series have a return.
+    spy_paired = spy_returns + 0 * returns
+    excess = returns - risk_free_rate / TRADING_DAYS
+    annualize = math.sqrt(TRADING_DAYS)
+
+    out: Dict[str, Any] = {}
+    for w in windows:
+        roll = returns.rolling(w, min_periods=w)
+        std = roll.std()
+        min_pairs = max(3, w // 2)
+        beta = (
+            returns.rolling(w, min_periods=min_pairs).cov(spy_paired)
+            / spy_paired.rolling(w, min_periods=min_pairs).var()
+        )
+        drawdown = values / values.rolling(w, min_periods=1).max() - 1
+        sharpe = excess.rolling(w, min_periods=w).mean() / std * annualize
+        out[str(w)] = {
+            "volatility_pct": _series_values(std, annualize * 100),
+            "beta": _series_values(beta),
+            "drawdown_pct": _series_values(drawdown, 100),
+            "sharpe": _series_values(sharpe),
+        }
+    return {"dates": [d.strftime("%Y-%m-%d") for d in values.index], "windows": out}
+
+
+def compute_risk_series(windows=RISK_SERIES_WINDOWS, risk_free_rate: float = 0.0) -> Dict[str, Any]:
+    """
+    Rolling risk metrics over the daily portfolio value series, one list per
+    metric aligned with ``dates``, for each trailing window (trading days):
+
+    - ``volatility_pct``: annualized std of daily returns;
+    - ``beta``: rolling cov / var against SPY returns on shared dates (needs
+      at least half the window, minimum 3);
+    - ``drawdown_pct``: value vs the highest value within the window;
+    - ``sharpe``: annualized mean excess return over std (``risk_free_rate``
+      is annual).
+
+    Values are None until a window fills. Results are cached until
+    ``quant_risk_state.data_version`` changes, i.e. until new prices land.
+    """
+    windows = tuple(sorted({int(w) for w in windows}))
+    key = (windows, float(risk_free_rate))
+    version = db_manager.get_quant_data_version()
+    with _risk_series_lock:
+        if _risk_series_cache["version"] != version:
+            _risk_series_cache["version"] = version
+            _risk_series_cache["entries"] = {}
+        hit = _risk_series_cache["entries"].get(key)
+    if hit is not None:
+        return {**hit, "cached": True}
+    result = _build_risk_series(windows, float(risk_free_rate))
+    result["data_version"] = version
+    with _risk_series_lock:
+        if _risk_series_cache["version"] == version:
+            _risk_series_cache["entries"][key] = result
+    return {**result, "cached": False}
+
+
 def record_daily_risk_snapshot_for_insights() -> None:
     """
     Store the current ``compute_risk_summary()`` payload keyed by portfolio as-of date
@@ -190,5 +268,11 @@ def record_daily_risk_snapshot_for_insights() -> None:
     if not raw:
         return
     snap = str(raw)[:10]
+    try:
+        from api import value_at_risk
+
+        data.update(value_at_risk.snapshot_fields(value_at_risk.compute_var_summary()))
+    except Exception:
+        pass
     db_manager.upsert_quant_risk_snapshot(snap, data)
     db_manager.prune_quant_risk_snapshots()
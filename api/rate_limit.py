@@ -0,0 +1,210 @@
+"""
+Rate limiting and retry helpers for outbound market-data HTTP calls.
+
+``TokenBucket`` caps request rate across worker threads and
+``AdaptiveConcurrency`` caps requests in flight (halved on 429, grown back on
+success). ``fetch_concurrently`` runs a per-key fetch function on a bounded
+thread pool behind both, retrying ``RetryableHTTPError`` (429 / 5xx) and
+network errors with jittered exponential backoff, and reports per-key latency
+and failures.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import requests
+
+# Backoff before retry N (0-based) is min(cap, base * 2**N), scaled by a random
+# factor in [0.5, 1.0] so parallel workers do not retry in lockstep.
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+
+
+class RetryableHTTPError(Exception):
+    """HTTP 429 or 5xx from an upstream API; ``retry_after`` in seconds when sent."""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None, message: str = ""):
+        super().__init__(message or f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def raise_for_retryable_status(resp: requests.Response) -> None:
+    """Raise ``RetryableHTTPError`` when ``resp`` is a 429 or 5xx."""
+    status = resp.status_code
+    if status != 429 and status < 500:
+        return
+    retry_after = None
+    raw = (resp.headers.get("Retry-After") or "").strip()
+    if raw:
+        try:
+            retry_after = max(float(raw), 0.0)
+        except ValueError:
+            retry_after = None
+    raise RetryableHTTPError(status, retry_after)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` tokens per second, up to ``capacity``.
+
+    ``acquire()`` blocks until a token is available. A ``rate`` of 0 or less
+    disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(self.rate, 1.0))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``; returns seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on requests in flight.
+
+    Starts at ``initial``; each throttled release halves the limit (not below
+    ``minimum``) and every ``limit`` consecutive successes raise it by one, up
+    to ``maximum``.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self._limit = min(self.maximum, max(self.minimum, int(initial)))
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(self.minimum, self._limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self._limit:
+                    self._limit = min(self.maximum, self._limit + 1)
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """Jittered exponential backoff for retry ``attempt`` (0-based)."""
+    base = BACKOFF_BASE_SECONDS if base is None else base
+    cap = BACKOFF_CAP_SECONDS if cap is None else cap
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def fetch_concurrently(
+    keys: Iterable[str],
+    fetch_one: Callable[[str], Any],
+    *,
+    max_workers: int = 4,
+    bucket: Optional[TokenBucket] = None,
+    concurrency: Optional[AdaptiveConcurrency] = None,
+    max_retries: int = 3,
+    sleep=time.sleep,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Call ``fetch_one(key)`` for each key on at most ``max_workers`` threads.
+
+    Every attempt takes a token from ``bucket`` and a slot from
+    ``concurrency`` first; an HTTP 429 releases the slot as throttled. ``RetryableHTTPError``
+    and ``requests.RequestException`` are retried up to ``max_retries`` times
+    with ``backoff_delay`` (or the server's ``Retry-After`` when longer, capped at
+    ``BACKOFF_CAP_SECONDS``); any
+    other exception fails the key immediately.
+
+    Returns ``{"results": {key: value}, "latency_ms": {key: ms},
+    "attempts": {key: n}, "failures": {key: reason}}``. Latency covers the
+    whole key including retries and rate-limit waits.
+    """
+    keys = list(dict.fromkeys(keys))
+    out: Dict[str, Dict[str, Any]] = {"results": {}, "latency_ms": {}, "attempts": {}, "failures": {}}
+    lock = threading.Lock()
+
+    def _run(key: str) -> None:
+        started = time.perf_counter()
+        attempt = 0
+        value = None
+        error = None
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            attempt += 1
+            if concurrency is not None:
+                concurrency.acquire()
+            retry_exc = None
+            try:
+                value = fetch_one(key)
+                error = None
+            except (RetryableHTTPError, requests.RequestException) as exc:
+                retry_exc = exc
+                error = str(exc) or type(exc).__name__
+            except Exception as exc:
+                error = str(exc) or type(exc).__name__
+            finally:
+                if concurrency is not None:
+                    concurrency.release(throttled=getattr(retry_exc, "status", None) == 429)
+            if retry_exc is None or attempt > max_retries:
+                break
+            delay = backoff_delay(attempt - 1)
+            retry_after = getattr(retry_exc, "retry_after", None)
+            if retry_after is not None:
+                # A server-sent Retry-After is honoured only up to the backoff cap.
+                delay = max(delay, min(retry_after, BACKOFF_CAP_SECONDS))
+            sleep(delay)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with lock:
+            out["latency_ms"][key] = round(elapsed_ms, 1)
+            out["attempts"][key] = attempt
+            if error is None:
+                out["results"][key] = value
+            else:
+                out["failures"][key] = error
+
+    if not keys:
+        return out
+    workers = max(1, min(int(max_workers), len(keys)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_run, keys))
+    return out
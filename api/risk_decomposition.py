@@ -0,0 +1,199 @@
+"""
+Covariance-based portfolio risk decomposition.
+
+Builds an aligned daily returns matrix (dates x held tickers) over a trailing
+lookback, shrinks its sample covariance toward a scaled identity
+(Ledoit-Wolf), and splits portfolio volatility into per-position marginal and
+component contributions. The matrix is the expensive part, so it is cached
+per day and ``quant_risk_state.data_version``; contributions are recomputed
+from current position weights on every call.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.risk_engine import TRADING_DAYS
+from services import db_manager
+
+DEFAULT_LOOKBACK_DAYS = 252
+# Tickers with fewer daily returns than this in the window are left out of the matrix.
+MIN_OBSERVATIONS = 20
+
+_cov_cache: Dict[str, Any] = {"key": None, "value": None}
+_cov_lock = threading.Lock()
+
+
+def returns_matrix(prices: pd.DataFrame, lookback: int = DEFAULT_LOOKBACK_DAYS) -> pd.DataFrame:
+    """
+    Daily close-to-close returns from long ``ticker`` / ``date`` /
+    ``closing_price`` rows, one column per ticker on the union of dates,
+    limited to the last ``lookback`` returns. Missing days stay NaN.
+    """
+    if prices.empty:
+        return pd.DataFrame()
+    wide = prices.pivot_table(index="date", columns="ticker", values="closing_price", aggfunc="last")
+    wide = wide.sort_index()
+    returns = wide / wide.ffill().shift(1) - 1
+    returns = returns.where(wide.notna())
+    return returns.iloc[1:].tail(lookback)
+
+
+def shrunk_covariance(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf covariance of a (n_obs x n_assets) returns array toward
+    ``mean variance * I``. NaNs count as a zero deviation from the column
+    mean. Returns ``(covariance, shrinkage)`` with shrinkage in [0, 1].
+    """
+    x = np.asarray(returns, dtype="float64")
+    n, p = x.shape
+    mask = np.isfinite(x)
+    counts = np.maximum(mask.sum(axis=0), 1)
+    means = np.where(mask, x, 0.0).sum(axis=0) / counts
+    x = np.where(mask, x - means, 0.0)
+
+    sample = x.T @ x / n
+    mu = np.trace(sample) / p
+    target_dist = sample.copy()
+    target_dist[np.diag_indices(p)] -= mu
+    delta = float((target_dist ** 2).sum()) / p
+    if delta <= 0:
+        return sample, 0.0
+    row_norms = (x ** 2).sum(axis=1)
+    beta = (float((row_norms ** 2).sum()) / n - float((sample ** 2).sum())) / (n * p)
+    shrinkage = min(max(beta / delta, 0.0), 1.0)
+    cov = (1.0 - shrinkage) * sample
+    cov[np.diag_indices(p)] += shrinkage * mu
+    return cov, shrinkage
+
+
+def risk_contributions(cov: np.ndarray, weights: np.ndarray) -> Dict[str, Any]:
+    """
+    Portfolio volatility ``sqrt(w' C w)`` with marginal (``C w / vol``) and
+    component (``w * marginal``, summing to vol) contributions, all in the
+    units of ``cov`` (daily).
+    """
+    w = np.asarray(weights, dtype="float64")
+    cw = cov @ w
+    variance = float(w @ cw)
+    vol = math.sqrt(variance) if variance > 0 else 0.0
+    marginal = cw / vol if vol > 0 else np.zeros_like(w)
+    return {"volatility": vol, "marginal": marginal, "component": w * marginal}
+
+
+def covariance_inputs(tickers: Tuple[str, ...], lookback: int, today: dt.date) -> Dict[str, Any]:
+    """
+    Returns matrix and shrunk covariance for ``tickers`` over ``lookback``
+    days ending ``today``: ``tickers`` kept (enough history), ``returns``
+    (n_obs x n_kept, NaN where missing), ``covariance``, ``shrinkage`` and
+    ``observations``. Cached per day and price-data version.
+    """
+    key = (db_manager.get_quant_data_version(), today.isoformat(), tickers, lookback)
+    with _cov_lock:
+        if _cov_cache["key"] == key:
+            return {**_cov_cache["value"], "cached": True}
+    # ~1.5 calendar days per trading day, plus slack for holidays.
+    start = today - dt.timedelta(days=int(lookback * 1.5) + 10)
+    prices = db_manager.get_price_history_df(list(tickers), start_date=start.isoformat())
+    returns = returns_matrix(prices, lookback)
+    if not returns.empty:
+        returns = returns.loc[:, returns.notna().sum() >= MIN_OBSERVATIONS]
+    if returns.empty or returns.shape[1] == 0:
+        value = {
+            "tickers": [],
+            "returns": np.zeros((0, 0)),
+            "covariance": np.zeros((0, 0)),
+            "shrinkage": None,
+            "observations": 0,
+        }
+    else:
+        cov, shrinkage = shrunk_covariance(returns.to_numpy())
+        value = {
+            "tickers": [str(t) for t in returns.columns],
+            "returns": returns.to_numpy(),
+            "covariance": cov,
+            "shrinkage": shrinkage,
+            "observations": int(len(returns)),
+        }
+    with _cov_lock:
+        _cov_cache["key"] = key
+        _cov_cache["value"] = value
+    return {**value, "cached": False}
+
+
+def held_position_values() -> pd.Series:
+    """Current position value per held ticker (positive values only)."""
+    value_df = db_manager.get_value_stocks()
+    if value_df.empty:
+        return pd.Series(dtype="float64")
+    values = value_df.groupby("ticker")["position_value"].sum()
+    return values[values > 0]
+
+
+def compute_risk_decomposition(
+    lookback: int = DEFAULT_LOOKBACK_DAYS,
+    today: Optional[dt.date] = None,
+) -> Dict[str, Any]:
+    """
+    Per-position risk contributions for current holdings (annualized, in %).
+
+    ``positions`` rows carry ``weight``, ``volatility_pct`` (own),
+    ``marginal_pct`` (d portfolio vol / d weight), ``component_pct`` (sums
+    to ``volatility_pct`` of the portfolio) and ``contribution_share``
+    (component / portfolio vol). Holdings without enough price history are
+    listed in ``excluded``; weights are renormalized over the rest.
+    """
+    today = today or dt.datetime.now(dt.timezone.utc).date()
+    values = held_position_values()
+    empty = {
+        "volatility_pct": None,
+        "diversification_ratio": None,
+        "shrinkage": None,
+        "observations": 0,
+        "positions": [],
+        "excluded": [],
+        "cached": False,
+    }
+    if values.empty:
+        return empty
+    cov_data = covariance_inputs(tuple(sorted(values.index)), int(lookback), today)
+    tickers: List[str] = cov_data["tickers"]
+    excluded = sorted(set(values.index) - set(tickers))
+    if not tickers:
+        return {**empty, "excluded": excluded, "cached": cov_data["cached"]}
+
+    w = values.reindex(tickers).to_numpy(dtype="float64")
+    w = w / w.sum()
+    cov = cov_data["covariance"]
+    contrib = risk_contributions(cov, w)
+    annualize = math.sqrt(TRADING_DAYS) * 100
+    own = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    vol = contrib["volatility"]
+    weighted_own = float(own @ w)
+    positions = [
+        {
+            "ticker": t,
+            "weight": round(float(w[i]), 6),
+            "volatility_pct": round(float(own[i] * annualize), 4),
+            "marginal_pct": round(float(contrib["marginal"][i] * annualize), 4),
+            "component_pct": round(float(contrib["component"][i] * annualize), 4),
+            "contribution_share": round(float(contrib["component"][i] / vol), 6) if vol > 0 else None,
+        }
+        for i, t in enumerate(tickers)
+    ]
+    positions.sort(key=lambda p: p["component_pct"], reverse=True)
+    return {
+        "volatility_pct": round(vol * annualize, 4),
+        # Same orientation as compute_risk_summary: portfolio vol / weighted own vol.
+        "diversification_ratio": round(vol / weighted_own, 4) if weighted_own > 0 else None,
+        "shrinkage": round(float(cov_data["shrinkage"]), 6),
+        "observations": cov_data["observations"],
+        "positions": positions,
+        "excluded": excluded,
+        "cached": cov_data["cached"],
+    }
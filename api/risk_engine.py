@@ -0,0 +1,232 @@
+"""
+Incremental portfolio risk state behind ``compute_risk_summary``.
+
+Instead of re-reading the whole portfolio and price history per request, the
+engine keeps running moments in ``quant_risk_state``:
+
+- portfolio daily returns: Welford count / mean / M2 (volatility), running
+  max and worst drawdown;
+- portfolio vs SPY returns on shared dates: co-moment and SPY M2 (beta);
+- per-ticker close-to-close returns: Welford count / mean / M2 (volatility).
+
+Days before today are folded into the stored state; today's rows, which are
+still being revised by live quotes, are applied to a copy per request. Each
+call only reads rows after ``as_of_date``. Triggers on ``stock_prices``,
+``portfolio_value_daily`` and ``benchmark_prices`` record the earliest date
+written, so an edit at or before ``as_of_date`` forces a full rebuild.
+"""
+from __future__ import annotations
+
+import copy
+import datetime as dt
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from services import db_manager
+
+TRADING_DAYS = 252
+BENCHMARK = "SPY"
+
+
+def new_state() -> Dict[str, Any]:
+    return {
+        "portfolio": {
+            "first_date": None,
+            "last_date": None,
+            "last_value": None,
+            "n": 0,
+            "mean": 0.0,
+            "m2": 0.0,
+            "run_max": None,
+            "min_drawdown": None,
+        },
+        "benchmark": {"last_close": None},
+        "beta": {"n": 0, "mean_p": 0.0, "mean_s": 0.0, "c": 0.0, "m2_s": 0.0},
+        "tickers": {},
+        "loaded": [],
+    }
+
+
+def _return(prev: Optional[float], cur: float) -> Optional[float]:
+    if prev is None or prev == 0:
+        return None
+    r = cur / prev - 1.0
+    return r if math.isfinite(r) else None
+
+
+def _welford(acc: Dict[str, Any], x: float) -> None:
+    acc["n"] += 1
+    delta = x - acc["mean"]
+    acc["mean"] += delta / acc["n"]
+    acc["m2"] += delta * (x - acc["mean"])
+
+
+def advance(
+    state: Dict[str, Any],
+    portfolio_rows: Iterable[Tuple[str, float]],
+    benchmark_rows: Iterable[Tuple[str, float]],
+    price_rows: Iterable[Tuple[str, str, float]],
+) -> None:
+    """
+    Fold rows into ``state`` in place. ``portfolio_rows`` and
+    ``benchmark_rows`` are ``(date, value)``, ``price_rows`` are
+    ``(ticker, date, close)``; all must be later than what ``state`` holds
+    and sorted by date (per ticker for prices).
+    """
+    pf = state["portfolio"]
+    bench = state["benchmark"]
+    beta = state["beta"]
+    pv = dict(portfolio_rows)
+    spy = dict(benchmark_rows)
+    for date in sorted(pv.keys() | spy.keys()):
+        r_s = None
+        if date in spy:
+            r_s = _return(bench["last_close"], spy[date])
+            bench["last_close"] = spy[date]
+        if date not in pv:
+            continue
+        value = pv[date]
+        r_p = _return(pf["last_value"], value)
+        pf["last_value"] = value
+        pf["first_date"] = pf["first_date"] or date
+        pf["last_date"] = date
+        pf["run_max"] = value if pf["run_max"] is None else max(pf["run_max"], value)
+        if pf["run_max"] > 0:
+            dd = value / pf["run_max"] - 1.0
+            pf["min_drawdown"] = dd if pf["min_drawdown"] is None else min(pf["min_drawdown"], dd)
+        if r_p is None:
+            continue
+        _welford(pf, r_p)
+        if r_s is not None:
+            beta["n"] += 1
+            dp = r_p - beta["mean_p"]
+            beta["mean_p"] += dp / beta["n"]
+            ds = r_s - beta["mean_s"]
+            beta["mean_s"] += ds / beta["n"]
+            beta["c"] += dp * (r_s - beta["mean_s"])
+            beta["m2_s"] += ds * (r_s - beta["mean_s"])
+
+    tickers = state["tickers"]
+    for ticker, _date, close in price_rows:
+        acc = tickers.setdefault(ticker, {"last_close": None, "n": 0, "mean": 0.0, "m2": 0.0})
+        r = _return(acc["last_close"], close)
+        acc["last_close"] = close
+        if r is not None:
+            _welford(acc, r)
+
+
+def metrics(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Annualized volatility (fraction), max drawdown (fraction), beta vs SPY and
+    per-ticker annualized volatility from ``state``. Sample (n - 1)
+    statistics, matching ``pandas`` ``std`` / ``cov``; None when undefined.
+    """
+    pf = state["portfolio"]
+    beta = state["beta"]
+    annualize = math.sqrt(TRADING_DAYS)
+    vol = math.sqrt(pf["m2"] / (pf["n"] - 1)) * annualize if pf["n"] >= 2 else None
+    beta_value = None
+    if beta["n"] >= 3 and beta["m2_s"] != 0:
+        beta_value = beta["c"] / beta["m2_s"]
+    ticker_vol = {
+        t: math.sqrt(acc["m2"] / (acc["n"] - 1)) * annualize
+        for t, acc in state["tickers"].items()
+        if acc["n"] >= 2
+    }
+    return {
+        "volatility": vol,
+        "max_drawdown": pf["min_drawdown"],
+        "beta": beta_value,
+        "ticker_volatility": ticker_vol,
+        "first_date": pf["first_date"],
+        "last_date": pf["last_date"],
+    }
+
+
+def _split(rows: List[tuple], cutoff: str, date_index: int) -> Tuple[List[tuple], List[tuple]]:
+    return (
+        [r for r in rows if r[date_index] < cutoff],
+        [r for r in rows if r[date_index] >= cutoff],
+    )
+
+
+def _day(value) -> str:
+    return str(value)[:10]
+
+
+def _load(since: Optional[str], tickers: List[str]) -> Tuple[List[tuple], List[tuple], List[tuple]]:
+    pv = db_manager.get_portfolio_value_daily(start_date=since)
+    spy = db_manager.get_benchmark_price_series(BENCHMARK, start_date=since)
+    prices = db_manager.get_price_history_df(tickers, start_date=since) if tickers else None
+    portfolio_rows = [(_day(d), float(v)) for d, v in zip(pv["date"], pv["portfolio_value"]) if v == v]
+    benchmark_rows = (
+        [(_day(d), float(v)) for d, v in zip(spy["date"], spy["closing_price"]) if v == v]
+        if not spy.empty else []
+    )
+    price_rows = (
+        [(str(t), _day(d), float(v)) for t, d, v in zip(prices["ticker"], prices["date"], prices["closing_price"])]
+        if prices is not None and not prices.empty else []
+    )
+    return portfolio_rows, benchmark_rows, price_rows
+
+
+def _load_ticker_history(tickers: List[str]) -> List[tuple]:
+    prices = db_manager.get_price_history_df(tickers)
+    if prices.empty:
+        return []
+    return [
+        (str(t), _day(d), float(v))
+        for t, d, v in zip(prices["ticker"], prices["date"], prices["closing_price"])
+    ]
+
+
+def current_metrics(tickers: Iterable[str], today: dt.date) -> Dict[str, Any]:
+    """
+    Risk metrics through the latest stored rows for the portfolio and
+    ``tickers``.
+
+    Advances the stored state by the rows dated after ``as_of_date`` and
+    before ``today`` and saves it (skipped if inputs changed meanwhile), then
+    applies rows from ``today`` on to a copy. ``full_rebuild`` in the result
+    tells whether the stored state had to be rebuilt from scratch.
+    """
+    wanted = sorted({str(t).upper() for t in tickers if t and str(t).strip()})
+    row = db_manager.get_quant_risk_state()
+    state = row["state"]
+    as_of = row["as_of_date"]
+    dirty_from = row["dirty_from"]
+    cutoff = today.isoformat()
+    full = (
+        state is None
+        or as_of is None
+        or as_of >= cutoff
+        or (dirty_from is not None and dirty_from[:10] <= as_of)
+    )
+    if full:
+        state = new_state()
+        as_of = None
+    since = None if as_of is None else (dt.date.fromisoformat(as_of) + dt.timedelta(days=1)).isoformat()
+
+    loaded = set(state["loaded"])
+    known = [t for t in wanted if t in loaded]
+    portfolio_rows, benchmark_rows, price_rows = _load(since, known)
+    added = [t for t in wanted if t not in loaded]
+    if added:
+        price_rows += _load_ticker_history(added)
+        state["loaded"] = sorted(loaded | set(added))
+
+    pf_done, pf_today = _split(portfolio_rows, cutoff, 0)
+    spy_done, spy_today = _split(benchmark_rows, cutoff, 0)
+    px_done, px_today = _split(price_rows, cutoff, 1)
+    advance(state, pf_done, spy_done, px_done)
+    new_as_of = (today - dt.timedelta(days=1)).isoformat()
+    if full or added or pf_done or spy_done or px_done or dirty_from is not None or as_of != new_as_of:
+        db_manager.save_quant_risk_state(state, new_as_of, row["data_version"])
+
+    if pf_today or spy_today or px_today:
+        state = copy.deepcopy(state)
+        advance(state, pf_today, spy_today, px_today)
+    out = metrics(state)
+    out["full_rebuild"] = full
+    return out
+
@@ -0,0 +1,199 @@
+"""
+One-day Value-at-Risk and expected shortfall (CVaR) for the held portfolio.
+
+Both methods apply current position weights to the trailing returns matrix
+from ``risk_decomposition.covariance_inputs``:
+
+- historical simulation: empirical loss quantiles of ``R @ w``;
+- Monte Carlo: ``VAR_MC_SCENARIOS`` (default 100k) one-day portfolio
+  returns drawn in batches, either zero-mean normal with the shrunk
+  covariance's portfolio variance ``w' cov w`` or a bootstrap of historical
+  days (``VAR_MC_METHOD``). Only the 1-D portfolio return is simulated: a
+  correlated asset draw projected onto ``w`` has exactly that distribution.
+
+Losses are positive numbers: % of the covered portfolio value and dollars.
+Batches get independent seeds from one ``SeedSequence``, so a run is
+reproducible. Results are cached per day and price-data version.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.risk_decomposition import DEFAULT_LOOKBACK_DAYS, covariance_inputs, held_position_values
+from services import db_manager
+
+CONFIDENCE_LEVELS = (0.95, 0.99)
+BATCH_SIZE = 10_000
+MC_METHODS = ("normal", "bootstrap")
+
+_var_cache: Dict[str, Any] = {"key": None, "value": None}
+_var_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def tail_risk(returns: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """VaR and CVaR at ``confidence`` as positive loss fractions of sampled returns."""
+    losses = -np.asarray(returns, dtype="float64")
+    losses = losses[np.isfinite(losses)]
+    if losses.size == 0:
+        return float("nan"), float("nan")
+    var = float(np.quantile(losses, confidence))
+    return var, float(losses[losses >= var].mean())
+
+
+def portfolio_sigma(cov: np.ndarray, weights: np.ndarray) -> float:
+    """One-day portfolio volatility ``sqrt(w' cov w)`` (0 if rounding makes the variance negative)."""
+    w = np.asarray(weights, dtype="float64")
+    return float(np.sqrt(max(float(w @ np.asarray(cov, dtype="float64") @ w), 0.0)))
+
+
+def _simulate_batch(method: str, source: Any, size: int, seed: np.random.SeedSequence) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if method == "bootstrap":
+        return source[rng.integers(0, source.shape[0], size)]
+    return rng.standard_normal(size) * source
+
+
+def monte_carlo_returns(
+    cov: np.ndarray,
+    weights: np.ndarray,
+    *,
+    n_scenarios: int,
+    method: str = "normal",
+    history: Optional[np.ndarray] = None,
+    seed: int = 0,
+    batch_size: int = BATCH_SIZE,
+) -> np.ndarray:
+    """
+    ``n_scenarios`` simulated one-day portfolio returns.
+
+    ``normal`` draws ``N(0, w' cov w)`` directly: ``w . r`` for correlated
+    ``r ~ N(0, cov)`` has that law, so there is no per-asset draw.
+    ``bootstrap`` resamples days of ``history @ w`` (``history`` is the
+    n_obs x n_assets returns matrix).
+    """
+    if method not in MC_METHODS:
+        raise ValueError(f"method must be one of {MC_METHODS}")
+    w = np.asarray(weights, dtype="float64")
+    if method == "bootstrap":
+        source = np.nan_to_num(np.asarray(history, dtype="float64")) @ w
+    else:
+        source = portfolio_sigma(cov, w)
+    n_scenarios = max(1, int(n_scenarios))
+    sizes = [batch_size] * (n_scenarios // batch_size)
+    if n_scenarios % batch_size:
+        sizes.append(n_scenarios % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return np.concatenate([_simulate_batch(method, source, size, s) for size, s in zip(sizes, seeds)])
+
+
+def _levels(returns: np.ndarray, value: float) -> Dict[str, Dict[str, Optional[float]]]:
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    for level in CONFIDENCE_LEVELS:
+        var, cvar = tail_risk(returns, level)
+        ok = np.isfinite(var)
+        out[str(round(level * 100))] = {
+            "var_pct": round(var * 100, 4) if ok else None,
+            "cvar_pct": round(cvar * 100, 4) if ok else None,
+            "var_value": round(var * value, 2) if ok else None,
+            "cvar_value": round(cvar * value, 2) if ok else None,
+        }
+    return out
+
+
+def compute_var_summary(
+    today: Optional[dt.date] = None,
+    *,
+    scenarios: Optional[int] = None,
+    method: Optional[str] = None,
+    lookback: int = DEFAULT_LOOKBACK_DAYS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Historical and Monte Carlo one-day VaR / CVaR at 95% and 99%.
+
+    ``historical`` and ``monte_carlo`` map ``"95"`` / ``"99"`` to
+    ``var_pct``, ``cvar_pct``, ``var_value`` and ``cvar_value``.
+    ``portfolio_value`` is the value of the positions covered by the returns
+    matrix; holdings without enough history are listed in ``excluded``.
+    """
+    today = today or dt.datetime.now(dt.timezone.utc).date()
+    scenarios = int(scenarios or _env_int("VAR_MC_SCENARIOS", 100_000))
+    method = (method or os.getenv("VAR_MC_METHOD") or "normal").strip().lower()
+    if method not in MC_METHODS:
+        raise ValueError(f"method must be one of {MC_METHODS}")
+    values = held_position_values()
+    tickers = tuple(sorted(values.index))
+    key = (db_manager.get_quant_data_version(), today.isoformat(), tickers, lookback, scenarios, method, seed)
+    with _var_lock:
+        if _var_cache["key"] == key:
+            return {**_var_cache["value"], "cached": True}
+
+    empty_levels = {str(round(c * 100)): {} for c in CONFIDENCE_LEVELS}
+    result: Dict[str, Any] = {
+        "as_of": today.isoformat(),
+        "horizon_days": 1,
+        "portfolio_value": None,
+        "observations": 0,
+        "excluded": list(tickers),
+        "historical": empty_levels,
+        "monte_carlo": {"scenarios": 0, "method": method, "levels": empty_levels},
+    }
+    if tickers:
+        inputs = covariance_inputs(tickers, int(lookback), today)
+        kept: List[str] = inputs["tickers"]
+        result["excluded"] = sorted(set(tickers) - set(kept))
+        if kept and inputs["observations"] >= 2:
+            covered = values.reindex(kept).to_numpy(dtype="float64")
+            total = float(covered.sum())
+            w = covered / total
+            history = inputs["returns"]
+            simulated = monte_carlo_returns(
+                inputs["covariance"],
+                w,
+                n_scenarios=scenarios,
+                method=method,
+                history=history,
+                seed=seed,
+            )
+            result.update(
+                {
+                    "portfolio_value": round(total, 2),
+                    "observations": inputs["observations"],
+                    "historical": _levels(np.nan_to_num(history) @ w, total),
+                    "monte_carlo": {
+                        "scenarios": int(simulated.size),
+                        "method": method,
+                        "levels": _levels(simulated, total),
+                    },
+                }
+            )
+    with _var_lock:
+        _var_cache["key"] = key
+        _var_cache["value"] = result
+    return {**result, "cached": False}
+
+
+def snapshot_fields(summary: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Flat VaR / CVaR percentages for ``quant_risk_snapshots`` payloads and home cards."""
+    out: Dict[str, Optional[float]] = {}
+    for prefix, levels in (("", summary["historical"]), ("mc_", summary["monte_carlo"]["levels"])):
+        for level in CONFIDENCE_LEVELS:
+            row = levels.get(str(round(level * 100))) or {}
+            out[f"{prefix}var_{round(level * 100)}_pct"] = row.get("var_pct")
+            out[f"{prefix}cvar_{round(level * 100)}_pct"] = row.get("cvar_pct")
+    return out
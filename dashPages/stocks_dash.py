@@ -241,8 +241,7 @@ def force_update_table(n_clicks, current_counter):
     
     
 # Page layout
-_price_df = db_manager.get_stock_prices_df()
-_price_df = _normalize_price_df(_price_df)
+_price_df = db_manager.get_price_history_df()
 _min_date = _price_df["date"].min() if not _price_df.empty else None
 _max_date = _price_df["date"].max() if not _price_df.empty else None
 _min_date_str = _min_date.date().isoformat() if _min_date is not None else None
@@ -553,7 +552,7 @@ layout = html.Div(
 def update_historical_chart(n_intervals, store_data, tickers, chart_type, start_date, end_date):
     from api import security_type as st
 
-    df = db_manager.get_stock_prices_df()
+    df = db_manager.get_price_history_df(tickers or None)
     if not df.empty:
         allowed = set(st.filter_tickers_for_ui(df["ticker"].astype(str).unique().tolist()))
         df = df[df["ticker"].isin(allowed)]
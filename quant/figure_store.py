@@ -0,0 +1,148 @@
+"""
+Compact on-disk storage for backtest charts.
+
+Each job keeps the arrays behind its charts (equity curve dates / values and
+the trades table) in one compressed ``data/quant_figures/<job_id>/arrays.npz``
+instead of three Plotly JSON documents. Figures are rebuilt on demand by
+``quant_backtest.backtest_figures``, with long lines min/max downsampled to
+``max_points``. Runs saved before this format still load from their JSON
+files.
+
+Job directories older than ``QUANT_FIGURES_RETENTION_DAYS`` (default 90), or
+beyond the newest ``QUANT_FIGURES_MAX_RUNS`` (default 200), are pruned after
+each save; set either to 0 to disable that rule.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from quant.quant_backtest import backtest_figures
+
+logger = logging.getLogger(__name__)
+
+ARRAYS_FILENAME = "arrays.npz"
+# Points per line when a figure is rebuilt; a chart is a few hundred pixels wide.
+DEFAULT_MAX_POINTS = 2000
+_LEGACY_FIGURES = ("equity_curve", "drawdown", "trades")
+_TRADE_FLOATS = ("Size", "EntryPrice", "ExitPrice", "PnL")
+_TRADE_TIMES = ("EntryTime", "ExitTime")
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def figures_root() -> Path:
+    return Path.cwd() / "data" / "quant_figures"
+
+
+def job_dir(job_id: str) -> Path:
+    return figures_root() / job_id
+
+
+def save_backtest_arrays(job_id: str, equity_curve: pd.DataFrame, trades: Optional[pd.DataFrame]) -> Path:
+    """Write the job's equity curve and trades as compressed npz, then prune old jobs."""
+    root = job_dir(job_id)
+    root.mkdir(parents=True, exist_ok=True)
+    trades = trades if trades is not None else pd.DataFrame()
+    arrays = {
+        "dates": equity_curve.index.to_numpy(dtype="datetime64[ns]"),
+        "equity": equity_curve["Equity"].to_numpy(dtype=float),
+    }
+    # Missing columns (walk-forward trades carry only times and PnL) are padded
+    # to the trade count so the table loads back with equal-length columns.
+    n_trades = len(trades)
+    for col in _TRADE_FLOATS:
+        arrays[col] = trades[col].to_numpy(dtype=float) if col in trades else np.full(n_trades, np.nan)
+    for col in _TRADE_TIMES:
+        arrays[col] = (
+            pd.to_datetime(trades[col]).to_numpy(dtype="datetime64[ns]")
+            if col in trades else np.full(n_trades, np.datetime64("NaT"), dtype="datetime64[ns]")
+        )
+    path = root / ARRAYS_FILENAME
+    tmp = root / (ARRAYS_FILENAME + ".tmp")
+    with tmp.open("wb") as fh:
+        np.savez_compressed(fh, **arrays)
+    tmp.replace(path)
+    try:
+        prune_figures(keep=job_id)
+    except OSError as exc:
+        logger.warning("quant figure prune failed: %s", exc)
+    return path
+
+
+def load_backtest_arrays(job_id: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """``(equity_curve, trades)`` saved for ``job_id``, or None when the job has no arrays file."""
+    path = job_dir(job_id) / ARRAYS_FILENAME
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        index = pd.DatetimeIndex(data["dates"])
+        equity = pd.Series(data["equity"], index=index)
+        equity_curve = pd.DataFrame({
+            "Equity": equity,
+            "DrawdownPct": 1 - equity / equity.cummax(),
+        })
+        trades = pd.DataFrame({col: data[col] for col in (*_TRADE_FLOATS, *_TRADE_TIMES)})
+    return equity_curve, trades
+
+
+def load_figures(job_id: str, max_points: Optional[int] = DEFAULT_MAX_POINTS) -> Dict[str, go.Figure]:
+    """Charts for ``job_id`` keyed like ``backtest_figures``; legacy JSON runs are read as saved."""
+    saved = load_backtest_arrays(job_id)
+    if saved is not None:
+        return backtest_figures(*saved, max_points=max_points)
+    figs: Dict[str, go.Figure] = {}
+    for name in _LEGACY_FIGURES:
+        path = job_dir(job_id) / f"{name}.json"
+        if path.exists():
+            figs[name] = pio.from_json(path.read_text(encoding="utf-8"))
+    return figs
+
+
+def prune_figures(
+    retention_days: Optional[int] = None,
+    max_runs: Optional[int] = None,
+    keep: Optional[str] = None,
+) -> int:
+    """
+    Delete job directories older than ``retention_days`` or past the newest
+    ``max_runs`` (env defaults above; 0 disables a rule). ``keep`` is never
+    deleted. Returns the number of directories removed.
+    """
+    if retention_days is None:
+        retention_days = _env_int("QUANT_FIGURES_RETENTION_DAYS", 90)
+    if max_runs is None:
+        max_runs = _env_int("QUANT_FIGURES_MAX_RUNS", 200)
+    root = figures_root()
+    if not root.is_dir():
+        return 0
+    dirs = sorted(
+        ((p.stat().st_mtime, p) for p in root.iterdir() if p.is_dir() and p.name != keep),
+        reverse=True,
+    )
+    cutoff = time.time() - retention_days * 86400
+    doomed = [
+        p for i, (mtime, p) in enumerate(dirs)
+        if (retention_days > 0 and mtime < cutoff) or (max_runs > 0 and i + (keep is not None) >= max_runs)
+    ]
+    for path in doomed:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(doomed)
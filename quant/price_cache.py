@@ -0,0 +1,245 @@
+"""
+Persistent daily OHLCV cache in front of ``yf.download`` for backtests.
+
+Bars live in the ``ohlcv_cache`` SQLite table and every fetched span is
+recorded per ticker in ``ohlcv_cache_coverage``. A request only downloads
+the parts of ``[start, end)`` that no earlier request covered; tickers with
+the same missing span share one download. Spans reaching today are only
+marked covered up to yesterday, so the latest bar is refreshed. A fetched
+split or dividend invalidates a ticker's earlier, differently adjusted bars,
+so its whole cached range is downloaded again.
+
+Each ticker lookup counts as a hit (fully cached), partial hit or miss in
+``ohlcv_cache_stats`` (see ``db_manager.get_ohlcv_cache_stats``).
+
+``QUANT_PRICE_CACHE_OFFLINE=1`` (or ``offline=True``) serves purely from
+the cache and never touches the network; ``QUANT_PRICE_CACHE=0`` bypasses
+the cache.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+from services import db_manager
+
+logger = logging.getLogger(__name__)
+
+# yfinance column names for the cached fields, in ``ohlcv_cache`` column order.
+FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+# Corporate actions from ``actions=True``; Yahoo re-adjusts every earlier bar after one.
+ACTION_FIELDS = ("Dividends", "Stock Splits")
+# A span this short can legitimately have no bars (weekend plus a holiday).
+_EMPTY_SPAN_DAYS = 5
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = (os.getenv(name) or "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "on")
+
+
+def offline_mode() -> bool:
+    return _env_flag("QUANT_PRICE_CACHE_OFFLINE", False)
+
+
+def cache_enabled() -> bool:
+    return _env_flag("QUANT_PRICE_CACHE", True)
+
+
+def missing_spans(covered: Iterable[Tuple[str, str]], start: str, end: str) -> List[Tuple[str, str]]:
+    """Parts of ``[start, end)`` not inside any of the sorted, merged ``covered`` spans."""
+    gaps: List[Tuple[str, str]] = []
+    cursor = start
+    for a, b in covered:
+        if b <= cursor:
+            continue
+        if a >= end:
+            break
+        if a > cursor:
+            gaps.append((cursor, a))
+        cursor = max(cursor, b)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _download(tickers: List[str], start: str, end: str) -> pd.DataFrame:
+    """The network call; the only place yfinance is used."""
+    return yf.download(
+        tickers=tickers,
+        start=start,
+        end=end,
+        auto_adjust=False,
+        progress=False,
+        group_by="column",
+        actions=True,
+    )
+
+
+def _ticker_frame(data: pd.DataFrame, ticker: str, tickers: List[str]) -> Optional[pd.DataFrame]:
+    """``ticker``'s columns from a ``group_by="column"`` download, or None when absent."""
+    if isinstance(data.columns, pd.MultiIndex):
+        if ticker not in data.columns.get_level_values(-1):
+            return None
+        return data.xs(ticker, axis=1, level=-1)
+    return data if len(tickers) == 1 else None
+
+
+def _bars_from_download(data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Per-ticker frames with ``FIELDS`` columns from a ``group_by="column"`` download."""
+    out: Dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return out
+    for ticker in tickers:
+        frame = _ticker_frame(data, ticker, tickers)
+        if frame is None:
+            continue
+        frame = frame.reindex(columns=list(FIELDS))
+        if frame["Adj Close"].isna().all():
+            frame["Adj Close"] = frame["Close"]
+        frame = frame.dropna(how="all", subset=["Open", "High", "Low", "Close", "Adj Close"])
+        if not frame.empty:
+            out[ticker] = frame
+    return out
+
+
+def _last_actions(data: pd.DataFrame, tickers: List[str]) -> Dict[str, str]:
+    """Date of each ticker's latest split or dividend in a download (``actions=True`` columns)."""
+    out: Dict[str, str] = {}
+    if data is None or data.empty:
+        return out
+    for ticker in tickers:
+        frame = _ticker_frame(data, ticker, tickers)
+        if frame is None:
+            continue
+        actions = frame.reindex(columns=list(ACTION_FIELDS)).fillna(0)
+        days = actions.index[(actions != 0).any(axis=1)]
+        if len(days):
+            out[ticker] = pd.Timestamp(days.max()).date().isoformat()
+    return out
+
+
+def _rows(bars: Dict[str, pd.DataFrame]) -> List[tuple]:
+    return [
+        (ticker, day, *(None if pd.isna(v) else float(v) for v in values))
+        for ticker, frame in bars.items()
+        for day, values in zip(frame.index, frame.itertuples(index=False, name=None))
+    ]
+
+
+def _fetch_missing(
+    missing: Dict[str, List[Tuple[str, str]]],
+    covered: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+) -> Tuple[int, int]:
+    """
+    Download and store every missing span; returns (spans downloaded, bars stored).
+
+    Cached Close / Adj Close are on the adjustment scale of the day they were
+    fetched. When a new span holds a split or dividend dated after the start
+    of a ticker's earlier ``covered`` bars, those bars are stale, so the
+    ticker's whole range is downloaded again and replaces its cache.
+    """
+    covered = covered or {}
+    by_span: Dict[Tuple[str, str], List[str]] = {}
+    for ticker, spans in missing.items():
+        for span in spans:
+            by_span.setdefault(span, []).append(ticker)
+    today = dt.date.today().isoformat()
+    rows_total = 0
+    stale: Dict[str, List[Tuple[str, str]]] = {}
+    for (start, end), tickers in sorted(by_span.items()):
+        data = _download(tickers, start, end)
+        bars = _bars_from_download(data, tickers)
+        for ticker, day in _last_actions(data, tickers).items():
+            if any(a < day for a, _ in covered.get(ticker, [])):
+                stale.setdefault(ticker, []).extend(covered[ticker])
+        short = (dt.date.fromisoformat(end) - dt.date.fromisoformat(start)).days <= _EMPTY_SPAN_DAYS
+        covered_end = min(end, today)
+        coverage = [
+            (ticker, start, covered_end)
+            for ticker in tickers
+            if ticker in bars or short  # an empty long span is more likely a failed request
+        ]
+        rows_total += db_manager.store_ohlcv_cache(_rows(bars), coverage)
+    for ticker, old in sorted(stale.items()):
+        spans = old + missing[ticker]
+        start, end = min(a for a, _ in spans), max(b for _, b in spans)
+        logger.info("OHLCV cache: corporate action for %s, refetching %s..%s", ticker, start, end)
+        bars = _bars_from_download(_download([ticker], start, end), [ticker])
+        if not bars:
+            continue  # keep the old bars rather than an empty cache
+        rows_total += db_manager.store_ohlcv_cache(
+            _rows(bars), [(ticker, start, min(end, today))], replace=[ticker]
+        )
+    return len(by_span) + len(stale), rows_total
+
+
+def _to_download_frame(df: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """Cached long rows reshaped like ``yf.download(group_by="column")`` output."""
+    if df.empty:
+        return pd.DataFrame()
+    df = df.rename(columns=dict(zip(("open", "high", "low", "close", "adj_close", "volume"), FIELDS)))
+    df["date"] = pd.to_datetime(df["date"])
+    wide = df.pivot(index="date", columns="ticker", values=list(FIELDS))
+    wide.index.name = "Date"
+    wide.columns.names = ["Price", "Ticker"]
+    if len(tickers) == 1:
+        wide = wide.droplevel("Ticker", axis=1)
+    return wide
+
+
+def load_ohlcv(
+    tickers: List[str],
+    start: str,
+    end: str,
+    *,
+    offline: Optional[bool] = None,
+) -> pd.DataFrame:
+    """
+    Daily bars for ``tickers`` over ``[start, end)``, downloading only uncached spans.
+
+    Returns the same shape ``yf.download(group_by="column")`` does: flat
+    columns for one ticker, ``(field, ticker)`` columns for several. Offline,
+    uncached spans are simply absent.
+    """
+    tickers = [str(t).upper() for t in tickers]
+    start, end = str(start)[:10], str(end)[:10]
+    offline = offline_mode() if offline is None else offline
+    if not cache_enabled():
+        if offline:
+            raise ValueError("Offline mode needs the OHLCV cache (QUANT_PRICE_CACHE=0).")
+        return _download(tickers, start, end)
+    try:
+        coverage = db_manager.get_ohlcv_cache_coverage(tickers)
+    except sqlite3.Error as exc:
+        if offline:
+            raise
+        logger.warning("OHLCV cache unavailable, downloading directly: %s", exc)
+        return _download(tickers, start, end)
+
+    missing = {t: missing_spans(coverage.get(t, []), start, end) for t in tickers}
+    hits = sum(1 for gaps in missing.values() if not gaps)
+    misses = sum(1 for gaps in missing.values() if gaps == [(start, end)])
+    spans = rows = 0
+    needed = {t: gaps for t, gaps in missing.items() if gaps}
+    if needed and not offline:
+        spans, rows = _fetch_missing(needed, coverage)
+    db_manager.record_ohlcv_cache_lookups(
+        hits=hits,
+        partial_hits=len(tickers) - hits - misses,
+        misses=misses,
+        spans_fetched=spans,
+        rows_fetched=rows,
+    )
+    return _to_download_frame(db_manager.get_ohlcv_cache_rows(tickers, start, end), tickers)
@@ -7,19 +7,24 @@ slippage, commissions, taxes, or real-world execution unless modeled.
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import yfinance as yf
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
 
+from quant import price_cache
+
 
 RISK_FREE_RATE = 0.04
 TRADING_DAYS = 252
+BACKTEST_ENGINES = ("backtesting", "vectorized")
+# backtesting.py's default order size: "all available margin", as a fraction.
+_FULL_EQUITY = 1 - sys.float_info.epsilon
 
 
 def _sma(series: pd.Series, window: int) -> np.ndarray:
@@ -70,15 +75,7 @@ def fetch_price_data(
     start: str,
     end: str,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    data = yf.download(
-        tickers=tickers,
-        start=start,
-        end=end,
-        auto_adjust=False,
-        progress=False,
-        group_by="column",
-        actions=True,
-    )
+    data = price_cache.load_ohlcv(tickers, start, end)
     if data.empty:
         raise ValueError("No data returned. Check tickers or date range.")
 
@@ -110,24 +107,38 @@ def build_portfolio_series(
     weights: Optional[pd.Series] = None,
     rebalance: bool = False,
 ) -> pd.Series:
+    """
+    Growth of 1.0 invested in ``prices`` at ``weights`` (equal when None).
+
+    Weights drift with prices; with ``rebalance`` they are reset to the
+    targets on bars dated the 1st of a month. Between resets the drifted
+    weights telescope, so each segment's value is the previous segment's
+    final value times ``cumprod(1 + returns) @ weights``.
+    """
     returns = prices.pct_change().fillna(0)
     if weights is None:
         weights = pd.Series(1.0, index=prices.columns)
     weights = weights / weights.sum()
-
-    portfolio_value = []
-    current_weights = weights.copy()
-    value = 1.0
-    for date, row in returns.iterrows():
-        if rebalance and date.day == 1:
-            current_weights = weights.copy()
-        daily_return = float((current_weights * row).sum())
-        value *= 1 + daily_return
-        portfolio_value.append(value)
-        current_weights = current_weights * (1 + row)
-        if current_weights.sum() != 0:
-            current_weights = current_weights / current_weights.sum()
-    return pd.Series(portfolio_value, index=returns.index, name="Close")
+    if returns.empty:
+        return pd.Series(dtype="float64", index=returns.index, name="Close")
+
+    target = weights.reindex(returns.columns).fillna(0.0).to_numpy(dtype="float64")
+    # Weights on tickers without prices are dropped by the renormalization
+    # after each reset bar, so that bar earns target . returns on a sum < 1.
+    target_sum = float(target.sum())
+    growth = 1.0 + returns.to_numpy(dtype="float64")
+    starts = [0]
+    if rebalance:
+        starts += [int(i) for i in np.flatnonzero(returns.index.day == 1) if i > 0]
+    bounds = starts + [len(returns)]
+    values = np.empty(len(returns))
+    level = 1.0
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        path = np.cumprod(growth[a:b], axis=0) @ target
+        first = level * (1.0 + path[0] - target_sum)
+        values[a:b] = first * path / path[0] if path[0] != 0 else first
+        level = values[b - 1]
+    return pd.Series(values, index=returns.index, name="Close")
 
 
 def build_portfolio_ohlcv(series: pd.Series) -> pd.DataFrame:
@@ -157,23 +168,47 @@ def _stats_from_equity(
     return total_return, annual_return, sharpe
 
 
-def _plot_equity_curve(equity_curve: pd.DataFrame) -> go.Figure:
+def _downsample(series: pd.Series, max_points: Optional[int]) -> pd.Series:
+    """Every bucket's min and max plus the endpoints, so long series keep their extremes when plotted."""
+    n = len(series)
+    if not max_points or n <= max_points:
+        return series
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-n // buckets)
+    values = series.to_numpy(dtype=float)
+    lows = np.full(buckets * size, np.inf)
+    highs = np.full(buckets * size, -np.inf)
+    finite = np.isfinite(values)
+    lows[:n] = np.where(finite, values, np.inf)
+    highs[:n] = np.where(finite, values, -np.inf)
+    offsets = np.arange(buckets) * size
+    used = offsets < n
+    keep = np.concatenate([
+        (offsets + lows.reshape(buckets, size).argmin(axis=1))[used],
+        (offsets + highs.reshape(buckets, size).argmax(axis=1))[used],
+        [0, n - 1],
+    ])
+    return series.iloc[np.unique(np.minimum(keep, n - 1))]
+
+
+def _plot_equity_curve(equity_curve: pd.DataFrame, max_points: Optional[int] = None) -> go.Figure:
+    equity = _downsample(equity_curve["Equity"], max_points)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=equity_curve.index, y=equity_curve["Equity"], name="Equity"))
+    fig.add_trace(go.Scatter(x=equity.index, y=equity, name="Equity"))
     fig.update_layout(title="Equity Curve", template="plotly_dark", height=400)
     return fig
 
 
-def _plot_drawdown(equity_curve: pd.DataFrame) -> go.Figure:
-    drawdown = equity_curve["Equity"] / equity_curve["Equity"].cummax() - 1
+def _plot_drawdown(equity_curve: pd.DataFrame, max_points: Optional[int] = None) -> go.Figure:
+    drawdown = _downsample(equity_curve["Equity"] / equity_curve["Equity"].cummax() - 1, max_points)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=equity_curve.index, y=drawdown, name="Drawdown"))
+    fig.add_trace(go.Scatter(x=drawdown.index, y=drawdown, name="Drawdown"))
     fig.update_layout(title="Drawdown", template="plotly_dark", height=250)
     return fig
 
 
-def _plot_trades(equity_curve: pd.DataFrame, trades: pd.DataFrame) -> go.Figure:
-    fig = _plot_equity_curve(equity_curve)
+def _plot_trades(equity_curve: pd.DataFrame, trades: pd.DataFrame, max_points: Optional[int] = None) -> go.Figure:
+    fig = _plot_equity_curve(equity_curve, max_points)
     if trades is None or trades.empty:
         return fig
     entry_times = trades["EntryTime"]
@@ -198,16 +233,142 @@ def _plot_trades(equity_curve: pd.DataFrame, trades: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def run_backtest(
+def _strategy_orders(
+    close: np.ndarray,
+    strategy_name: str,
+    fast_window: int,
+    slow_window: int,
+) -> Tuple[np.ndarray, int]:
+    """
+    Order side (+1 buy, -1 sell, 0 none) placed by each bar's ``next()`` call.
+
+    Mirrors ``BuyAndHoldStrategy`` / ``SmaCrossStrategy`` as backtesting.py
+    drives them: ``next()`` first runs on the bar after the slowest
+    indicator's warm-up. Also returns that first bar.
+    """
+    orders = np.zeros(len(close), dtype="int8")
+    if strategy_name == "buy_hold":
+        start = 1
+        if start < len(close):
+            orders[start] = 1
+        return orders, start
+    fast = _sma(pd.Series(close), fast_window)
+    slow = _sma(pd.Series(close), slow_window)
+    warmup = max(int(np.isnan(fast).argmin()), int(np.isnan(slow).argmin()))
+    start = 1 + warmup
+    with np.errstate(invalid="ignore"):
+        up = (fast[:-1] < slow[:-1]) & (fast[1:] > slow[1:])
+        down = (slow[:-1] < fast[:-1]) & (slow[1:] > fast[1:])
+    orders[1:][up] = 1
+    orders[1:][down & ~up] = -1
+    orders[:start] = 0
+    return orders, start
+
+
+def _vectorized_backtest(
+    ohlcv: pd.DataFrame,
+    orders: np.ndarray,
+    start: int,
+    initial_cash: float,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Equity curve and closed trades for ``orders`` with backtesting.py's broker rules.
+
+    Same settings as ``run_backtest`` uses for ``Backtest``: no commission,
+    no leverage, no hedging, market orders filled at the signal bar's close.
+    Orders size to whole units of the available margin, net against
+    opposite open trades first (FIFO) and are cancelled when that margin
+    does not cover a unit. The position only changes on fill bars, so the
+    equity between fills is one array expression per segment; the Python
+    loop runs once per order rather than once per bar.
+    """
+    close = ohlcv["Close"].to_numpy(dtype="float64")
+    n = len(close)
+    equity = np.full(n, np.nan)
+    cash = float(initial_cash)
+    trades: List[list] = []  # open trades: [size, entry_price, entry_bar]
+    closed: List[tuple] = []  # (size, entry_bar, exit_bar, entry_price, exit_price)
+
+    def position() -> Tuple[int, float]:
+        return sum(t[0] for t in trades), sum(t[0] * t[1] for t in trades)
+
+    def margin_available(price: float) -> float:
+        size, basis = position()
+        used = sum(abs(t[0]) * price for t in trades)
+        return max(0, cash + (price * size - basis) - used)
+
+    def close_trade(trade: list, size: int, price: float, bar: int) -> None:
+        nonlocal cash
+        closed.append((size, trade[2], bar, trade[1], price))
+        cash += size * (price - trade[1])
+
+    cursor = start
+    events = [int(i) for i in np.flatnonzero(orders[: max(n - 1, 0)])]
+    for i in events + [n - 1]:
+        fill = i + 1 if i < n - 1 else n
+        size, basis = position()
+        segment = cash + (close[cursor:fill] * size - basis)
+        broke = np.flatnonzero(segment <= 0)
+        if broke.size:
+            k = cursor + int(broke[0])
+            equity[cursor:k] = segment[: k - cursor]
+            equity[k:] = 0
+            # Out of money: the broker liquidates while removing from the list
+            # it iterates, so with several open trades only every other one
+            # is recorded as closed. Kept as-is for identical stats.
+            for trade in trades:
+                trades.remove(trade)
+                close_trade(trade, trade[0], close[k], k)
+            break
+        equity[cursor:fill] = segment
+        cursor = fill
+        if fill == n:
+            break
+
+        # Fill the order placed on bar i at its close, sized on bar i + 1.
+        price = close[i]
+        side = int(orders[i])
+        need = side * int((margin_available(close[fill]) * _FULL_EQUITY) // price)
+        if not need:
+            continue
+        for trade in list(trades):
+            if (trade[0] > 0) == (side > 0):
+                continue
+            if abs(need) >= abs(trade[0]):
+                trades.remove(trade)
+                close_trade(trade, trade[0], price, i)
+                need += trade[0]
+            else:
+                trade[0] += need
+                close_trade(trade, -need, price, i)
+                need = 0
+            if not need:
+                break
+        if need and abs(need) * price <= margin_available(close[fill]):
+            trades.append([need, price, i])
+
+    equity = pd.Series(equity).bfill().fillna(cash).to_numpy()
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    equity_curve = pd.DataFrame({"Equity": equity, "DrawdownPct": drawdown}, index=ohlcv.index)
+    trade_df = pd.DataFrame(closed, columns=["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice"])
+    trade_df["PnL"] = trade_df["Size"] * (trade_df["ExitPrice"] - trade_df["EntryPrice"])
+    trade_df["EntryTime"] = ohlcv.index[trade_df["EntryBar"].to_numpy(dtype="int64")]
+    trade_df["ExitTime"] = ohlcv.index[trade_df["ExitBar"].to_numpy(dtype="int64")]
+    return equity_curve, trade_df
+
+
+def load_backtest_ohlcv(
     portfolio: Union[Dict[str, float], Iterable[str], pd.DataFrame],
     start: str,
     end: str,
-    strategy_name: str = "sma",
-    fast_window: int = 50,
-    slow_window: int = 200,
-    initial_cash: float = 10000,
     rebalance_monthly: bool = False,
-) -> Tuple[Dict[str, Optional[float]], Dict[str, go.Figure]]:
+) -> pd.DataFrame:
+    """
+    Clean OHLCV frame that ``backtest_ohlcv`` trades.
+
+    One ticker uses its adjusted close; several are combined into a
+    share-weighted portfolio series (optionally rebalanced monthly).
+    """
     portfolio_map = normalize_portfolio_input(portfolio)
     tickers = list(portfolio_map.keys())
     raw_data, prices = fetch_price_data(tickers, start, end)
@@ -233,7 +394,33 @@ def run_backtest(
     ohlcv = ohlcv.dropna()
     if ohlcv.empty or ohlcv["Close"].dropna().empty:
         raise ValueError("No usable price data after cleaning.")
+    return ohlcv
+
 
+def backtest_ohlcv(
+    ohlcv: pd.DataFrame,
+    strategy_name: str = "sma",
+    fast_window: int = 50,
+    slow_window: int = 200,
+    initial_cash: float = 10000,
+    engine: str = "backtesting",
+    trade_from: int = 0,
+) -> Tuple[Dict[str, Optional[float]], pd.DataFrame, pd.DataFrame]:
+    """
+    Run one strategy over ``ohlcv``; returns (stats, equity curve, closed trades).
+
+    ``engine="backtesting"`` steps ``backtesting.Backtest`` bar by bar;
+    ``engine="vectorized"`` reproduces its fills and equity curve from the
+    signal arrays (see ``_vectorized_backtest``).
+
+    With ``trade_from`` (vectorized only) the bars before it just warm up the
+    indicators: no orders are placed there and the equity curve and stats
+    start at that bar, as for an out-of-sample window.
+    """
+    if engine not in BACKTEST_ENGINES:
+        raise ValueError(f"engine must be one of {BACKTEST_ENGINES}")
+    if trade_from and engine != "vectorized":
+        raise ValueError("trade_from requires the vectorized engine")
     if strategy_name == "buy_hold":
         strategy = BuyAndHoldStrategy
         strategy_kwargs = {}
@@ -246,35 +433,104 @@ def run_backtest(
                 f"Not enough data for SMA windows. Need at least {min_bars} bars, got {len(ohlcv)}."
             )
 
-    bt = Backtest(
-        ohlcv,
-        strategy,
-        cash=initial_cash,
-        commission=0.0,
-        trade_on_close=True,
-    )
-    stats = bt.run(**strategy_kwargs)
+    if engine == "vectorized":
+        orders, first_bar = _strategy_orders(
+            ohlcv["Close"].to_numpy(dtype="float64"), strategy_name, fast_window, slow_window
+        )
+        if trade_from:
+            orders[:trade_from] = 0
+            if strategy_name == "buy_hold" and trade_from < len(orders) - 1:
+                orders[trade_from] = 1
+            first_bar = max(first_bar, int(trade_from))
+        equity_curve, trades = _vectorized_backtest(ohlcv, orders, first_bar, initial_cash)
+        if trade_from:
+            equity = equity_curve["Equity"].iloc[trade_from:]
+            equity_curve = pd.DataFrame(
+                {"Equity": equity, "DrawdownPct": 1 - equity / equity.cummax()}, index=equity.index
+            )
+        max_drawdown, win_rate = _drawdown_and_win_rate(equity_curve, trades)
+    else:
+        bt = Backtest(
+            ohlcv,
+            strategy,
+            cash=initial_cash,
+            commission=0.0,
+            trade_on_close=True,
+        )
+        stats = bt.run(**strategy_kwargs)
+        equity_curve = stats.get("_equity_curve")
+        trades = stats.get("_trades")
+        max_drawdown = stats.get("Max. Drawdown [%]", 0)
+        win_rate = stats.get("Win Rate [%]", 0)
 
-    equity_curve = stats.get("_equity_curve")
-    trades = stats.get("_trades")
-    total_ret, annual_ret, sharpe = _stats_from_equity(equity_curve)
+    return _stats_dict(equity_curve, trades, max_drawdown, win_rate), equity_curve, trades
+
+
+def _drawdown_and_win_rate(equity_curve: pd.DataFrame, trades: pd.DataFrame) -> Tuple[float, float]:
+    """Max drawdown % (negative) and win rate % the way backtesting.py's stats report them."""
+    equity = equity_curve["Equity"].to_numpy(dtype="float64")
+    drawdown = 1 - equity / np.maximum.accumulate(equity) if len(equity) else np.array([])
+    max_drawdown = -float(np.nan_to_num(drawdown.max() if len(drawdown) else 0.0)) * 100
+    win_rate = float((trades["PnL"] > 0).mean() * 100) if len(trades) else np.nan
+    return max_drawdown, win_rate
 
-    stats_out = {
+
+def _stats_dict(
+    equity_curve: pd.DataFrame,
+    trades: Optional[pd.DataFrame],
+    max_drawdown: float,
+    win_rate: float,
+) -> Dict[str, Optional[float]]:
+    total_ret, annual_ret, sharpe = _stats_from_equity(equity_curve)
+    return {
         "total_return_pct": round(total_ret * 100, 2) if total_ret is not None else None,
         "annualized_return_pct": round(annual_ret * 100, 2) if annual_ret is not None else None,
         "sharpe_ratio": round(sharpe, 2) if sharpe is not None else None,
-        "max_drawdown_pct": round(stats.get("Max. Drawdown [%]", 0), 2) if stats is not None else None,
-        "trades": int(stats.get("# Trades", 0)) if stats is not None else 0,
-        "win_rate_pct": round(stats.get("Win Rate [%]", 0), 2) if stats is not None else None,
+        "max_drawdown_pct": round(max_drawdown, 2),
+        "trades": int(len(trades)) if trades is not None else 0,
+        "win_rate_pct": round(win_rate, 2),
     }
 
-    figures = {
-        "equity_curve": _plot_equity_curve(equity_curve),
-        "drawdown": _plot_drawdown(equity_curve),
-        "trades": _plot_trades(equity_curve, trades),
+
+def equity_stats(equity_curve: pd.DataFrame, trades: pd.DataFrame) -> Dict[str, Optional[float]]:
+    """``backtest_ohlcv`` stats for an equity curve built elsewhere (e.g. stitched walk-forward folds)."""
+    return _stats_dict(equity_curve, trades, *_drawdown_and_win_rate(equity_curve, trades))
+
+
+def backtest_figures(
+    equity_curve: pd.DataFrame,
+    trades: pd.DataFrame,
+    max_points: Optional[int] = None,
+) -> Dict[str, go.Figure]:
+    """Equity, drawdown and trade-marker charts; lines longer than ``max_points`` are min/max downsampled."""
+    return {
+        "equity_curve": _plot_equity_curve(equity_curve, max_points),
+        "drawdown": _plot_drawdown(equity_curve, max_points),
+        "trades": _plot_trades(equity_curve, trades, max_points),
     }
 
-    return stats_out, figures
+
+def run_backtest(
+    portfolio: Union[Dict[str, float], Iterable[str], pd.DataFrame],
+    start: str,
+    end: str,
+    strategy_name: str = "sma",
+    fast_window: int = 50,
+    slow_window: int = 200,
+    initial_cash: float = 10000,
+    rebalance_monthly: bool = False,
+    engine: str = "backtesting",
+) -> Tuple[Dict[str, Optional[float]], Dict[str, go.Figure]]:
+    ohlcv = load_backtest_ohlcv(portfolio, start, end, rebalance_monthly=rebalance_monthly)
+    stats_out, equity_curve, trades = backtest_ohlcv(
+        ohlcv,
+        strategy_name=strategy_name,
+        fast_window=fast_window,
+        slow_window=slow_window,
+        initial_cash=initial_cash,
+        engine=engine,
+    )
+    return stats_out, backtest_figures(equity_curve, trades)
 
 
 SAMPLE_PORTFOLIO = {"AAPL": 10, "TSLA": 5, "GOOG": 8, "JPM": 12}
@@ -0,0 +1,383 @@
+"""
+Parameter sweeps and walk-forward optimization over SMA windows.
+
+Every (strategy, fast_window, slow_window) combination is evaluated against
+one cleaned OHLCV frame from ``load_backtest_ohlcv``, so prices are
+downloaded once per job. Large jobs fan out over a process pool whose
+workers receive the frame once through the pool initializer and keep it as
+their in-memory price cache; each task then only pickles its combination
+(or fold bounds) and the results it returns.
+
+Walk-forward splits the frame into rolling train/test windows: each fold
+picks the best combination on its train slice and trades it, flat at the
+start, on the following test slice. The folds' test equity curves are
+chained into one out-of-sample curve.
+
+Educational/simulation use only. Not financial advice.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from quant.quant_backtest import backtest_ohlcv, equity_stats
+
+SWEEP_STRATEGIES = ("sma", "buy_hold")
+SWEEP_METRICS = ("sharpe_ratio", "total_return_pct", "max_drawdown_pct")
+MAX_SWEEP_COMBOS = 2000
+
+# ``on_progress(done, total)`` for long sweeps (services/quant_job.py reports it).
+ProgressCallback = Callable[[int, int], None]
+
+# Set in each pool worker by ``_init_worker``; the parent uses its own frame.
+_worker_ohlcv: Optional[pd.DataFrame] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def window_range(start: int, stop: int, step: int = 1) -> List[int]:
+    """Inclusive integer range for sweep inputs (``window_range(10, 50, 10)`` -> 10..50)."""
+    step = max(1, int(step))
+    lo, hi = sorted((int(start), int(stop)))
+    return list(range(max(1, lo), hi + 1, step))
+
+
+def sweep_combinations(
+    strategies: Iterable[str],
+    fast_windows: Iterable[int],
+    slow_windows: Iterable[int],
+) -> List[Tuple[str, int, int]]:
+    """
+    Combinations to evaluate, in a stable order.
+
+    SMA pairs need ``fast < slow``; buy & hold ignores the windows and is
+    evaluated once as ``("buy_hold", 0, 0)``.
+    """
+    combos: List[Tuple[str, int, int]] = []
+    fast = sorted({int(w) for w in fast_windows if int(w) > 0})
+    slow = sorted({int(w) for w in slow_windows if int(w) > 0})
+    for name in dict.fromkeys(str(s).strip().lower() for s in strategies):
+        if name not in SWEEP_STRATEGIES:
+            raise ValueError(f"strategy must be one of {SWEEP_STRATEGIES}")
+        if name == "buy_hold":
+            combos.append(("buy_hold", 0, 0))
+        else:
+            combos.extend(("sma", f, s) for f in fast for s in slow if f < s)
+    if not combos:
+        raise ValueError("Sweep has no valid combinations (SMA needs fast < slow).")
+    if len(combos) > MAX_SWEEP_COMBOS:
+        raise ValueError(f"Sweep has {len(combos)} combinations; the limit is {MAX_SWEEP_COMBOS}.")
+    return combos
+
+
+def _init_worker(ohlcv: pd.DataFrame, options: Dict[str, Any]) -> None:
+    global _worker_ohlcv, _worker_options
+    _worker_ohlcv = ohlcv
+    _worker_options = options
+
+
+def _evaluate_on(ohlcv: pd.DataFrame, combo: Tuple[str, int, int]) -> Dict[str, Any]:
+    name, fast, slow = combo
+    row: Dict[str, Any] = {"strategy_name": name, "fast_window": fast, "slow_window": slow}
+    try:
+        kwargs = {"fast_window": fast, "slow_window": slow} if name == "sma" else {}
+        stats, _, _ = backtest_ohlcv(ohlcv, strategy_name=name, **kwargs, **_worker_options)
+    except ValueError as exc:
+        row["error"] = str(exc)
+        return row
+    row.update(stats)
+    return row
+
+
+def _evaluate(combo: Tuple[str, int, int]) -> Dict[str, Any]:
+    """Stats for one combination against the worker's frame; top-level so the pool can pickle it."""
+    return _evaluate_on(_worker_ohlcv, combo)
+
+
+def _map_in_pool(
+    fn: Any,
+    tasks: Sequence[Any],
+    ohlcv: pd.DataFrame,
+    options: Dict[str, Any],
+    use_pool: bool,
+    workers: int,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[Any]:
+    """
+    ``fn`` over ``tasks`` with ``ohlcv`` installed as the worker frame, pooled or in-process.
+
+    ``on_progress(done, total)`` is called as results arrive, in task order;
+    if it raises, tasks not yet started are cancelled and the error propagates.
+    """
+    total = len(tasks)
+    out: List[Any] = []
+    if use_pool and workers > 1 and total > 1:
+        workers = min(workers, total)
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(ohlcv, options),
+        )
+        try:
+            chunksize = max(1, total // (workers * 4))
+            for result in executor.map(fn, tasks, chunksize=chunksize):
+                out.append(result)
+                if on_progress is not None:
+                    on_progress(len(out), total)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return out
+    _init_worker(ohlcv, options)
+    try:
+        for task in tasks:
+            out.append(fn(task))
+            if on_progress is not None:
+                on_progress(len(out), total)
+        return out
+    finally:
+        _init_worker(None, {})
+
+
+def run_sweep(
+    ohlcv: pd.DataFrame,
+    combos: Sequence[Tuple[str, int, int]],
+    *,
+    initial_cash: float = 10000,
+    engine: str = "vectorized",
+    workers: Optional[int] = None,
+    pool_min_combos: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One stats row per combination, in ``combos`` order.
+
+    Rows carry the ``backtest_ohlcv`` stats keys, or ``error`` when a
+    combination cannot run (e.g. windows longer than the data). Uses
+    ``QUANT_SWEEP_WORKERS`` processes once there are at least
+    ``QUANT_SWEEP_POOL_MIN_COMBOS`` combinations.
+    """
+    options = {"initial_cash": initial_cash, "engine": engine}
+    if workers is None:
+        workers = _env_int("QUANT_SWEEP_WORKERS", min(4, os.cpu_count() or 1))
+    if pool_min_combos is None:
+        pool_min_combos = _env_int("QUANT_SWEEP_POOL_MIN_COMBOS", 32)
+    use_pool = len(combos) >= pool_min_combos
+    return _map_in_pool(_evaluate, list(combos), ohlcv, options, use_pool, workers, on_progress)
+
+
+def best_result(results: Sequence[Dict[str, Any]], metric: str = "sharpe_ratio") -> Optional[Dict[str, Any]]:
+    """Row with the highest ``metric`` (drawdown is negative, so highest is shallowest)."""
+    scored = [
+        r for r in results
+        if r.get(metric) is not None and np.isfinite(r[metric])
+    ]
+    return max(scored, key=lambda r: r[metric]) if scored else None
+
+
+def sweep_heatmap(results: Sequence[Dict[str, Any]], metric: str = "sharpe_ratio") -> go.Figure:
+    """Fast x slow SMA heatmap of ``metric``; missing or failed pairs stay blank."""
+    rows = [r for r in results if r.get("strategy_name") == "sma"]
+    grid = pd.DataFrame(
+        {
+            "fast": [r["fast_window"] for r in rows],
+            "slow": [r["slow_window"] for r in rows],
+            "value": pd.to_numeric(pd.Series([r.get(metric) for r in rows], dtype="object")),
+        }
+    )
+    fig = go.Figure()
+    if not grid.empty:
+        pivot = grid.pivot(index="fast", columns="slow", values="value")
+        fig.add_trace(
+            go.Heatmap(
+                z=pivot.to_numpy(dtype="float64"),
+                x=[str(c) for c in pivot.columns],
+                y=[str(i) for i in pivot.index],
+                colorscale="RdYlGn",
+                colorbar=dict(title=metric),
+            )
+        )
+    fig.update_layout(
+        title=f"SMA sweep: {metric}",
+        xaxis_title="Slow SMA",
+        yaxis_title="Fast SMA",
+        template="plotly_dark",
+        height=450,
+    )
+    return fig
+
+
+def walk_forward_folds(n_bars: int, train_bars: int, test_bars: int) -> List[Tuple[int, int, int]]:
+    """
+    ``(train_start, test_start, test_end)`` bar positions for rolling folds.
+
+    Test windows tile the bars after the first ``train_bars``; each fold
+    trains on the ``train_bars`` right before its test window. A trailing
+    test window shorter than two bars is dropped.
+    """
+    train_bars, test_bars = int(train_bars), int(test_bars)
+    if train_bars < 2 or test_bars < 2:
+        raise ValueError("train_bars and test_bars must be at least 2.")
+    folds: List[Tuple[int, int, int]] = []
+    test_start = train_bars
+    while True:
+        test_end = min(test_start + test_bars, n_bars)
+        if test_end - test_start < 2:
+            break
+        folds.append((test_start - train_bars, test_start, test_end))
+        test_start = test_end
+    if not folds:
+        raise ValueError(
+            f"Need more than {train_bars + 1} bars for one train/test fold, got {n_bars}."
+        )
+    return folds
+
+
+def _walk_forward_fold(task: Tuple[int, Tuple[int, int, int], List[Tuple[str, int, int]], str]) -> Dict[str, Any]:
+    """Optimize on one train slice and trade the winner on its test slice (pool task)."""
+    number, (train_start, test_start, test_end), combos, metric = task
+    ohlcv = _worker_ohlcv
+    index = ohlcv.index
+    fold: Dict[str, Any] = {
+        "fold": number,
+        "train_start": index[train_start].date().isoformat(),
+        "train_end": index[test_start - 1].date().isoformat(),
+        "test_start": index[test_start].date().isoformat(),
+        "test_end": index[test_end - 1].date().isoformat(),
+    }
+    train = ohlcv.iloc[train_start:test_start]
+    best = best_result([_evaluate_on(train, c) for c in combos], metric)
+    if best is None:
+        fold["error"] = "No combination produced stats on the train slice."
+        return fold
+    name, fast, slow = best["strategy_name"], best["fast_window"], best["slow_window"]
+    # Prepend enough history to warm the SMAs so the test slice trades from its first bar.
+    warm = min(test_start, max(fast, slow)) if name == "sma" else 0
+    window = ohlcv.iloc[test_start - warm:test_end]
+    kwargs = {"fast_window": fast, "slow_window": slow} if name == "sma" else {}
+    stats, curve, trades = backtest_ohlcv(
+        window,
+        strategy_name=name,
+        initial_cash=_worker_options.get("initial_cash", 10000),
+        engine="vectorized",
+        trade_from=warm,
+        **kwargs,
+    )
+    fold.update(
+        {
+            "strategy_name": name,
+            "fast_window": fast,
+            "slow_window": slow,
+            f"train_{metric}": best[metric],
+            "test_stats": stats,
+            "dates": [d.date().isoformat() for d in curve.index],
+            "equity": curve["Equity"].astype("float64").tolist(),
+            "trades": [
+                {"EntryTime": e.date().isoformat(), "ExitTime": x.date().isoformat(), "PnL": float(p)}
+                for e, x, p in zip(trades["EntryTime"], trades["ExitTime"], trades["PnL"])
+            ],
+        }
+    )
+    return fold
+
+
+def run_walk_forward(
+    ohlcv: pd.DataFrame,
+    combos: Sequence[Tuple[str, int, int]],
+    *,
+    train_bars: int,
+    test_bars: int,
+    metric: str = "sharpe_ratio",
+    initial_cash: float = 10000,
+    workers: Optional[int] = None,
+    pool_min_combos: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One result per fold, in date order.
+
+    Folds run in parallel (``QUANT_SWEEP_WORKERS``) once folds x combinations
+    reaches ``QUANT_SWEEP_POOL_MIN_COMBOS``; all use the vectorized engine.
+    Each fold dict holds its dates, the chosen combination and its train
+    score, ``test_stats``, and the test slice's ``dates`` / ``equity`` /
+    ``trades`` (or ``error``).
+    """
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"metric must be one of {SWEEP_METRICS}")
+    folds = walk_forward_folds(len(ohlcv), train_bars, test_bars)
+    tasks = [(i + 1, bounds, list(combos), metric) for i, bounds in enumerate(folds)]
+    options = {"initial_cash": initial_cash, "engine": "vectorized"}
+    if workers is None:
+        workers = _env_int("QUANT_SWEEP_WORKERS", min(4, os.cpu_count() or 1))
+    if pool_min_combos is None:
+        pool_min_combos = _env_int("QUANT_SWEEP_POOL_MIN_COMBOS", 32)
+    use_pool = len(folds) * len(combos) >= pool_min_combos
+    return _map_in_pool(_walk_forward_fold, tasks, ohlcv, options, use_pool, workers, on_progress)
+
+
+def stitch_walk_forward(
+    folds: Sequence[Dict[str, Any]],
+    initial_cash: float = 10000,
+) -> Tuple[Dict[str, Optional[float]], pd.DataFrame, pd.DataFrame]:
+    """
+    Out-of-sample (stats, equity curve, trades) from ``run_walk_forward`` folds.
+
+    Each fold starts flat with the full account, so its curve is rescaled
+    to continue from the previous fold's final equity.
+    """
+    level = float(initial_cash)
+    dates: List[str] = []
+    equity: List[np.ndarray] = []
+    trades: List[Dict[str, Any]] = []
+    for fold in folds:
+        if "error" in fold or not fold.get("equity"):
+            continue
+        curve = np.asarray(fold["equity"], dtype="float64")
+        scaled = curve * (level / curve[0]) if curve[0] else np.zeros_like(curve)
+        dates.extend(fold["dates"])
+        equity.append(scaled)
+        level = float(scaled[-1])
+        trades.extend(fold["trades"])
+    if not equity:
+        raise ValueError("No walk-forward fold produced an out-of-sample curve.")
+    values = np.concatenate(equity)
+    curve_df = pd.DataFrame(
+        {"Equity": values, "DrawdownPct": 1 - values / np.maximum.accumulate(values)},
+        index=pd.to_datetime(dates),
+    )
+    trade_df = pd.DataFrame(trades, columns=["EntryTime", "ExitTime", "PnL"])
+    trade_df["EntryTime"] = pd.to_datetime(trade_df["EntryTime"])
+    trade_df["ExitTime"] = pd.to_datetime(trade_df["ExitTime"])
+    return equity_stats(curve_df, trade_df), curve_df, trade_df
+
+
+def walk_forward_buy_hold_stats(
+    ohlcv: pd.DataFrame,
+    equity_curve: pd.DataFrame,
+    initial_cash: float = 10000,
+) -> Dict[str, Optional[float]]:
+    """
+    Buy & hold stats over the span of ``stitch_walk_forward``'s curve: from the first fold
+    that produced one to the last, so folds that errored at either end do not give the
+    benchmark a different span than the strategy.
+    """
+    trade_from = int(ohlcv.index.searchsorted(equity_curve.index[0]))
+    window = ohlcv.loc[:equity_curve.index[-1]]
+    stats, _, _ = backtest_ohlcv(
+        window, strategy_name="buy_hold", initial_cash=initial_cash, engine="vectorized", trade_from=trade_from
+    )
+    return stats
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark article snippet fetching: the original serial loop (full download
+plus a BeautifulSoup lxml tree per page) vs ``_fetch_article_snippets``
+(bounded concurrency, streamed until ``</head>``).
+
+Serves synthetic article pages from a local HTTP server with a fixed
+per-request latency (default 50 ms; a ~6 KB head and ~400 KB body, every
+fifth page without a description), then reports wall time, response bytes
+read by the client and whether both paths filled the same URLs with the same
+snippets.
+
+Run:
+  python scripts/bench_article_snippets.py [--pages 60] [--budget 40] [--latency-ms 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import api.news_digest as nd
+
+_BYTES = {"read": 0}
+
+
+def _page(i: int) -> bytes:
+    meta = "" if i % 5 == 0 else f'<meta property="og:description" content="Story {i}: shares of LMT moved.">'
+    head = (
+        '<html><head><meta charset="utf-8"><title>Story</title>'
+        + '<link rel="stylesheet" href="/s.css">' * 150
+        + meta
+        + "</head>"
+    )
+    body = "<body>" + f"<p>Paragraph of article {i} text.</p>" * 12_000 + "</body></html>"
+    return (head + body).encode()
+
+
+def _serve(latency: float) -> http.server.ThreadingHTTPServer:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = _page(int(self.path.rsplit("/", 1)[1]))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda *args: None  # streamed clients hang up after </head>
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _original_fetch(url: str) -> str:
+    from bs4 import BeautifulSoup
+
+    try:
+        r = requests.get(url, timeout=18)
+        r.raise_for_status()
+        _BYTES["read"] += len(r.content)
+        soup = BeautifulSoup(r.text[:800_000], "lxml")
+        for attrs in ({"property": "og:description"}, {"name": "twitter:description"}, {"name": "description"}):
+            tag = soup.find("meta", attrs=attrs)
+            if tag and tag.get("content"):
+                t = str(tag["content"]).strip()
+                if len(t) > 12:
+                    return re.sub(r"\s+", " ", t)[:12000]
+    except Exception:
+        pass
+    return ""
+
+
+def _original_fill(urls: list[str], budget: int) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for url in urls:
+        if len(out) >= budget:
+            break
+        fetched = _original_fetch(url)
+        if fetched:
+            out[url] = fetched
+    return out
+
+
+def _counting_iter_content(orig):
+    def iter_content(self, *args, **kwargs):
+        for chunk in orig(self, *args, **kwargs):
+            _BYTES["read"] += len(chunk)
+            yield chunk
+
+    return iter_content
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    os.environ["NEWS_DIGEST_FETCH_ARTICLE_SNIPPET"] = "1"
+
+    server = _serve(args.latency_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/article/{i}" for i in range(args.pages)]
+    try:
+        t0 = time.perf_counter()
+        old = _original_fill(urls, args.budget)
+        t_old, b_old = time.perf_counter() - t0, _BYTES["read"]
+
+        _BYTES["read"] = 0
+        requests.models.Response.iter_content = _counting_iter_content(requests.models.Response.iter_content)
+        t0 = time.perf_counter()
+        new = {urls[i]: s for i, s in nd._fetch_article_snippets(urls, args.budget)}
+        t_new, b_new = time.perf_counter() - t0, _BYTES["read"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{args.pages} pages ({len(_page(1)) / 1024:,.0f} KiB each), budget {args.budget}, "
+          f"{args.latency_ms:g} ms latency, {nd._env_workers('NEWS_DIGEST_SNIPPET_WORKERS', args.budget)} workers")
+    print(f"  serial + BeautifulSoup : {t_old:7.3f}s  {b_old / 1024:10,.0f} KiB read")
+    print(f"  concurrent streaming   : {t_new:7.3f}s  {b_new / 1024:10,.0f} KiB read  "
+          f"({t_old / t_new:.1f}x faster, {b_old / max(b_new, 1):.0f}x fewer bytes)")
+    print(f"  filled {len(new)} / {len(old)}; identical={new == old}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
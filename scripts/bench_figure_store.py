@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark backtest chart storage: three Plotly JSON files per job vs one
+compressed ``arrays.npz`` (``quant.figure_store``).
+
+Runs a synthetic SMA backtest (default 20 years of business days), writes
+both formats into a temporary directory, and reports bytes on disk, the
+time to get the three figures back (JSON parse vs npz load + rebuild, with
+and without downsampling) and the downsampled chart payload size.
+
+Run:
+  python scripts/bench_figure_store.py [--years 20] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from quant import figure_store
+from quant.quant_backtest import backtest_figures, backtest_ohlcv, build_portfolio_ohlcv
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2)
+    index = pd.bdate_range("2000-01-03", periods=args.years * 252)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+    _, curve, trades = backtest_ohlcv(
+        build_portfolio_ohlcv(pd.Series(closes, index=index)), "sma", 10, 40, engine="vectorized"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        legacy = Path(tmp) / "legacy"
+        legacy.mkdir()
+        for name, fig in backtest_figures(curve, trades).items():
+            (legacy / f"{name}.json").write_text(fig.to_json(), encoding="utf-8")
+        json_bytes = sum(p.stat().st_size for p in legacy.iterdir())
+        npz_bytes = figure_store.save_backtest_arrays("bench", curve, trades).stat().st_size
+
+        def load_json() -> None:
+            for p in legacy.iterdir():
+                pio.from_json(p.read_text(encoding="utf-8"))
+
+        t_json = _best_of(args.repeat, load_json)
+        t_full = _best_of(args.repeat, lambda: figure_store.load_figures("bench", max_points=None))
+        t_down = _best_of(args.repeat, lambda: figure_store.load_figures("bench"))
+        payload_down = sum(len(f.to_json()) for f in figure_store.load_figures("bench").values())
+        os.chdir(ROOT)
+
+    print(f"{len(curve)} bars, {len(trades)} trades")
+    print(f"  disk: json {json_bytes / 1024:8.1f} KiB   npz {npz_bytes / 1024:6.1f} KiB  "
+          f"({json_bytes / npz_bytes:,.0f}x smaller)")
+    print(f"  load: json {t_json * 1000:8.1f} ms    npz+rebuild {t_full * 1000:6.1f} ms  "
+          f"npz+rebuild downsampled to {figure_store.DEFAULT_MAX_POINTS} pts {t_down * 1000:6.1f} ms")
+    print(f"  chart payload sent to the browser: {json_bytes / 1024:8.1f} KiB -> {payload_down / 1024:.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
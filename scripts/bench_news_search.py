@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark ``list_news_digest_articles(q=...)``: the FTS5 index (BM25 ranking
+and highlighting) vs the LIKE scan used when SQLite has no FTS5.
+
+Fills a temporary database with synthetic articles (default 100,000; titles
+of 6-12 words and summaries of 30-60 words over a 20,000-word vocabulary plus
+common finance terms) through ``upsert_news_digest_articles_from_digest``, so
+the sync triggers are part of the load time. Then reports first-page latency
+(median / p95) for a mix of rare, common, multi-word and prefix queries,
+first with the index and then with it dropped.
+
+Run:
+  python scripts/bench_news_search.py [--articles 100000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import db_manager
+
+_FINANCE = (
+    "stocks shares earnings rates inflation fed oil chip semiconductor bank guidance revenue "
+    "merger tariff bond yields dividend buyback outlook forecast rally slump"
+).split()
+QUERIES = ("semiconductor", "earnings guidance", "fed rates inflation", "merg*", "qzxv", "oil tariff slump")
+
+
+def _vocabulary(rng: random.Random, n: int) -> list[str]:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(n)]
+
+
+def _text(rng: random.Random, vocab: list[str], lo: int, hi: int) -> str:
+    return " ".join(
+        rng.choice(_FINANCE) if rng.random() < 0.08 else rng.choice(vocab) for _ in range(rng.randint(lo, hi))
+    )
+
+
+def _load(n: int, seed: int = 11) -> float:
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng, 20_000)
+    t0 = time.perf_counter()
+    for start in range(0, n, 1000):
+        items = [
+            {
+                "title": _text(rng, vocab, 6, 12).capitalize(),
+                "link": f"https://example.com/article/{i}",
+                "source_feed": "Bench",
+                "summary_text": _text(rng, vocab, 30, 60),
+            }
+            for i in range(start, min(start + 1000, n))
+        ]
+        db_manager.upsert_news_digest_articles_from_digest({
+            "generated_at_utc": f"2026-01-01T00:00:{start % 60:02d}+00:00",
+            "items": items,
+        })
+    return time.perf_counter() - t0
+
+
+def _latency(q: str, repeat: int) -> tuple[float, float, int]:
+    times = []
+    total = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _, total, _ = db_manager.list_news_digest_articles(page=1, per_page=20, q=q)
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return statistics.median(times) * 1000, times[int(0.95 * (len(times) - 1))] * 1000, total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager.DATABASE = os.path.join(tmp, "bench_news.db")
+        db_manager.init_db()
+        load_s = _load(args.articles)
+        size_mb = os.path.getsize(db_manager.DATABASE) / 1e6
+        print(f"{args.articles:,} articles loaded in {load_s:.1f}s (with FTS sync triggers), db {size_mb:,.0f} MB")
+
+        fts = {q: _latency(q, args.repeat) for q in QUERIES}
+        conn = sqlite3.connect(db_manager.DATABASE)
+        conn.execute("DROP TABLE news_digest_articles_fts")
+        conn.commit()
+        conn.close()
+        like = {q: _latency(q.rstrip("*"), max(3, args.repeat // 4)) for q in QUERIES}
+
+    print(f"  {'query':24s} {'hits':>7s}   {'FTS5 p50/p95 ms':>17s}   {'LIKE p50/p95 ms':>17s}   speedup")
+    for q in QUERIES:
+        (f50, f95, hits), (l50, l95, _) = fts[q], like[q]
+        print(f"  {q:24s} {hits:7,d}   {f50:8.2f}/{f95:8.2f}   {l50:8.1f}/{l95:8.1f}   {l50 / f50:6.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark ``build_portfolio_series``: the previous per-bar ``iterrows`` loop
+vs the NumPy segment implementation.
+
+Uses synthetic business-day prices (default 20 years x 50 tickers), with and
+without monthly rebalancing, and reports timings plus the largest difference
+between the two outputs.
+
+Run:
+  python scripts/bench_portfolio_series.py [--years 20] [--tickers 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from quant.quant_backtest import build_portfolio_series
+
+
+def legacy_build_portfolio_series(prices, weights=None, rebalance=False):
+    """The pre-vectorization implementation: Series arithmetic per bar."""
+    returns = prices.pct_change().fillna(0)
+    if weights is None:
+        weights = pd.Series(1.0, index=prices.columns)
+    weights = weights / weights.sum()
+
+    portfolio_value = []
+    current_weights = weights.copy()
+    value = 1.0
+    for date, row in returns.iterrows():
+        if rebalance and date.day == 1:
+            current_weights = weights.copy()
+        daily_return = float((current_weights * row).sum())
+        value *= 1 + daily_return
+        portfolio_value.append(value)
+        current_weights = current_weights * (1 + row)
+        if current_weights.sum() != 0:
+            current_weights = current_weights / current_weights.sum()
+    return pd.Series(portfolio_value, index=returns.index, name="Close")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--tickers", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    index = pd.bdate_range("2000-01-03", periods=args.years * 252)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (len(index), args.tickers)), axis=0))
+    prices = pd.DataFrame(closes, index=index, columns=[f"T{i:03d}" for i in range(args.tickers)])
+    weights = pd.Series(rng.uniform(1, 20, args.tickers), index=prices.columns) * prices.iloc[0]
+
+    print(f"{len(index)} bars x {args.tickers} tickers")
+    for rebalance in (False, True):
+        t0 = time.perf_counter()
+        old = legacy_build_portfolio_series(prices, weights, rebalance)
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = build_portfolio_series(prices, weights, rebalance)
+        t_new = time.perf_counter() - t0
+        rel = float(((new - old).abs() / old.abs()).max())
+        label = "monthly rebalance" if rebalance else "drift weights    "
+        print(f"  {label}: legacy {t_old:7.3f}s  numpy {t_new:7.4f}s  "
+              f"({t_old / t_new:,.0f}x)  max rel diff {rel:.1e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
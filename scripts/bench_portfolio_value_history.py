@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized portfolio value history engine.
+
+Compares ``db_manager.compute_portfolio_value_history`` with the previous
+per-lot ``iterrows`` implementation (kept below as ``legacy_history``) on
+synthetic portfolios of 10, 100 and 1,000 lots over ~3 years of daily closes.
+Nothing touches the database; frames are built in memory.
+
+Run:
+  python scripts/bench_portfolio_value_history.py
+"""
+
+from __future__ import annotations
+
+import bisect
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.db_manager import compute_portfolio_value_history
+
+LOT_COUNTS = (10, 100, 1000)
+TRADING_DAYS = 756
+
+
+def synthetic_portfolio(n_lots: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=TRADING_DAYS)
+    n_tickers = max(2, n_lots // 3)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), n_tickers)), axis=0))
+    prices = pd.DataFrame(
+        {
+            "ticker": np.repeat(tickers, len(dates)),
+            "date": np.tile(dates.strftime("%Y-%m-%d"), n_tickers),
+            "closing_price": closes.T.ravel(),
+        }
+    )
+
+    lot_rows = []
+    snap_rows = []
+    for lot_id in range(1, n_lots + 1):
+        open_i = int(rng.integers(0, len(dates) // 2))
+        closed = rng.random() < 0.3
+        close_i = int(rng.integers(open_i + 1, len(dates))) if closed else None
+        opened_at = f"{dates[open_i].date().isoformat()}T00:00:00+00:00"
+        closed_at = (
+            f"{dates[close_i].date().isoformat()}T00:00:00+00:00" if close_i is not None else None
+        )
+        shares = float(rng.integers(1, 200))
+        lot_rows.append(
+            {
+                "stock_id": lot_id,
+                "ticker": tickers[lot_id % n_tickers],
+                "current_shares": shares,
+                "opened_at_utc": opened_at,
+                "closed_at_utc": closed_at,
+            }
+        )
+        for snap_i in range(open_i, close_i or len(dates), 63):
+            snap_rows.append(
+                {
+                    "stock_id": lot_id,
+                    "snapshot_date": dates[snap_i].date().isoformat(),
+                    "shares": float(rng.integers(1, 200)),
+                }
+            )
+    return pd.DataFrame(lot_rows), pd.DataFrame(snap_rows), prices
+
+
+def _position_open_on_date(opened_at, closed_at, price_date) -> bool:
+    if pd.isna(price_date):
+        return False
+
+    def _as_naive_day(value):
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return None
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        return ts.normalize()
+
+    d = _as_naive_day(price_date)
+    if d is None:
+        return False
+    open_d = _as_naive_day(opened_at)
+    if open_d is None:
+        open_d = pd.Timestamp.min.normalize()
+    if d < open_d:
+        return False
+    close_d = _as_naive_day(closed_at)
+    if close_d is None:
+        return True
+    return d < close_d
+
+
+def legacy_history(positions, snapshots, prices):
+    """The pre-vectorization loop from ``get_portfolio_value_history``."""
+    prices = prices.copy()
+    prices["date"] = pd.to_datetime(prices["date"], errors="coerce")
+    prices["closing_price"] = pd.to_numeric(prices["closing_price"], errors="coerce")
+    prices = prices.dropna(subset=["date", "closing_price"])
+    snapshots = snapshots.copy()
+    snapshots["snapshot_date"] = pd.to_datetime(snapshots["snapshot_date"], errors="coerce")
+    snapshots["shares"] = pd.to_numeric(snapshots["shares"], errors="coerce").fillna(0.0)
+    snapshots = snapshots.dropna(subset=["snapshot_date"])
+
+    parts = []
+    for _, lot in positions.iterrows():
+        ticker = str(lot.get("ticker") or "").upper()
+        ticker_prices = prices[prices["ticker"].astype(str).str.upper() == ticker]
+        if ticker_prices.empty:
+            continue
+        mask = ticker_prices["date"].map(
+            lambda d: _position_open_on_date(lot.get("opened_at_utc"), lot.get("closed_at_utc"), d)
+        )
+        if not mask.any():
+            continue
+        chunk = ticker_prices.loc[mask, ["date", "closing_price"]].copy()
+        lot_snaps = snapshots[snapshots["stock_id"] == lot["stock_id"]].sort_values("snapshot_date")
+        if lot_snaps.empty:
+            chunk["shares"] = float(lot.get("current_shares") or 0)
+        else:
+            snap_dates = [pd.Timestamp(d).normalize() for d in lot_snaps["snapshot_date"].tolist()]
+            snap_shares = lot_snaps["shares"].tolist()
+
+            def _shares_on(d):
+                idx = bisect.bisect_right(snap_dates, pd.Timestamp(d).normalize()) - 1
+                return float(snap_shares[max(idx, 0)])
+
+            chunk["shares"] = chunk["date"].map(_shares_on)
+        chunk["position_value"] = chunk["closing_price"] * chunk["shares"]
+        parts.append(chunk[["date", "position_value"]])
+    combined = pd.concat(parts, ignore_index=True)
+    return (
+        combined.groupby("date", as_index=False)["position_value"]
+        .sum()
+        .rename(columns={"position_value": "portfolio_value"})
+        .sort_values("date")
+    )
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    print(f"{'lots':>6} {'legacy s':>10} {'vector s':>10} {'speedup':>9}  max |diff|")
+    for n_lots in LOT_COUNTS:
+        positions, snapshots, prices = synthetic_portfolio(n_lots)
+        legacy = legacy_history(positions, snapshots, prices)
+        fast = compute_portfolio_value_history(positions, snapshots, prices)
+        diff = float(
+            np.max(np.abs(legacy["portfolio_value"].to_numpy() - fast["portfolio_value"].to_numpy()))
+        )
+        t_legacy = _best_of(lambda: legacy_history(positions, snapshots, prices), 1)
+        t_fast = _best_of(lambda: compute_portfolio_value_history(positions, snapshots, prices), 3)
+        print(f"{n_lots:>6} {t_legacy:>10.3f} {t_fast:>10.4f} {t_legacy / t_fast:>8.1f}x  {diff:.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark price ingestion: per-row upserts vs ``bulk_upsert_stock_prices``.
+
+Simulates a 60-day Yahoo backfill for N held tickers into a throwaway SQLite
+file. The per-row path is the previous ``upsert_stock_price`` (fresh
+connection, SELECT, then UPDATE or INSERT, commit per candle). The bulk paths
+write one transaction per ticker, or one for the whole backfill (what
+``backfill_held_price_history`` does), and also keep ``portfolio_value_daily``
+in sync. Reports rows/sec for each.
+
+Run:
+  python scripts/bench_price_ingestion.py [--tickers 200] [--days 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import db_manager
+
+
+def _fresh_db(tmp: Path, name: str, tickers: list[str]) -> None:
+    db_manager.DATABASE = str(tmp / name)
+    db_manager.init_db()
+    db_manager.replace_all_stocks(
+        [{"ticker": t, "shares": 10, "brokerage": "Bench", "account": "A"} for t in tickers]
+    )
+
+
+def _rows(tickers: list[str], days: int) -> list[tuple[str, str, float]]:
+    start = dt.date(2024, 1, 1)
+    return [
+        (t, (start + dt.timedelta(days=i)).isoformat(), 100.0 + i * 0.1)
+        for t in tickers
+        for i in range(days)
+    ]
+
+
+def legacy_upsert_stock_price(ticker, date, closing_price):
+    """The pre-bulk implementation: one connection and commit per row."""
+    conn = sqlite3.connect(db_manager.DATABASE)
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM stock_prices WHERE ticker = ? AND date = ?", (ticker, date))
+    row = cur.fetchone()
+    if row:
+        cur.execute("UPDATE stock_prices SET closing_price = ? WHERE id = ?", (closing_price, row[0]))
+    else:
+        cur.execute(
+            "INSERT INTO stock_prices (ticker, date, closing_price) VALUES (?, ?, ?)",
+            (ticker, date, closing_price),
+        )
+    conn.commit()
+    conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    rows = _rows(tickers, args.days)
+    with tempfile.TemporaryDirectory() as tmp_name:
+        tmp = Path(tmp_name)
+
+        _fresh_db(tmp, "legacy.db", tickers)
+        t0 = time.perf_counter()
+        for ticker, date, px in rows:
+            legacy_upsert_stock_price(ticker, date, px)
+        t_legacy = time.perf_counter() - t0
+
+        by_ticker = {t: [r for r in rows if r[0] == t] for t in tickers}
+        _fresh_db(tmp, "bulk_ticker.db", tickers)
+        t0 = time.perf_counter()
+        for ticker in tickers:
+            db_manager.bulk_upsert_stock_prices(by_ticker[ticker])
+        t_ticker = time.perf_counter() - t0
+
+        _fresh_db(tmp, "bulk_all.db", tickers)
+        t0 = time.perf_counter()
+        db_manager.bulk_upsert_stock_prices(rows)
+        t_all = time.perf_counter() - t0
+
+        db_manager.close_pooled_connections()
+
+    n = len(rows)
+    print(f"{n} rows ({args.tickers} tickers x {args.days} days)")
+    print(f"  per-row upsert : {t_legacy:8.2f}s  {n / t_legacy:>10,.0f} rows/s  ({n} commits)")
+    print(f"  bulk per ticker: {t_ticker:8.2f}s  {n / t_ticker:>10,.0f} rows/s  ({len(tickers)} commits)")
+    print(f"  bulk, one call : {t_all:8.2f}s  {n / t_all:>10,.0f} rows/s  (1 commit)")
+    print(f"  speedup        : {t_legacy / t_ticker:8.1f}x / {t_legacy / t_all:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark analytics price reads: SQLite vs the columnar (Arrow IPC) store.
+
+Loads N tickers x D trading days of closes (default 1,000 x 1,008, about 1M
+rows) into a throwaway database, builds the per-ticker store, then times:
+
+- the legacy analytics pattern: ``get_stock_prices_df`` plus ``to_datetime`` /
+  ``to_numeric`` re-parsing of the whole table;
+- ``get_price_history_df`` on SQLite and on the memory-mapped store, for all
+  tickers and for a 50-ticker slice (what risk and chart callbacks ask for).
+
+Run:
+  python scripts/bench_price_store.py [--tickers 1000] [--days 1008]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import db_manager
+
+
+def _load(db_path: Path, n_tickers: int, n_days: int) -> int:
+    rng = np.random.default_rng(3)
+    days = pd.bdate_range("2020-01-01", periods=n_days).strftime("%Y-%m-%d").tolist()
+    conn = sqlite3.connect(db_path)
+    for i in range(n_tickers):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))
+        conn.executemany(
+            "INSERT INTO stock_prices (ticker, date, closing_price) VALUES (?, ?, ?)",
+            zip([f"T{i:04d}"] * n_days, days, closes.tolist()),
+        )
+    conn.commit()
+    conn.close()
+    return n_tickers * n_days
+
+
+def _legacy_read():
+    df = db_manager.get_stock_prices_df()
+    df["date"] = pd.to_datetime(df["date"])
+    df["closing_price"] = pd.to_numeric(df["closing_price"], errors="coerce")
+    return df
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=1008)
+    args = parser.parse_args()
+
+    subset = [f"T{i:04d}" for i in range(0, args.tickers, max(1, args.tickers // 50))][:50]
+    with tempfile.TemporaryDirectory() as tmp_name:
+        db_path = Path(tmp_name) / "bench.db"
+        db_manager.DATABASE = str(db_path)
+        db_manager.init_db()
+        rows = _load(db_path, args.tickers, args.days)
+
+        os.environ.pop("PRICE_STORE", None)
+        t_legacy = _best_of(_legacy_read)
+        t_sql_all = _best_of(db_manager.get_price_history_df)
+        t_sql_sub = _best_of(lambda: db_manager.get_price_history_df(subset))
+
+        os.environ["PRICE_STORE"] = "arrow"
+        t0 = time.perf_counter()
+        db_manager.rebuild_price_store()
+        t_build = time.perf_counter() - t0
+        t_store_all = _best_of(db_manager.get_price_history_df)
+        t_store_sub = _best_of(lambda: db_manager.get_price_history_df(subset))
+        t_store_cols = _best_of(lambda: db_manager.get_price_history_df(subset, columns=["date", "closing_price"]))
+        os.environ.pop("PRICE_STORE", None)
+        db_manager.close_pooled_connections()
+
+    print(f"{rows:,} rows ({args.tickers} tickers x {args.days} days); store build {t_build:.2f}s")
+    print(f"  legacy get_stock_prices_df + parse : {t_legacy:7.3f}s")
+    print(f"  SQLite typed, all tickers          : {t_sql_all:7.3f}s")
+    print(f"  store,        all tickers          : {t_store_all:7.3f}s  ({t_legacy / t_store_all:.1f}x vs legacy)")
+    print(f"  SQLite typed, {len(subset)} tickers           : {t_sql_sub:7.3f}s")
+    print(f"  store,        {len(subset)} tickers           : {t_store_sub:7.3f}s  ({t_sql_sub / t_store_sub:.1f}x vs SQLite)")
+    print(f"  store,        {len(subset)} tickers, 2 cols   : {t_store_cols:7.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
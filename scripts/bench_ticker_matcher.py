@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark news ticker tagging: the original four-pass regex matcher vs
+``api.news_digest.TickerMatcher``.
+
+Builds a synthetic holdings universe (default 2,000 symbols, including class
+shares and single letters) and synthetic articles (default 10,000) that mix
+ordinary words with ``$SYM``, ``NASDAQ: SYM``, ``(SYM)`` and bare mentions,
+then reports the time for each matcher and whether every article got the
+same tickers.
+
+Run:
+  python scripts/bench_ticker_matcher.py [--articles 10000] [--tickers 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.news_digest import TickerMatcher, matching_text_for_ticker_enrichment
+
+_WORDS = (
+    "the market shares rose fell after earnings report quarter guidance CEO CFO said on in of and "
+    "to a for with investors stock price analysts expect revenue growth AI IT US EU ETF IPO SEC Fed"
+).split()
+
+
+def _original_match(text: str, universe: dict[str, str]) -> tuple[list[str], dict[str, str]]:
+    text = re.sub(r"\s+", " ", (text or "").strip())
+    if not text or not universe:
+        return [], {}
+    found: set[str] = set()
+    for m in re.finditer(r"\$([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text, flags=re.IGNORECASE):
+        if m.group(1).upper() in universe:
+            found.add(m.group(1).upper())
+    for m in re.finditer(
+        r"(?:NYSE|NASDAQ|AMEX|OTC|BATS)\s*:\s*([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text, flags=re.IGNORECASE
+    ):
+        if m.group(1).upper() in universe:
+            found.add(m.group(1).upper())
+    for m in re.finditer(r"\(([A-Z0-9]{1,5}(?:\.[A-Z])?)\)", text):
+        if m.group(1).upper() in universe:
+            found.add(m.group(1).upper())
+    for m in re.finditer(r"\b([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text.upper()):
+        sym = m.group(1)
+        if sym in universe and len(sym) > 1:
+            found.add(sym)
+    ordered = sorted(found)
+    return ordered, {s: universe[s] for s in ordered}
+
+
+def _universe(n: int, rng: random.Random) -> dict[str, str]:
+    symbols: set[str] = set("FCTV")
+    while len(symbols) < n:
+        sym = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5)))
+        if rng.random() < 0.03:
+            sym = f"{sym[:3]}.{rng.choice('AB')}"
+        symbols.add(sym)
+    return {s: "Manage Stocks" for s in sorted(symbols)}
+
+
+def _article(symbols: list[str], rng: random.Random) -> str:
+    words = rng.choices(_WORDS, k=rng.randint(60, 140))
+    for _ in range(rng.randint(0, 4)):
+        sym = rng.choice(symbols)
+        form = rng.choice(("${}", "NASDAQ: {}", "({})", "{}", "{} shares"))
+        words.insert(rng.randrange(len(words)), form.format(sym))
+    title = " ".join(words[:12]).title()
+    return matching_text_for_ticker_enrichment(title, " ".join(words[12:]), "https://example.com/news/a-b-c")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--tickers", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    universe = _universe(args.tickers, rng)
+    symbols = list(universe)
+    texts = [_article(symbols, rng) for _ in range(args.articles)]
+
+    t0 = time.perf_counter()
+    want = [_original_match(t, universe) for t in texts]
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matcher = TickerMatcher(universe)
+    got = [matcher.match(t) for t in texts]
+    t_new = time.perf_counter() - t0
+
+    tagged = sum(1 for tickers, _ in got if tickers)
+    print(f"{len(texts)} articles x {len(universe)} tickers ({tagged} tagged)")
+    print(f"  original 4-pass: {t_old:6.3f}s   TickerMatcher (incl. build): {t_new:6.3f}s  "
+          f"({t_old / t_new:.1f}x)   identical={got == want}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Rebuild or verify the materialized ``portfolio_value_daily`` table.
+
+The table is kept in sync on price and holdings writes; use this after manual
+SQL edits or restoring a database copy.
+
+  python scripts/rebuild_portfolio_value_daily.py           # rebuild, then verify
+  python scripts/rebuild_portfolio_value_daily.py --check   # verify only
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services import db_manager
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only compare against the full computation")
+    args = parser.parse_args()
+
+    db_manager.init_db()
+    if not args.check:
+        result = db_manager.rebuild_portfolio_value_daily()
+        print(f"Rebuilt {result['dates']} date(s) from {result['ticker_rows']} ticker row(s).")
+    check = db_manager.check_portfolio_value_daily()
+    print(
+        f"Checked {check['dates_checked']} date(s): "
+        f"{len(check['missing_dates'])} missing, {len(check['extra_dates'])} extra, "
+        f"{len(check['mismatched_dates'])} mismatched (max |diff| {check['max_abs_diff']:.6g})."
+    )
+    return 0 if check["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -19,7 +19,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from services import db_manager
-from api.quant_risk import compute_risk_summary
+from api.quant_risk import RISK_SERIES_WINDOWS, compute_risk_series, compute_risk_summary
 
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 _LOG = logging.getLogger(__name__)
@@ -232,6 +232,16 @@ def create_flask_app():
         except Exception as exc:
             return jsonify({"error": str(exc)}), 500
 
+    @app.route('/admin/rebuild_portfolio_value_daily', methods=['POST'])
+    def admin_rebuild_portfolio_value_daily():
+        """Recompute the materialized portfolio value history and verify it."""
+        try:
+            result = db_manager.rebuild_portfolio_value_daily()
+            check = db_manager.check_portfolio_value_daily()
+            return jsonify({"status": "ok", **result, "consistent": check["ok"]})
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 500
+
     @app.route('/admin/hide_manual_entry', methods=['GET'])
     def admin_get_hide_manual_entry():
         try:
@@ -413,6 +423,51 @@ def create_flask_app():
         except Exception as exc:
             return jsonify({"error": str(exc)}), 500
 
+    @app.route('/quant/risk_series', methods=['GET'])
+    def quant_risk_series():
+        """Rolling volatility / beta / drawdown / Sharpe; ``?windows=21,63,252&rf=0.04``."""
+        raw_windows = (request.args.get("windows") or "").strip()
+        try:
+            windows = [int(w) for w in raw_windows.split(",") if w.strip()] if raw_windows else list(RISK_SERIES_WINDOWS)
+            rf = float(request.args.get("rf") or 0.0)
+        except ValueError:
+            return jsonify({"error": "windows must be integers and rf a number"}), 400
+        if not windows or len(windows) > 6 or any(w < 2 or w > 2520 for w in windows):
+            return jsonify({"error": "windows must be 1-6 values between 2 and 2520"}), 400
+        try:
+            return jsonify(compute_risk_series(windows, risk_free_rate=rf))
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 500
+
+    @app.route('/quant/var', methods=['GET'])
+    def quant_var():
+        """One-day historical and Monte Carlo VaR / CVaR; ``?method=normal|bootstrap``."""
+        from api.value_at_risk import MC_METHODS, compute_var_summary
+
+        method = (request.args.get("method") or "").strip().lower() or None
+        if method is not None and method not in MC_METHODS:
+            return jsonify({"error": f"method must be one of {', '.join(MC_METHODS)}"}), 400
+        try:
+            return jsonify(compute_var_summary(method=method))
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 500
+
+    @app.route('/quant/risk_decomposition', methods=['GET'])
+    def quant_risk_decomposition():
+        """Shrinkage-covariance marginal / component risk per position; ``?lookback=252``."""
+        from api.risk_decomposition import DEFAULT_LOOKBACK_DAYS, compute_risk_decomposition
+
+        try:
+            lookback = int(request.args.get("lookback") or DEFAULT_LOOKBACK_DAYS)
+        except ValueError:
+            return jsonify({"error": "lookback must be an integer"}), 400
+        if lookback < 30 or lookback > 2520:
+            return jsonify({"error": "lookback must be between 30 and 2520"}), 400
+        try:
+            return jsonify(compute_risk_decomposition(lookback))
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 500
+
     # Optional: browser calls POST /api/client_error with {source, message, detail?} when client error logging is enabled.
     @app.route("/api/client_error", methods=["POST"])
     def client_error():
@@ -502,7 +557,27 @@ def create_flask_app():
     def api_quant_job_status():
         from services import quant_job
 
-        return jsonify(quant_job.read_status())
+        job_id = (request.args.get("job_id") or "").strip() or None
+        payload = quant_job.read_status(job_id)
+        if "since" in request.args:
+            # Every job finished since the caller's last poll, not just the latest one.
+            since = (request.args.get("since") or "").strip() or None
+            finished = quant_job.list_finished_since(since)
+            payload["finished"] = finished
+            payload["finished_cursor"] = finished[-1]["finished_at"] if finished else since
+        return jsonify(payload)
+
+    @app.route("/api/quant_queue_metrics", methods=["GET"])
+    def api_quant_queue_metrics():
+        from services import quant_job
+
+        return jsonify(quant_job.queue_metrics())
+
+    @app.route("/api/quote_cache_stats", methods=["GET"])
+    def api_quote_cache_stats():
+        from api.finnhub_api import get_quote_cache
+
+        return jsonify(get_quote_cache().stats())
 
     @app.route("/api/home_insights", methods=["GET"])
     def api_home_insights_get():
@@ -523,9 +598,14 @@ def create_flask_app():
 
     @app.route("/api/news_articles", methods=["GET"])
     def api_news_articles_list():
-        """Stored news rows. With ``page`` query: offset pagination. Without ``page``: one local calendar day per response."""
+        """
+        Stored news rows. With ``page`` or ``q`` query: offset pagination (``q`` is a full-text
+        search over title and summary, ranked by relevance unless ``sort`` is given). Otherwise:
+        one local calendar day per response.
+        """
         try:
-            if "page" in request.args:
+            q = (request.args.get("q") or "").strip() or None
+            if "page" in request.args or q:
                 try:
                     page = int(request.args.get("page") or 1)
                 except (TypeError, ValueError):
@@ -536,13 +616,14 @@ def create_flask_app():
                     per_page = 20
                 category = (request.args.get("category") or "").strip() or None
                 ticker = (request.args.get("ticker") or "").strip() or None
-                sort = (request.args.get("sort") or "created").strip() or "created"
+                sort = (request.args.get("sort") or "").strip() or None
                 items, total, per_effective = db_manager.list_news_digest_articles(
                     page=page,
                     per_page=per_page,
                     category=category,
                     ticker=ticker,
                     sort=sort,
+                    q=q,
                 )
                 from api.news_ai import enrich_items_with_merged_tickers
 
@@ -555,6 +636,7 @@ def create_flask_app():
                         "page": max(1, page),
                         "per_page": per_effective,
                         "pages": pages,
+                        "q": q,
                     }
                 )
 
@@ -1,15 +1,23 @@
 import hashlib
+import html
 import json
+import math
 import os
 import sqlite3
 import bisect
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 import re
+
+from services import price_store
+
 DATABASE = "finance_data.db"
 
 
@@ -76,8 +84,145 @@ def _ensure_accounts_timestamp_columns(c: sqlite3.Cursor) -> None:
         c.execute("ALTER TABLE accounts ADD COLUMN updated_at_utc TEXT")
 
 
+# Applied to every new connection. Override a single value with an env var named
+# SQLITE_PRAGMA_<NAME>, e.g. SQLITE_PRAGMA_SYNCHRONOUS=FULL or SQLITE_PRAGMA_MMAP_SIZE=0.
+SQLITE_PRAGMAS: dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "cache_size": -20000,
+}
+# Idle connections kept per thread and database file.
+SQLITE_POOL_MAX_IDLE = 4
+
+_PRAGMA_VALUE_RE = re.compile(r"^-?[A-Za-z0-9_]+$")
+_pool_local = threading.local()
+
+
+def _sqlite_pragmas() -> dict[str, Any]:
+    pragmas = dict(SQLITE_PRAGMAS)
+    for name in list(pragmas):
+        raw = (os.getenv(f"SQLITE_PRAGMA_{name.upper()}") or "").strip()
+        if raw:
+            pragmas[name] = raw
+    return pragmas
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    ``sqlite3.Connection`` whose ``close()`` hands it back to the owning
+    thread's pool (rolling back anything uncommitted) instead of closing it.
+    Still a real ``sqlite3.Connection``, so pandas ``read_sql_query`` accepts it.
+    """
+
+    def close(self) -> None:
+        _release_connection(self)
+
+    def close_for_real(self) -> None:
+        super().close()
+
+
+def _idle_connections(key: str) -> list:
+    pools = getattr(_pool_local, "pools", None)
+    if pools is None:
+        pools = _pool_local.pools = {}
+    return pools.setdefault(key, [])
+
+
+def _open_connection(key: str) -> PooledConnection:
+    pragmas = _sqlite_pragmas()
+    try:
+        timeout = max(float(pragmas.get("busy_timeout") or 0) / 1000.0, 0.0)
+    except (TypeError, ValueError):
+        timeout = 5.0
+    conn = sqlite3.connect(key, timeout=timeout, factory=PooledConnection)
+    conn._pool_key = key
+    conn._pool_idle = False
+    for name, value in pragmas.items():
+        if value is None or not _PRAGMA_VALUE_RE.match(str(value)):
+            continue
+        try:
+            conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.OperationalError:
+            # e.g. journal_mode switch while another process holds a lock; keep going.
+            pass
+    return conn
+
+
+def _release_connection(conn: PooledConnection) -> None:
+    if getattr(conn, "_pool_idle", False):
+        return
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+    except sqlite3.ProgrammingError:
+        # Closed for real already, or released from a thread that does not own it.
+        return
+    idle = _idle_connections(conn._pool_key)
+    if len(idle) >= SQLITE_POOL_MAX_IDLE:
+        conn.close_for_real()
+        return
+    conn._pool_idle = True
+    idle.append(conn)
+
+
 def get_connection():
-    return sqlite3.connect(DATABASE)
+    """
+    Connection to ``DATABASE`` from the calling thread's pool.
+
+    Connections are opened with ``SQLITE_PRAGMAS`` (WAL, ``synchronous=NORMAL``,
+    busy timeout, mmap) and reused across calls; ``close()`` returns them to
+    the pool. Each thread has its own pool, so connections never cross threads.
+    """
+    key = os.path.abspath(str(DATABASE))
+    idle = _idle_connections(key)
+    if idle:
+        conn = idle.pop()
+        conn._pool_idle = False
+        return conn
+    return _open_connection(key)
+
+
+def close_pooled_connections() -> None:
+    """Really close the calling thread's idle connections (shutdown / tests)."""
+    pools = getattr(_pool_local, "pools", None) or {}
+    for idle in pools.values():
+        while idle:
+            idle.pop().close_for_real()
+
+
+@contextmanager
+def db_read():
+    """``with db_read() as conn:`` — pooled connection for reads, released on exit."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def db_transaction(immediate: bool = True):
+    """
+    ``with db_transaction() as conn:`` — one write transaction.
+
+    Commits on success and rolls back on error. ``BEGIN IMMEDIATE`` takes the
+    write lock up front so concurrent writers wait on the busy timeout instead
+    of failing mid-transaction; WAL keeps readers unblocked meanwhile.
+    """
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
 def get_app_setting(key: str, default: Optional[str] = None) -> Optional[str]:
@@ -397,20 +542,116 @@ def init_db():
             closing_price REAL NOT NULL
         )
     """)
-    # Ensure no duplicate (ticker, date) rows before adding unique constraint.
+    # Ensure no duplicate (ticker, day) rows before adding unique constraint,
+    # then store every date as plain YYYY-MM-DD (older rows may carry a time).
     cur5.execute("""
         DELETE FROM stock_prices
         WHERE id NOT IN (
             SELECT MAX(id)
             FROM stock_prices
-            GROUP BY ticker, date
+            GROUP BY ticker, substr(date, 1, 10)
         )
     """)
+    cur5.execute("UPDATE stock_prices SET date = substr(date, 1, 10) WHERE length(date) != 10")
     # Enforce one price per ticker per day.
     cur5.execute("""
         CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_prices_ticker_date
         ON stock_prices (ticker, date)
     """)
+    # Portfolio value refreshes look prices up case-insensitively by ticker.
+    cur5.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stock_prices_upper_ticker_date
+        ON stock_prices (UPPER(ticker), date)
+    """)
+    # Backfill coverage counts distinct recent dates across all tickers.
+    cur5.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stock_prices_date
+        ON stock_prices (date)
+    """)
+    # Latest close per ticker, kept current by triggers on stock_prices so
+    # holdings queries avoid MAX(date) GROUP BY over the whole table.
+    cur5.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'latest_stock_price'"
+    )
+    seed_latest_stock_price = cur5.fetchone() is None
+    cur5.execute("""
+        CREATE TABLE IF NOT EXISTS latest_stock_price (
+            ticker TEXT PRIMARY KEY,
+            date TEXT NOT NULL,
+            closing_price REAL NOT NULL
+        )
+    """)
+    cur5.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stock_prices_latest_insert
+        AFTER INSERT ON stock_prices
+        BEGIN
+            INSERT INTO latest_stock_price (ticker, date, closing_price)
+            VALUES (NEW.ticker, NEW.date, NEW.closing_price)
+            ON CONFLICT(ticker) DO UPDATE SET
+                date = excluded.date,
+                closing_price = excluded.closing_price
+            WHERE excluded.date >= latest_stock_price.date;
+        END
+    """)
+    cur5.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stock_prices_latest_update
+        AFTER UPDATE ON stock_prices
+        BEGIN
+            DELETE FROM latest_stock_price WHERE ticker IN (OLD.ticker, NEW.ticker);
+            INSERT OR REPLACE INTO latest_stock_price (ticker, date, closing_price)
+            SELECT ticker, date, closing_price FROM (
+                SELECT ticker, date, closing_price FROM stock_prices
+                WHERE ticker = OLD.ticker ORDER BY date DESC LIMIT 1
+            )
+            UNION ALL
+            SELECT ticker, date, closing_price FROM (
+                SELECT ticker, date, closing_price FROM stock_prices
+                WHERE ticker = NEW.ticker AND NEW.ticker != OLD.ticker
+                ORDER BY date DESC LIMIT 1
+            );
+        END
+    """)
+    cur5.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_stock_prices_latest_delete
+        AFTER DELETE ON stock_prices
+        BEGIN
+            DELETE FROM latest_stock_price WHERE ticker = OLD.ticker AND date = OLD.date;
+            INSERT OR IGNORE INTO latest_stock_price (ticker, date, closing_price)
+            SELECT ticker, date, closing_price FROM stock_prices
+            WHERE ticker = OLD.ticker ORDER BY date DESC LIMIT 1;
+        END
+    """)
+    if seed_latest_stock_price:
+        # Bare columns with MAX() come from the row holding the maximum.
+        cur5.execute("""
+            INSERT INTO latest_stock_price (ticker, date, closing_price)
+            SELECT ticker, MAX(date), closing_price FROM stock_prices GROUP BY ticker
+        """)
+    # Materialized daily portfolio value, maintained incrementally on price and
+    # lot writes (see _refresh_portfolio_value_daily). Seeded on first creation.
+    cur5.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'portfolio_value_daily'"
+    )
+    seed_portfolio_value_daily = cur5.fetchone() is None
+    cur5.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_value_ticker_daily (
+            date TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            position_value REAL NOT NULL,
+            PRIMARY KEY (ticker, date)
+        )
+    """)
+    cur5.execute("""
+        CREATE INDEX IF NOT EXISTS idx_portfolio_value_ticker_daily_date
+        ON portfolio_value_ticker_daily (date)
+    """)
+    cur5.execute("""
+        CREATE TABLE IF NOT EXISTS portfolio_value_daily (
+            date TEXT PRIMARY KEY,
+            portfolio_value REAL NOT NULL,
+            updated_at_utc TEXT NOT NULL
+        )
+    """)
 
 
     cur6 = con.cursor()
@@ -606,6 +847,63 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_news_digest_articles_first_seen
         ON news_digest_articles (first_seen_at_utc DESC)
     """)
+    # Full-text index over title + summary for ``list_news_digest_articles(q=...)``.
+    # External content (rows live only in news_digest_articles), kept in sync by
+    # triggers so upserts, summary backfills, pruning and wipes all reindex.
+    # Skipped when this SQLite build lacks FTS5; search then falls back to LIKE.
+    cur15.execute("SELECT 1 FROM sqlite_master WHERE name = 'news_digest_articles_fts'")
+    build_news_fts = cur15.fetchone() is None
+    try:
+        cur15.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS news_digest_articles_fts USING fts5(
+                title, summary,
+                content='news_digest_articles', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError:
+        build_news_fts = False
+    else:
+        cur15.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_news_digest_articles_fts_insert
+            AFTER INSERT ON news_digest_articles
+            BEGIN
+                INSERT INTO news_digest_articles_fts (rowid, title, summary)
+                VALUES (NEW.id, NEW.title, NEW.summary);
+            END
+        """)
+        cur15.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_news_digest_articles_fts_delete
+            AFTER DELETE ON news_digest_articles
+            BEGIN
+                INSERT INTO news_digest_articles_fts (news_digest_articles_fts, rowid, title, summary)
+                VALUES ('delete', OLD.id, OLD.title, OLD.summary);
+            END
+        """)
+        cur15.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_news_digest_articles_fts_update
+            AFTER UPDATE OF title, summary ON news_digest_articles
+            WHEN OLD.title IS NOT NEW.title OR OLD.summary IS NOT NEW.summary
+            BEGIN
+                INSERT INTO news_digest_articles_fts (news_digest_articles_fts, rowid, title, summary)
+                VALUES ('delete', OLD.id, OLD.title, OLD.summary);
+                INSERT INTO news_digest_articles_fts (rowid, title, summary)
+                VALUES (NEW.id, NEW.title, NEW.summary);
+            END
+        """)
+    if build_news_fts:
+        cur15.execute("INSERT INTO news_digest_articles_fts (news_digest_articles_fts) VALUES ('rebuild')")
+    # Per-feed HTTP validators and last parsed items, so unchanged feeds come
+    # back as 304 Not Modified and reuse their items (api/news_digest.py).
+    cur15.execute("""
+        CREATE TABLE IF NOT EXISTS news_feed_http_cache (
+            feed_url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            items_json TEXT NOT NULL DEFAULT '[]',
+            fetched_at_utc TEXT NOT NULL
+        )
+    """)
 
     cur16 = con.cursor()
     cur16.execute("""
@@ -630,10 +928,57 @@ def init_db():
             benchmark_stats_json TEXT
         )
     """)
+    cur17.execute("PRAGMA table_info(quant_backtest_runs)")
+    if "detail_json" not in {row[1] for row in cur17.fetchall()}:
+        # Walk-forward folds and stitched out-of-sample curve (quant/quant_sweep.py).
+        cur17.execute("ALTER TABLE quant_backtest_runs ADD COLUMN detail_json TEXT")
     cur17.execute("""
         CREATE INDEX IF NOT EXISTS idx_quant_backtest_runs_created
         ON quant_backtest_runs (created_at_utc DESC)
     """)
+    # Backtest job queue (services/quant_job.py): workers claim the highest
+    # priority, oldest queued row; running jobs poll cancel_requested.
+    cur17.execute("""
+        CREATE TABLE IF NOT EXISTS quant_jobs (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            tickers_json TEXT,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            error_text TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            worker_pid INTEGER,
+            created_at_utc TEXT NOT NULL,
+            started_at_utc TEXT,
+            updated_at_utc TEXT,
+            finished_at_utc TEXT
+        )
+    """)
+    cur17.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quant_jobs_queue
+        ON quant_jobs (status, priority DESC, seq)
+    """)
+    # One row per evaluated combination of a parameter sweep job (quant/quant_sweep.py).
+    cur17.execute("""
+        CREATE TABLE IF NOT EXISTS quant_sweep_results (
+            job_id TEXT NOT NULL,
+            strategy_name TEXT NOT NULL,
+            fast_window INTEGER NOT NULL,
+            slow_window INTEGER NOT NULL,
+            total_return_pct REAL,
+            annualized_return_pct REAL,
+            sharpe_ratio REAL,
+            max_drawdown_pct REAL,
+            trades INTEGER,
+            win_rate_pct REAL,
+            error_text TEXT,
+            PRIMARY KEY (job_id, strategy_name, fast_window, slow_window)
+        )
+    """)
 
     cur18 = con.cursor()
     cur18.execute("""
@@ -643,6 +988,45 @@ def init_db():
             created_at_utc TEXT NOT NULL
         )
     """)
+    # Running risk state (see api/risk_engine.py). Triggers bump data_version on
+    # every effective write to its inputs and keep the earliest touched date in
+    # dirty_from, so the engine knows when folded history was edited.
+    cur18.execute("""
+        CREATE TABLE IF NOT EXISTS quant_risk_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            data_version INTEGER NOT NULL DEFAULT 0,
+            dirty_from TEXT,
+            as_of_date TEXT,
+            state_json TEXT,
+            updated_at_utc TEXT
+        )
+    """)
+    cur18.execute("INSERT OR IGNORE INTO quant_risk_state (id, data_version) VALUES (1, 0)")
+    for table, when_changed in (
+        ("stock_prices", "OLD.ticker IS NOT NEW.ticker OR OLD.date IS NOT NEW.date "
+                         "OR OLD.closing_price IS NOT NEW.closing_price"),
+        ("portfolio_value_daily", "OLD.date IS NOT NEW.date OR OLD.portfolio_value IS NOT NEW.portfolio_value"),
+        ("benchmark_prices", "OLD.symbol IS NOT NEW.symbol OR OLD.date IS NOT NEW.date "
+                             "OR OLD.closing_price IS NOT NEW.closing_price"),
+    ):
+        for event, when, date_expr in (
+            ("INSERT", "", "NEW.date"),
+            ("DELETE", "", "OLD.date"),
+            ("UPDATE", f"WHEN {when_changed}", "MIN(OLD.date, NEW.date)"),
+        ):
+            cur18.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_risk_dirty_{event.lower()}
+                AFTER {event} ON {table} {when}
+                BEGIN
+                    UPDATE quant_risk_state SET
+                        data_version = data_version + 1,
+                        dirty_from = CASE
+                            WHEN dirty_from IS NULL OR {date_expr} < dirty_from THEN {date_expr}
+                            ELSE dirty_from
+                        END
+                    WHERE id = 1;
+                END
+            """)
 
     cur19 = con.cursor()
     cur19.execute("""
@@ -721,9 +1105,50 @@ def init_db():
         """
     )
 
+    # Daily OHLCV bars downloaded for backtests (quant/price_cache.py). Coverage
+    # rows are merged [start_date, end_date) spans already fetched per ticker,
+    # so holidays and weekends inside a span are not refetched.
+    cur21 = con.cursor()
+    cur21.execute("""
+        CREATE TABLE IF NOT EXISTS ohlcv_cache (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            adj_close REAL,
+            volume REAL,
+            PRIMARY KEY (ticker, date)
+        ) WITHOUT ROWID
+    """)
+    cur21.execute("""
+        CREATE TABLE IF NOT EXISTS ohlcv_cache_coverage (
+            ticker TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            fetched_at_utc TEXT,
+            PRIMARY KEY (ticker, start_date)
+        )
+    """)
+    cur21.execute("""
+        CREATE TABLE IF NOT EXISTS ohlcv_cache_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            hits INTEGER NOT NULL DEFAULT 0,
+            partial_hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0,
+            spans_fetched INTEGER NOT NULL DEFAULT 0,
+            rows_fetched INTEGER NOT NULL DEFAULT 0,
+            updated_at_utc TEXT
+        )
+    """)
+    cur21.execute("INSERT OR IGNORE INTO ohlcv_cache_stats (id) VALUES (1)")
+
     con.commit()
     con.close()
     prune_error_logs()
+    if seed_portfolio_value_daily:
+        rebuild_portfolio_value_daily()
 
 # endregion
 
@@ -1251,6 +1676,9 @@ def wipe_all_data(force: bool = False, wipe_etf_sources: bool = False):
     cur.execute("DELETE FROM accounts")
     cur.execute("DELETE FROM transactions")
     _safe_delete("position_share_snapshots")
+    _safe_delete("portfolio_value_ticker_daily")
+    _safe_delete("portfolio_value_daily")
+    _safe_delete("latest_stock_price")
     _safe_delete("items")
     _safe_delete("plaid_holdings")
     _safe_delete("price_update_log")
@@ -1262,13 +1690,19 @@ def wipe_all_data(force: bool = False, wipe_etf_sources: bool = False):
     _safe_delete("sec_filing_summaries")
     _safe_delete("client_error_log")
     _safe_delete("news_digest_articles")
+    _safe_delete("news_feed_http_cache")
     _safe_delete("home_insights_cache")
     _safe_delete("quant_backtest_runs")
+    _safe_delete("quant_sweep_results")
+    _safe_delete("quant_jobs")
+    _safe_delete("ohlcv_cache")
+    _safe_delete("ohlcv_cache_coverage")
     _safe_delete("quant_risk_snapshots")
     _safe_delete("covered_calls")
     # Keep app_settings (e.g. hide_manual_entry) across wipes.
     conn.commit()
     conn.close()
+    _sync_price_store()
 
 def insert_transactions(transactions):
     # Connect to SQLite and insert each transaction
@@ -1508,8 +1942,13 @@ def insert_quant_backtest_run(
     params: dict[str, Any],
     stats: dict[str, Any],
     benchmark_stats: Optional[dict[str, Any]] = None,
+    detail: Optional[dict[str, Any]] = None,
 ) -> None:
-    """Persist a completed quant backtest for history and home insights."""
+    """Persist a completed quant backtest for history and home insights.
+
+    ``detail`` holds bulky per-run data (walk-forward folds and curve); it is
+    only returned by ``get_quant_backtest_run_by_job_id``.
+    """
     jid = (job_id or "").strip()[:80]
     if not jid:
         raise ValueError("job_id required")
@@ -1519,9 +1958,9 @@ def insert_quant_backtest_run(
     cur.execute(
         """
         INSERT INTO quant_backtest_runs (
-            job_id, created_at_utc, params_json, stats_json, benchmark_stats_json
+            job_id, created_at_utc, params_json, stats_json, benchmark_stats_json, detail_json
         )
-        VALUES (?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?)
         """,
         (
             jid,
@@ -1529,6 +1968,7 @@ def insert_quant_backtest_run(
             json.dumps(params, ensure_ascii=False),
             json.dumps(stats, ensure_ascii=False),
             json.dumps(benchmark_stats, ensure_ascii=False) if benchmark_stats is not None else None,
+            json.dumps(detail, ensure_ascii=False) if detail is not None else None,
         ),
     )
     conn.commit()
@@ -1543,7 +1983,7 @@ def get_quant_backtest_run_by_job_id(job_id: str) -> Optional[dict[str, Any]]:
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT job_id, created_at_utc, params_json, stats_json, benchmark_stats_json
+        SELECT job_id, created_at_utc, params_json, stats_json, benchmark_stats_json, detail_json
         FROM quant_backtest_runs WHERE job_id = ?
         """,
         (jid,),
@@ -1609,6 +2049,264 @@ def get_quant_backtest_runs_filtered(
     return out
 
 
+QUANT_JOB_STATUSES = ("queued", "running", "done", "error", "cancelled")
+_QUANT_JOB_COLUMNS = (
+    "job_id", "kind", "params_json", "tickers_json", "priority", "status", "progress", "message",
+    "error_text", "cancel_requested", "worker_pid", "created_at_utc", "started_at_utc",
+    "updated_at_utc", "finished_at_utc",
+)
+
+
+def _row_to_quant_job(row: tuple[Any, ...]) -> dict[str, Any]:
+    job = dict(zip(_QUANT_JOB_COLUMNS, row))
+    job["params"] = json.loads(job.pop("params_json") or "{}")
+    job["tickers"] = json.loads(job.pop("tickers_json") or "[]")
+    job["error"] = job.pop("error_text")
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+def enqueue_quant_job(
+    job_id: str,
+    kind: str,
+    params: dict[str, Any],
+    tickers: Optional[list[str]] = None,
+    priority: int = 0,
+) -> None:
+    """Add a queued backtest job; higher ``priority`` runs first, FIFO within a priority."""
+    now = datetime.now(timezone.utc).isoformat()
+    with db_transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO quant_jobs (
+                job_id, kind, params_json, tickers_json, priority, status, message,
+                created_at_utc, updated_at_utc
+            )
+            VALUES (?, ?, ?, ?, ?, 'queued', 'Queued', ?, ?)
+            """,
+            (
+                job_id,
+                kind,
+                json.dumps(params, ensure_ascii=False),
+                json.dumps(list(tickers or []), ensure_ascii=False),
+                int(priority),
+                now,
+                now,
+            ),
+        )
+
+
+def claim_next_quant_job(worker_pid: int) -> Optional[dict[str, Any]]:
+    """Atomically move the next queued job to ``running`` for this worker, or None."""
+    now = datetime.now(timezone.utc).isoformat()
+    with db_transaction() as conn:
+        row = conn.execute(
+            """
+            SELECT job_id FROM quant_jobs WHERE status = 'queued'
+            ORDER BY priority DESC, seq LIMIT 1
+            """
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            """
+            UPDATE quant_jobs SET status = 'running', worker_pid = ?, message = 'Running…',
+                started_at_utc = ?, updated_at_utc = ?
+            WHERE job_id = ?
+            """,
+            (int(worker_pid), now, now, row[0]),
+        )
+        job = conn.execute(
+            f"SELECT {', '.join(_QUANT_JOB_COLUMNS)} FROM quant_jobs WHERE job_id = ?", (row[0],)
+        ).fetchone()
+    return _row_to_quant_job(job)
+
+
+def update_quant_job_progress(job_id: str, progress: float, message: Optional[str] = None) -> bool:
+    """Record progress (0..1) for a running job; returns True when cancellation was requested."""
+    now = datetime.now(timezone.utc).isoformat()
+    with db_transaction() as conn:
+        conn.execute(
+            """
+            UPDATE quant_jobs SET progress = ?, message = COALESCE(?, message), updated_at_utc = ?
+            WHERE job_id = ? AND status = 'running'
+            """,
+            (max(0.0, min(1.0, float(progress))), message, now, job_id),
+        )
+        row = conn.execute("SELECT cancel_requested FROM quant_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return bool(row and row[0])
+
+
+def finish_quant_job(job_id: str, status: str, message: str = "", error: Optional[str] = None) -> None:
+    """Final state for a claimed job: ``done``, ``error`` or ``cancelled``."""
+    if status not in ("done", "error", "cancelled"):
+        raise ValueError("status must be done, error or cancelled")
+    now = datetime.now(timezone.utc).isoformat()
+    with db_transaction() as conn:
+        conn.execute(
+            """
+            UPDATE quant_jobs SET status = ?, message = ?, error_text = ?,
+                progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END,
+                updated_at_utc = ?, finished_at_utc = ?
+            WHERE job_id = ?
+            """,
+            (status, message, error, status, now, now, job_id),
+        )
+
+
+def request_quant_job_cancel(job_id: str) -> Optional[str]:
+    """
+    Cancel a job: queued jobs are cancelled at once, running ones are flagged
+    for their worker to stop at the next progress report. Returns the job's
+    status afterwards (None if unknown).
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    with db_transaction() as conn:
+        conn.execute(
+            """
+            UPDATE quant_jobs SET status = 'cancelled', message = 'Cancelled before start',
+                updated_at_utc = ?, finished_at_utc = ?
+            WHERE job_id = ? AND status = 'queued'
+            """,
+            (now, now, job_id),
+        )
+        conn.execute(
+            """
+            UPDATE quant_jobs SET cancel_requested = 1, message = 'Cancelling…', updated_at_utc = ?
+            WHERE job_id = ? AND status = 'running'
+            """,
+            (now, job_id),
+        )
+        row = conn.execute("SELECT status FROM quant_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return row[0] if row else None
+
+
+def get_quant_job(job_id: str) -> Optional[dict[str, Any]]:
+    with db_read() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(_QUANT_JOB_COLUMNS)} FROM quant_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+    return _row_to_quant_job(row) if row else None
+
+
+def list_quant_jobs(statuses: Optional[list[str]] = None, limit: int = 50) -> list[dict[str, Any]]:
+    """Jobs newest first, optionally filtered by status."""
+    n = max(1, min(int(limit), 500))
+    where, params = "", []
+    if statuses:
+        where = f"WHERE status IN ({', '.join('?' * len(statuses))})"
+        params = list(statuses)
+    with db_read() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(_QUANT_JOB_COLUMNS)} FROM quant_jobs {where} ORDER BY seq DESC LIMIT ?",
+            [*params, n],
+        ).fetchall()
+    return [_row_to_quant_job(r) for r in rows]
+
+
+def get_quant_job_metrics(recent: int = 50) -> dict[str, Any]:
+    """
+    Queue depth and timing: job counts per status, age of the oldest queued
+    job, and mean wait / run seconds over the last ``recent`` finished jobs.
+    """
+    now = datetime.now(timezone.utc)
+    with db_read() as conn:
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM quant_jobs GROUP BY status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(created_at_utc) FROM quant_jobs WHERE status = 'queued'"
+        ).fetchone()[0]
+        finished = conn.execute(
+            """
+            SELECT created_at_utc, started_at_utc, finished_at_utc FROM quant_jobs
+            WHERE status IN ('done', 'error', 'cancelled') AND started_at_utc IS NOT NULL
+            ORDER BY seq DESC LIMIT ?
+            """,
+            (max(1, int(recent)),),
+        ).fetchall()
+
+    def _secs(a: str, b: str) -> float:
+        return (datetime.fromisoformat(b) - datetime.fromisoformat(a)).total_seconds()
+
+    waits = [_secs(c, s) for c, s, _ in finished]
+    runs = [_secs(s, f) for _, s, f in finished if f]
+    return {
+        "counts": {status: int(counts.get(status, 0)) for status in QUANT_JOB_STATUSES},
+        "queue_depth": int(counts.get("queued", 0)),
+        "running": int(counts.get("running", 0)),
+        "oldest_queued_age_seconds": round((now - datetime.fromisoformat(oldest)).total_seconds(), 1)
+        if oldest else None,
+        "avg_wait_seconds": round(sum(waits) / len(waits), 2) if waits else None,
+        "avg_run_seconds": round(sum(runs) / len(runs), 2) if runs else None,
+    }
+
+
+_SWEEP_METRIC_COLUMNS = (
+    "total_return_pct",
+    "annualized_return_pct",
+    "sharpe_ratio",
+    "max_drawdown_pct",
+    "trades",
+    "win_rate_pct",
+)
+
+
+def _finite_or_none(value: Any) -> Optional[float]:
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
+
+
+def insert_quant_sweep_results(job_id: str, rows: list[dict[str, Any]]) -> int:
+    """Store a sweep's results grid (one row per strategy / window combination)."""
+    jid = (job_id or "").strip()[:80]
+    if not jid:
+        raise ValueError("job_id required")
+    values = [
+        (
+            jid,
+            str(r["strategy_name"]),
+            int(r.get("fast_window") or 0),
+            int(r.get("slow_window") or 0),
+            *(_finite_or_none(r.get(col)) for col in _SWEEP_METRIC_COLUMNS),
+            r.get("error"),
+        )
+        for r in rows
+    ]
+    with db_transaction() as conn:
+        conn.executemany(
+            f"""
+            INSERT OR REPLACE INTO quant_sweep_results (
+                job_id, strategy_name, fast_window, slow_window,
+                {", ".join(_SWEEP_METRIC_COLUMNS)}, error_text
+            )
+            VALUES ({", ".join("?" * (len(_SWEEP_METRIC_COLUMNS) + 5))})
+            """,
+            values,
+        )
+    return len(values)
+
+
+def get_quant_sweep_results(job_id: str) -> list[dict[str, Any]]:
+    """Results grid for a sweep job, ordered by strategy then windows."""
+    jid = (job_id or "").strip()[:80]
+    if not jid:
+        return []
+    with db_read() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT strategy_name, fast_window, slow_window,
+                   {", ".join(_SWEEP_METRIC_COLUMNS)}, error_text
+            FROM quant_sweep_results WHERE job_id = ?
+            ORDER BY strategy_name, fast_window, slow_window
+            """,
+            (jid,),
+        ).fetchall()
+    keys = ("strategy_name", "fast_window", "slow_window", *_SWEEP_METRIC_COLUMNS, "error")
+    return [dict(zip(keys, row)) for row in rows]
+
+
 def _row_to_quant_run(row: tuple[Any, ...]) -> dict[str, Any]:
     def _loads(raw: Any) -> dict[str, Any]:
         if raw is None or raw == "":
@@ -1625,6 +2323,7 @@ def _row_to_quant_run(row: tuple[Any, ...]) -> dict[str, Any]:
         "params": _loads(row[2]),
         "stats": _loads(row[3]),
         "benchmark_stats": _loads(row[4]),
+        **({"detail": _loads(row[5])} if len(row) > 5 else {}),
     }
 
 
@@ -1653,6 +2352,56 @@ def upsert_quant_risk_snapshot(snapshot_date: str, payload: dict[str, Any]) -> N
     conn.close()
 
 
+def get_quant_risk_state() -> dict[str, Any]:
+    """
+    The persisted running risk state: ``data_version`` (bumped by triggers on
+    every price / portfolio value write), ``dirty_from`` (earliest date written
+    since the last save), ``as_of_date`` (last day folded into ``state``) and
+    ``state`` (dict, None before the first save).
+    """
+    with db_read() as conn:
+        row = conn.execute(
+            "SELECT data_version, dirty_from, as_of_date, state_json FROM quant_risk_state WHERE id = 1"
+        ).fetchone()
+    if row is None:
+        return {"data_version": 0, "dirty_from": None, "as_of_date": None, "state": None}
+    try:
+        state = json.loads(row[3]) if row[3] else None
+    except json.JSONDecodeError:
+        state = None
+    return {
+        "data_version": int(row[0] or 0),
+        "dirty_from": row[1],
+        "as_of_date": row[2],
+        "state": state if isinstance(state, dict) else None,
+    }
+
+
+def get_quant_data_version() -> int:
+    """Current ``quant_risk_state.data_version``; changes whenever prices or portfolio values change."""
+    with db_read() as conn:
+        row = conn.execute("SELECT data_version FROM quant_risk_state WHERE id = 1").fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def save_quant_risk_state(state: dict[str, Any], as_of_date: str, data_version: int) -> bool:
+    """
+    Store ``state`` folded through ``as_of_date`` and clear ``dirty_from``,
+    but only if no input changed since ``data_version`` was read. Returns
+    whether the state was saved.
+    """
+    with db_transaction() as conn:
+        cur = conn.execute(
+            """
+            UPDATE quant_risk_state
+            SET state_json = ?, as_of_date = ?, dirty_from = NULL, updated_at_utc = ?
+            WHERE id = 1 AND data_version = ?
+            """,
+            (json.dumps(state), as_of_date, _utc_now_iso(), int(data_version)),
+        )
+        return cur.rowcount == 1
+
+
 def get_quant_risk_snapshots(limit: int = 14) -> list[dict[str, Any]]:
     """Daily portfolio risk card metrics, newest calendar date first."""
     n = max(0, min(int(limit), 366))
@@ -1936,6 +2685,58 @@ def update_news_digest_article_tickers(
     return bool(changed)
 
 
+def get_news_feed_cache(feed_urls: list[str]) -> dict[str, dict[str, Any]]:
+    """``feed_url`` → ``etag``, ``last_modified``, ``items`` and ``fetched_at_utc`` for stored feeds."""
+    urls = [u for u in feed_urls if u]
+    if not urls:
+        return {}
+    with db_read() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT feed_url, etag, last_modified, items_json, fetched_at_utc
+            FROM news_feed_http_cache WHERE feed_url IN ({', '.join('?' * len(urls))})
+            """,
+            urls,
+        ).fetchall()
+    return {
+        url: {
+            "etag": etag,
+            "last_modified": last_modified,
+            "items": json.loads(items_json or "[]"),
+            "fetched_at_utc": fetched_at,
+        }
+        for url, etag, last_modified, items_json, fetched_at in rows
+    }
+
+
+def store_news_feed_cache(
+    feed_url: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    items: list[dict[str, Any]],
+) -> None:
+    """Remember a feed's validators and parsed items after a full (200) download."""
+    with db_transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO news_feed_http_cache (feed_url, etag, last_modified, items_json, fetched_at_utc)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(feed_url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                items_json = excluded.items_json,
+                fetched_at_utc = excluded.fetched_at_utc
+            """,
+            (
+                feed_url,
+                etag,
+                last_modified,
+                json.dumps(items, ensure_ascii=False),
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+
+
 def recent_news_digest_articles_with_null_summary(days: int = 2) -> list[dict[str, Any]]:
     """
     Return articles from the last *days* (by ``first_seen_at_utc``) that still have no summary.
@@ -2182,62 +2983,147 @@ def list_news_digest_articles_for_local_date(local_date: str) -> list[dict[str,
     return rows_out
 
 
+_NEWS_SEARCH_WORD_RE = re.compile(r"(\w+)(\*?)")
+# Highlight markers returned by FTS5; swapped for <mark> after HTML-escaping the text.
+_NEWS_MARK_OPEN, _NEWS_MARK_CLOSE = "\x02", "\x03"
+
+
+def news_search_fts_query(q: Optional[str]) -> str:
+    """
+    FTS5 ``MATCH`` expression for free text ``q``: every word quoted (so punctuation and
+    operators like ``AND`` / ``-`` are plain text) and ANDed; a trailing ``*`` keeps prefix
+    search (``semicond*``). Empty when ``q`` has no words.
+    """
+    return " ".join(f'"{word}"{star}' for word, star in _NEWS_SEARCH_WORD_RE.findall(q or ""))
+
+
+def _news_mark_html(text: Optional[str]) -> str:
+    return html.escape(text or "").replace(_NEWS_MARK_OPEN, "<mark>").replace(_NEWS_MARK_CLOSE, "</mark>")
+
+
+def _news_fts_available(cur) -> bool:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'news_digest_articles_fts'")
+    return cur.fetchone() is not None
+
+
 def list_news_digest_articles(
     page: int = 1,
     per_page: int = 20,
     category: Optional[str] = None,
     ticker: Optional[str] = None,
-    sort: str = "created",
+    sort: Optional[str] = None,
+    q: Optional[str] = None,
 ) -> tuple[list[dict[str, Any]], int, int]:
     """
     Paginated history for the news table. Optional filters: category slug (e.g. ``rates``),
-    ticker symbol (e.g. ``MSFT``). ``sort``: ``created`` (default) by ``first_seen_at_utc``,
-    or ``last_seen`` by ``last_seen_at_utc``. Returns (rows, total_count, per_page_effective).
+    ticker symbol (e.g. ``MSFT``), full-text query ``q`` over title and summary (see
+    ``news_search_fts_query``). ``sort``: ``created`` by ``first_seen_at_utc``, ``last_seen`` by
+    ``last_seen_at_utc``, or ``relevance`` (BM25, title weighted above summary); defaults to
+    ``relevance`` when searching and ``created`` otherwise. Search results also carry
+    ``title_highlight`` / ``summary_snippet``: HTML-escaped text with matches in ``<mark>``.
+    Returns (rows, total_count, per_page_effective).
     """
     page = max(1, int(page))
     per_page = min(max(1, int(per_page)), 100)
     offset = (page - 1) * per_page
-    sort_key = (sort or "created").strip().lower()
-    if sort_key not in ("created", "last_seen"):
+    match = news_search_fts_query(q)
+    sort_key = (sort or ("relevance" if match else "created")).strip().lower()
+    if sort_key not in ("created", "last_seen", "relevance") or (sort_key == "relevance" and not match):
         sort_key = "created"
 
+    conn = get_connection()
+    cur = conn.cursor()
+    use_fts = bool(match) and _news_fts_available(cur)
+
+    from_sql = "news_digest_articles a"
     where_parts: list[str] = []
     params: list[Any] = []
+    if use_fts:
+        from_sql += " JOIN news_digest_articles_fts ON news_digest_articles_fts.rowid = a.id"
+        where_parts.append("news_digest_articles_fts MATCH ?")
+        params.append(match)
+    elif match:
+        for word, _star in _NEWS_SEARCH_WORD_RE.findall(q or ""):
+            where_parts.append("(a.title LIKE ? ESCAPE '\\' OR a.summary LIKE ? ESCAPE '\\')")
+            pattern = "%" + word.replace("_", "\\_") + "%"
+            params.extend([pattern, pattern])
     if category and str(category).strip():
         where_parts.append(
-            "EXISTS (SELECT 1 FROM json_each(categories_json) WHERE LOWER(value) = ?)"
+            "EXISTS (SELECT 1 FROM json_each(a.categories_json) WHERE LOWER(value) = ?)"
         )
         params.append(str(category).strip().lower())
     if ticker and str(ticker).strip():
         where_parts.append(
-            "EXISTS (SELECT 1 FROM json_each(tickers_json) WHERE UPPER(value) = ?)"
+            "EXISTS (SELECT 1 FROM json_each(a.tickers_json) WHERE UPPER(value) = ?)"
         )
         params.append(str(ticker).strip().upper())
 
     where_sql = (" WHERE " + " AND ".join(where_parts)) if where_parts else ""
-    order_sql = (
-        "ORDER BY last_seen_at_utc DESC"
-        if sort_key == "last_seen"
-        else "ORDER BY first_seen_at_utc DESC"
-    )
-
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(f"SELECT COUNT(*) FROM news_digest_articles{where_sql}", params)
-    total = int(cur.fetchone()[0])
+    if sort_key == "last_seen":
+        order_sql = "ORDER BY a.last_seen_at_utc DESC"
+    elif sort_key == "relevance" and use_fts:
+        order_sql = "ORDER BY bm25(news_digest_articles_fts, 5.0, 1.0), a.id DESC"
+    else:
+        order_sql = "ORDER BY a.first_seen_at_utc DESC"
+    select_sql = """
+        SELECT a.url, a.title, a.source_feed, a.categories_json, a.tickers_json, a.ticker_companies_json,
+               a.first_seen_at_utc, a.last_seen_at_utc, a.summary, a.ai_relevance_json, a.ai_processed_at_utc
+    """
 
-    cur.execute(
-        f"""
-        SELECT url, title, source_feed, categories_json, tickers_json, ticker_companies_json,
-               first_seen_at_utc, last_seen_at_utc, summary, ai_relevance_json, ai_processed_at_utc
-        FROM news_digest_articles
-        {where_sql}
-        {order_sql}
-        LIMIT ? OFFSET ?
-        """,
-        params + [per_page, offset],
-    )
-    rows_out = [_news_digest_item_dict_from_row(r) for r in cur.fetchall()]
+    if not use_fts:
+        cur.execute(f"SELECT COUNT(*) FROM {from_sql}{where_sql}", params)
+        total = int(cur.fetchone()[0])
+        cur.execute(f"{select_sql} FROM {from_sql}{where_sql} {order_sql} LIMIT ? OFFSET ?", params + [per_page, offset])
+        rows_out = [_news_digest_item_dict_from_row(r) for r in cur.fetchall()]
+        if match:
+            for item in rows_out:
+                item["title_highlight"] = _news_mark_html(item["title"])
+                item["summary_snippet"] = ""
+        conn.close()
+        return rows_out, total, per_page
+
+    # Search: pick the page's ids first (from the index alone when only the text filters),
+    # then build highlights for just those rows instead of every match.
+    text_only = len(where_parts) == 1
+    if text_only:
+        cur.execute("SELECT COUNT(*) FROM news_digest_articles_fts WHERE news_digest_articles_fts MATCH ?", [match])
+    else:
+        cur.execute(f"SELECT COUNT(*) FROM {from_sql}{where_sql}", params)
+    total = int(cur.fetchone()[0])
+    if text_only and sort_key == "relevance":
+        cur.execute(
+            """
+            SELECT rowid FROM news_digest_articles_fts WHERE news_digest_articles_fts MATCH ?
+            ORDER BY bm25(news_digest_articles_fts, 5.0, 1.0), rowid DESC
+            LIMIT ? OFFSET ?
+            """,
+            [match, per_page, offset],
+        )
+    else:
+        cur.execute(f"SELECT a.id FROM {from_sql}{where_sql} {order_sql} LIMIT ? OFFSET ?", params + [per_page, offset])
+    ids = [r[0] for r in cur.fetchall()]
+    rows_by_id: dict[int, tuple[Any, ...]] = {}
+    if ids:
+        cur.execute(
+            f"""
+            {select_sql}, a.id,
+                   highlight(news_digest_articles_fts, 0, ?, ?),
+                   snippet(news_digest_articles_fts, 1, ?, ?, '…', 24)
+            FROM {from_sql}
+            WHERE news_digest_articles_fts MATCH ? AND a.id IN ({', '.join('?' * len(ids))})
+            """,
+            [_NEWS_MARK_OPEN, _NEWS_MARK_CLOSE] * 2 + [match] + ids,
+        )
+        rows_by_id = {r[11]: r for r in cur.fetchall()}
+    rows_out = []
+    for row_id in ids:
+        r = rows_by_id.get(row_id)
+        if r is None:  # deleted (pruned / upserted away) between the two queries
+            continue
+        item = _news_digest_item_dict_from_row(r[:11])
+        item["title_highlight"] = _news_mark_html(r[12])
+        item["summary_snippet"] = _news_mark_html(r[13])
+        rows_out.append(item)
     conn.close()
     return rows_out, total, per_page
 
@@ -2261,15 +3147,8 @@ def get_stocks():
                 ELSE ((s.shares * sp.closing_price) - COALESCE(s.cost_basis, 0)) / COALESCE(s.cost_basis, 0)
             END AS gain_loss_pct
         FROM Stocks s
-        LEFT JOIN (
-            SELECT ticker, MAX(date) AS max_date
-            FROM stock_prices
-            GROUP BY ticker
-        ) latest
-            ON latest.ticker = s.ticker
-        LEFT JOIN stock_prices sp
+        LEFT JOIN latest_stock_price sp
             ON sp.ticker = s.ticker
-           AND sp.date = latest.max_date
         WHERE s.closed_at_utc IS NULL
         ORDER BY brokerage, account, s.ticker
     """
@@ -2361,15 +3240,8 @@ def get_value_stocks():
             WHERE closed_at_utc IS NULL
             GROUP BY ticker
         ) s
-        LEFT JOIN (
-            SELECT ticker, MAX(date) AS max_date
-            FROM stock_prices
-            GROUP BY ticker
-        ) latest
-            ON latest.ticker = s.ticker
-        LEFT JOIN stock_prices sp
+        LEFT JOIN latest_stock_price sp
             ON sp.ticker = s.ticker
-           AND sp.date = latest.max_date
         """
     df = pd.read_sql_query(query, conn)
     conn.close()
@@ -2392,43 +3264,375 @@ def get_stock_prices_df():
     return df
 
 
-def _position_open_on_date(opened_at, closed_at, price_date) -> bool:
-    """True when a position lot contributes to portfolio value on price_date."""
-    if pd.isna(price_date):
-        return False
+def count_price_dates_since(since) -> int:
+    """Number of distinct price dates on or after ``since`` (YYYY-MM-DD)."""
+    with db_read() as conn:
+        row = conn.execute(
+            "SELECT COUNT(DISTINCT date) FROM stock_prices WHERE date >= ?",
+            (str(since)[:10],),
+        ).fetchone()
+    return int(row[0] or 0)
 
-    def _as_naive_day(value):
-        if value is None or (isinstance(value, float) and pd.isna(value)):
-            return None
-        ts = pd.Timestamp(value)
-        if ts.tzinfo is not None:
-            ts = ts.tz_convert("UTC").tz_localize(None)
-        return ts.normalize()
 
-    d = _as_naive_day(price_date)
-    if d is None:
-        return False
-    open_d = _as_naive_day(opened_at)
-    if open_d is None:
-        open_d = pd.Timestamp.min.normalize()
-    if d < open_d:
-        return False
-    close_d = _as_naive_day(closed_at)
-    if close_d is None:
-        return True
-    return d < close_d
+def get_trading_calendar(start_date, end_date, symbol="SPY") -> list:
+    """
+    Trading days (YYYY-MM-DD) in ``[start_date, end_date]``.
 
+    Uses stored ``symbol`` benchmark closes as the market calendar, so exchange
+    holidays are not treated as gaps; weekdays after the last benchmark close
+    (or the whole range, with no benchmark data) come from a business-day range.
+    """
+    start = str(start_date)[:10]
+    end = str(end_date)[:10]
+    if end < start:
+        return []
+    with db_read() as conn:
+        days = [
+            r[0]
+            for r in conn.execute(
+                """
+                SELECT DISTINCT substr(date, 1, 10) AS d
+                FROM benchmark_prices
+                WHERE symbol = ? AND date >= ? AND date < ?
+                ORDER BY d
+                """,
+                (symbol, start, end + "~"),
+            ).fetchall()
+        ]
+    tail_start = (pd.Timestamp(days[-1]) + pd.Timedelta(days=1)) if days else pd.Timestamp(start)
+    if tail_start <= pd.Timestamp(end):
+        days.extend(d.strftime("%Y-%m-%d") for d in pd.bdate_range(tail_start, end))
+    return days
+
+
+def get_price_coverage(tickers, calendar) -> dict:
+    """
+    Per-ticker coverage of ``stock_prices`` against ``calendar`` (sorted
+    YYYY-MM-DD trading days, e.g. from ``get_trading_calendar``).
 
-def get_portfolio_value_history():
+    Returns ``{TICKER: {"first_date", "last_date", "present", "missing"}}``:
+    overall first/last stored date (None when the ticker has no prices), the
+    set of calendar days already stored, and the sorted calendar days without
+    a close. Reads only the ``(UPPER(ticker), date)`` index.
     """
-    Portfolio value over time using share snapshots within each lot's open window.
+    symbols = sorted({str(t).upper().strip() for t in tickers or [] if str(t).strip()})
+    coverage = {
+        t: {"first_date": None, "last_date": None, "present": set(), "missing": list(calendar)}
+        for t in symbols
+    }
+    if not symbols:
+        return coverage
+    placeholders = ",".join("?" for _ in symbols)
+    with db_read() as conn:
+        for ticker, first, last in conn.execute(
+            f"""
+            SELECT UPPER(ticker), MIN(date), MAX(date)
+            FROM stock_prices
+            WHERE UPPER(ticker) IN ({placeholders})
+            GROUP BY UPPER(ticker)
+            """,
+            symbols,
+        ):
+            coverage[ticker]["first_date"] = first
+            coverage[ticker]["last_date"] = last
+        if calendar:
+            for ticker, day in conn.execute(
+                f"""
+                SELECT UPPER(ticker), date
+                FROM stock_prices
+                WHERE UPPER(ticker) IN ({placeholders}) AND date >= ? AND date <= ?
+                """,
+                [*symbols, calendar[0], calendar[-1]],
+            ):
+                coverage[ticker]["present"].add(day)
+    for entry in coverage.values():
+        entry["missing"] = [d for d in calendar if d not in entry["present"]]
+    return coverage
+
+
+def _price_store_root():
+    return price_store.store_dir(DATABASE)
+
+
+def rebuild_price_store() -> int:
+    """Rewrite the columnar price store from ``stock_prices``. Returns rows written."""
+    with db_read() as conn:
+        df = pd.read_sql_query("SELECT ticker, date, closing_price FROM stock_prices", conn)
+    return price_store.rebuild(_price_store_root(), df)
+
+
+def _sync_price_store(tickers=None) -> None:
+    """
+    Mirror committed ``stock_prices`` rows for ``tickers`` into the columnar
+    store (no-op unless enabled and built). ``None`` means every ticker
+    changed: the store is invalidated and rebuilt on next read.
+    """
+    if not price_store.enabled():
+        return
+    root = _price_store_root()
+    if not price_store.is_built(root):
+        return
+    if tickers is None:
+        price_store.invalidate(root)
+        return
+    symbols = sorted({str(t).upper() for t in tickers})
+    try:
+        with db_read() as conn:
+            df = pd.read_sql_query(
+                f"""
+                SELECT ticker, date, closing_price FROM stock_prices
+                WHERE UPPER(ticker) IN ({','.join('?' for _ in symbols)})
+                """,
+                conn,
+                params=symbols,
+            )
+        price_store.write_partitions(root, df, symbols)
+    except Exception as exc:
+        print(f"[PriceStore] Sync failed, rebuilding on next read: {exc}")
+        price_store.invalidate(root)
 
-    Trim/add uploads write a new snapshot for that day so historical value uses
-    the share count that was actually held, not only the latest quantity.
+
+def get_price_history_df(tickers=None, start_date=None, columns=None):
     """
-    conn = get_connection()
+    Typed price history for analytics: ``ticker``, ``date`` (datetime64[ns])
+    and ``closing_price`` (float64), sorted by ticker then date.
+
+    ``tickers`` (case-insensitive) and ``start_date`` limit the rows and
+    ``columns`` the columns returned. Served from the memory-mapped columnar
+    store when ``PRICE_STORE=arrow`` (rebuilt from SQLite if missing),
+    otherwise from ``stock_prices`` with the filters pushed into SQL.
+    """
+    cols = list(columns) if columns else list(price_store.COLUMNS)
+    symbols = None if tickers is None else sorted({str(t).upper() for t in tickers if str(t).strip()})
+    if symbols == []:
+        return price_store.empty_frame(cols)
+    if price_store.enabled():
+        root = _price_store_root()
+        if not price_store.is_built(root):
+            rebuild_price_store()
+        return price_store.read(root, symbols, cols, start_date)
+
+    where = []
+    params: list[Any] = []
+    if symbols is not None:
+        where.append(f"UPPER(ticker) IN ({','.join('?' for _ in symbols)})")
+        params.extend(symbols)
+    if start_date is not None:
+        where.append("date >= ?")
+        params.append(str(pd.Timestamp(start_date).date()))
+    sql = "SELECT ticker, date, closing_price FROM stock_prices"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with db_read() as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+    return price_store.typed_frame(df)[cols]
+
+
+_NAT_NS = np.iinfo("int64").min
+
+
+def _naive_utc_days(values: pd.Series) -> np.ndarray:
+    """Normalize timestamps (tz-aware or naive) to naive UTC midnights as int64 ns."""
+    ts = pd.to_datetime(values, errors="coerce", utc=True, format="ISO8601")
+    days = ts.dt.tz_localize(None).dt.normalize()
+    return days.to_numpy(dtype="datetime64[ns]").astype("int64")
+
+
+def _as_of_share_matrix(
+    day_ns: np.ndarray,
+    lot_ids: np.ndarray,
+    default_shares: np.ndarray,
+    snapshots: pd.DataFrame,
+) -> np.ndarray:
+    """
+    Shares held per (day, lot) from ``position_share_snapshots``.
+
+    Each lot uses its latest snapshot on or before the day; days before the
+    first snapshot use the first snapshot. Lots without snapshots fall back to
+    ``default_shares`` (the current ``Stocks.shares``).
+    """
+    n_days = len(day_ns)
+    n_lots = len(lot_ids)
+    shares = np.broadcast_to(default_shares, (n_days, n_lots)).copy()
+    if snapshots.empty or n_lots == 0:
+        return shares
+
+    lot_pos = pd.Index(lot_ids).get_indexer(snapshots["stock_id"].to_numpy())
+    snap_day = _naive_utc_days(snapshots["snapshot_date"])
+    keep = (lot_pos >= 0) & (snap_day != _NAT_NS)
+    if not keep.any():
+        return shares
+    snap_lot = lot_pos[keep]
+    snap_day = snap_day[keep]
+    snap_shares = snapshots["shares"].to_numpy(dtype="float64")[keep]
+    order = np.lexsort((snap_day, snap_lot))
+    snap_lot = snap_lot[order]
+    snap_day = snap_day[order]
+    snap_shares = snap_shares[order]
+
+    # Rank days on a shared axis so (lot, day) packs into one sortable int64 key.
+    axis = np.unique(np.concatenate([day_ns, snap_day]))
+    width = len(axis) + 1
+    snap_keys = snap_lot.astype("int64") * width + np.searchsorted(axis, snap_day)
+    query_keys = (
+        np.arange(n_lots, dtype="int64")[None, :] * width
+        + np.searchsorted(axis, day_ns)[:, None]
+    )
+    idx = np.searchsorted(snap_keys, query_keys, side="right") - 1
+
+    first_idx = np.full(n_lots, -1, dtype="int64")
+    lots_with_snaps, first_pos = np.unique(snap_lot, return_index=True)
+    first_idx[lots_with_snaps] = first_pos
+    has_snaps = first_idx >= 0
+    before_first = (idx < 0) | (snap_lot[np.clip(idx, 0, None)] != np.arange(n_lots)[None, :])
+    idx = np.where(before_first, first_idx[None, :], idx)
+    snap_vals = snap_shares[np.clip(idx, 0, None)]
+    return np.where(has_snaps[None, :], snap_vals, shares)
+
+
+def _lot_value_matrix(
+    positions: pd.DataFrame,
+    snapshots: pd.DataFrame,
+    prices: pd.DataFrame,
+):
+    """
+    Core of the vectorized history engine.
+
+    Returns ``(dates, lot_tickers, values, open_mask)`` where ``values`` and
+    ``open_mask`` are date x lot arrays, or None when nothing contributes.
+    """
+    if positions is None or positions.empty or prices is None or prices.empty:
+        return None
+
+    prices = prices.copy()
+    prices["ticker"] = prices["ticker"].astype(str).str.upper()
+    prices["date"] = pd.to_datetime(prices["date"], errors="coerce")
+    prices["closing_price"] = pd.to_numeric(prices["closing_price"], errors="coerce")
+    prices = prices.dropna(subset=["date", "closing_price"])
+    if prices.empty:
+        return None
+    # Same as pivot_table(aggfunc="sum") but several times cheaper.
+    matrix = prices.groupby(["date", "ticker"])["closing_price"].sum().unstack("ticker")
+
+    lots = positions.copy()
+    lots["ticker"] = lots["ticker"].fillna("").astype(str).str.upper()
+    ticker_pos = matrix.columns.get_indexer(lots["ticker"])
+    lots = lots[ticker_pos >= 0]
+    ticker_pos = ticker_pos[ticker_pos >= 0]
+    if lots.empty:
+        return None
+
+    dates = matrix.index
+    if getattr(dates, "tz", None) is not None:
+        day_ns = dates.tz_convert("UTC").tz_localize(None).normalize()
+    else:
+        day_ns = dates.normalize()
+    day_ns = day_ns.to_numpy(dtype="datetime64[ns]").astype("int64")
+
+    # Missing opened_at means "always open"; missing closed_at means still held.
+    # NaT already sorts before every day, so only closed_at needs a sentinel.
+    open_ns = _naive_utc_days(lots["opened_at_utc"])
+    close_ns = _naive_utc_days(lots["closed_at_utc"])
+    close_ns = np.where(close_ns == _NAT_NS, np.iinfo("int64").max, close_ns)
+
+    lot_prices = matrix.to_numpy(dtype="float64")[:, ticker_pos]
+    open_mask = (
+        (day_ns[:, None] >= open_ns[None, :])
+        & (day_ns[:, None] < close_ns[None, :])
+        & ~np.isnan(lot_prices)
+    )
+    if not open_mask.any():
+        return None
+
+    if snapshots is None or snapshots.empty:
+        snapshots = pd.DataFrame(columns=["stock_id", "snapshot_date", "shares"])
+    else:
+        snapshots = snapshots.copy()
+        snapshots["shares"] = pd.to_numeric(snapshots["shares"], errors="coerce").fillna(0.0)
+    default_shares = pd.to_numeric(lots["current_shares"], errors="coerce").fillna(0.0)
+    shares = _as_of_share_matrix(
+        day_ns,
+        lots["stock_id"].to_numpy(),
+        default_shares.to_numpy(dtype="float64"),
+        snapshots,
+    )
+
+    values = np.where(open_mask, lot_prices * shares, 0.0)
+    return dates, lots["ticker"].to_numpy(), values, open_mask
+
+
+def compute_portfolio_value_history(
+    positions: pd.DataFrame,
+    snapshots: pd.DataFrame,
+    prices: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Vectorized portfolio value per price date.
+
+    ``positions`` has ``stock_id, ticker, current_shares, opened_at_utc,
+    closed_at_utc``; ``snapshots`` has ``stock_id, snapshot_date, shares``;
+    ``prices`` has ``ticker, date, closing_price``. Prices are pivoted into a
+    date x ticker matrix, shares come from an as-of join on the snapshots, and
+    each lot's open window is applied as a mask. A date is included when at
+    least one open lot has a price that day.
+    """
+    result = _lot_value_matrix(positions, snapshots, prices)
+    if result is None:
+        return pd.DataFrame(columns=["date", "portfolio_value"])
+    dates, _, values, open_mask = result
+    has_value = open_mask.any(axis=1)
+    return pd.DataFrame(
+        {
+            "date": dates[has_value],
+            "portfolio_value": np.nansum(values[has_value], axis=1),
+        }
+    )
+
+
+def compute_ticker_value_history(
+    positions: pd.DataFrame,
+    snapshots: pd.DataFrame,
+    prices: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Same engine as ``compute_portfolio_value_history`` but one row per
+    (date, ticker) with an open lot: ``date, ticker, position_value``.
+    """
+    result = _lot_value_matrix(positions, snapshots, prices)
+    if result is None:
+        return pd.DataFrame(columns=["date", "ticker", "position_value"])
+    dates, lot_tickers, values, open_mask = result
+    codes, tickers = pd.factorize(lot_tickers)
+    summed = np.zeros((len(dates), len(tickers)))
+    present = np.zeros((len(dates), len(tickers)), dtype=bool)
+    np.add.at(summed.T, codes, np.nan_to_num(values.T))
+    np.logical_or.at(present.T, codes, open_mask.T)
+    day_i, ticker_i = np.nonzero(present)
+    return pd.DataFrame(
+        {
+            "date": dates[day_i],
+            "ticker": np.asarray(tickers)[ticker_i],
+            "position_value": summed[day_i, ticker_i],
+        }
+    )
+
+
+def _read_portfolio_history_inputs(conn, tickers=None, since=None, dates=None, with_prices=True):
+    """
+    Load the Stocks / snapshot / price frames the history engine needs.
+
+    ``tickers`` limits lots and prices to those symbols; ``since`` and ``dates``
+    limit only the price rows (snapshots are always loaded in full because the
+    as-of join needs earlier share counts). ``with_prices=False`` returns None
+    for prices, for callers reading them from the columnar store.
+    """
+    lot_where = "TRIM(COALESCE(ticker, '')) != ''"
+    lot_params: list[Any] = []
+    if tickers is not None:
+        lot_where += f" AND UPPER(ticker) IN ({','.join('?' for _ in tickers)})"
+        lot_params.extend(tickers)
     positions = pd.read_sql_query(
-        """
+        f"""
         SELECT
             id AS stock_id,
             ticker,
@@ -2436,87 +3640,240 @@ def get_portfolio_value_history():
             opened_at_utc,
             closed_at_utc
         FROM Stocks
-        WHERE TRIM(COALESCE(ticker, '')) != ''
+        WHERE {lot_where}
         """,
         conn,
+        params=lot_params,
     )
     snapshots = pd.read_sql_query(
-        """
+        f"""
         SELECT stock_id, snapshot_date, shares
         FROM position_share_snapshots
+        WHERE stock_id IN (SELECT id FROM Stocks WHERE {lot_where})
         ORDER BY stock_id, snapshot_date
         """,
         conn,
+        params=lot_params,
     )
-    prices = pd.read_sql_query(
-        "SELECT ticker, date, closing_price FROM stock_prices",
-        conn,
-    )
+    if not with_prices:
+        return positions, snapshots, None
+    price_where = []
+    price_params: list[Any] = []
+    if tickers is not None:
+        price_where.append(f"UPPER(ticker) IN ({','.join('?' for _ in tickers)})")
+        price_params.extend(tickers)
+    if since is not None:
+        price_where.append("date >= ?")
+        price_params.append(since)
+    if dates is not None:
+        price_where.append(f"date IN ({','.join('?' for _ in dates)})")
+        price_params.extend(dates)
+    price_sql = "SELECT ticker, date, closing_price FROM stock_prices"
+    if price_where:
+        price_sql += " WHERE " + " AND ".join(price_where)
+    prices = pd.read_sql_query(price_sql, conn, params=price_params)
+    return positions, snapshots, prices
+
+
+def get_portfolio_value_history():
+    """
+    Portfolio value over time using share snapshots within each lot's open window.
+
+    Trim/add uploads write a new snapshot for that day so historical value uses
+    the share count that was actually held, not only the latest quantity.
+
+    This is the full computation; readers that only need the series should use
+    ``get_portfolio_value_daily`` (materialized, kept in sync on writes).
+    """
+    conn = get_connection()
+    positions, snapshots, prices = _read_portfolio_history_inputs(conn, with_prices=not price_store.enabled())
     conn.close()
-    if positions.empty or prices.empty:
-        return pd.DataFrame(columns=["date", "portfolio_value"])
+    if price_store.enabled():
+        prices = get_price_history_df(positions["ticker"].dropna().unique().tolist())
+    return compute_portfolio_value_history(positions, snapshots, prices)
 
-    positions = positions.copy()
-    prices = prices.copy()
-    prices["date"] = pd.to_datetime(prices["date"], errors="coerce")
-    prices["closing_price"] = pd.to_numeric(prices["closing_price"], errors="coerce")
-    prices = prices.dropna(subset=["date", "closing_price"])
-    if snapshots is not None and not snapshots.empty:
-        snapshots = snapshots.copy()
-        snapshots["snapshot_date"] = pd.to_datetime(snapshots["snapshot_date"], errors="coerce")
-        snapshots["shares"] = pd.to_numeric(snapshots["shares"], errors="coerce").fillna(0.0)
-        snapshots = snapshots.dropna(subset=["snapshot_date"])
-    else:
-        snapshots = pd.DataFrame(columns=["stock_id", "snapshot_date", "shares"])
 
-    parts = []
-    for _, lot in positions.iterrows():
-        ticker = str(lot.get("ticker") or "").upper()
-        if not ticker:
-            continue
-        ticker_prices = prices[prices["ticker"].astype(str).str.upper() == ticker]
-        if ticker_prices.empty:
-            continue
-        mask = ticker_prices["date"].map(
-            lambda d: _position_open_on_date(
-                lot.get("opened_at_utc"), lot.get("closed_at_utc"), d
-            )
-        )
-        if not mask.any():
-            continue
-        chunk = ticker_prices.loc[mask, ["date", "closing_price"]].copy()
-        lot_snaps = snapshots[snapshots["stock_id"] == lot["stock_id"]].sort_values(
-            "snapshot_date"
-        )
-        if lot_snaps.empty:
-            chunk["shares"] = float(lot.get("current_shares") or 0)
-        else:
-            snap_dates = [
-                pd.Timestamp(d).normalize() for d in lot_snaps["snapshot_date"].tolist()
-            ]
-            snap_shares = lot_snaps["shares"].tolist()
+def _refresh_portfolio_value_daily(conn, tickers=None, *, since=None, dates=None) -> int:
+    """
+    Recompute materialized portfolio value rows without committing.
 
-            def _shares_on(d):
-                idx = bisect.bisect_right(snap_dates, pd.Timestamp(d).normalize()) - 1
-                if idx < 0:
-                    return float(snap_shares[0])
-                return float(snap_shares[idx])
+    Only ``tickers`` (all when None) are recomputed, optionally limited to
+    price dates ``>= since`` or in ``dates``. Per-ticker contributions live in
+    ``portfolio_value_ticker_daily``; totals in ``portfolio_value_daily`` are
+    re-summed for the touched date range. Returns rows written.
+    """
+    if tickers is not None:
+        tickers = sorted({str(t).upper().strip() for t in tickers if t and str(t).strip()})
+        if not tickers:
+            return 0
+    if dates is not None:
+        dates = sorted({str(d) for d in dates if d})
+        if not dates:
+            return 0
+    positions, snapshots, prices = _read_portfolio_history_inputs(
+        conn, tickers, since=since, dates=dates
+    )
+    frame = compute_ticker_value_history(positions, snapshots, prices)
+    rows = [
+        (pd.Timestamp(d).strftime("%Y-%m-%d"), str(t), float(v))
+        for d, t, v in zip(frame["date"], frame["ticker"], frame["position_value"])
+    ]
 
-            chunk["shares"] = chunk["date"].map(_shares_on)
-        chunk["position_value"] = chunk["closing_price"] * chunk["shares"]
-        parts.append(chunk[["date", "position_value"]])
+    where = []
+    params: list[Any] = []
+    if tickers is not None:
+        where.append(f"ticker IN ({','.join('?' for _ in tickers)})")
+        params.extend(tickers)
+    if since is not None:
+        where.append("date >= ?")
+        params.append(since)
+    if dates is not None:
+        where.append(f"date IN ({','.join('?' for _ in dates)})")
+        params.extend(dates)
+    scope = (" WHERE " + " AND ".join(where)) if where else ""
 
-    if not parts:
-        return pd.DataFrame(columns=["date", "portfolio_value"])
+    cur = conn.cursor()
+    cur.execute(f"SELECT MIN(date), MAX(date) FROM portfolio_value_ticker_daily{scope}", params)
+    bounds = [d for d in cur.fetchone() if d]
+    cur.execute(f"DELETE FROM portfolio_value_ticker_daily{scope}", params)
+    cur.executemany(
+        """
+        INSERT INTO portfolio_value_ticker_daily (date, ticker, position_value)
+        VALUES (?, ?, ?)
+        ON CONFLICT(ticker, date) DO UPDATE SET
+            position_value = excluded.position_value
+        """,
+        rows,
+    )
+    if rows:
+        bounds.extend([min(r[0] for r in rows), max(r[0] for r in rows)])
+    if not bounds:
+        return 0
+    lo, hi = min(bounds), max(bounds)
+    # Upsert only changed totals so the risk-state triggers see real edits, not
+    # a delete/re-insert of the whole range.
+    cur.execute(
+        """
+        DELETE FROM portfolio_value_daily
+        WHERE date BETWEEN ? AND ?
+          AND date NOT IN (
+              SELECT date FROM portfolio_value_ticker_daily WHERE date BETWEEN ? AND ?
+          )
+        """,
+        (lo, hi, lo, hi),
+    )
+    cur.execute(
+        """
+        INSERT INTO portfolio_value_daily (date, portfolio_value, updated_at_utc)
+        SELECT date, SUM(position_value), ?
+        FROM portfolio_value_ticker_daily
+        WHERE date BETWEEN ? AND ?
+        GROUP BY date
+        ON CONFLICT(date) DO UPDATE SET
+            portfolio_value = excluded.portfolio_value,
+            updated_at_utc = excluded.updated_at_utc
+        WHERE portfolio_value IS NOT excluded.portfolio_value
+        """,
+        (_utc_now_iso(), lo, hi),
+    )
+    return len(rows)
 
-    combined = pd.concat(parts, ignore_index=True)
-    portfolio = (
-        combined.groupby("date", as_index=False)["position_value"]
-        .sum()
-        .rename(columns={"position_value": "portfolio_value"})
-        .sort_values("date")
+
+def _portfolio_refresh_since(cur, stock_ids, since: str) -> Optional[str]:
+    """
+    ``since`` when every lot already had a snapshot before it, else None.
+
+    A lot's first snapshot also prices the days before it, so replacing that
+    snapshot changes the whole history for the ticker.
+    """
+    ids = [int(i) for i in stock_ids]
+    if not ids:
+        return since
+    cur.execute(
+        f"""
+        SELECT COUNT(*)
+        FROM Stocks s
+        WHERE s.id IN ({','.join('?' for _ in ids)})
+          AND NOT EXISTS (
+              SELECT 1 FROM position_share_snapshots p
+              WHERE p.stock_id = s.id AND p.snapshot_date < ?
+          )
+        """,
+        [*ids, since],
     )
-    return portfolio
+    return since if int(cur.fetchone()[0] or 0) == 0 else None
+
+
+def refresh_portfolio_value_daily(tickers=None, since=None, dates=None) -> int:
+    """Recompute and commit materialized portfolio value rows (see ``_refresh_portfolio_value_daily``)."""
+    with db_transaction() as conn:
+        return _refresh_portfolio_value_daily(conn, tickers, since=since, dates=dates)
+
+
+def rebuild_portfolio_value_daily() -> dict[str, int]:
+    """Drop and recompute the whole materialized portfolio value history."""
+    with db_transaction() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM portfolio_value_ticker_daily")
+        cur.execute("DELETE FROM portfolio_value_daily")
+        written = _refresh_portfolio_value_daily(conn)
+        cur.execute("SELECT COUNT(*) FROM portfolio_value_daily")
+        dates = int(cur.fetchone()[0] or 0)
+    return {"ticker_rows": written, "dates": dates}
+
+
+def get_portfolio_value_daily(start_date=None, end_date=None) -> pd.DataFrame:
+    """
+    Materialized portfolio value history (``date``, ``portfolio_value``).
+
+    Single range scan on the ``portfolio_value_daily`` primary key; same shape
+    as ``get_portfolio_value_history``.
+    """
+    with db_read() as conn:
+        df = pd.read_sql_query(
+            """
+            SELECT date, portfolio_value
+            FROM portfolio_value_daily
+            WHERE date >= ? AND date <= ?
+            ORDER BY date
+            """,
+            conn,
+            params=(start_date or "", end_date or "9999-12-31"),
+        )
+    df["date"] = pd.to_datetime(df["date"])
+    df["portfolio_value"] = pd.to_numeric(df["portfolio_value"], errors="coerce")
+    return df
+
+
+def check_portfolio_value_daily(tolerance: float = 1e-6) -> dict[str, Any]:
+    """
+    Compare the materialized table against ``get_portfolio_value_history``.
+
+    Returns ``ok`` plus the dates that are missing, extra, or differ by more
+    than ``tolerance`` (absolute), and the largest absolute difference seen.
+    """
+    full = get_portfolio_value_history()
+    expected = {
+        pd.Timestamp(d).strftime("%Y-%m-%d"): float(v)
+        for d, v in zip(full["date"], full["portfolio_value"])
+    }
+    stored_df = get_portfolio_value_daily()
+    stored = {
+        d.strftime("%Y-%m-%d"): float(v)
+        for d, v in zip(stored_df["date"], stored_df["portfolio_value"])
+    }
+    missing = sorted(set(expected) - set(stored))
+    extra = sorted(set(stored) - set(expected))
+    diffs = {d: abs(expected[d] - stored[d]) for d in set(expected) & set(stored)}
+    mismatched = sorted(d for d, diff in diffs.items() if diff > tolerance)
+    return {
+        "ok": not (missing or extra or mismatched),
+        "dates_checked": len(expected),
+        "missing_dates": missing,
+        "extra_dates": extra,
+        "mismatched_dates": mismatched,
+        "max_abs_diff": max(diffs.values()) if diffs else 0.0,
+    }
 
 
 def get_stock_price_series(ticker):
@@ -2532,10 +3889,19 @@ def get_stock_price_series(ticker):
     return df.sort_values("date")
 
 
-def get_benchmark_price_series(symbol):
+def get_portfolio_value_daily_bounds() -> dict[str, Any]:
+    """First and last ``portfolio_value_daily`` dates plus the row count, without reading values."""
+    with db_read() as conn:
+        row = conn.execute(
+            "SELECT MIN(date), MAX(date), COUNT(*) FROM portfolio_value_daily"
+        ).fetchone()
+    return {"first_date": row[0], "last_date": row[1], "rows": int(row[2] or 0)}
+
+
+def get_benchmark_price_series(symbol, start_date=None):
     conn = get_connection()
-    query = "SELECT date, closing_price FROM benchmark_prices WHERE symbol = ?"
-    df = pd.read_sql_query(query, conn, params=(symbol,))
+    query = "SELECT date, closing_price FROM benchmark_prices WHERE symbol = ? AND date >= ?"
+    df = pd.read_sql_query(query, conn, params=(symbol, start_date or ""))
     conn.close()
     if df.empty:
         return df
@@ -2546,34 +3912,171 @@ def get_benchmark_price_series(symbol):
 
 
 def upsert_benchmark_price(symbol, date, closing_price, source=None, updated_at=None):
-    conn = get_connection()
-    cur = conn.cursor()
+    bulk_upsert_benchmark_prices([(symbol, date, closing_price)], source=source, updated_at=updated_at)
+
+
+def bulk_upsert_benchmark_prices(rows, source=None, updated_at=None) -> int:
+    """
+    Upsert many ``(symbol, date, closing_price)`` benchmark rows in one
+    transaction (``executemany`` + ``ON CONFLICT(symbol, date)``).
+    Returns the number of rows written.
+    """
     if updated_at is None:
         updated_at = datetime.now(timezone.utc).isoformat()
-    cur.execute(
-        "SELECT id FROM benchmark_prices WHERE symbol = ? AND date = ?",
-        (symbol, date),
-    )
-    row = cur.fetchone()
-    if row:
-        cur.execute(
+    params = [(sym, _price_day(d), px, source, updated_at) for sym, d, px in rows or []]
+    if not params:
+        return 0
+    with db_transaction() as conn:
+        conn.executemany(
             """
-            UPDATE benchmark_prices
-            SET closing_price = ?, source = ?, updated_at = ?
-            WHERE symbol = ? AND date = ?
+            INSERT INTO benchmark_prices (symbol, date, closing_price, source, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(symbol, date) DO UPDATE SET
+                closing_price = excluded.closing_price,
+                source = excluded.source,
+                updated_at = excluded.updated_at
             """,
-            (closing_price, source, updated_at, symbol, date),
+            params,
         )
-    else:
-        cur.execute(
+    return len(params)
+
+
+_OHLCV_FIELDS = ("open", "high", "low", "close", "adj_close", "volume")
+
+
+def _merge_spans(spans: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Union of half-open ``[start, end)`` ISO date spans, sorted; touching spans join."""
+    merged: list[list[str]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(a, b) for a, b in merged]
+
+
+def get_ohlcv_cache_coverage(tickers) -> dict[str, list[tuple[str, str]]]:
+    """Fetched ``[start, end)`` spans per ticker (tickers never fetched map to ``[]``)."""
+    syms = sorted({str(t).upper() for t in tickers or []})
+    out: dict[str, list[tuple[str, str]]] = {t: [] for t in syms}
+    if not syms:
+        return out
+    with db_read() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT ticker, start_date, end_date FROM ohlcv_cache_coverage
+            WHERE ticker IN ({", ".join("?" * len(syms))})
+            ORDER BY ticker, start_date
+            """,
+            syms,
+        ).fetchall()
+    for ticker, start, end in rows:
+        out[ticker].append((start, end))
+    return out
+
+
+def store_ohlcv_cache(rows, coverage, replace=None) -> int:
+    """
+    Upsert ``(ticker, date, open, high, low, close, adj_close, volume)`` bars and
+    mark ``(ticker, start, end)`` spans as fetched, merging them with existing
+    coverage, in one transaction. Tickers in ``replace`` lose their cached bars
+    and coverage first (re-adjusted history). Returns the number of bars written.
+    """
+    bars = [(str(r[0]).upper(), _price_day(r[1]), *r[2:8]) for r in rows or []]
+    spans: dict[str, list[tuple[str, str]]] = {}
+    for ticker, start, end in coverage or []:
+        if start < end:
+            spans.setdefault(str(ticker).upper(), []).append((start, end))
+    now = datetime.now(timezone.utc).isoformat()
+    with db_transaction() as conn:
+        for ticker in sorted({str(t).upper() for t in replace or []}):
+            conn.execute("DELETE FROM ohlcv_cache WHERE ticker = ?", (ticker,))
+            conn.execute("DELETE FROM ohlcv_cache_coverage WHERE ticker = ?", (ticker,))
+        if bars:
+            conn.executemany(
+                f"""
+                INSERT INTO ohlcv_cache (ticker, date, {", ".join(_OHLCV_FIELDS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, date) DO UPDATE SET
+                    {", ".join(f"{c} = excluded.{c}" for c in _OHLCV_FIELDS)}
+                """,
+                bars,
+            )
+        for ticker, new in spans.items():
+            old = conn.execute(
+                "SELECT start_date, end_date FROM ohlcv_cache_coverage WHERE ticker = ?", (ticker,)
+            ).fetchall()
+            conn.execute("DELETE FROM ohlcv_cache_coverage WHERE ticker = ?", (ticker,))
+            conn.executemany(
+                """
+                INSERT INTO ohlcv_cache_coverage (ticker, start_date, end_date, fetched_at_utc)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(ticker, a, b, now) for a, b in _merge_spans([tuple(o) for o in old] + new)],
+            )
+    return len(bars)
+
+
+def get_ohlcv_cache_rows(tickers, start: str, end: str) -> pd.DataFrame:
+    """Cached bars for ``tickers`` with ``start <= date < end`` (long format, date-sorted)."""
+    syms = sorted({str(t).upper() for t in tickers or []})
+    columns = ["ticker", "date", *_OHLCV_FIELDS]
+    if not syms:
+        return pd.DataFrame(columns=columns)
+    with db_read() as conn:
+        df = pd.read_sql_query(
+            f"""
+            SELECT ticker, date, {", ".join(_OHLCV_FIELDS)} FROM ohlcv_cache
+            WHERE ticker IN ({", ".join("?" * len(syms))}) AND date >= ? AND date < ?
+            ORDER BY date, ticker
+            """,
+            conn,
+            params=[*syms, start, end],
+        )
+    return df
+
+
+def record_ohlcv_cache_lookups(
+    hits: int = 0,
+    partial_hits: int = 0,
+    misses: int = 0,
+    spans_fetched: int = 0,
+    rows_fetched: int = 0,
+) -> None:
+    """Add per-ticker lookup outcomes and download volume to the cache counters."""
+    with db_transaction() as conn:
+        conn.execute(
             """
-            INSERT INTO benchmark_prices (symbol, date, closing_price, source, updated_at)
-            VALUES (?, ?, ?, ?, ?)
+            UPDATE ohlcv_cache_stats SET
+                hits = hits + ?,
+                partial_hits = partial_hits + ?,
+                misses = misses + ?,
+                spans_fetched = spans_fetched + ?,
+                rows_fetched = rows_fetched + ?,
+                updated_at_utc = ?
+            WHERE id = 1
             """,
-            (symbol, date, closing_price, source, updated_at),
+            (hits, partial_hits, misses, spans_fetched, rows_fetched, datetime.now(timezone.utc).isoformat()),
         )
-    conn.commit()
-    conn.close()
+
+
+def get_ohlcv_cache_stats() -> dict[str, Any]:
+    """Cache counters plus ``hit_rate`` (full hits / ticker lookups) and stored bar count."""
+    with db_read() as conn:
+        row = conn.execute(
+            """
+            SELECT hits, partial_hits, misses, spans_fetched, rows_fetched, updated_at_utc
+            FROM ohlcv_cache_stats WHERE id = 1
+            """
+        ).fetchone()
+        bars = conn.execute("SELECT COUNT(*) FROM ohlcv_cache").fetchone()[0]
+    keys = ("hits", "partial_hits", "misses", "spans_fetched", "rows_fetched", "updated_at_utc")
+    out = dict(zip(keys, row or (0, 0, 0, 0, 0, None)))
+    lookups = out["hits"] + out["partial_hits"] + out["misses"]
+    out["lookups"] = lookups
+    out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else None
+    out["cached_bars"] = int(bars)
+    return out
 
 
 def get_etf_sector_breakdown(symbol):
@@ -2694,6 +4197,7 @@ def delete_orphan_stock_prices():
     """)
     conn.commit()
     conn.close()
+    _sync_price_store()
 
 def insert_stock(ticker, shares, cost_basis=None, brokerage=None, account=None):
     """
@@ -2725,6 +4229,7 @@ def insert_stock(ticker, shares, cost_basis=None, brokerage=None, account=None):
         """,
         (stock_id, today, shares, cost_basis),
     )
+    _refresh_portfolio_value_daily(conn, [ticker_val], since=today)
     conn.commit()
     conn.close()
     return stock_id
@@ -2761,8 +4266,16 @@ def update_stock(
         return
     conn = get_connection()
     cur = conn.cursor()
+    cur.execute("SELECT ticker FROM Stocks WHERE id = ?", (stock_id,))
+    row = cur.fetchone()
     params.append(stock_id)
     cur.execute(f"UPDATE Stocks SET {', '.join(fields)} WHERE id = ?", params)
+    if row and (ticker is not None or shares is not None):
+        # Ticker moves or share edits can change every historical day of the lot.
+        affected = {row[0]}
+        if ticker is not None:
+            affected.add(str(ticker).upper().strip())
+        _refresh_portfolio_value_daily(conn, affected)
     conn.commit()
     conn.close()
 
@@ -2802,6 +4315,7 @@ def upsert_stock_by_ticker(ticker, shares, cost_basis=None, brokerage=None, acco
             """,
             (ticker_val, shares, cost_basis, brokerage_val, account_val, now),
         )
+    _refresh_portfolio_value_daily(conn, [ticker_val])
     conn.commit()
     conn.close()
 
@@ -2904,6 +4418,9 @@ def sync_stocks_from_upload(rows):
     cur = conn.cursor()
     upload_keys = set(upload_map)
     open_keys = set(open_lots)
+    # Lots whose share history changed today, for the portfolio_value_daily refresh.
+    changed_lot_ids = []
+    changed_tickers = set()
 
     def _upsert_snapshot(stock_id, shares, cost_basis):
         cur.execute(
@@ -2974,6 +4491,9 @@ def sync_stocks_from_upload(rows):
             (new_shares, new_basis, lot["id"]),
         )
         _upsert_snapshot(lot["id"], new_shares, new_basis)
+        if new_shares != old_shares:
+            changed_lot_ids.append(lot["id"])
+            changed_tickers.add(lot["ticker"])
 
     for key in upload_keys - open_keys:
         row = upload_map[key]
@@ -2995,6 +4515,7 @@ def sync_stocks_from_upload(rows):
         )
         new_id = cur.lastrowid
         _upsert_snapshot(new_id, row["shares"], row["cost_basis"])
+        changed_tickers.add(row["ticker"])
 
     for key in open_keys - upload_keys:
         lot = open_lots[key]
@@ -3009,6 +4530,15 @@ def sync_stocks_from_upload(rows):
             (now, lot["id"]),
         )
         _upsert_snapshot(lot["id"], 0.0, 0.0)
+        changed_lot_ids.append(lot["id"])
+        changed_tickers.add(lot["ticker"])
+
+    if changed_tickers:
+        _refresh_portfolio_value_daily(
+            conn,
+            changed_tickers,
+            since=_portfolio_refresh_since(cur, changed_lot_ids, today),
+        )
 
     cur.execute("SELECT COUNT(*) FROM Stocks WHERE closed_at_utc IS NULL")
     open_count = int(cur.fetchone()[0] or 0)
@@ -3096,6 +4626,11 @@ def delete_stock(stock_id):
         """,
         (_utc_now_iso(), stock_id),
     )
+    if cur.rowcount:
+        cur.execute("SELECT ticker FROM Stocks WHERE id = ?", (stock_id,))
+        row = cur.fetchone()
+        today = datetime.now(timezone.utc).date().isoformat()
+        _refresh_portfolio_value_daily(conn, [row[0]] if row else [], since=today)
     conn.commit()
     conn.close()
 
@@ -3260,21 +4795,11 @@ def get_realized_gains(year=None):
 def get_latest_stock_prices_map(tickers=None):
     """Return {ticker: closing_price} for the most recent price row per ticker."""
     conn = get_connection()
-    query = """
-        SELECT sp.ticker, sp.closing_price
-        FROM stock_prices sp
-        JOIN (
-            SELECT ticker, MAX(date) AS max_date
-            FROM stock_prices
-            GROUP BY ticker
-        ) latest
-            ON latest.ticker = sp.ticker
-           AND latest.max_date = sp.date
-    """
+    query = "SELECT ticker, closing_price FROM latest_stock_price"
     params = []
     if tickers:
         placeholders = ",".join("?" for _ in tickers)
-        query += f" WHERE sp.ticker IN ({placeholders})"
+        query += f" WHERE ticker IN ({placeholders})"
         params = list(tickers)
     cur = conn.cursor()
     cur.execute(query, params)
@@ -3494,39 +5019,69 @@ def get_tickers_missing_prices(tickers=None):
     conn.close()
     return [t for t in held if t not in have]
 
+def _price_day(value) -> str:
+    """Canonical ``YYYY-MM-DD`` for a price date (date, datetime, Timestamp or ISO string)."""
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    return str(value).strip()[:10]
+
+
 def insert_stock_price(ticker, date, closing_price):
+    date = _price_day(date)
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
         INSERT INTO stock_prices (ticker, date, closing_price)
         VALUES (?, ?, ?)
     """, (ticker, date, closing_price))
+    _refresh_portfolio_value_daily(conn, [ticker], dates=[date])
     conn.commit()
     conn.close()
+    _sync_price_store([ticker])
 
 def upsert_stock_price(ticker, date, closing_price):
     """
     Update the existing row for (ticker, date) if present; otherwise insert it.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id FROM stock_prices WHERE ticker = ? AND date = ?
-    """, (ticker, date))
-    row = cursor.fetchone()
-    if row:
-        cursor.execute("""
-            UPDATE stock_prices
-            SET closing_price = ?
-            WHERE id = ?
-        """, (closing_price, row[0]))
-    else:
-        cursor.execute("""
+    bulk_upsert_stock_prices([(ticker, date, closing_price)])
+
+
+# Above this many distinct dates, refresh the materialized history by range
+# (date >= earliest) rather than an IN list.
+_BULK_REFRESH_MAX_DATES = 500
+
+
+def bulk_upsert_stock_prices(rows) -> int:
+    """
+    Upsert many ``(ticker, date, closing_price)`` rows in one transaction.
+    Dates are stored as ``YYYY-MM-DD``.
+
+    Uses ``executemany`` with ``INSERT ... ON CONFLICT(ticker, date)`` and
+    refreshes ``portfolio_value_daily`` once for the touched tickers/dates.
+    Returns the number of rows written.
+    """
+    rows = [(t, _price_day(d), p) for t, d, p in rows or []]
+    if not rows:
+        return 0
+    with db_transaction() as conn:
+        conn.executemany(
+            """
             INSERT INTO stock_prices (ticker, date, closing_price)
             VALUES (?, ?, ?)
-        """, (ticker, date, closing_price))
-    conn.commit()
-    conn.close()
+            ON CONFLICT(ticker, date) DO UPDATE SET
+                closing_price = excluded.closing_price
+            """,
+            rows,
+        )
+        tickers = {r[0] for r in rows}
+        dates = sorted({r[1] for r in rows})
+        if len(dates) > _BULK_REFRESH_MAX_DATES:
+            _refresh_portfolio_value_daily(conn, tickers, since=dates[0])
+        else:
+            _refresh_portfolio_value_daily(conn, tickers, dates=dates)
+    _sync_price_store(tickers)
+    return len(rows)
+
 
 def get_last_update():
     """
@@ -0,0 +1,157 @@
+"""
+Optional columnar mirror of ``stock_prices`` for history-heavy analytics.
+
+One Arrow IPC (Feather v2, uncompressed) file per ticker holds typed
+``ticker`` / ``date`` (timestamp[ns]) / ``closing_price`` (float64) columns.
+Reads memory-map only the partitions and columns requested, so analytics skip
+both the full-table SQL scan and re-parsing date and price strings. SQLite
+remains the source of truth: ``db_manager`` rewrites a ticker's partition after
+each committed price write and rebuilds the whole store when it is missing.
+
+Enable with ``PRICE_STORE=arrow`` (needs ``pyarrow``). The store lives next to
+the database (``<db name>_prices/``) unless ``PRICE_STORE_DIR`` is set.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+COLUMNS = ("ticker", "date", "closing_price")
+_DTYPES = {"ticker": object, "date": "datetime64[ns]", "closing_price": "float64"}
+_MANIFEST = "_manifest.json"
+_SUFFIX = ".arrow"
+
+
+def enabled() -> bool:
+    """True when ``PRICE_STORE=arrow`` and pyarrow is importable."""
+    return pa is not None and (os.getenv("PRICE_STORE") or "").strip().lower() in {"arrow", "1", "true"}
+
+
+def store_dir(database: str) -> Path:
+    raw = (os.getenv("PRICE_STORE_DIR") or "").strip()
+    if raw:
+        return Path(raw).expanduser()
+    return Path(os.path.splitext(os.path.abspath(database))[0] + "_prices")
+
+
+def _partition_path(root: Path, ticker: str) -> Path:
+    return root / (quote(str(ticker).upper(), safe="") + _SUFFIX)
+
+
+def typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce raw ``stock_prices`` rows to datetime64[ns] / float64, dropping unparseable ones."""
+    out = pd.DataFrame(
+        {
+            "ticker": df["ticker"].astype(str),
+            "date": pd.to_datetime(df["date"], errors="coerce", utc=True, format="ISO8601")
+            .dt.tz_localize(None)
+            .astype("datetime64[ns]"),
+            "closing_price": pd.to_numeric(df["closing_price"], errors="coerce").astype("float64"),
+        }
+    )
+    out = out.dropna(subset=["date", "closing_price"])
+    return out.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+
+def empty_frame(columns: Iterable[str] = COLUMNS) -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype=_DTYPES[c]) for c in columns})
+
+
+def is_built(root: Path) -> bool:
+    return (root / _MANIFEST).exists()
+
+
+def invalidate(root: Path) -> None:
+    """Drop the manifest so the next read rebuilds from SQLite."""
+    try:
+        (root / _MANIFEST).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def write_partitions(root: Path, df: pd.DataFrame, tickers: Iterable[str]) -> None:
+    """
+    Replace the partitions for ``tickers`` with their rows in ``df`` (raw or
+    typed ``stock_prices`` rows). Tickers with no rows lose their partition.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    typed = typed_frame(df) if not df.empty else df
+    keys = typed["ticker"].str.upper() if not typed.empty else pd.Series(dtype=str)
+    groups = {k: g for k, g in typed.groupby(keys, sort=False)} if not typed.empty else {}
+    for ticker in {str(t).upper() for t in tickers}:
+        path = _partition_path(root, ticker)
+        part = groups.get(ticker)
+        if part is None or part.empty:
+            path.unlink(missing_ok=True)
+            continue
+        table = pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False)
+        # A temp name of its own, so concurrent writers of one ticker never share a half-written file.
+        fd, tmp = tempfile.mkstemp(dir=root, prefix=path.name + ".", suffix=".tmp")
+        os.close(fd)
+        try:
+            feather.write_feather(table, tmp, compression="uncompressed")
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+def rebuild(root: Path, df: pd.DataFrame) -> int:
+    """Rewrite the whole store from ``df`` (every ``stock_prices`` row). Returns rows written."""
+    if root.exists():
+        shutil.rmtree(root)
+    tickers = df["ticker"].astype(str).str.upper().unique().tolist() if not df.empty else []
+    write_partitions(root, df, tickers)
+    (root / _MANIFEST).write_text(json.dumps({"rows": int(len(df)), "tickers": len(tickers)}))
+    return int(len(df))
+
+
+def stored_tickers(root: Path) -> list[str]:
+    return sorted(unquote(p.name[: -len(_SUFFIX)]) for p in root.glob("*" + _SUFFIX))
+
+
+def read(
+    root: Path,
+    tickers: Optional[Iterable[str]] = None,
+    columns: Optional[Iterable[str]] = None,
+    start_date=None,
+) -> pd.DataFrame:
+    """
+    Memory-mapped read of the requested partitions.
+
+    ``tickers`` (case-insensitive; all when None) picks partitions, ``columns``
+    a subset of ``COLUMNS`` and ``start_date`` filters ``date >=`` before
+    conversion to pandas.
+    """
+    cols = list(columns) if columns else list(COLUMNS)
+    names = stored_tickers(root) if tickers is None else sorted({str(t).upper() for t in tickers})
+    start = pd.Timestamp(start_date) if start_date is not None else None
+    read_cols = cols if start is None else list(dict.fromkeys(cols + ["date"]))
+    tables = []
+    for ticker in names:
+        path = _partition_path(root, ticker)
+        if not path.exists():
+            continue
+        table = feather.read_table(path, columns=read_cols, memory_map=True)
+        if start is not None:
+            cutoff = pa.scalar(start.as_unit("ns").value, pa.timestamp("ns"))
+            table = table.filter(pc.greater_equal(table["date"], cutoff)).select(cols)
+        tables.append(table)
+    if not tables:
+        return empty_frame(cols)
+    return pa.concat_tables(tables).to_pandas()
+
@@ -1,29 +1,58 @@
-"""Quant backtest job status (Streamlit + Flask), mirroring sec_filing_job."""
+"""
+Quant backtest job queue (Streamlit + Flask).
+
+Jobs are rows in the ``quant_jobs`` SQLite table, so any process can submit
+and poll them by ``job_id``. ``submit_quant_job`` enqueues a job and keeps up
+to ``QUANT_JOB_WORKERS`` worker processes alive; each worker claims the
+highest-priority queued job, runs it and reports progress, which is also
+where it notices a cancellation request. Idle workers exit after
+``QUANT_JOB_WORKER_IDLE_SECONDS``.
+"""
 
 from __future__ import annotations
 
-import json
+import logging
+import multiprocessing
 import os
+import sqlite3
 import threading
+import time
 import uuid
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
 from services import db_manager
 
+logger = logging.getLogger(__name__)
+
 _LOCK = threading.RLock()
+_WORKERS: List[Any] = []
+
+TOAST_MAX_AGE_SECONDS = int(os.getenv("QUANT_TOAST_MAX_AGE_SECONDS") or os.getenv("SEC_FILING_TOAST_MAX_AGE_SECONDS") or "120")
+_FINISHED_STATUSES = ("done", "error", "cancelled")
+# Seconds between progress writes (and cancellation checks) of a running job.
+PROGRESS_INTERVAL_SECONDS = 0.5
 
+# ``progress(fraction, message)``; raises ``JobCancelled`` once cancellation is requested.
+ProgressFn = Callable[[float, Optional[str]], None]
 
-def _default_status_path() -> Path:
-    raw = os.getenv("QUANT_JOB_STATUS_PATH")
-    if raw:
-        return Path(raw).expanduser()
-    return Path.cwd() / "data" / "quant_backtest_job_status.json"
 
+class JobCancelled(Exception):
+    """Raised inside a running job after ``cancel_quant_job`` was called for it."""
 
-STATUS_PATH = _default_status_path()
-TOAST_MAX_AGE_SECONDS = int(os.getenv("QUANT_TOAST_MAX_AGE_SECONDS") or os.getenv("SEC_FILING_TOAST_MAX_AGE_SECONDS") or "120")
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _no_progress(fraction: float, message: Optional[str] = None) -> None:
+    return None
 
 
 def _utc_now_iso() -> str:
@@ -44,7 +73,7 @@ def _parse_finished_at_utc(raw: Any) -> Optional[datetime]:
 
 
 def _finished_age_seconds(data: Dict[str, Any]) -> Optional[float]:
-    if data.get("status") not in ("done", "error"):
+    if data.get("status") not in _FINISHED_STATUSES:
         return None
     dt = _parse_finished_at_utc(data.get("finished_at"))
     if dt is None:
@@ -57,32 +86,13 @@ def _enrich_status(data: Dict[str, Any]) -> Dict[str, Any]:
     age = _finished_age_seconds(out)
     out["finished_age_seconds"] = age
     out["toast_eligible"] = (
-        out.get("status") in ("done", "error")
+        out.get("status") in _FINISHED_STATUSES
         and age is not None
         and age <= TOAST_MAX_AGE_SECONDS
     )
     return out
 
 
-def _atomic_write(path: Path, payload: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    tmp.replace(path)
-
-
-def read_status() -> Dict[str, Any]:
-    with _LOCK:
-        if not STATUS_PATH.exists():
-            return _enrich_status(_idle_payload())
-        try:
-            raw = STATUS_PATH.read_text(encoding="utf-8")
-            data = json.loads(raw)
-            if not isinstance(data, dict):
-                return _enrich_status(_idle_payload())
-            return _enrich_status(data)
-        except (OSError, json.JSONDecodeError):
-            return _enrich_status(_idle_payload())
 
 
 def _idle_payload() -> Dict[str, Any]:
@@ -97,48 +107,77 @@ def _idle_payload() -> Dict[str, Any]:
     }
 
 
-def write_running(job_id: str, tickers: List[str]) -> None:
-    payload = {
-        "job_id": job_id,
-        "status": "running",
-        "message": "Running backtest…",
-        "error": None,
-        "tickers": list(tickers),
-        "updated_at": _utc_now_iso(),
-        "finished_at": None,
+def _status_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "message": job.get("message") or "",
+        "error": job.get("error"),
+        "tickers": list(job.get("tickers") or []),
+        "priority": job["priority"],
+        "progress": float(job.get("progress") or 0.0),
+        "cancel_requested": job["cancel_requested"],
+        "created_at": job["created_at_utc"],
+        "started_at": job.get("started_at_utc"),
+        "updated_at": job.get("updated_at_utc"),
+        "finished_at": job.get("finished_at_utc"),
     }
-    with _LOCK:
-        _atomic_write(STATUS_PATH, payload)
 
 
-def write_done(job_id: str, message: str, tickers: List[str]) -> None:
-    now = _utc_now_iso()
-    payload = {
-        "job_id": job_id,
-        "status": "done",
-        "message": message,
-        "error": None,
-        "tickers": list(tickers),
-        "updated_at": now,
-        "finished_at": now,
-    }
-    with _LOCK:
-        _atomic_write(STATUS_PATH, payload)
-
-
-def write_error(job_id: str, err: str, tickers: List[str]) -> None:
-    now = _utc_now_iso()
-    payload = {
-        "job_id": job_id,
-        "status": "error",
-        "message": "Quant backtest failed.",
-        "error": err,
-        "tickers": list(tickers),
-        "updated_at": now,
-        "finished_at": now,
-    }
+def read_status(job_id: Optional[str] = None) -> Dict[str, Any]:
+    """Status of ``job_id``, or of the most recently submitted job; ``idle`` when there is none."""
+    try:
+        if job_id:
+            job = db_manager.get_quant_job(job_id)
+        else:
+            latest = db_manager.list_quant_jobs(limit=1)
+            job = latest[0] if latest else None
+    except sqlite3.Error as exc:
+        logger.warning("quant job status unavailable: %s", exc)
+        job = None
+    if job is None:
+        return _enrich_status(_idle_payload())
+    return _enrich_status(_status_payload(job))
+
+
+def list_jobs(statuses: Optional[List[str]] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """Status payloads, newest first."""
+    return [_enrich_status(_status_payload(j)) for j in db_manager.list_quant_jobs(statuses, limit)]
+
+
+def list_finished_since(since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Toast-eligible jobs that finished (done, error or cancelled) at or after
+    ``since``, oldest first, so a poller can notify each one even when several
+    finish between two polls. Without ``since`` every toast-eligible job is
+    returned; callers dedupe by ``job_id``.
+    """
+    cutoff = _parse_finished_at_utc(since)
+    try:
+        jobs = list_jobs(list(_FINISHED_STATUSES), limit)
+    except sqlite3.Error as exc:
+        logger.warning("quant job status unavailable: %s", exc)
+        return []
+    out = []
+    for job in jobs:
+        finished = _parse_finished_at_utc(job.get("finished_at"))
+        if job["toast_eligible"] and finished is not None and (cutoff is None or finished >= cutoff):
+            out.append(job)
+    out.sort(key=lambda j: _parse_finished_at_utc(j["finished_at"]))
+    return out
+
+
+def cancel_quant_job(job_id: str) -> Optional[str]:
+    """Cancel a queued job or ask a running one to stop; returns its status afterwards."""
+    return db_manager.request_quant_job_cancel(job_id)
+
+
+def queue_metrics() -> Dict[str, Any]:
+    """Queue depth, per-status counts and timings (``db_manager.get_quant_job_metrics``) plus local workers."""
     with _LOCK:
-        _atomic_write(STATUS_PATH, payload)
+        alive = sum(1 for p in _WORKERS if p.is_alive())
+    return {**db_manager.get_quant_job_metrics(), "workers_alive": alive}
 
 
 def _tickers_from_params(params: Dict[str, Any]) -> List[str]:
@@ -150,35 +189,42 @@ def _tickers_from_params(params: Dict[str, Any]) -> List[str]:
     return []
 
 
-def execute_quant_backtest_job(job_id: str, params: Dict[str, Any]) -> None:
-    """Run backtest, save Plotly JSON figures, persist row, set status done."""
-    from quant.quant_backtest import normalize_portfolio_input, run_backtest
+def execute_quant_backtest_job(job_id: str, params: Dict[str, Any], progress: ProgressFn = _no_progress) -> str:
+    """Run backtest, save chart arrays (``quant.figure_store``), persist row; returns the status message.
+
+    Prices are fetched once; the buy & hold baseline reuses them. The engine
+    comes from ``params["engine"]`` or ``QUANT_BACKTEST_ENGINE`` (default
+    ``vectorized``).
+    """
+    from quant.figure_store import save_backtest_arrays
+    from quant.quant_backtest import (
+        backtest_ohlcv,
+        load_backtest_ohlcv,
+        normalize_portfolio_input,
+    )
 
     port = params.get("portfolio")
     port_map = normalize_portfolio_input(port)  # type: ignore[arg-type]
     tickers = sorted(port_map.keys())
+    engine = str(params.get("engine") or os.getenv("QUANT_BACKTEST_ENGINE") or "vectorized").strip().lower()
 
-    stats, figs = run_backtest(
-        portfolio=port_map,
-        start=params["start"],
-        end=params["end"],
+    progress(0.05, "Loading prices…")
+    ohlcv = load_backtest_ohlcv(
+        port_map,
+        params["start"],
+        params["end"],
+        rebalance_monthly=bool(params.get("rebalance_monthly")),
+    )
+    progress(0.4, "Running backtest…")
+    stats, equity_curve, trades = backtest_ohlcv(
+        ohlcv,
         strategy_name=params["strategy_name"],
         fast_window=int(params.get("fast_window") or 50),
         slow_window=int(params.get("slow_window") or 200),
-        rebalance_monthly=bool(params.get("rebalance_monthly")),
+        engine=engine,
     )
-    buy_stats, _ = run_backtest(
-        portfolio=port_map,
-        start=params["start"],
-        end=params["end"],
-        strategy_name="buy_hold",
-        rebalance_monthly=bool(params.get("rebalance_monthly")),
-    )
-
-    root = Path.cwd() / "data" / "quant_figures" / job_id
-    root.mkdir(parents=True, exist_ok=True)
-    for name, fig in figs.items():
-        (root / f"{name}.json").write_text(fig.to_json(), encoding="utf-8")
+    buy_stats, _, _ = backtest_ohlcv(ohlcv, strategy_name="buy_hold", engine=engine)
+    save_backtest_arrays(job_id, equity_curve, trades)
 
     db_manager.insert_quant_backtest_run(
         job_id,
@@ -186,30 +232,304 @@ def execute_quant_backtest_job(job_id: str, params: Dict[str, Any]) -> None:
         stats,
         buy_stats,
     )
-    msg = f"Backtest complete ({params.get('strategy_name', 'strategy')}) for {', '.join(tickers)}."
-    write_done(job_id, msg, tickers)
+    return f"Backtest complete ({params.get('strategy_name', 'strategy')}) for {', '.join(tickers)}."
+
+
+def execute_quant_sweep_job(job_id: str, params: Dict[str, Any], progress: ProgressFn = _no_progress) -> str:
+    """Parameter sweep: evaluate every strategy / window combination on one price download.
+
+    Stores the results grid in ``quant_sweep_results`` (the heatmap is drawn
+    from it), the best combination's chart arrays via ``quant.figure_store``, and
+    a ``quant_backtest_runs`` row whose stats are the best combination's
+    (``params["best"]`` records which one).
+    """
+    from quant.figure_store import save_backtest_arrays
+    from quant.quant_backtest import (
+        backtest_ohlcv,
+        load_backtest_ohlcv,
+        normalize_portfolio_input,
+    )
+    from quant.quant_sweep import best_result, run_sweep, sweep_combinations
 
+    port_map = normalize_portfolio_input(params.get("portfolio"))  # type: ignore[arg-type]
+    tickers = sorted(port_map.keys())
+    engine = str(params.get("engine") or os.getenv("QUANT_BACKTEST_ENGINE") or "vectorized").strip().lower()
+    combos = sweep_combinations(
+        params.get("strategies") or ["sma"],
+        params.get("fast_windows") or [],
+        params.get("slow_windows") or [],
+    )
 
-def start_quant_job_if_idle(
-    params: Dict[str, Any],
-    runner: Callable[[str, Dict[str, Any]], None],
-) -> bool:
-    with _LOCK:
-        if STATUS_PATH.exists():
-            try:
-                cur = json.loads(STATUS_PATH.read_text(encoding="utf-8"))
-                if isinstance(cur, dict) and cur.get("status") == "running":
-                    return False
-            except (OSError, json.JSONDecodeError):
-                pass
-        job_id = str(uuid.uuid4())
-        write_running(job_id, _tickers_from_params(params))
-
-    def _target() -> None:
-        try:
-            runner(job_id, params)
-        except Exception as exc:
-            write_error(job_id, str(exc), _tickers_from_params(params))
-
-    threading.Thread(target=_target, name="quant_backtest_job", daemon=True).start()
+    ohlcv = load_backtest_ohlcv(
+        port_map,
+        params["start"],
+        params["end"],
+        rebalance_monthly=bool(params.get("rebalance_monthly")),
+    )
+    progress(0.1, f"Evaluating {len(combos)} combinations…")
+    results = run_sweep(
+        ohlcv,
+        combos,
+        engine=engine,
+        on_progress=lambda done, total: progress(0.1 + 0.8 * done / total, f"{done}/{total} combinations"),
+    )
+    db_manager.insert_quant_sweep_results(job_id, results)
+
+    best = best_result(results)
+    if best is None:
+        raise ValueError("No sweep combination produced stats (check windows against the date range).")
+    stats, equity_curve, trades = backtest_ohlcv(
+        ohlcv,
+        strategy_name=best["strategy_name"],
+        fast_window=best["fast_window"] or 50,
+        slow_window=best["slow_window"] or 200,
+        engine=engine,
+    )
+    buy_stats, _, _ = backtest_ohlcv(ohlcv, strategy_name="buy_hold", engine=engine)
+    save_backtest_arrays(job_id, equity_curve, trades)
+
+    saved = {
+        **params,
+        "mode": "sweep",
+        "strategy_name": best["strategy_name"],
+        "fast_window": best["fast_window"],
+        "slow_window": best["slow_window"],
+        "best": {k: best[k] for k in ("strategy_name", "fast_window", "slow_window", "sharpe_ratio")},
+        "combinations": len(combos),
+    }
+    db_manager.insert_quant_backtest_run(job_id, saved, stats, buy_stats)
+    ok = sum(1 for r in results if "error" not in r)
+    label = best["strategy_name"]
+    if label == "sma":
+        label = f"sma {best['fast_window']}/{best['slow_window']}"
+    return (
+        f"Sweep complete: {ok}/{len(combos)} combinations for {', '.join(tickers)}; "
+        f"best {label} (Sharpe {best['sharpe_ratio']})."
+    )
+
+
+def execute_quant_walkforward_job(job_id: str, params: Dict[str, Any], progress: ProgressFn = _no_progress) -> str:
+    """Walk-forward: optimize SMA windows per train slice, trade them on the next test slice.
+
+    The stitched out-of-sample curve and per-fold results go into the
+    ``quant_backtest_runs`` row (``detail``); its stats are the out-of-sample
+    ones and the benchmark is buy & hold over the same out-of-sample span.
+    """
+    from quant.figure_store import save_backtest_arrays
+    from quant.quant_backtest import load_backtest_ohlcv, normalize_portfolio_input
+    from quant.quant_sweep import (
+        run_walk_forward,
+        stitch_walk_forward,
+        sweep_combinations,
+        walk_forward_buy_hold_stats,
+    )
+
+    port_map = normalize_portfolio_input(params.get("portfolio"))  # type: ignore[arg-type]
+    tickers = sorted(port_map.keys())
+    combos = sweep_combinations(
+        params.get("strategies") or ["sma"],
+        params.get("fast_windows") or [],
+        params.get("slow_windows") or [],
+    )
+    train_bars = int(params.get("train_bars") or 504)
+    test_bars = int(params.get("test_bars") or 126)
+
+    ohlcv = load_backtest_ohlcv(
+        port_map,
+        params["start"],
+        params["end"],
+        rebalance_monthly=bool(params.get("rebalance_monthly")),
+    )
+    progress(0.1, "Optimizing folds…")
+    folds = run_walk_forward(
+        ohlcv,
+        combos,
+        train_bars=train_bars,
+        test_bars=test_bars,
+        metric=str(params.get("metric") or "sharpe_ratio"),
+        on_progress=lambda done, total: progress(0.1 + 0.8 * done / total, f"{done}/{total} folds"),
+    )
+    stats, equity_curve, trades = stitch_walk_forward(folds)
+    buy_stats = walk_forward_buy_hold_stats(ohlcv, equity_curve)
+
+    save_backtest_arrays(job_id, equity_curve, trades)
+
+    detail = {
+        "folds": [{k: v for k, v in f.items() if k not in ("dates", "equity", "trades")} for f in folds],
+        "equity_curve": {
+            "dates": [d.date().isoformat() for d in equity_curve.index],
+            "equity": [round(float(v), 2) for v in equity_curve["Equity"]],
+        },
+    }
+    saved = {
+        **params,
+        "mode": "walk_forward",
+        "strategy_name": params.get("strategy_name") or "sma",
+        "train_bars": train_bars,
+        "test_bars": test_bars,
+        "oos_start": detail["equity_curve"]["dates"][0],
+    }
+    db_manager.insert_quant_backtest_run(job_id, saved, stats, buy_stats, detail=detail)
+    ok = sum(1 for f in folds if "error" not in f)
+    return (
+        f"Walk-forward complete: {ok}/{len(folds)} folds for {', '.join(tickers)}; "
+        f"out-of-sample Sharpe {stats.get('sharpe_ratio')}."
+    )
+
+
+JOB_RUNNERS: Dict[str, Callable[..., str]] = {
+    "backtest": execute_quant_backtest_job,
+    "sweep": execute_quant_sweep_job,
+    "walk_forward": execute_quant_walkforward_job,
+}
+
+
+def _progress_reporter(job_id: str) -> ProgressFn:
+    """Throttled ``ProgressFn`` writing to ``quant_jobs``; raises ``JobCancelled`` when asked to stop."""
+    last = [float("-inf")]
+
+    def report(fraction: float, message: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if now - last[0] < PROGRESS_INTERVAL_SECONDS:
+            return
+        last[0] = now
+        if db_manager.update_quant_job_progress(job_id, fraction, message):
+            raise JobCancelled(job_id)
+
+    return report
+
+
+def run_next_job(worker_pid: Optional[int] = None) -> Optional[str]:
+    """Claim and run the next queued job in this process; returns its job_id, or None if the queue is empty."""
+    job = db_manager.claim_next_quant_job(os.getpid() if worker_pid is None else worker_pid)
+    if job is None:
+        return None
+    job_id = job["job_id"]
+    runner = JOB_RUNNERS.get(job["kind"])
+    try:
+        if runner is None:
+            raise ValueError(f"Unknown quant job kind: {job['kind']}")
+        msg = runner(job_id, job["params"], _progress_reporter(job_id))
+    except JobCancelled:
+        db_manager.finish_quant_job(job_id, "cancelled", "Cancelled")
+    except Exception as exc:
+        logger.exception("quant job %s failed", job_id)
+        db_manager.finish_quant_job(job_id, "error", "Quant backtest failed.", str(exc))
+    else:
+        db_manager.finish_quant_job(job_id, "done", msg)
+    return job_id
+
+
+def _worker_main(database: str, idle_exit_seconds: float) -> None:
+    """Worker process loop: run queued jobs until idle for ``idle_exit_seconds``."""
+    db_manager.DATABASE = database
+    idle_since = time.monotonic()
+    while True:
+        if run_next_job() is not None:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= idle_exit_seconds:
+            return
+        else:
+            time.sleep(0.5)
+
+
+# Windows process-query access right, OpenProcess error and GetExitCodeProcess value.
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+
+def _pid_alive_windows(pid: int) -> bool:
+    """Liveness via OpenProcess / GetExitCodeProcess (``os.kill`` would terminate the process)."""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+    try:
+        code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return True  # cannot tell; never fail a job that may still be running
+        return code.value == _STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    if os.name == "nt":
+        return _pid_alive_windows(int(pid))
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
     return True
+
+
+def _fail_orphaned_jobs() -> int:
+    """Mark ``running`` jobs whose worker process is gone as errors; returns how many."""
+    orphaned = [
+        j for j in db_manager.list_quant_jobs(["running"], limit=500) if not _pid_alive(j.get("worker_pid"))
+    ]
+    for job in orphaned:
+        db_manager.finish_quant_job(job["job_id"], "error", "Quant backtest failed.", "Worker process exited.")
+    return len(orphaned)
+
+
+def ensure_workers(n: Optional[int] = None) -> int:
+    """
+    Keep ``n`` (``QUANT_JOB_WORKERS``, default 2) worker processes running; returns how many are alive.
+
+    Workers are spawned (not forked, so no SQLite connections or server
+    threads are inherited) and non-daemonic, because sweeps start their own
+    process pools.
+    """
+    if n is None:
+        n = _env_int("QUANT_JOB_WORKERS", 2)
+    idle = float(_env_int("QUANT_JOB_WORKER_IDLE_SECONDS", 60))
+    with _LOCK:
+        _WORKERS[:] = [p for p in _WORKERS if p.is_alive()]
+        _fail_orphaned_jobs()
+        ctx = multiprocessing.get_context("spawn")
+        while len(_WORKERS) < max(0, n):
+            proc = ctx.Process(
+                target=_worker_main,
+                args=(db_manager.DATABASE, idle),
+                name=f"quant_job_worker_{len(_WORKERS) + 1}",
+                daemon=False,
+            )
+            proc.start()
+            _WORKERS.append(proc)
+        return len(_WORKERS)
+
+
+def submit_quant_job(
+    params: Dict[str, Any],
+    *,
+    kind: Optional[str] = None,
+    priority: int = 0,
+    start_workers: bool = True,
+) -> str:
+    """
+    Queue a job and return its job_id. ``kind`` defaults to ``params["mode"]``
+    (``backtest``, ``sweep`` or ``walk_forward``); higher ``priority`` runs first.
+    """
+    kind = kind or str(params.get("mode") or "backtest")
+    if kind not in JOB_RUNNERS:
+        raise ValueError(f"kind must be one of {tuple(JOB_RUNNERS)}")
+    job_id = str(uuid.uuid4())
+    db_manager.enqueue_quant_job(job_id, kind, params, _tickers_from_params(params), priority)
+    if start_workers:
+        ensure_workers()
+    return job_id
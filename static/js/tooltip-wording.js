@@ -199,4 +199,59 @@ document.addEventListener("DOMContentLoaded", () => {
         }
       });
   }
+
+  const varTiles = [
+    { key: "var_95", el: document.getElementById("quantVar95"), tip: document.getElementById("quantVar95TipBody"), level: "95", field: "var" },
+    { key: "cvar_95", el: document.getElementById("quantCvar95"), tip: document.getElementById("quantCvar95TipBody"), level: "95", field: "cvar" },
+    { key: "var_99", el: document.getElementById("quantVar99"), tip: document.getElementById("quantVar99TipBody"), level: "99", field: "var" },
+  ];
+  if (varTiles.every(t => t.el && t.tip)) {
+    const fmtMoney = value => `$${Math.round(value).toLocaleString()}`;
+    const describe = {
+      var: level => `Value-at-Risk is the one-day loss your current holdings would exceed on only ${100 - Number(level)}% of days, estimated from the last year of daily returns (historical simulation).`,
+      cvar: level => `CVaR (expected shortfall) is the average one-day loss on the worst ${100 - Number(level)}% of days, so it also reflects how bad the tail gets beyond VaR.`,
+    };
+    const clearVarTiles = () => {
+      varTiles.forEach(t => {
+        t.el.innerText = "—";
+        t.tip.innerText = `${describe[t.field](t.level)}\n\nValue: —`;
+      });
+    };
+    fetch("/quant/var")
+      .then(response => response.json())
+      .then(data => {
+        if (data.error) {
+          clearVarTiles();
+          if (typeof reportClientError === "function") {
+            reportClientError("quant_var", data.error);
+          }
+          return;
+        }
+        const mc = (data.monte_carlo && data.monte_carlo.levels) || {};
+        varTiles.forEach(t => {
+          const hist = (data.historical || {})[t.level] || {};
+          const sim = mc[t.level] || {};
+          const pct = hist[`${t.field}_pct`];
+          const dollars = hist[`${t.field}_value`];
+          if (pct === null || pct === undefined) {
+            t.el.innerText = "—";
+            t.tip.innerText = `${describe[t.field](t.level)}\n\nValue: — (not enough price history yet).`;
+            return;
+          }
+          const text = `${pct.toFixed(2)}% (${fmtMoney(dollars)})`;
+          t.el.innerText = text;
+          const simPct = sim[`${t.field}_pct`];
+          const simText = simPct !== null && simPct !== undefined
+            ? ` Monte Carlo (${(data.monte_carlo.scenarios || 0).toLocaleString()} ${data.monte_carlo.method} scenarios): ${simPct.toFixed(2)}%.`
+            : "";
+          t.tip.innerText = `${describe[t.field](t.level)}\n\nValue: ${text}.${simText}`;
+        });
+      })
+      .catch(error => {
+        clearVarTiles();
+        if (typeof reportClientError === "function") {
+          reportClientError("quant_var", "fetch failed", error && error.message);
+        }
+      });
+  }
 });
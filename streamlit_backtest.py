@@ -9,19 +9,19 @@ from __future__ import annotations
 
 import datetime as dt
 import time
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
 import pandas as pd
-import plotly.io as pio
 import streamlit as st
 
+from quant import figure_store
 from quant.quant_backtest import SAMPLE_PORTFOLIO, normalize_portfolio_input
+from quant.quant_sweep import SWEEP_METRICS, sweep_heatmap, window_range
 from services import db_manager, quant_job
 
 
 def _render_quant_run_results(job_id: str, row: dict[str, Any], *, key_suffix: str) -> None:
-    """Stats tables + Plotly charts from DB row and ``data/quant_figures/<job_id>/``."""
+    """Stats tables + Plotly charts from DB row and the job's saved arrays (``quant.figure_store``)."""
     p = row.get("params") or {}
     port = p.get("portfolio") if isinstance(p.get("portfolio"), dict) else {}
     tickers_s = ", ".join(sorted(str(k).upper() for k in port.keys())) if port else "—"
@@ -33,47 +33,66 @@ def _render_quant_run_results(job_id: str, row: dict[str, Any], *, key_suffix: s
     if (p.get("strategy_name") or "") == "sma":
         st.caption(f"SMA: fast={p.get('fast_window')}, slow={p.get('slow_window')}")
     st.caption(f"Monthly rebalance: {p.get('rebalance_monthly', False)}")
+    if p.get("mode") == "sweep":
+        _render_sweep_results(job_id, p, key_suffix=key_suffix)
+    elif p.get("mode") == "walk_forward":
+        _render_walk_forward(job_id, row, p)
 
     st.subheader("Key stats (strategy)")
     st.table(pd.DataFrame([row["stats"]]))
-    fig_root = Path.cwd() / "data" / "quant_figures" / job_id
+    figs = figure_store.load_figures(job_id)
     col1, col2 = st.columns([2, 1])
     with col1:
-        p_eq = fig_root / "equity_curve.json"
-        if p_eq.exists():
-            st.plotly_chart(
-                pio.from_json(p_eq.read_text(encoding="utf-8")),
-                use_container_width=True,
-                key=f"{key_suffix}_eq",
-            )
+        if "equity_curve" in figs:
+            st.plotly_chart(figs["equity_curve"], use_container_width=True, key=f"{key_suffix}_eq")
         else:
-            st.caption("Equity chart file not found (older run or local data cleared).")
+            st.caption("Equity chart data not found (older run, pruned, or local data cleared).")
     with col2:
-        p_dd = fig_root / "drawdown.json"
-        if p_dd.exists():
-            st.plotly_chart(
-                pio.from_json(p_dd.read_text(encoding="utf-8")),
-                use_container_width=True,
-                key=f"{key_suffix}_dd",
-            )
-    p_tr = fig_root / "trades.json"
-    if p_tr.exists():
-        st.plotly_chart(
-            pio.from_json(p_tr.read_text(encoding="utf-8")),
-            use_container_width=True,
-            key=f"{key_suffix}_tr",
-        )
+        if "drawdown" in figs:
+            st.plotly_chart(figs["drawdown"], use_container_width=True, key=f"{key_suffix}_dd")
+    if "trades" in figs:
+        st.plotly_chart(figs["trades"], use_container_width=True, key=f"{key_suffix}_tr")
     st.subheader("Buy & hold comparison")
     st.table(pd.DataFrame([row["benchmark_stats"]]))
 
 
+def _render_sweep_results(job_id: str, p: dict[str, Any], *, key_suffix: str) -> None:
+    """Results grid and heatmap for a parameter sweep; stats below are the best combination's."""
+    grid = db_manager.get_quant_sweep_results(job_id)
+    st.subheader(f"Parameter sweep ({p.get('combinations', len(grid))} combinations)")
+    if not grid:
+        st.caption("Sweep results not found.")
+        return
+    metric = st.selectbox("Heatmap metric", list(SWEEP_METRICS), key=f"{key_suffix}_metric")
+    st.plotly_chart(sweep_heatmap(grid, metric), use_container_width=True, key=f"{key_suffix}_hm")
+    # A plain table: results are also rendered inside history / job expanders, which cannot nest.
+    st.dataframe(pd.DataFrame(grid), use_container_width=True, height=240)
+    st.caption("Key stats and charts below are for the best combination by Sharpe ratio.")
+
+
+def _render_walk_forward(job_id: str, row: dict[str, Any], p: dict[str, Any]) -> None:
+    """Per-fold table; stats and charts below are the stitched out-of-sample run."""
+    detail = row.get("detail")
+    if detail is None:
+        detail = (db_manager.get_quant_backtest_run_by_job_id(job_id) or {}).get("detail") or {}
+    folds = detail.get("folds") or []
+    st.subheader(f"Walk-forward ({len(folds)} folds, train {p.get('train_bars')} / test {p.get('test_bars')} bars)")
+    if folds:
+        table = pd.json_normalize(folds)
+        st.dataframe(table, use_container_width=True)
+    st.caption(
+        f"Key stats and charts below are out-of-sample from {p.get('oos_start', '?')}; "
+        "buy & hold covers the same span."
+    )
+
+
 st.set_page_config(page_title="Quant Backtesting", layout="wide")
 
 st.title("Quant Backtesting")
 st.caption("Educational/simulation use only. Not financial advice.")
 
 db_manager.init_db()
-status = quant_job.read_status()
+job_ids: List[str] = st.session_state.setdefault("quant_job_ids", [])
 
 
 def _parse_portfolio(tickers_str: str, shares_str: str) -> Union[Dict[str, float], List[str]]:
@@ -117,9 +136,24 @@ with st.sidebar:
         "Shares (comma-separated, optional)",
         value=", ".join(str(v) for v in SAMPLE_PORTFOLIO.values()),
     )
-    strategy = st.selectbox("Strategy", ["SMA Crossover", "Buy & Hold"])
-    fast_window = st.number_input("Fast SMA", min_value=5, max_value=200, value=50)
-    slow_window = st.number_input("Slow SMA", min_value=20, max_value=400, value=200)
+    mode = st.radio("Mode", ["Single run", "Parameter sweep", "Walk-forward"], horizontal=True)
+    if mode in ("Parameter sweep", "Walk-forward"):
+        if mode == "Walk-forward":
+            sweep_strategies = ["sma"]
+            train_bars = st.number_input("Train window (bars)", min_value=60, max_value=2520, value=504)
+            test_bars = st.number_input("Test window (bars)", min_value=5, max_value=1260, value=126)
+        else:
+            sweep_strategies = st.multiselect("Strategies", ["sma", "buy_hold"], default=["sma", "buy_hold"])
+        fast_lo, fast_hi = st.slider("Fast SMA range", min_value=5, max_value=200, value=(10, 60))
+        fast_step = st.number_input("Fast SMA step", min_value=1, max_value=50, value=10)
+        slow_lo, slow_hi = st.slider("Slow SMA range", min_value=20, max_value=400, value=(100, 250))
+        slow_step = st.number_input("Slow SMA step", min_value=1, max_value=100, value=25)
+        strategy = "SMA Crossover"
+        fast_window, slow_window = fast_lo, slow_hi
+    else:
+        strategy = st.selectbox("Strategy", ["SMA Crossover", "Buy & Hold"])
+        fast_window = st.number_input("Fast SMA", min_value=5, max_value=200, value=50)
+        slow_window = st.number_input("Slow SMA", min_value=20, max_value=400, value=200)
     rebalance = st.checkbox("Monthly rebalance (portfolio mode)", value=False)
     period = st.selectbox("Period", ["1y", "3y", "5y", "Custom"])
     end_date = dt.date.today()
@@ -130,12 +164,19 @@ with st.sidebar:
         years = {"1y": 1, "3y": 3, "5y": 5}[period]
         start_date = end_date - dt.timedelta(days=365 * years)
 
+    priority = st.number_input("Queue priority (higher runs first)", min_value=-10, max_value=10, value=0, step=1)
     run_button = st.button("Run Backtest")
     st.divider()
     show_history = st.checkbox("Show history", value=False)
     history_ticker = st.text_input("History filter ticker (substring)", value="", placeholder="e.g. AAPL")
     history_strategy = st.selectbox("History filter strategy", ["(any)", "sma", "buy_hold"])
     history_limit = st.number_input("History limit", min_value=1, max_value=200, value=25, step=1)
+    cache_stats = db_manager.get_ohlcv_cache_stats()
+    if cache_stats["lookups"]:
+        st.caption(
+            f"Price cache: {cache_stats['hit_rate']:.0%} full hits over {cache_stats['lookups']} ticker lookups, "
+            f"{cache_stats['cached_bars']:,} bars stored."
+        )
 
 if run_button:
     try:
@@ -152,54 +193,82 @@ if run_button:
             int(slow_window),
             rebalance,
         )
-        started = quant_job.start_quant_job_if_idle(params, quant_job.execute_quant_backtest_job)
-        if not started:
-            st.warning("A backtest is already running.")
-        else:
-            st.rerun()
+        if mode in ("Parameter sweep", "Walk-forward"):
+            if not sweep_strategies:
+                st.warning("Pick at least one strategy to sweep.")
+                st.stop()
+            params.update(
+                {
+                    "mode": "sweep",
+                    "strategies": list(sweep_strategies),
+                    "fast_windows": window_range(fast_lo, fast_hi, int(fast_step)),
+                    "slow_windows": window_range(slow_lo, slow_hi, int(slow_step)),
+                }
+            )
+            if mode == "Walk-forward":
+                params.update({"mode": "walk_forward", "train_bars": int(train_bars), "test_bars": int(test_bars)})
+        job_ids.append(quant_job.submit_quant_job(params, priority=int(priority)))
+        st.rerun()
     except Exception as exc:
         st.error(f"Could not start backtest: {exc}")
 
-if status.get("status") == "running":
-    st.info(
-        "Backtest **running in the background**. You can switch tabs or open the main dashboard; "
-        "results are saved when finished."
-    )
-    with st.spinner("Working…"):
-        time.sleep(2)
-    st.rerun()
-
 done_acked = st.session_state.setdefault("quant_done_acked_jobs", [])
 err_acked = st.session_state.setdefault("quant_err_acked_jobs", [])
+statuses = [quant_job.read_status(jid) for jid in reversed(job_ids)]
+active = [s for s in statuses if s.get("status") in ("queued", "running")]
 
-if status.get("status") == "error":
-    jid = status.get("job_id")
-    if jid and jid not in err_acked:
-        if status.get("toast_eligible"):
-            st.toast("Quant backtest failed.", icon="⚠️")
-        err_acked.append(jid)
-        st.error(status.get("error") or "Unknown error")
-    elif jid:
-        st.caption(f"Last backtest error: {status.get('error')}")
-
-if status.get("status") == "done":
-    jid = status.get("job_id")
-    if jid and jid not in done_acked:
-        if status.get("toast_eligible"):
-            st.toast("Quant backtest completed.", icon="✅")
-        done_acked.append(jid)
-        st.success(status.get("message", "Completed"))
+if statuses:
+    st.subheader("Jobs")
+    for status in statuses:
+        jid = str(status.get("job_id") or "")
+        if not jid:
+            continue
+        ks = jid.replace("-", "")[:16]
+        state = status.get("status")
+        c1, c2, c3 = st.columns([3, 4, 1])
+        c1.markdown(f"**{status.get('kind', 'backtest')}** · {', '.join(status.get('tickers') or []) or '—'}")
+        c1.caption(f"{state} · priority {status.get('priority', 0)} · {jid[:8]}")
+        if state in ("queued", "running"):
+            c2.progress(float(status.get("progress") or 0.0), text=status.get("message") or state)
+            if c3.button("Cancel", key=f"qcancel_{ks}", disabled=bool(status.get("cancel_requested"))):
+                quant_job.cancel_quant_job(jid)
+                st.rerun()
+        elif state == "error":
+            c2.error(status.get("error") or "Unknown error")
+            if jid not in err_acked:
+                if status.get("toast_eligible"):
+                    st.toast("Quant backtest failed.", icon="⚠️")
+                err_acked.append(jid)
+        else:
+            c2.caption(status.get("message") or state)
+
+    done = [s for s in statuses if s.get("status") == "done" and s.get("job_id")]
+    for i, status in enumerate(done):
+        jid = str(status["job_id"])
+        if jid not in done_acked:
+            if status.get("toast_eligible"):
+                st.toast("Quant backtest completed.", icon="✅")
+            done_acked.append(jid)
         row = db_manager.get_quant_backtest_run_by_job_id(jid)
         if row:
             ks = jid.replace("-", "")[:16]
-            _render_quant_run_results(jid, row, key_suffix=f"qcur_{ks}")
-    elif jid:
-        st.caption(f"Last backtest: {status.get('message', 'Done')}")
+            with st.expander(status.get("message") or "Completed", expanded=i == 0):
+                _render_quant_run_results(jid, row, key_suffix=f"qcur_{ks}")
+
+if active:
+    metrics = quant_job.queue_metrics()
+    st.info(
+        f"{len(active)} job(s) **running in the background** · queue depth {metrics['queue_depth']}, "
+        f"{metrics['running']} running, {metrics['workers_alive']} local worker(s). You can switch tabs or "
+        "open the main dashboard; results are saved when finished."
+    )
+    time.sleep(2)
+    st.rerun()
 
-if status.get("status") in (None, "idle") and not run_button:
+if not job_ids and not run_button:
     st.info(
-        "Configure inputs and click **Run Backtest**. The run continues in the background "
-        "so you do not need to keep this tab focused."
+        "Configure inputs and click **Run Backtest**. Jobs are queued and run in background workers, "
+        "so you can submit several and do not need to keep this tab focused."
     )
 
 if show_history:
@@ -233,9 +302,7 @@ if show_history:
 st.markdown(
     """
 ### Extensions
-- Parameter optimization (grid search)
 - More strategies (RSI, MACD)
-- Walk-forward testing
 - Upgrade to vectorbt for faster vectorized portfolio runs
 """
 )
@@ -1,4 +1,5 @@
 import sqlite3
+import threading
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -622,6 +623,101 @@ def test_news_digest_articles_upsert_and_list_filters(tmp_path):
     assert msft_only[0]["tickers"] == ["MSFT"]
 
 
+def _news_search_urls(q, **kwargs):
+    rows, total, _ = db_manager.list_news_digest_articles(q=q, **kwargs)
+    return [r["url"] for r in rows], total
+
+
+def test_news_digest_articles_full_text_search(tmp_path):
+    _init_temp_db(tmp_path)
+    digest = {
+        "generated_at_utc": "2026-04-03T12:00:00+00:00",
+        "items": [
+            {"title": "Chip stocks rally on AI demand", "link": "https://example.com/chips",
+             "summary_text": "Semiconductor stocks climbed.", "tickers": ["NVDA"]},
+            {"title": "Oil slips as supply rises", "link": "https://example.com/oil",
+             "summary_text": "Analysts say chips shortage is easing <b>slowly</b>."},
+            {"title": "Fed holds rates", "link": "https://example.com/fed"},
+        ],
+    }
+    db_manager.upsert_news_digest_articles_from_digest(digest)
+
+    # Title matches outrank summary matches; porter stemming matches "chips" to "chip".
+    assert _news_search_urls("chip") == (["https://example.com/chips", "https://example.com/oil"], 2)
+    assert _news_search_urls("semicond*") == (["https://example.com/chips"], 1)
+    assert _news_search_urls("chip", ticker="NVDA") == (["https://example.com/chips"], 1)
+    # Operators and punctuation are plain words, not FTS syntax errors.
+    assert _news_search_urls('"oil" -supply)(') == (["https://example.com/oil"], 1)
+    assert _news_search_urls("nothing matches") == ([], 0)
+
+    rows, _, _ = db_manager.list_news_digest_articles(q="slowly")
+    assert rows[0]["summary_snippet"] == (
+        "Analysts say chips shortage is easing &lt;b&gt;<mark>slowly</mark>&lt;/b&gt;."
+    )
+    assert rows[0]["title_highlight"] == "Oil slips as supply rises"
+
+    # Summary backfill and upserts reindex; pruned rows leave the index.
+    db_manager.update_news_digest_article_summary("https://example.com/fed", "Powell signals patience.")
+    assert _news_search_urls("powell") == (["https://example.com/fed"], 1)
+    digest["items"] = [{"title": "Fed cuts rates", "link": "https://example.com/fed"}]
+    db_manager.upsert_news_digest_articles_from_digest(digest)
+    assert _news_search_urls("holds") == ([], 0)
+    assert _news_search_urls("cuts powell") == (["https://example.com/fed"], 1)
+    assert db_manager.prune_news_digest_articles(retention_days=1) == 3
+    assert _news_search_urls("chip") == ([], 0)
+
+
+def test_news_digest_search_skips_rows_deleted_between_queries(tmp_path, monkeypatch):
+    _init_temp_db(tmp_path)
+    db_manager.upsert_news_digest_articles_from_digest({
+        "generated_at_utc": "2026-04-03T12:00:00+00:00",
+        "items": [
+            {"title": "Oil slips", "link": "https://example.com/oil"},
+            {"title": "Oil rallies", "link": "https://example.com/oil2"},
+        ],
+    })
+    real_get_connection = db_manager.get_connection
+
+    def racing_connection():
+        conn = real_get_connection()
+
+        def delete_before_highlight(sql):
+            if "highlight(" in sql:
+                other = sqlite3.connect(db_manager.DATABASE)
+                other.execute("DELETE FROM news_digest_articles WHERE url = 'https://example.com/oil'")
+                other.commit()
+                other.close()
+                conn.set_trace_callback(None)
+
+        conn.set_trace_callback(delete_before_highlight)
+        return conn
+
+    monkeypatch.setattr(db_manager, "get_connection", racing_connection)
+    rows, total, _ = db_manager.list_news_digest_articles(q="oil")
+    assert total == 2
+    assert [r["url"] for r in rows] == ["https://example.com/oil2"]
+
+
+def test_news_digest_fts_built_for_existing_rows_and_like_fallback(tmp_path):
+    _init_temp_db(tmp_path)
+    db_manager.upsert_news_digest_articles_from_digest({
+        "generated_at_utc": "2026-04-03T12:00:00+00:00",
+        "items": [{"title": "Oil_slips lower", "link": "https://example.com/oil"}],
+    })
+    conn = sqlite3.connect(db_manager.DATABASE)
+    conn.execute("DROP TABLE news_digest_articles_fts")
+    conn.commit()
+    conn.close()
+
+    assert _news_search_urls("slips") == (["https://example.com/oil"], 1)
+    assert _news_search_urls("oil_slips") == (["https://example.com/oil"], 1)
+
+    db_manager.init_db()
+    assert _news_search_urls("slips") == (["https://example.com/oil"], 1)
+    rows, _, _ = db_manager.list_news_digest_articles(q="slips")
+    assert rows[0]["title_highlight"] == "Oil_<mark>slips</mark> lower"
+
+
 def test_news_digest_urls_with_null_summary(tmp_path):
     _init_temp_db(tmp_path)
     conn = sqlite3.connect(db_manager.DATABASE)
@@ -900,3 +996,427 @@ def test_get_plaid_holdings_tickers_distinct_upper(tmp_path):
     conn.commit()
     conn.close()
     assert db_manager.get_plaid_holdings_tickers() == ["MSFT", "NVDA"]
+
+
+def test_compute_portfolio_value_history_masks_windows_and_as_of_shares():
+    positions = pd.DataFrame(
+        [
+            # Snapshot starts after the first price: earlier days use the first snapshot.
+            {"stock_id": 1, "ticker": "aapl", "current_shares": 9.0,
+             "opened_at_utc": "2026-01-01T00:00:00+00:00", "closed_at_utc": None},
+            # No snapshots: falls back to current shares; closed on Jan 3.
+            {"stock_id": 2, "ticker": "MSFT", "current_shares": 3.0,
+             "opened_at_utc": "2026-01-02T15:30:00+00:00",
+             "closed_at_utc": "2026-01-03T09:00:00+00:00"},
+            # No prices for this ticker at all.
+            {"stock_id": 3, "ticker": "ZZZZ", "current_shares": 1.0,
+             "opened_at_utc": None, "closed_at_utc": None},
+        ]
+    )
+    snapshots = pd.DataFrame(
+        [
+            {"stock_id": 1, "snapshot_date": "2026-01-02", "shares": 2.0},
+            {"stock_id": 1, "snapshot_date": "2026-01-04", "shares": 5.0},
+        ]
+    )
+    prices = pd.DataFrame(
+        [
+            {"ticker": "AAPL", "date": "2026-01-01", "closing_price": 10.0},
+            {"ticker": "AAPL", "date": "2026-01-02", "closing_price": 11.0},
+            {"ticker": "AAPL", "date": "2026-01-03", "closing_price": 12.0},
+            {"ticker": "AAPL", "date": "2026-01-04", "closing_price": 13.0},
+            {"ticker": "MSFT", "date": "2026-01-01", "closing_price": 100.0},
+            {"ticker": "MSFT", "date": "2026-01-02", "closing_price": 100.0},
+            {"ticker": "MSFT", "date": "2026-01-03", "closing_price": 100.0},
+        ]
+    )
+
+    hist = db_manager.compute_portfolio_value_history(positions, snapshots, prices)
+    by_date = {
+        pd.Timestamp(r["date"]).strftime("%Y-%m-%d"): float(r["portfolio_value"])
+        for _, r in hist.iterrows()
+    }
+    assert by_date == {
+        "2026-01-01": 20.0,  # 2 * 10 (before first snapshot)
+        "2026-01-02": 322.0,  # 2 * 11 + 3 * 100
+        "2026-01-03": 24.0,  # MSFT closed that day
+        "2026-01-04": 65.0,  # 5 * 13
+    }
+    assert list(hist["date"]) == sorted(hist["date"])
+
+
+def test_compute_portfolio_value_history_empty_inputs():
+    empty = pd.DataFrame(columns=["ticker", "date", "closing_price"])
+    out = db_manager.compute_portfolio_value_history(pd.DataFrame(), pd.DataFrame(), empty)
+    assert out.empty
+    assert list(out.columns) == ["date", "portfolio_value"]
+
+
+def test_portfolio_value_daily_tracks_price_and_lot_writes(tmp_path):
+    _init_temp_db(tmp_path)
+    row = {"ticker": "NVDA", "shares": 2, "cost_basis": 200, "brokerage": "B", "account": "A"}
+    db_manager.replace_all_stocks([row, {**row, "ticker": "AAPL", "shares": 1}])
+    conn = sqlite3.connect(db_manager.DATABASE)
+    conn.execute("UPDATE Stocks SET opened_at_utc = '2026-01-01T00:00:00+00:00'")
+    conn.execute("UPDATE position_share_snapshots SET snapshot_date = '2026-01-01'")
+    conn.commit()
+    conn.close()
+    for day, price in [("2026-01-01", 100.0), ("2026-01-02", 110.0)]:
+        db_manager.upsert_stock_price("NVDA", day, price)
+        db_manager.upsert_stock_price("AAPL", day, 10.0)
+
+    daily = db_manager.get_portfolio_value_daily()
+    assert daily["portfolio_value"].tolist() == [210.0, 230.0]
+    assert db_manager.check_portfolio_value_daily()["ok"]
+
+    # Price correction only touches that ticker/date.
+    db_manager.upsert_stock_price("NVDA", "2026-01-02", 120.0)
+    assert db_manager.get_portfolio_value_daily("2026-01-02")["portfolio_value"].tolist() == [250.0]
+
+    # Trim NVDA and close AAPL through an upload, then edit shares directly.
+    db_manager.replace_all_stocks([{**row, "shares": 1}])
+    assert db_manager.check_portfolio_value_daily()["ok"]
+    nvda_id = int(db_manager.get_stocks().iloc[0]["id"])
+    db_manager.update_stock(nvda_id, ticker="MSFT")
+    assert db_manager.check_portfolio_value_daily()["ok"]
+    db_manager.delete_stock(nvda_id)
+    assert db_manager.check_portfolio_value_daily()["ok"]
+
+
+def test_portfolio_value_daily_rebuild_repairs_manual_edits(tmp_path):
+    _init_temp_db(tmp_path)
+    db_manager.insert_stock("AAPL", 3, cost_basis=100.0)
+    db_manager.upsert_stock_price("AAPL", "2099-01-02", 10.0)
+    conn = sqlite3.connect(db_manager.DATABASE)
+    conn.execute("UPDATE Stocks SET shares = 4")
+    conn.execute("DELETE FROM position_share_snapshots")
+    conn.commit()
+    conn.close()
+
+    check = db_manager.check_portfolio_value_daily()
+    assert check["ok"] is False
+    assert check["mismatched_dates"] == ["2099-01-02"]
+    assert check["max_abs_diff"] == 10.0
+
+    result = db_manager.rebuild_portfolio_value_daily()
+    assert result == {"ticker_rows": 1, "dates": 1}
+    assert db_manager.check_portfolio_value_daily()["ok"]
+    assert db_manager.get_portfolio_value_daily()["portfolio_value"].tolist() == [40.0]
+
+
+def test_portfolio_value_daily_read_uses_primary_key(tmp_path):
+    _init_temp_db(tmp_path)
+    conn = sqlite3.connect(db_manager.DATABASE)
+    plan = conn.execute(
+        """
+        EXPLAIN QUERY PLAN
+        SELECT date, portfolio_value FROM portfolio_value_daily
+        WHERE date >= ? AND date <= ? ORDER BY date
+        """,
+        ("2026-01-01", "2026-12-31"),
+    ).fetchall()
+    conn.close()
+    detail = " ".join(str(r[-1]) for r in plan)
+    assert "USING INDEX" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+def test_get_connection_pools_per_thread_with_pragmas(tmp_path):
+    _init_temp_db(tmp_path)
+    db_manager.close_pooled_connections()
+    conn = db_manager.get_connection()
+    assert isinstance(conn, sqlite3.Connection)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    nested = db_manager.get_connection()
+    assert nested is not conn
+    nested.close()
+    conn.close()
+    assert db_manager.get_connection() is conn
+
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(db_manager.get_connection()))
+    t.start()
+    t.join()
+    assert seen and seen[0] is not conn
+    conn.close()
+
+
+def test_sqlite_pragma_env_override(tmp_path, monkeypatch):
+    _init_temp_db(tmp_path)
+    db_manager.close_pooled_connections()
+    monkeypatch.setenv("SQLITE_PRAGMA_SYNCHRONOUS", "FULL")
+    monkeypatch.setenv("SQLITE_PRAGMA_CACHE_SIZE", "1; DROP TABLE Stocks")
+    conn = db_manager.get_connection()
+    try:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM Stocks").fetchone()[0] == 0
+    finally:
+        conn.close()
+        db_manager.close_pooled_connections()
+
+
+def test_db_transaction_commits_and_rolls_back(tmp_path):
+    _init_temp_db(tmp_path)
+    with db_manager.db_transaction() as conn:
+        conn.execute("INSERT INTO app_settings (key, value) VALUES ('a', '1')")
+    try:
+        with db_manager.db_transaction() as conn:
+            conn.execute("INSERT INTO app_settings (key, value) VALUES ('b', '2')")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert db_manager.get_app_setting("a") == "1"
+    assert db_manager.get_app_setting("b") is None
+
+    # A connection released mid-transaction must not leak the write.
+    conn = db_manager.get_connection()
+    conn.execute("INSERT INTO app_settings (key, value) VALUES ('c', '3')")
+    conn.close()
+    assert db_manager.get_app_setting("c") is None
+
+
+def test_readers_not_blocked_by_writer_thread(tmp_path):
+    _init_temp_db(tmp_path)
+    started = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        with db_manager.db_transaction() as conn:
+            conn.execute("INSERT INTO app_settings (key, value) VALUES ('w', '1')")
+            started.set()
+            release.wait(5)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    assert started.wait(5)
+    try:
+        # Reader sees the last committed state while the write lock is held.
+        assert db_manager.get_app_setting("w") is None
+        assert db_manager.get_hide_plaid() is True
+    finally:
+        release.set()
+        t.join()
+    assert db_manager.get_app_setting("w") == "1"
+
+
+def test_bulk_upsert_stock_prices_single_transaction_on_conflict(tmp_path):
+    _init_temp_db(tmp_path)
+    db_manager.insert_stock("AAPL", 2, cost_basis=100.0)
+    db_manager.upsert_stock_price("AAPL", "2099-01-01", 1.0)
+    written = db_manager.bulk_upsert_stock_prices(
+        [
+            ("AAPL", "2099-01-01", 10.0),
+            ("AAPL", "2099-01-02", 11.0),
+            ("MSFT", "2099-01-02", 50.0),
+        ]
+    )
+    assert written == 3
+    assert db_manager.bulk_upsert_stock_prices([]) == 0
+    df = db_manager.get_stock_prices_df()
+    assert len(df) == 3
+    assert db_manager.get_latest_stock_prices_map(["AAPL"]) == {"AAPL": 11.0}
+    aapl = db_manager.get_stock_price_series("AAPL")
+    assert aapl["closing_price"].tolist() == [10.0, 11.0]
+    assert db_manager.get_portfolio_value_daily()["portfolio_value"].tolist() == [20.0, 22.0]
+
+
+def test_bulk_upsert_benchmark_prices(tmp_path):
+    _init_temp_db(tmp_path)
+    db_manager.upsert_benchmark_price("SPY", "2026-01-01", 1.0, source="Old")
+    written = db_manager.bulk_upsert_benchmark_prices(
+        [("SPY", "2026-01-01", 100.0), ("SPY", "2026-01-02", 101.0)],
+        source="Yahoo",
+    )
+    assert written == 2
+    conn = sqlite3.connect(db_manager.DATABASE)
+    rows = conn.execute(
+        "SELECT date, closing_price, source FROM benchmark_prices ORDER BY date"
+    ).fetchall()
+    conn.close()
+    assert rows == [("2026-01-01", 100.0, "Yahoo"), ("2026-01-02", 101.0, "Yahoo")]
+
+
+def test_price_coverage_uses_benchmark_calendar(tmp_path):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    db_manager.bulk_upsert_benchmark_prices(
+        [("SPY", d, 1.0) for d in ("2024-07-01", "2024-07-02", "2024-07-03", "2024-07-05")]
+    )
+    calendar = db_manager.get_trading_calendar("2024-07-01", "2024-07-09")
+    # 07-04 is a holiday (no SPY close); days after the last SPY close are weekdays.
+    assert calendar == ["2024-07-01", "2024-07-02", "2024-07-03", "2024-07-05", "2024-07-08", "2024-07-09"]
+
+    db_manager.bulk_upsert_stock_prices(
+        [("aapl", "2024-06-03", 1.0), ("AAPL", "2024-07-02", 1.0), ("AAPL", "2024-07-08", 1.0)]
+    )
+    coverage = db_manager.get_price_coverage(["AAPL", "msft"], calendar)
+    assert coverage["AAPL"]["first_date"] == "2024-06-03"
+    assert coverage["AAPL"]["last_date"] == "2024-07-08"
+    assert coverage["AAPL"]["missing"] == ["2024-07-01", "2024-07-03", "2024-07-05", "2024-07-09"]
+    assert coverage["MSFT"]["first_date"] is None
+    assert coverage["MSFT"]["missing"] == calendar
+    assert db_manager.count_price_dates_since("2024-07-01") == 2
+
+
+def test_price_history_df_columnar_store_matches_sqlite(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    db_manager.replace_all_stocks([{"ticker": "AAPL", "shares": 2, "brokerage": "B", "account": "A"}])
+    db_manager.bulk_upsert_stock_prices(
+        [
+            ("AAPL", "2024-01-02", 10.0),
+            ("AAPL", "2024-01-03", 11.0),
+            ("msft", "2024-01-02", 20.0),
+            ("BRK/B", "2024-01-03T00:00:00+00:00", 30.0),
+        ]
+    )
+    sqlite_df = db_manager.get_price_history_df()
+    sqlite_history = db_manager.get_portfolio_value_history()
+
+    monkeypatch.setenv("PRICE_STORE", "arrow")
+    root = db_manager._price_store_root()
+    assert root == tmp_path / "test_finance_data_prices"
+    store_df = db_manager.get_price_history_df()
+    assert (root / "_manifest.json").exists()
+    pd.testing.assert_frame_equal(store_df, sqlite_df)
+    assert str(store_df["date"].dtype) == "datetime64[ns]"
+    assert store_df["closing_price"].dtype == "float64"
+    pd.testing.assert_frame_equal(db_manager.get_portfolio_value_history(), sqlite_history)
+
+    # Writes after the build are mirrored per ticker.
+    db_manager.bulk_upsert_stock_prices([("AAPL", "2024-01-03", 12.5), ("AAPL", "2024-01-04", 13.0)])
+    db_manager.insert_stock_price("NVDA", "2024-01-04", 40.0)
+    aapl = db_manager.get_price_history_df(["aapl"], start_date="2024-01-03", columns=["date", "closing_price"])
+    assert list(aapl.columns) == ["date", "closing_price"]
+    assert aapl["closing_price"].tolist() == [12.5, 13.0]
+    from_store = db_manager.get_price_history_df(["NVDA", "AAPL"])
+    monkeypatch.delenv("PRICE_STORE")
+    pd.testing.assert_frame_equal(from_store, db_manager.get_price_history_df(["NVDA", "AAPL"]))
+    monkeypatch.setenv("PRICE_STORE", "arrow")
+
+    db_manager.wipe_all_data(force=True)
+    assert not (root / "_manifest.json").exists()
+    assert db_manager.get_price_history_df().empty
+
+
+def test_price_store_concurrent_writers_publish_whole_partitions(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from services import price_store
+
+    frames = [
+        pd.DataFrame({
+            "ticker": "AAPL",
+            "date": pd.date_range("2020-01-01", periods=2000 + 100 * i).strftime("%Y-%m-%d"),
+            "closing_price": float(i),
+        })
+        for i in range(8)
+    ]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda df: price_store.write_partitions(tmp_path, df, ["AAPL"]), frames * 3))
+    got = price_store.read(tmp_path, ["AAPL"])
+    writer = int(got["closing_price"].iloc[0])
+    assert len(got) == len(frames[writer]) and (got["closing_price"] == writer).all()
+    assert price_store.stored_tickers(tmp_path) == ["AAPL"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def _traced_selects(fn):
+    """Run ``fn`` on this thread's pooled connection and return the SELECTs it issued."""
+    conn = db_manager.get_connection()
+    seen = []
+    conn.set_trace_callback(seen.append)
+    conn.close()
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in seen if s.lstrip().upper().startswith("SELECT")]
+
+
+def _plan(sql):
+    with db_manager.db_read() as conn:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()]
+
+
+def test_latest_stock_price_maintained_by_triggers(tmp_path):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    db_manager.bulk_upsert_stock_prices([("AAPL", "2024-01-02", 10.0), ("AAPL", "2024-01-03", 11.0)])
+    db_manager.insert_stock_price("AAPL", "2024-01-01", 9.0)
+    with db_manager.db_transaction() as conn:
+        conn.execute("INSERT INTO stock_prices (ticker, date, closing_price) VALUES ('MSFT', '2024-01-02', 20.0)")
+    assert db_manager.get_latest_stock_prices_map() == {"AAPL": 11.0, "MSFT": 20.0}
+
+    db_manager.bulk_upsert_stock_prices([("AAPL", "2024-01-03", 11.5)])
+    assert db_manager.get_latest_stock_prices_map(["AAPL"]) == {"AAPL": 11.5}
+    with db_manager.db_transaction() as conn:
+        conn.execute("DELETE FROM stock_prices WHERE ticker = 'AAPL' AND date = '2024-01-03'")
+        conn.execute("UPDATE stock_prices SET ticker = 'MSFT2' WHERE ticker = 'MSFT'")
+    assert db_manager.get_latest_stock_prices_map() == {"AAPL": 10.0, "MSFT2": 20.0}
+
+    with db_manager.db_read() as conn:
+        expected = conn.execute(
+            "SELECT ticker, MAX(date), closing_price FROM stock_prices GROUP BY ticker ORDER BY ticker"
+        ).fetchall()
+        actual = conn.execute("SELECT ticker, date, closing_price FROM latest_stock_price ORDER BY ticker").fetchall()
+    assert actual == expected
+
+
+def test_init_db_normalizes_price_dates_and_seeds_latest(tmp_path):
+    db_path = tmp_path / "test_finance_data.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        "CREATE TABLE stock_prices (id INTEGER PRIMARY KEY AUTOINCREMENT, ticker TEXT NOT NULL, "
+        "date TEXT NOT NULL, closing_price REAL NOT NULL)"
+    )
+    legacy.executemany(
+        "INSERT INTO stock_prices (ticker, date, closing_price) VALUES (?, ?, ?)",
+        [
+            ("AAPL", "2024-01-02", 10.0),
+            ("AAPL", "2024-01-03T00:00:00+00:00", 11.0),
+            ("AAPL", "2024-01-03", 12.0),
+            ("MSFT", "2024-01-04 16:00:00", 20.0),
+        ],
+    )
+    legacy.commit()
+    legacy.close()
+
+    db_manager.DATABASE = str(db_path)
+    db_manager.init_db()
+
+    with db_manager.db_read() as conn:
+        rows = conn.execute("SELECT ticker, date, closing_price FROM stock_prices ORDER BY ticker, date").fetchall()
+    assert rows == [("AAPL", "2024-01-02", 10.0), ("AAPL", "2024-01-03", 12.0), ("MSFT", "2024-01-04", 20.0)]
+    assert db_manager.get_latest_stock_prices_map() == {"AAPL": 12.0, "MSFT": 20.0}
+    db_manager.bulk_upsert_stock_prices([("MSFT", "2024-01-05T21:00:00Z", 21.0)])
+    assert db_manager.get_latest_stock_prices_map(["MSFT"]) == {"MSFT": 21.0}
+
+
+def test_price_queries_use_indexes_not_table_scans(tmp_path):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    db_manager.replace_all_stocks([{"ticker": "AAPL", "shares": 2, "brokerage": "B", "account": "A"}])
+    db_manager.bulk_upsert_stock_prices([("AAPL", "2024-01-02", 10.0), ("MSFT", "2024-01-02", 20.0)])
+
+    checks = {
+        "latest_map": lambda: db_manager.get_latest_stock_prices_map(["AAPL", "MSFT"]),
+        "value_stocks": db_manager.get_value_stocks,
+        "stocks": db_manager.get_stocks,
+        "dates_since": lambda: db_manager.count_price_dates_since("2024-01-01"),
+        "coverage": lambda: db_manager.get_price_coverage(["AAPL"], ["2024-01-02", "2024-01-03"]),
+    }
+    for name, fn in checks.items():
+        selects = _traced_selects(fn)
+        assert selects, name
+        for sql in selects:
+            plan = _plan(sql)
+            assert not any(step.startswith("SCAN stock_prices") for step in plan), (name, plan)
+            assert not any("SCAN latest_stock_price" in step or "SCAN sp" == step for step in plan), (name, plan)
+
+    latest_plan = _plan(_traced_selects(lambda: db_manager.get_latest_stock_prices_map(["AAPL"]))[0])
+    assert any("SEARCH latest_stock_price USING INDEX" in step for step in latest_plan), latest_plan
+    dates_plan = _plan(_traced_selects(lambda: db_manager.count_price_dates_since("2024-01-01"))[0])
+    assert any("idx_stock_prices_date" in step for step in dates_plan), dates_plan
@@ -0,0 +1,99 @@
+"""Tests for quant.figure_store and figure downsampling."""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from quant import figure_store, quant_sweep
+from quant.quant_backtest import _downsample, backtest_figures, backtest_ohlcv, build_portfolio_ohlcv
+
+
+def _run(n=1500, seed=2):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2005-01-03", periods=n)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    _, curve, trades = backtest_ohlcv(build_portfolio_ohlcv(pd.Series(closes, index=index)), "sma", 10, 40, engine="vectorized")
+    return curve, trades
+
+
+def test_arrays_round_trip_and_rebuild_same_figures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    curve, trades = _run()
+    assert len(trades) > 0
+    path = figure_store.save_backtest_arrays("job-a", curve, trades)
+    assert path.name == "arrays.npz"
+    got_curve, got_trades = figure_store.load_backtest_arrays("job-a")
+    assert got_curve.index.equals(curve.index)
+    np.testing.assert_array_equal(got_curve["Equity"].to_numpy(), curve["Equity"].to_numpy())
+    np.testing.assert_allclose(got_curve["DrawdownPct"].to_numpy(), curve["DrawdownPct"].to_numpy())
+    cols = ["Size", "EntryPrice", "ExitPrice", "PnL", "EntryTime", "ExitTime"]
+    pd.testing.assert_frame_equal(got_trades[cols], trades[cols].astype(got_trades[cols].dtypes), check_dtype=False)
+
+    full = figure_store.load_figures("job-a", max_points=None)
+    want = backtest_figures(curve, trades)
+    for name in ("equity_curve", "drawdown", "trades"):
+        np.testing.assert_allclose(np.asarray(full[name].data[0].y), np.asarray(want[name].data[0].y))
+    assert figure_store.load_backtest_arrays("missing") is None
+    assert figure_store.load_figures("missing") == {}
+
+
+def test_walk_forward_trades_round_trip(tmp_path, monkeypatch):
+    """Stitched walk-forward trades have no Size / prices; those load back as NaN, not a ragged table."""
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(4)
+    index = pd.bdate_range("2010-01-04", periods=900)
+    ohlcv = build_portfolio_ohlcv(pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, 900))), index=index))
+    combos = quant_sweep.sweep_combinations(["sma"], [5, 10], [20, 40])
+    folds = quant_sweep.run_walk_forward(ohlcv, combos, train_bars=300, test_bars=150, workers=1)
+    _, curve, trades = quant_sweep.stitch_walk_forward(folds)
+    assert len(trades) > 0 and "Size" not in trades
+    figure_store.save_backtest_arrays("job-wf", curve, trades)
+    got_curve, got_trades = figure_store.load_backtest_arrays("job-wf")
+    assert len(got_trades) == len(trades)
+    assert got_trades["Size"].isna().all() and got_trades["ExitPrice"].isna().all()
+    np.testing.assert_array_equal(got_trades["PnL"].to_numpy(), trades["PnL"].to_numpy(dtype=float))
+    assert (got_trades["EntryTime"].to_numpy() == pd.to_datetime(trades["EntryTime"]).to_numpy()).all()
+    figs = figure_store.load_figures("job-wf")
+    assert len(figs["trades"].data[1].x) == len(trades)
+
+
+def test_downsample_keeps_extremes_and_endpoints():
+    curve, trades = _run(n=5000)
+    equity = curve["Equity"]
+    small = _downsample(equity, 500)
+    assert len(small) <= 500
+    assert small.index[0] == equity.index[0] and small.index[-1] == equity.index[-1]
+    assert small.max() == equity.max() and small.min() == equity.min()
+    assert small.index.is_monotonic_increasing
+    assert _downsample(equity.iloc[:100], 500) is not None and len(_downsample(equity.iloc[:100], 500)) == 100
+    figs = backtest_figures(curve, trades, max_points=500)
+    drawdown = equity / equity.cummax() - 1
+    assert min(figs["drawdown"].data[0].y) == drawdown.min()
+    # Trade markers still sit on the full-resolution curve.
+    assert len(figs["trades"].data[1].x) == len(trades)
+
+
+def test_legacy_json_figures_still_load(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "data" / "quant_figures" / "old-job"
+    root.mkdir(parents=True)
+    (root / "equity_curve.json").write_text(go.Figure(go.Scatter(y=[1, 2])).to_json(), encoding="utf-8")
+    figs = figure_store.load_figures("old-job")
+    assert list(figs) == ["equity_curve"] and list(figs["equity_curve"].data[0].y) == [1, 2]
+
+
+def test_prune_by_age_and_count(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / "data" / "quant_figures"
+    now = time.time()
+    for i in range(5):
+        d = root / f"job-{i}"
+        d.mkdir(parents=True)
+        age = i * 86400 - 3600
+        os.utime(d, (now - age, now - age))
+    assert figure_store.prune_figures(retention_days=0, max_runs=0) == 0
+    assert figure_store.prune_figures(retention_days=3, max_runs=0) == 1  # job-4 is four days old
+    assert figure_store.prune_figures(retention_days=0, max_runs=2, keep="job-3") == 2  # keep takes a slot
+    assert sorted(p.name for p in root.iterdir()) == ["job-0", "job-3"]
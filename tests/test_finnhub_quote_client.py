@@ -0,0 +1,172 @@
+"""Tests for the pooled, rate-limited Finnhub quote client (local stub server)."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from api import finnhub_api, rate_limit
+
+
+@pytest.fixture
+def quote_server(monkeypatch):
+    """Stub /quote: AAPL ok, SLOW 429s twice, FAKE returns Finnhub's all-zero quote."""
+    state = {"hits": {}, "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            symbol = parse_qs(urlparse(self.path).query)["symbol"][0]
+            with lock:
+                state["hits"][symbol] = state["hits"].get(symbol, 0) + 1
+                n = state["hits"][symbol]
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                if symbol == "SLOW" and n <= 2:
+                    self._send(429, {"error": "API limit reached"})
+                elif symbol == "FAKE":
+                    self._send(200, {"c": 0, "d": None, "t": 0})
+                else:
+                    self._send(200, {"c": 123.5, "t": 1_700_000_000})
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE_SECONDS", 0.01)
+    state["url"] = f"http://127.0.0.1:{server.server_address[1]}/api/v1/quote"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_quote_client_structured_results_and_429_backoff(quote_server):
+    client = finnhub_api.FinnhubQuoteClient(
+        "test-key", url=quote_server["url"], per_minute=6000, max_concurrency=4
+    )
+
+    results = client.fetch_quotes(["AAPL", "SLOW", "FAKE"])
+
+    assert results["AAPL"]["price"] == pytest.approx(123.5)
+    assert results["AAPL"]["timestamp"] == 1_700_000_000
+    assert results["AAPL"]["error"] is None
+    assert results["AAPL"]["latency_ms"] >= 0
+    assert results["SLOW"]["price"] == pytest.approx(123.5)
+    assert results["SLOW"]["attempts"] == 3
+    assert results["FAKE"]["price"] is None
+    assert "no quote" in results["FAKE"]["error"]
+    assert quote_server["hits"]["FAKE"] == 1
+
+
+def test_quote_client_caps_in_flight_requests(quote_server):
+    client = finnhub_api.FinnhubQuoteClient(
+        "test-key", url=quote_server["url"], per_minute=60000, max_concurrency=3
+    )
+    tickers = [f"T{i}" for i in range(60)]
+
+    results = client.fetch_quotes(tickers)
+
+    assert all(results[t]["price"] == pytest.approx(123.5) for t in tickers)
+    assert quote_server["max_in_flight"] <= 3
+    assert client.concurrency.limit == 3
+
+
+def test_fetch_stock_prices_batch_uses_shared_client(quote_server, monkeypatch):
+    client = finnhub_api.FinnhubQuoteClient("test-key", url=quote_server["url"], per_minute=6000)
+    monkeypatch.setattr(finnhub_api, "_quote_client", client)
+    monkeypatch.setattr(finnhub_api, "_quote_cache", finnhub_api.QuoteCache(0))
+
+    prices = finnhub_api.fetch_stock_prices_batch(["AAPL", "FAKE"])
+
+    assert prices == {"AAPL": pytest.approx(123.5), "FAKE": None}
+    assert finnhub_api.fetch_finnhub_quote("AAPL") == ("AAPL", pytest.approx(123.5))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_quote_cache_serves_hits_until_ttl_expires():
+    clock = FakeClock()
+    cache = finnhub_api.QuoteCache(30, clock=clock)
+    calls = []
+
+    def fetch_many(tickers):
+        calls.append(list(tickers))
+        return {t: {"price": 10.0, "error": None} for t in tickers if t != "BAD"}
+
+    first = cache.get_many(["AAPL", "MSFT", "BAD"], fetch_many)
+    clock.now = 29
+    second = cache.get_many(["AAPL", "MSFT", "BAD"], fetch_many)
+    clock.now = 31
+    cache.get_many(["AAPL"], fetch_many)
+
+    assert calls == [["AAPL", "MSFT", "BAD"], ["BAD"], ["AAPL"]]
+    assert first["BAD"]["price"] is None
+    assert second["AAPL"] == {"price": 10.0, "error": None, "cached": True}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (2, 5, 0)
+    assert stats["hit_rate"] == pytest.approx(2 / 7, abs=1e-4)
+
+
+def test_quote_cache_coalesces_concurrent_fetches():
+    cache = finnhub_api.QuoteCache(60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(tickers):
+        calls.append(list(tickers))
+        started.set()
+        release.wait(5)
+        return {t: {"price": 42.0, "error": None} for t in tickers}
+
+    results = {}
+    first = threading.Thread(target=lambda: results.update(a=cache.get_many(["NVDA"], slow_fetch)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.update(b=cache.get_many(["NVDA"], slow_fetch)))
+    second.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert calls == [["NVDA"]]
+    assert results["a"]["NVDA"]["price"] == results["b"]["NVDA"]["price"] == 42.0
+    assert cache.stats()["coalesced"] == 1
+
+
+def test_fetch_stock_prices_batch_reuses_cached_quotes(quote_server, monkeypatch):
+    client = finnhub_api.FinnhubQuoteClient("test-key", url=quote_server["url"], per_minute=6000)
+    monkeypatch.setattr(finnhub_api, "_quote_client", client)
+    monkeypatch.setattr(finnhub_api, "_quote_cache", finnhub_api.QuoteCache(60))
+
+    finnhub_api.fetch_stock_prices_batch(["AAPL", "MSFT"])
+    prices = finnhub_api.fetch_stock_prices_batch(["AAPL", "MSFT"])
+
+    assert prices == {"AAPL": pytest.approx(123.5), "MSFT": pytest.approx(123.5)}
+    assert quote_server["hits"] == {"AAPL": 1, "MSFT": 1}
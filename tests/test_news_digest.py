@@ -18,7 +18,9 @@ SAMPLE_RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
 """
 
 
-def test_collect_digest_dedupes_by_link(monkeypatch):
+def test_collect_digest_dedupes_by_link(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_manager, "DATABASE", str(tmp_path / "test_finance_data.db"))
+    db_manager.init_db()
     calls = {"n": 0}
 
     def fake_get(url, **kwargs):
@@ -29,12 +31,14 @@ def test_collect_digest_dedupes_by_link(monkeypatch):
         return r
 
     monkeypatch.setattr(nd.requests, "get", fake_get)
+    monkeypatch.setattr(nd.requests.Session, "get", lambda self, url, **kw: fake_get(url, **kw))
 
     digest = nd.collect_digest(
         feeds=[("TestSrc", "http://fake/1"), ("TestSrc2", "http://fake/2")],
         max_items=10,
     )
     assert digest["item_count"] == 2
+    assert [s["source"] for s in digest["feed_stats"]] == ["TestSrc", "TestSrc2"]
     assert len(digest["items"]) == 2
     titles = {x["title"] for x in digest["items"]}
     assert titles == {"Headline A", "Headline B"}
@@ -102,13 +106,40 @@ def test_rss_entry_combined_plain_text_includes_atom_content():
     assert "LMT" in combined and "BA" in combined
 
 
+class _FakeHTMLResponse:
+    """Streaming ``requests`` response stand-in that records how much of the body was read."""
+
+    def __init__(self, body: bytes, chunk_size: int = 16_384, content_type: str = "text/html"):
+        self._body = body
+        self._chunk_size = chunk_size
+        self.headers = {"Content-Type": content_type}
+        self.encoding = "utf-8" if "charset=" in content_type else "ISO-8859-1"
+        self.bytes_read = 0
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._body), self._chunk_size):
+            chunk = self._body[i:i + self._chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
 def test_fill_snippets_prioritizes_priority_urls_before_others(monkeypatch):
     """DB-null-summary URLs are fetched first when passed as priority_urls."""
     from services import db_manager as dm
 
     calls: list[str] = []
 
-    def fake_fetch(url: str) -> str:
+    def fake_fetch(url: str, http=None) -> str:
         calls.append(url)
         return "ok"
 
@@ -117,8 +148,33 @@ def test_fill_snippets_prioritizes_priority_urls_before_others(monkeypatch):
     first = {"title": "a", "link": "https://example.com/first", "summary_text": ""}
     second = {"title": "b", "link": "https://example.com/second", "summary_text": ""}
     pri = {dm.canonical_news_article_url(second)}
-    nd._fill_article_snippets_for_items([first, second], 10, priority_urls=pri)
-    assert calls[0] == second["link"]
+    nd._fill_article_snippets_for_items([first, second], 1, priority_urls=pri)
+    assert calls == [second["link"]]
+    assert second["summary_text"] == "ok" and first["summary_text"] == ""
+
+
+def test_fill_snippets_budget_goes_to_earliest_successes(monkeypatch):
+    """Concurrent fetches fill the same items a serial loop would: first N successes in order."""
+    import random
+    import time
+
+    calls: list[str] = []
+    rng = random.Random(3)
+    delays = {f"https://example.com/{i}": rng.uniform(0, 0.02) for i in range(30)}
+
+    def fake_fetch(url: str, http=None) -> str:
+        calls.append(url)
+        time.sleep(delays[url])
+        return "" if int(url.rsplit("/", 1)[1]) % 3 == 0 else f"snippet {url}"
+
+    monkeypatch.setattr(nd, "_fetch_article_snippet_from_url", fake_fetch)
+    monkeypatch.setenv("NEWS_DIGEST_FETCH_ARTICLE_SNIPPET", "1")
+    monkeypatch.setenv("NEWS_DIGEST_SNIPPET_WORKERS", "4")
+    items = [{"title": str(i), "link": f"https://example.com/{i}", "summary_text": ""} for i in range(30)]
+    nd._fill_article_snippets_for_items(items, 8)
+    filled = [i for i, it in enumerate(items) if it["summary_text"]]
+    assert filled == [1, 2, 4, 5, 7, 8, 10, 11]
+    assert sorted(calls, key=lambda u: int(u.rsplit("/", 1)[1])) == [f"https://example.com/{i}" for i in range(12)]
 
 
 def test_fetch_article_snippet_reads_og_description(monkeypatch):
@@ -127,12 +183,10 @@ def test_fetch_article_snippet_reads_og_description(monkeypatch):
         '<meta property="og:description" content="LMT shares moved on Pentagon news." />'
         "</head><body></body></html>"
     )
-    mock_r = MagicMock()
-    mock_r.raise_for_status = lambda: None
-    mock_r.text = html
 
     def fake_get(url, **kwargs):
-        return mock_r
+        assert kwargs.get("stream") is True
+        return _FakeHTMLResponse(html.encode())
 
     monkeypatch.setattr(nd.requests, "get", fake_get)
     monkeypatch.setenv("NEWS_DIGEST_FETCH_ARTICLE_SNIPPET", "1")
@@ -140,6 +194,32 @@ def test_fetch_article_snippet_reads_og_description(monkeypatch):
     assert "LMT" in out
 
 
+def test_fetch_article_snippet_stops_reading_at_head_end(monkeypatch):
+    head = (
+        '<html><head><meta charset="utf-8"><title>x</title>'
+        '<meta name="description" content="Plain meta description text">'
+        '<meta name="twitter:description" content="Caf\u00e9 &amp; LMT: twitter card text">'
+        "</head>"
+    ).encode("utf-8")
+    body = b"<body>" + b"<p>filler paragraph</p>" * 50_000 + b"</body></html>"
+    resp = _FakeHTMLResponse(head + body, chunk_size=1024, content_type="text/html; charset=utf-8")
+    monkeypatch.setattr(nd.requests, "get", lambda url, **kw: resp)
+    monkeypatch.setenv("NEWS_DIGEST_FETCH_ARTICLE_SNIPPET", "1")
+    out = nd._fetch_article_snippet_from_url("https://example.com/article")
+    assert out == "Caf\u00e9 & LMT: twitter card text"
+    assert resp.bytes_read <= len(head) + 1024
+    assert resp.closed
+
+
+def test_fetch_article_snippet_unknown_charset_falls_back_to_utf8(monkeypatch):
+    html = '<html><head><meta property="og:description" content="Caf\u00e9 shares of LMT rose today."></head>'
+    resp = _FakeHTMLResponse(html.encode("utf-8"), content_type="text/html; charset=x-unknown")
+    resp.encoding = "x-unknown"
+    monkeypatch.setattr(nd.requests, "get", lambda url, **kw: resp)
+    monkeypatch.setenv("NEWS_DIGEST_FETCH_ARTICLE_SNIPPET", "1")
+    assert nd._fetch_article_snippet_from_url("https://example.com/article") == "Caf\u00e9 shares of LMT rose today."
+
+
 def test_yahoo_style_rss_entry_gets_summary_via_fetch(monkeypatch):
     """Yahoo top-news RSS often has no description in XML; digest fills snippet after merge."""
     rss_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
@@ -154,15 +234,15 @@ def test_yahoo_style_rss_entry_gets_summary_via_fetch(monkeypatch):
     )
 
     def fake_get(url, **kwargs):
-        r = MagicMock()
-        r.raise_for_status = lambda: None
         if "fake-feed" in str(url):
+            r = MagicMock()
+            r.raise_for_status = lambda: None
             r.content = rss_xml
-        else:
-            r.text = html
-        return r
+            return r
+        return _FakeHTMLResponse(html.encode())
 
     monkeypatch.setattr(nd.requests, "get", fake_get)
+    monkeypatch.setattr(nd.requests.Session, "get", lambda self, url, **kw: fake_get(url, **kw))
     monkeypatch.setenv("NEWS_DIGEST_FETCH_ARTICLE_SNIPPET", "1")
     items, err = nd._fetch_and_parse_feed("Yahoo", "http://fake-feed/rss")
     assert err is None
@@ -396,7 +476,7 @@ def test_backfill_null_summaries_fetches_for_db_only_rows(tmp_path, monkeypatch)
     conn.close()
 
     fetched_urls = []
-    def fake_fetch(url):
+    def fake_fetch(url, http=None):
         fetched_urls.append(url)
         return f"Snippet for {url}"
 
@@ -410,3 +490,134 @@ def test_backfill_null_summaries_fetches_for_db_only_rows(tmp_path, monkeypatch)
     rows, _, _ = db_manager.list_news_digest_articles(page=1, per_page=10)
     backfill_row = [r for r in rows if r["url"] == "https://example.com/backfill-me"][0]
     assert backfill_row["summary"] == "Snippet for https://example.com/backfill-me"
+
+
+def _reference_match_tickers(text, universe):
+    """The original four-pass matcher ``TickerMatcher`` must reproduce."""
+    import re
+
+    text = re.sub(r"\s+", " ", (text or "").strip())
+    if not text or not universe:
+        return [], {}
+    found = set()
+    for m in re.finditer(r"\$([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text, flags=re.IGNORECASE):
+        if m.group(1).upper() in universe:
+            found.add(m.group(1).upper())
+    for m in re.finditer(
+        r"(?:NYSE|NASDAQ|AMEX|OTC|BATS)\s*:\s*([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text, flags=re.IGNORECASE
+    ):
+        if m.group(1).upper() in universe:
+            found.add(m.group(1).upper())
+    for m in re.finditer(r"\(([A-Z0-9]{1,5}(?:\.[A-Z])?)\)", text):
+        if m.group(1).upper() in universe:
+            found.add(m.group(1).upper())
+    for m in re.finditer(r"\b([A-Z0-9]{1,5}(?:\.[A-Z])?)\b", text.upper()):
+        if m.group(1) in universe and len(m.group(1)) > 1:
+            found.add(m.group(1))
+    ordered = sorted(found)
+    return ordered, {s: universe[s] for s in ordered}
+
+
+def test_ticker_matcher_matches_reference_on_edge_cases_and_random_text():
+    import random
+
+    universe = {s: f"label {s}" for s in ("F", "C", "AAPL", "BRK", "BRK.B", "B.C", "NYSE", "OTC", "SS", "ABSS", "A1", "IT")}
+    edge_cases = [
+        "$NYSE:AAPL and $OTC: F",
+        "NYSE: AMEX: F, nasdaq:brk.b, xNYSE:c, NYSE:NYSE:AAPL, OTC \u00a0:\n F, NASDAQ :: C",
+        "BRK.B BRK.Bx BRK. A.B.C (B.C) (brk) $brk.b",
+        "$ABß $ſs straße (F) (C)x $F $c it IT",
+        "A1 $a1. (A1) F C 123456 AAPLX $AAPLX",
+        "",
+        "   ",
+    ]
+    fragments = list("ABCFSPLKNYOTIX1.$():ſßé -\t") + [
+        "NYSE", "nasdaq", "AMEX", "oTc", "BATS", "  ", "\n", "\u00a0", "\u2003", "AAPL", "brk", "A1", "IT", "SS",
+    ]
+    rng = random.Random(5)
+    random_texts = ["".join(rng.choice(fragments) for _ in range(rng.randint(1, 40))) for _ in range(5000)]
+    matcher = nd.TickerMatcher(universe)
+    for text in edge_cases + random_texts:
+        assert matcher.match(text) == _reference_match_tickers(text, universe), text
+        assert nd.match_tickers_from_universe(text, universe) == _reference_match_tickers(text, universe)
+
+
+def test_ticker_matcher_cache_follows_universe_contents():
+    u = {"IBM": "Manage Stocks"}
+    first = nd.ticker_matcher(u)
+    assert nd.ticker_matcher(dict(u)) is first
+    u["LMT"] = "Plaid-linked"
+    second = nd.ticker_matcher(u)
+    assert second is not first
+    assert nd.match_tickers_from_universe("IBM and LMT", u)[0] == ["IBM", "LMT"]
+    assert nd.match_tickers_from_universe("IBM", {}) == ([], {})
+
+
+def _feed_fixture_server():
+    """Local RSS server: /etag answers If-None-Match, /modified answers If-Modified-Since."""
+    import http.server
+    import threading
+    import time
+
+    hits: list[tuple[str, int]] = []
+    last_modified = "Wed, 01 Jan 2026 06:00:00 GMT"
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(0.3)
+            if self.path == "/etag":
+                fresh = self.headers.get("If-None-Match") == '"v1"'
+                validator = ("ETag", '"v1"')
+            else:
+                fresh = self.headers.get("If-Modified-Since") == last_modified
+                validator = ("Last-Modified", last_modified)
+            hits.append((self.path, 304 if fresh else 200))
+            if fresh:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = SAMPLE_RSS.replace(b"example.com/", f"example.com{self.path}/".encode())
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header(*validator)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+def test_collect_digest_fetches_concurrently_and_uses_conditional_get(monkeypatch, tmp_path):
+    import time
+
+    monkeypatch.setattr(db_manager, "DATABASE", str(tmp_path / "test_finance_data.db"))
+    monkeypatch.setenv("NEWS_DIGEST_FETCH_ARTICLE_SNIPPET", "0")
+    db_manager.init_db()
+    server, hits = _feed_fixture_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    feeds = [("ETagSrc", f"{base}/etag"), ("ModSrc", f"{base}/modified")]
+    try:
+        t0 = time.perf_counter()
+        first = nd.collect_digest(feeds=feeds, max_items=10)
+        elapsed = time.perf_counter() - t0
+        second = nd.collect_digest(feeds=feeds, max_items=10)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert elapsed < 0.55  # two 0.3s responses overlapped
+    assert sorted(hits) == [("/etag", 200), ("/etag", 304), ("/modified", 200), ("/modified", 304)]
+    assert first["errors"] == second["errors"] == []
+    assert [s["status"] for s in first["feed_stats"]] == [200, 200]
+    assert all(s["bytes"] > 0 and not s["not_modified"] for s in first["feed_stats"])
+    assert [s["status"] for s in second["feed_stats"]] == [304, 304]
+    assert all(s["bytes"] == 0 and s["not_modified"] and s["items"] == 2 for s in second["feed_stats"])
+    assert all(s["latency_ms"] >= 300 for s in first["feed_stats"] + second["feed_stats"])
+    links = lambda d: sorted(x["link"] for x in d["items"])
+    assert links(first) == links(second)
+    assert len(links(second)) == 4
@@ -107,6 +107,8 @@ def test_backfill_skips_when_enough_dates(temp_db, monkeypatch):
     monkeypatch.setenv("PRICE_HISTORY_BACKFILL", "1")
     monkeypatch.setenv("PRICE_HISTORY_MIN_DATES", "15")
     monkeypatch.delenv("PRICE_HISTORY_BACKFILL_FORCE", raising=False)
+    # Recent closes were already refreshed today.
+    db_manager.set_app_setting("last_price_history_backfill", today.isoformat())
 
     called = {"n": 0}
 
@@ -119,3 +121,246 @@ def test_backfill_skips_when_enough_dates(temp_db, monkeypatch):
     assert result["upserted"] == 0
     assert result["skipped"] is True
     assert called["n"] == 0
+
+
+@pytest.fixture
+def yahoo_stub(monkeypatch):
+    """Local Yahoo chart stub: MSFT ok, FLAKY 429s once, DOWN always 503."""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from api import quant_risk, rate_limit
+
+    hits = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            symbol = self.path.split("?")[0].rsplit("/", 1)[-1]
+            with lock:
+                hits[symbol] = hits.get(symbol, 0) + 1
+                n = hits[symbol]
+            if symbol == "DOWN" or (symbol == "FLAKY" and n == 1):
+                status = 503 if symbol == "DOWN" else 429
+                self.send_response(status)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            body = json.dumps(
+                {
+                    "chart": {
+                        "result": [
+                            {
+                                "timestamp": [1_700_000_000, 1_700_086_400],
+                                "indicators": {"quote": [{"close": [10.0, 11.0]}]},
+                            }
+                        ]
+                    }
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        quant_risk,
+        "YAHOO_CHART_URL",
+        f"http://127.0.0.1:{server.server_address[1]}/v8/finance/chart/{{symbol}}",
+    )
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(quant_risk, "_yahoo_session", None)
+    yield hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_backfill_concurrent_retries_and_reports_failures(temp_db, monkeypatch, yahoo_stub):
+    db_manager.replace_all_stocks(
+        [
+            {"brokerage": "A", "account": "1", "ticker": t, "shares": 5, "cost_basis": 1}
+            for t in ("MSFT", "FLAKY", "DOWN")
+        ]
+    )
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL_WORKERS", "3")
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL_RETRIES", "2")
+    monkeypatch.setattr(
+        "api.quant_risk.ensure_benchmark_history",
+        lambda symbol, start, end: None,
+    )
+
+    result = finnhub_api.backfill_held_price_history(force=True)
+
+    assert result["upserted"] == 4
+    assert result["workers"] == 3
+    assert set(result["latency_ms"]) == {"MSFT", "FLAKY", "DOWN"}
+    assert result["attempts"] == {"MSFT": 1, "FLAKY": 2, "DOWN": 3}
+    assert list(result["failures"]) == ["DOWN"]
+    assert "503" in result["failures"]["DOWN"]
+    assert yahoo_stub["DOWN"] == 3
+    df = db_manager.get_stock_prices_df()
+    assert sorted(df["ticker"].unique()) == ["FLAKY", "MSFT"]
+
+
+def _utc_ts(day: datetime.date) -> int:
+    return int(
+        datetime.datetime(day.year, day.month, day.day, 14, 30, tzinfo=datetime.timezone.utc).timestamp()
+    )
+
+
+def test_backfill_requests_only_missing_ranges(temp_db, monkeypatch):
+    today = datetime.date.today()
+    calendar = [today - datetime.timedelta(days=i) for i in range(20, 0, -1)]
+    holiday = calendar[5]
+    trading = [d for d in calendar if d != holiday]
+    db_manager.bulk_upsert_benchmark_prices(
+        [("SPY", d.isoformat(), 400.0) for d in trading], source="Yahoo"
+    )
+    db_manager.replace_all_stocks(
+        [{"brokerage": "A", "account": "1", "ticker": "MSFT", "shares": 5, "cost_basis": 1}]
+    )
+    # Stored: everything except a hole in the middle and the last two days.
+    hole = trading[10:12]
+    stored = [d for d in trading[:-2] if d not in hole]
+    db_manager.bulk_upsert_stock_prices([("MSFT", d.isoformat(), 100.0) for d in stored])
+
+    requested = []
+
+    def fake_history(symbol, start, end):
+        requested.append((start.date(), end.date()))
+        days = [d for d in calendar if start.date() <= d < end.date()]
+        return [(_utc_ts(d), 200.0) for d in days], None
+
+    monkeypatch.setattr("api.quant_risk.fetch_yahoo_history", fake_history)
+    monkeypatch.setattr("api.quant_risk.ensure_benchmark_history", lambda symbol, start, end: None)
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL_DAYS", "20")
+    monkeypatch.setattr(finnhub_api, "BACKFILL_RANGE_MERGE_DAYS", 1)
+
+    result = finnhub_api.backfill_held_price_history(force=True)
+
+    assert requested == [
+        (hole[0], hole[-1] + datetime.timedelta(days=1)),
+        (trading[-2], trading[-1] + datetime.timedelta(days=1)),
+    ]
+    assert result["missing_days"] == {"MSFT": 4}
+    assert result["ranges"] == 2
+    assert result["upserted"] == 4
+    coverage = db_manager.get_price_coverage(["msft"], [d.isoformat() for d in trading])
+    assert coverage["MSFT"]["missing"] == []
+
+    # Complete history: only the most recent days are refetched, to replace quotes.
+    requested.clear()
+    again = finnhub_api.backfill_held_price_history(force=True)
+    assert requested == [(trading[-2], trading[-1] + datetime.timedelta(days=1))]
+    assert again["upserted"] == 2
+
+
+def test_auto_backfill_fills_recent_gap_despite_todays_quote(temp_db, monkeypatch):
+    today = datetime.date.today()
+    trading = [today - datetime.timedelta(days=i) for i in range(30, 0, -1)]
+    db_manager.bulk_upsert_benchmark_prices(
+        [("SPY", d.isoformat(), 400.0) for d in trading], source="Yahoo"
+    )
+    db_manager.replace_all_stocks(
+        [{"brokerage": "A", "account": "1", "ticker": "MSFT", "shares": 5, "cost_basis": 1}]
+    )
+    # Three missing trading days before the live quote update_stock_prices writes for today.
+    db_manager.bulk_upsert_stock_prices(
+        [("MSFT", d.isoformat(), 100.0) for d in trading[:-3]] + [("MSFT", today.isoformat(), 101.0)]
+    )
+
+    requested = []
+
+    def fake_history(symbol, start, end):
+        requested.append((start.date(), end.date()))
+        return [(_utc_ts(d), 200.0) for d in trading if start.date() <= d < end.date()], None
+
+    monkeypatch.setattr("api.quant_risk.fetch_yahoo_history", fake_history)
+    monkeypatch.setattr("api.quant_risk.ensure_benchmark_history", lambda symbol, start, end: None)
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL", "1")
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL_DAYS", "30")
+    monkeypatch.setenv("PRICE_HISTORY_MIN_DATES", "15")
+    monkeypatch.delenv("PRICE_HISTORY_BACKFILL_FORCE", raising=False)
+
+    result = finnhub_api.backfill_held_price_history()
+
+    assert result["skipped"] is False
+    assert requested == [(trading[-3], today)]
+    assert result["upserted"] == 3
+    assert result["failures"] == {}
+
+
+def test_auto_backfill_overwrites_recent_quote_with_close(temp_db, monkeypatch):
+    today = datetime.date.today()
+    trading = [today - datetime.timedelta(days=i) for i in range(30, 0, -1)]
+    db_manager.bulk_upsert_benchmark_prices(
+        [("SPY", d.isoformat(), 400.0) for d in trading], source="Yahoo"
+    )
+    db_manager.replace_all_stocks(
+        [{"brokerage": "A", "account": "1", "ticker": "MSFT", "shares": 5, "cost_basis": 1}]
+    )
+    # Complete history, but the last day holds yesterday's intraday quote.
+    db_manager.bulk_upsert_stock_prices(
+        [("MSFT", d.isoformat(), 100.0) for d in trading[:-1]] + [("MSFT", trading[-1].isoformat(), 97.5)]
+    )
+    db_manager.set_app_setting("last_price_history_backfill", trading[-1].isoformat())
+
+    requested = []
+
+    def fake_history(symbol, start, end):
+        requested.append((start.date(), end.date()))
+        return [(_utc_ts(d), 200.0) for d in trading if start.date() <= d < end.date()], None
+
+    monkeypatch.setattr("api.quant_risk.fetch_yahoo_history", fake_history)
+    monkeypatch.setattr("api.quant_risk.ensure_benchmark_history", lambda symbol, start, end: None)
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL_DAYS", "30")
+    monkeypatch.setenv("PRICE_HISTORY_MIN_DATES", "15")
+    monkeypatch.delenv("PRICE_HISTORY_BACKFILL_FORCE", raising=False)
+
+    result = finnhub_api.backfill_held_price_history()
+
+    assert requested == [(trading[-2], today)]
+    assert result["upserted"] == 2
+    df = db_manager.get_stock_prices_df()
+    closes = dict(zip(df["date"].astype(str).str[:10], df["closing_price"]))
+    assert closes[trading[-1].isoformat()] == 200.0 and closes[trading[-3].isoformat()] == 100.0
+    # Later the same day there is nothing left to do.
+    requested.clear()
+    assert finnhub_api.backfill_held_price_history()["skipped"] is True
+    assert requested == []
+
+
+def test_backfill_reports_range_errors_as_failures(temp_db, monkeypatch):
+    db_manager.replace_all_stocks(
+        [{"brokerage": "A", "account": "1", "ticker": "MSFT", "shares": 5, "cost_basis": 1}]
+    )
+    monkeypatch.setattr(
+        "api.quant_risk.fetch_yahoo_history",
+        lambda symbol, start, end: (None, {"chart": {"error": "Not Found"}}),
+    )
+    monkeypatch.setattr("api.quant_risk.ensure_benchmark_history", lambda symbol, start, end: None)
+    monkeypatch.setenv("PRICE_HISTORY_BACKFILL_DAYS", "10")
+
+    result = finnhub_api.backfill_held_price_history(force=True)
+
+    assert result["upserted"] == 0
+    assert "Not Found" in result["failures"]["MSFT"]
+    assert result["reason"] == "1 ticker(s) failed"
+
+
+def test_missing_ranges_merges_nearby_gaps(monkeypatch):
+    monkeypatch.setattr(finnhub_api, "BACKFILL_RANGE_MERGE_DAYS", 3)
+    days = ["2024-01-02", "2024-01-03", "2024-01-05", "2024-01-12", "2024-01-16"]
+    assert finnhub_api._missing_ranges(days) == [
+        ("2024-01-02", "2024-01-05"),
+        ("2024-01-12", "2024-01-12"),
+        ("2024-01-16", "2024-01-16"),
+    ]
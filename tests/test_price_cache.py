@@ -0,0 +1,145 @@
+"""Tests for quant.price_cache: the persistent OHLCV cache behind fetch_price_data."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quant import price_cache
+from quant.quant_backtest import fetch_price_data
+from services import db_manager
+
+
+def _fake_yf(calls):
+    """Stand-in for ``yf.download``: deterministic business-day bars, MultiIndex columns."""
+
+    def download(tickers, start, end):
+        calls.append((tuple(tickers), start, end))
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        frames = {}
+        for i, ticker in enumerate(tickers):
+            close = 100.0 + i + np.arange(len(index)) + index.day / 100
+            frames[ticker] = pd.DataFrame(
+                {
+                    "Adj Close": close * 0.9,
+                    "Close": close,
+                    "High": close + 1,
+                    "Low": close - 1,
+                    "Open": close - 0.5,
+                    "Volume": 1000.0,
+                },
+                index=index,
+            )
+        return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+    return download
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    monkeypatch.delenv("QUANT_PRICE_CACHE_OFFLINE", raising=False)
+    monkeypatch.delenv("QUANT_PRICE_CACHE", raising=False)
+    calls = []
+    monkeypatch.setattr(price_cache, "_download", _fake_yf(calls))
+    return calls
+
+
+def test_missing_spans_subtracts_merged_coverage():
+    covered = [("2024-01-01", "2024-02-01"), ("2024-03-01", "2024-04-01")]
+    assert price_cache.missing_spans(covered, "2024-01-15", "2024-03-15") == [("2024-02-01", "2024-03-01")]
+    assert price_cache.missing_spans(covered, "2023-12-01", "2024-05-01") == [
+        ("2023-12-01", "2024-01-01"),
+        ("2024-02-01", "2024-03-01"),
+        ("2024-04-01", "2024-05-01"),
+    ]
+    assert price_cache.missing_spans(covered, "2024-01-02", "2024-01-20") == []
+    assert price_cache.missing_spans([], "2024-01-01", "2024-01-05") == [("2024-01-01", "2024-01-05")]
+
+
+def test_overlapping_requests_fetch_only_missing_spans(cache_db):
+    first = price_cache.load_ohlcv(["AAA", "BBB"], "2024-01-01", "2024-03-01")
+    assert cache_db == [(("AAA", "BBB"), "2024-01-01", "2024-03-01")]
+    assert list(first.columns.get_level_values(1).unique()) == ["AAA", "BBB"]
+
+    # Extends both ends for AAA; CCC is new and shares no span, so it gets its own download.
+    cache_db.clear()
+    second = price_cache.load_ohlcv(["AAA", "CCC"], "2023-12-01", "2024-04-01")
+    assert sorted(cache_db) == [
+        (("AAA",), "2023-12-01", "2024-01-01"),
+        (("AAA",), "2024-03-01", "2024-04-01"),
+        (("CCC",), "2023-12-01", "2024-04-01"),
+    ]
+    assert db_manager.get_ohlcv_cache_coverage(["AAA"])["AAA"] == [("2023-12-01", "2024-04-01")]
+    pd.testing.assert_frame_equal(
+        second.xs("AAA", axis=1, level=1).loc["2024-01-01":"2024-02-29"],
+        first.xs("AAA", axis=1, level=1),
+    )
+
+    cache_db.clear()
+    single = price_cache.load_ohlcv(["AAA"], "2024-01-10", "2024-02-10")
+    assert cache_db == []
+    assert list(single.columns) == list(price_cache.FIELDS)
+
+    stats = db_manager.get_ohlcv_cache_stats()
+    assert (stats["hits"], stats["partial_hits"], stats["misses"]) == (1, 1, 3)
+    assert stats["hit_rate"] == 0.2
+    assert stats["spans_fetched"] == 4
+    assert stats["cached_bars"] == stats["rows_fetched"] > 0
+
+
+def test_offline_mode_serves_cache_only(cache_db, monkeypatch):
+    price_cache.load_ohlcv(["AAA"], "2024-01-01", "2024-02-01")
+    cache_db.clear()
+    monkeypatch.setenv("QUANT_PRICE_CACHE_OFFLINE", "1")
+    ohlcv, prices = fetch_price_data(["AAA"], "2024-01-01", "2024-03-01")
+    assert cache_db == []
+    assert ohlcv.index.max() < pd.Timestamp("2024-02-01")
+    assert list(prices.columns) == ["AAA"]
+    np.testing.assert_allclose(prices["AAA"], ohlcv["Close"] * 0.9)
+    with pytest.raises(ValueError):
+        fetch_price_data(["ZZZ"], "2024-01-01", "2024-02-01")
+    assert cache_db == []
+
+
+def test_empty_long_span_is_not_marked_covered(cache_db, monkeypatch):
+    monkeypatch.setattr(price_cache, "_download", lambda tickers, start, end: pd.DataFrame())
+    assert price_cache.load_ohlcv(["AAA"], "2024-01-01", "2024-03-01").empty
+    assert db_manager.get_ohlcv_cache_coverage(["AAA"])["AAA"] == []
+    # A holiday weekend legitimately has no bars and is remembered.
+    price_cache.load_ohlcv(["AAA"], "2024-03-29", "2024-04-01")
+    assert db_manager.get_ohlcv_cache_coverage(["AAA"])["AAA"] == [("2024-03-29", "2024-04-01")]
+
+
+def test_split_in_new_span_refetches_stale_history(cache_db, monkeypatch):
+    """Yahoo re-adjusts earlier bars after a split; cached bars from before it must not keep the old scale."""
+    split_day = pd.Timestamp("2024-04-15")
+    state = {"split": False}
+    calls = []
+
+    def download(tickers, start, end):
+        calls.append((tuple(tickers), start, end))
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        close = np.full(len(index), 50.0)  # 100 before the split, 50 after, on today's scale
+        if not state["split"]:
+            close[index < split_day] = 100.0
+        splits = np.where((index == split_day) & state["split"], 2.0, 0.0)
+        frame = pd.DataFrame(
+            {"Adj Close": close, "Close": close, "High": close, "Low": close, "Open": close,
+             "Volume": 1000.0, "Dividends": 0.0, "Stock Splits": splits},
+            index=index,
+        )
+        return pd.concat({tickers[0]: frame}, axis=1).swaplevel(0, 1, axis=1)
+
+    monkeypatch.setattr(price_cache, "_download", download)
+    price_cache.load_ohlcv(["AAA"], "2024-01-01", "2024-03-01")
+    state["split"] = True
+    calls.clear()
+    joined = price_cache.load_ohlcv(["AAA"], "2024-01-01", "2024-05-01")
+    assert calls == [(("AAA",), "2024-03-01", "2024-05-01"), (("AAA",), "2024-01-01", "2024-05-01")]
+    assert (joined["Close"] == 50.0).all()
+    assert db_manager.get_ohlcv_cache_coverage(["AAA"])["AAA"] == [("2024-01-01", "2024-05-01")]
+
+    # Later spans without a corporate action are fetched incrementally again.
+    calls.clear()
+    price_cache.load_ohlcv(["AAA"], "2024-01-01", "2024-06-01")
+    assert calls == [(("AAA",), "2024-05-01", "2024-06-01")]
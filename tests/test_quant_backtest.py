@@ -0,0 +1,148 @@
+"""Tests for quant.quant_backtest."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quant import quant_backtest
+from quant.quant_backtest import backtest_ohlcv, build_portfolio_ohlcv, build_portfolio_series
+
+
+def _reference_portfolio_series(prices, weights=None, rebalance=False):
+    """Per-bar loop the vectorized builder must reproduce."""
+    returns = prices.pct_change().fillna(0)
+    if weights is None:
+        weights = pd.Series(1.0, index=prices.columns)
+    weights = weights / weights.sum()
+    out = []
+    current = weights.copy()
+    value = 1.0
+    for date, row in returns.iterrows():
+        if rebalance and date.day == 1:
+            current = weights.copy()
+        value *= 1 + float((current * row).sum())
+        out.append(value)
+        current = current * (1 + row)
+        if current.sum() != 0:
+            current = current / current.sum()
+    return pd.Series(out, index=returns.index, name="Close")
+
+
+def _prices(n=400, k=6, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2021-01-01", periods=n, freq="D")
+    closes = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, k)), axis=0))
+    return pd.DataFrame(closes, index=index, columns=[f"T{i}" for i in range(k)])
+
+
+@pytest.mark.parametrize("rebalance", [False, True])
+def test_build_portfolio_series_matches_reference(rebalance):
+    prices = _prices()
+    prices.iloc[:3, 2] = np.nan  # late listing: zero return until it trades
+    weights = pd.Series([3.0, 1.0, 2.0, 0.5, 0.0, 4.0], index=prices.columns)
+    got = build_portfolio_series(prices, weights, rebalance=rebalance)
+    want = _reference_portfolio_series(prices, weights, rebalance=rebalance)
+    assert got.name == "Close"
+    assert got.index.equals(want.index)
+    np.testing.assert_allclose(got.to_numpy(), want.to_numpy(), rtol=1e-12)
+
+
+def test_build_portfolio_series_equal_weights_and_unaligned_weights():
+    prices = _prices(n=90, k=3, seed=1)
+    np.testing.assert_allclose(
+        build_portfolio_series(prices, rebalance=True).to_numpy(),
+        _reference_portfolio_series(prices, rebalance=True).to_numpy(),
+        rtol=1e-12,
+    )
+    # Weights for tickers without prices still count in the initial normalization.
+    weights = pd.Series({"T2": 1.0, "T0": 2.0, "ZZZ": 1.0})
+    for rebalance in (False, True):
+        np.testing.assert_allclose(
+            build_portfolio_series(prices, weights, rebalance=rebalance).to_numpy(),
+            _reference_portfolio_series(prices, weights, rebalance=rebalance).to_numpy(),
+            rtol=1e-12,
+        )
+
+
+def test_build_portfolio_series_rebalances_only_on_first_of_month():
+    index = pd.to_datetime(["2024-01-30", "2024-01-31", "2024-02-01", "2024-02-02"])
+    prices = pd.DataFrame({"A": [1.0, 2.0, 2.0, 4.0], "B": [1.0, 1.0, 1.0, 1.0]}, index=index)
+    drift = build_portfolio_series(prices, rebalance=False)
+    monthly = build_portfolio_series(prices, rebalance=True)
+    assert drift.tolist() == pytest.approx([1.0, 1.5, 1.5, 2.5])
+    # Reset to 50/50 on Feb 1, so A doubling adds half of 1.5.
+    assert monthly.tolist() == pytest.approx([1.0, 1.5, 1.5, 2.25])
+    assert build_portfolio_series(prices.iloc[:0]).empty
+
+
+def _ohlcv(n, vol, seed, level=100.0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2015-01-01", periods=n)
+    closes = level * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    return build_portfolio_ohlcv(pd.Series(closes, index=index))
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize(
+    "seed,n,vol",
+    [(0, 600, 0.02), (3, 400, 0.06), (55, 347, 0.06), (59, 520, 0.06), (11, 90, 0.01)],
+)
+@pytest.mark.parametrize(
+    "strategy,fast,slow",
+    [("sma", 5, 20), ("sma", 10, 30), ("sma", 30, 10), ("buy_hold", 50, 200)],
+)
+def test_vectorized_engine_matches_backtesting_py(seed, n, vol, strategy, fast, slow):
+    # Seeds 55 / 59 go short and run out of money, exercising the liquidation path.
+    ohlcv = _ohlcv(n, vol, seed, level=3000.0 if seed > 50 else 100.0)
+    want_stats, want_curve, want_trades = backtest_ohlcv(ohlcv, strategy, fast, slow, engine="backtesting")
+    got_stats, got_curve, got_trades = backtest_ohlcv(ohlcv, strategy, fast, slow, engine="vectorized")
+    np.testing.assert_array_equal(got_curve["Equity"].to_numpy(), want_curve["Equity"].to_numpy())
+    for key, want in want_stats.items():
+        assert got_stats[key] == want or (np.isnan(got_stats[key]) and np.isnan(want)), key
+    cols = ["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "PnL", "EntryTime", "ExitTime"]
+    assert got_trades[cols].to_dict("list") == want_trades[cols].to_dict("list")
+
+
+def test_vectorized_engine_fills_crossover_at_signal_close():
+    # The 2/3-bar SMAs cross up on bar 4; the buy fills 7 units at its close of 13.
+    closes = pd.Series(
+        [12.0, 11.0, 10.0, 10.0, 13.0, 13.0, 13.0, 26.0],
+        index=pd.bdate_range("2024-01-01", periods=8),
+    )
+    stats, curve, trades = backtest_ohlcv(build_portfolio_ohlcv(closes), "sma", 2, 3, initial_cash=100, engine="vectorized")
+    assert trades.empty  # still open at the end
+    assert curve["Equity"].tolist() == [100.0] * 5 + [100.0, 100.0, 100.0 + 7 * 13.0]
+    assert stats["total_return_pct"] == 91.0
+    with pytest.raises(ValueError):
+        backtest_ohlcv(build_portfolio_ohlcv(closes), "sma", 2, 3, engine="numba")
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_quant_job_fetches_prices_once(tmp_path, monkeypatch):
+    from services import db_manager, quant_job
+
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    ohlcv = _ohlcv(300, 0.02, 1)
+
+    def fake_fetch(tickers, start, end):
+        calls.append(tickers)
+        prices = ohlcv[["Close"]].rename(columns={"Close": tickers[0]})
+        return ohlcv.assign(AdjClose=ohlcv["Close"]), prices
+
+    monkeypatch.setattr(quant_backtest, "fetch_price_data", fake_fetch)
+    params = {
+        "portfolio": {"AAA": 1.0},
+        "start": "2015-01-01",
+        "end": "2016-03-01",
+        "strategy_name": "sma",
+        "fast_window": 10,
+        "slow_window": 30,
+    }
+    quant_job.execute_quant_backtest_job("job-1", params)
+    assert calls == [["AAA"]]
+    row = db_manager.get_quant_backtest_run_by_job_id("job-1")
+    want, _, _ = backtest_ohlcv(ohlcv, "buy_hold", engine="backtesting")
+    assert row["benchmark_stats"]["total_return_pct"] == want["total_return_pct"]
+    assert (tmp_path / "data" / "quant_figures" / "job-1" / "arrays.npz").exists()
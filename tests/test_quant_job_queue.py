@@ -0,0 +1,137 @@
+"""Tests for the SQLite-backed quant job queue (services.quant_job)."""
+import time
+
+import pytest
+
+from services import db_manager, quant_job
+
+
+@pytest.fixture
+def queue_db(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    monkeypatch.chdir(tmp_path)
+    ran = []
+
+    def fake_runner(job_id, params, progress):
+        ran.append(params["name"])
+        progress(0.5, "halfway")
+        if params.get("fail"):
+            raise RuntimeError("boom")
+        return f"ran {params['name']}"
+
+    monkeypatch.setitem(quant_job.JOB_RUNNERS, "backtest", fake_runner)
+    return ran
+
+
+def _submit(name, priority=0, **extra):
+    params = {"portfolio": {"aaa": 1.0}, "name": name, **extra}
+    return quant_job.submit_quant_job(params, priority=priority, start_workers=False)
+
+
+def test_jobs_run_by_priority_then_fifo(queue_db):
+    _submit("low-1")
+    _submit("high", priority=5)
+    _submit("low-2")
+    assert quant_job.read_status()["status"] == "queued"
+    while quant_job.run_next_job() is not None:
+        pass
+    assert queue_db == ["high", "low-1", "low-2"]
+    statuses = quant_job.list_jobs()
+    assert [s["status"] for s in statuses] == ["done"] * 3
+    assert statuses[0]["message"] == "ran low-2" and statuses[0]["tickers"] == ["AAA"]
+    assert statuses[0]["progress"] == 1.0 and statuses[0]["toast_eligible"]
+
+
+def test_cancel_queued_and_running_jobs(queue_db, monkeypatch):
+    queued = _submit("never")
+    assert quant_job.cancel_quant_job(queued) == "cancelled"
+
+    def cancels_itself(job_id, params, progress):
+        progress(0.1, "starting")
+        assert quant_job.cancel_quant_job(job_id) == "running"
+        progress(0.2, "still going")  # the next report notices the request
+        raise AssertionError("not reached")
+
+    monkeypatch.setitem(quant_job.JOB_RUNNERS, "sweep", cancels_itself)
+    monkeypatch.setattr(quant_job, "PROGRESS_INTERVAL_SECONDS", 0)
+    running = quant_job.submit_quant_job({"mode": "sweep"}, start_workers=False)
+    assert quant_job.run_next_job() == running
+    assert quant_job.run_next_job() is None
+    assert queue_db == []
+    assert quant_job.read_status(queued)["status"] == "cancelled"
+    status = quant_job.read_status(running)
+    assert status["status"] == "cancelled" and status["cancel_requested"]
+    assert status["progress"] == pytest.approx(0.2)
+
+
+def test_finished_since_returns_every_job_finished_between_polls(queue_db):
+    first = _submit("first")
+    assert quant_job.run_next_job() == first
+    cursor = quant_job.read_status(first)["finished_at"]
+    failing = _submit("bad", fail=True)
+    done = _submit("ok")
+    cancelled = _submit("dropped")
+    assert quant_job.cancel_quant_job(cancelled) == "cancelled"
+    while quant_job.run_next_job() is not None:
+        pass
+    finished = quant_job.list_finished_since(cursor)
+    assert [j["job_id"] for j in finished] == [first, cancelled, failing, done]  # by finish time
+    assert [j["status"] for j in finished] == ["done", "cancelled", "error", "done"]
+    assert all(j["toast_eligible"] for j in finished)
+    assert len(quant_job.list_finished_since()) == 4
+
+
+def test_errors_and_metrics(queue_db):
+    failing = _submit("bad", fail=True)
+    _submit("waiting")
+    assert quant_job.run_next_job() == failing
+    status = quant_job.read_status(failing)
+    assert status["status"] == "error" and status["error"] == "boom"
+    metrics = quant_job.queue_metrics()
+    assert metrics["queue_depth"] == 1 and metrics["counts"]["error"] == 1
+    assert metrics["oldest_queued_age_seconds"] >= 0 and metrics["avg_run_seconds"] >= 0
+    assert metrics["workers_alive"] == 0
+    assert quant_job.read_status("missing")["status"] == "idle"
+    with pytest.raises(ValueError):
+        quant_job.submit_quant_job({"mode": "optimize"}, start_workers=False)
+
+
+def test_orphaned_running_job_is_failed(queue_db):
+    job_id = _submit("orphan")
+    db_manager.claim_next_quant_job(worker_pid=999_999_999)
+    assert quant_job.ensure_workers(0) == 0
+    status = quant_job.read_status(job_id)
+    assert status["status"] == "error" and "exited" in status["error"]
+
+
+def test_pid_alive_never_signals_on_windows(monkeypatch):
+    """On Windows ``os.kill(pid, 0)`` terminates the process, so liveness goes through OpenProcess."""
+    checked = []
+
+    def no_kill(*args):
+        raise AssertionError("os.kill must not be used on Windows")
+
+    monkeypatch.setattr(quant_job, "_pid_alive_windows", lambda pid: checked.append(pid) or True)
+    monkeypatch.setattr(quant_job.os, "kill", no_kill)
+    monkeypatch.setattr(quant_job.os, "name", "nt")
+    alive = quant_job._pid_alive(1234)
+    monkeypatch.undo()
+    assert alive and checked == [1234]
+
+
+def test_worker_process_runs_queued_job(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("QUANT_JOB_WORKER_IDLE_SECONDS", "1")
+    job_id = quant_job.submit_quant_job({"portfolio": {"AAA": 1.0}}, start_workers=False)  # no dates: fails fast
+    assert quant_job.ensure_workers(1) == 1
+    deadline = time.monotonic() + 60
+    while quant_job.read_status(job_id)["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.2)
+    status = quant_job.read_status(job_id)
+    assert status["status"] == "error" and "start" in status["error"]
+    for proc in list(quant_job._WORKERS):
+        proc.join(30)
+    assert quant_job.queue_metrics()["workers_alive"] == 0
@@ -212,3 +212,50 @@ def test_quant_risk_summary_fresh_flags(monkeypatch, client):
     data = resp.get_json()
     assert data["last_updated"] == "2026-01-02"
     assert data["fresh"] is True
+
+
+def test_quant_risk_series_rolling_metrics_and_cache(client):
+    db_manager.insert_stock("AAPL", 1, cost_basis=100.0)
+    _backdate_open_lots()
+    days = pd.bdate_range("2026-01-01", periods=30).strftime("%Y-%m-%d").tolist()
+    aapl = [100.0 + (i % 7) * 1.5 - i * 0.2 for i in range(30)]
+    spy = [400.0 + (i % 5) * 2.0 + i * 0.5 for i in range(30)]
+    db_manager.bulk_upsert_stock_prices([("AAPL", d, p) for d, p in zip(days, aapl)])
+    db_manager.bulk_upsert_benchmark_prices([("SPY", d, p) for d, p in zip(days, spy)], source="Test")
+
+    resp = client.get("/quant/risk_series?windows=5,10")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["cached"] is False
+    assert data["dates"] == days
+
+    values = pd.Series(aapl)
+    returns = values.pct_change()
+    spy_returns = pd.Series(spy).pct_change()
+    vol = returns.rolling(5).std() * math.sqrt(252) * 100
+    beta = returns.rolling(5, min_periods=3).cov(spy_returns) / spy_returns.rolling(5, min_periods=3).var()
+    drawdown = (values / values.rolling(5, min_periods=1).max() - 1) * 100
+    sharpe = returns.rolling(5).mean() / returns.rolling(5).std() * math.sqrt(252)
+    five = data["windows"]["5"]
+    assert five["volatility_pct"][:5] == [None] * 5
+    for i in range(5, 30):
+        assert five["volatility_pct"][i] == pytest.approx(vol[i], abs=1e-4)
+        assert five["beta"][i] == pytest.approx(beta[i], abs=1e-4)
+        assert five["sharpe"][i] == pytest.approx(sharpe[i], abs=1e-4)
+    assert five["drawdown_pct"] == pytest.approx(drawdown.round(4).tolist(), abs=1e-4)
+    assert data["windows"]["10"]["volatility_pct"][9] is None
+    assert data["windows"]["10"]["volatility_pct"][10] is not None
+
+    assert client.get("/quant/risk_series?windows=10,5").get_json()["cached"] is True
+    db_manager.bulk_upsert_stock_prices([("AAPL", "2026-02-13", 120.0)])
+    refreshed = client.get("/quant/risk_series?windows=5,10").get_json()
+    assert refreshed["cached"] is False
+    assert refreshed["dates"][-1] == "2026-02-13"
+
+
+def test_quant_risk_series_rejects_bad_windows(client):
+    assert client.get("/quant/risk_series?windows=abc").status_code == 400
+    assert client.get("/quant/risk_series?windows=1").status_code == 400
+    empty = client.get("/quant/risk_series").get_json()
+    assert empty["dates"] == []
+    assert set(empty["windows"]) == {"21", "63", "252"}
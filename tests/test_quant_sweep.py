@@ -0,0 +1,185 @@
+"""Tests for quant.quant_sweep and the sweep job."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from quant import quant_backtest, quant_sweep
+from quant.quant_backtest import backtest_ohlcv, build_portfolio_ohlcv
+from services import db_manager, quant_job
+
+
+def _ohlcv(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2018-01-01", periods=n)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    return build_portfolio_ohlcv(pd.Series(closes, index=index))
+
+
+def test_sweep_combinations_skip_inverted_pairs_and_dedupe_buy_hold():
+    combos = quant_sweep.sweep_combinations(["SMA", "buy_hold", "sma"], [10, 20, 30], [20, 30])
+    assert combos == [("sma", 10, 20), ("sma", 10, 30), ("sma", 20, 30), ("buy_hold", 0, 0)]
+    assert quant_sweep.window_range(50, 10, 20) == [10, 30, 50]
+    with pytest.raises(ValueError):
+        quant_sweep.sweep_combinations(["sma"], [30], [20])
+    with pytest.raises(ValueError):
+        quant_sweep.sweep_combinations(["rsi"], [10], [20])
+
+
+def test_run_sweep_matches_single_runs_and_pool_matches_serial():
+    ohlcv = _ohlcv()
+    combos = quant_sweep.sweep_combinations(["sma", "buy_hold"], [5, 10], [20, 40, 500])
+    serial = quant_sweep.run_sweep(ohlcv, combos, workers=1)
+    pooled = quant_sweep.run_sweep(ohlcv, combos, workers=2, pool_min_combos=0)
+    pd.testing.assert_frame_equal(pd.DataFrame(pooled), pd.DataFrame(serial))
+    by_combo = {(r["strategy_name"], r["fast_window"], r["slow_window"]): r for r in serial}
+    want, _, _ = backtest_ohlcv(ohlcv, "sma", 10, 40, engine="vectorized")
+    assert pd.Series({k: by_combo[("sma", 10, 40)][k] for k in want}).equals(pd.Series(want))
+    assert "Not enough data" in by_combo[("sma", 5, 500)]["error"]
+    assert quant_sweep.best_result(serial)["sharpe_ratio"] == max(
+        r["sharpe_ratio"] for r in serial if "error" not in r
+    )
+    fig = quant_sweep.sweep_heatmap(serial)
+    assert np.asarray(fig.data[0].z).shape == (2, 3)
+
+
+def test_sweep_progress_callback_can_stop_the_pool():
+    ohlcv = _ohlcv()
+    combos = quant_sweep.sweep_combinations(["sma"], [5, 10, 15, 20], [30, 40, 50, 60])
+    seen = []
+    quant_sweep.run_sweep(ohlcv, combos, workers=1, on_progress=lambda d, t: seen.append((d, t)))
+    assert seen == [(i, 16) for i in range(1, 17)]
+
+    def stop(done, total):
+        raise quant_job.JobCancelled("stop")
+
+    with pytest.raises(quant_job.JobCancelled):
+        quant_sweep.run_sweep(ohlcv, combos, workers=2, pool_min_combos=0, on_progress=stop)
+
+
+def test_sweep_job_downloads_once_and_stores_grid(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    monkeypatch.chdir(tmp_path)
+    ohlcv = _ohlcv(seed=3)
+    calls = []
+
+    def fake_fetch(tickers, start, end):
+        calls.append(tickers)
+        return ohlcv.assign(AdjClose=ohlcv["Close"]), ohlcv[["Close"]].rename(columns={"Close": tickers[0]})
+
+    monkeypatch.setattr(quant_backtest, "fetch_price_data", fake_fetch)
+    params = {
+        "portfolio": {"AAA": 1.0},
+        "start": "2018-01-01",
+        "end": "2019-08-01",
+        "mode": "sweep",
+        "strategies": ["sma", "buy_hold"],
+        "fast_windows": [5, 10, 20],
+        "slow_windows": [30, 60],
+    }
+    job_id = quant_job.submit_quant_job(params, start_workers=False)
+    assert quant_job.run_next_job() == job_id
+    assert calls == [["AAA"]]
+    grid = db_manager.get_quant_sweep_results(job_id)
+    assert len(grid) == 7
+    assert {r["strategy_name"] for r in grid} == {"sma", "buy_hold"}
+    run = db_manager.get_quant_backtest_run_by_job_id(job_id)
+    best = run["params"]["best"]
+    assert run["params"]["mode"] == "sweep"
+    assert best["sharpe_ratio"] == max(r["sharpe_ratio"] for r in grid)
+    assert run["stats"]["sharpe_ratio"] == best["sharpe_ratio"]
+    assert (tmp_path / "data" / "quant_figures" / job_id / "arrays.npz").exists()
+    status = quant_job.read_status(job_id)
+    assert status["status"] == "done" and status["progress"] == 1.0
+    assert status["message"].startswith("Sweep complete: 7/7")
+
+
+def test_walk_forward_folds_tile_test_windows():
+    assert quant_sweep.walk_forward_folds(20, 8, 5) == [(0, 8, 13), (5, 13, 18), (10, 18, 20)]
+    # A one-bar tail cannot be traded and is dropped.
+    assert quant_sweep.walk_forward_folds(19, 8, 5) == [(0, 8, 13), (5, 13, 18)]
+    with pytest.raises(ValueError):
+        quant_sweep.walk_forward_folds(9, 8, 5)
+
+
+def test_trade_from_warms_indicators_without_trading():
+    ohlcv = _ohlcv(300, seed=5)
+    stats, curve, trades = backtest_ohlcv(ohlcv, "sma", 5, 20, engine="vectorized", trade_from=200)
+    assert curve.index[0] == ohlcv.index[200]
+    assert curve["Equity"].iloc[0] == 10000
+    assert (trades["EntryBar"] >= 200).all()
+    with pytest.raises(ValueError):
+        backtest_ohlcv(ohlcv, "sma", 5, 20, engine="backtesting", trade_from=200)
+
+
+def test_walk_forward_pool_matches_serial_and_stitches_folds():
+    ohlcv = _ohlcv(700, seed=6)
+    combos = quant_sweep.sweep_combinations(["sma"], [5, 10, 20], [40, 80])
+    serial = quant_sweep.run_walk_forward(ohlcv, combos, train_bars=300, test_bars=120, workers=1)
+    pooled = quant_sweep.run_walk_forward(
+        ohlcv, combos, train_bars=300, test_bars=120, workers=2, pool_min_combos=0
+    )
+    assert [f["fold"] for f in serial] == [1, 2, 3, 4]
+    assert pd.DataFrame(pooled).drop(columns=["test_stats"]).equals(pd.DataFrame(serial).drop(columns=["test_stats"]))
+    first = serial[0]
+    train_best = quant_sweep.best_result(quant_sweep.run_sweep(ohlcv.iloc[:300], combos, workers=1))
+    assert (first["fast_window"], first["slow_window"]) == (train_best["fast_window"], train_best["slow_window"])
+    assert first["test_start"] == ohlcv.index[300].date().isoformat()
+
+    stats, curve, trades = quant_sweep.stitch_walk_forward(serial)
+    assert len(curve) == 400 and curve.index[0] == ohlcv.index[300]
+    growth = np.prod([f["equity"][-1] / f["equity"][0] for f in serial])
+    assert curve["Equity"].iloc[-1] == pytest.approx(10000 * growth)
+    assert stats["trades"] == sum(len(f["trades"]) for f in serial) == len(trades)
+
+
+def test_walk_forward_benchmark_starts_at_first_successful_fold():
+    ohlcv = _ohlcv(700, seed=6)
+    combos = quant_sweep.sweep_combinations(["sma"], [5, 10], [40])
+    folds = quant_sweep.run_walk_forward(ohlcv, combos, train_bars=300, test_bars=120, workers=1)
+    folds[0] = {k: folds[0][k] for k in ("fold", "train_start", "train_end", "test_start", "test_end")}
+    folds[0]["error"] = "No combination produced stats on the train slice."
+    folds[-1]["error"] = "failed"
+
+    _, curve, _ = quant_sweep.stitch_walk_forward(folds)
+    assert curve.index[0] == ohlcv.index[420] and curve.index[-1] == ohlcv.index[659]
+    bench = quant_sweep.walk_forward_buy_hold_stats(ohlcv, curve)
+    want, want_curve, _ = backtest_ohlcv(ohlcv.iloc[:660], "buy_hold", engine="vectorized", trade_from=420)
+    assert want_curve.index[0] == curve.index[0] and want_curve.index[-1] == curve.index[-1]
+    assert pd.Series(bench).equals(pd.Series(want))
+
+
+def test_walk_forward_job_stores_folds_and_oos_curve(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    monkeypatch.chdir(tmp_path)
+    ohlcv = _ohlcv(600, seed=8)
+    monkeypatch.setattr(
+        quant_backtest,
+        "fetch_price_data",
+        lambda tickers, start, end: (
+            ohlcv.assign(AdjClose=ohlcv["Close"]),
+            ohlcv[["Close"]].rename(columns={"Close": tickers[0]}),
+        ),
+    )
+    params = {
+        "portfolio": {"AAA": 1.0},
+        "start": "2018-01-01",
+        "end": "2020-05-01",
+        "fast_windows": [5, 10],
+        "slow_windows": [30, 60],
+        "train_bars": 250,
+        "test_bars": 100,
+    }
+    reports = []
+    msg = quant_job.execute_quant_walkforward_job("wf-1", params, lambda f, m=None: reports.append((f, m)))
+    assert msg.startswith("Walk-forward complete: 4/4 folds")
+    assert reports[-1] == (pytest.approx(0.9), "4/4 folds")
+    run = db_manager.get_quant_backtest_run_by_job_id("wf-1")
+    assert run["params"]["mode"] == "walk_forward"
+    folds = run["detail"]["folds"]
+    assert len(folds) == 4 and all("test_stats" in f for f in folds)
+    oos = run["detail"]["equity_curve"]
+    assert oos["dates"][0] == ohlcv.index[250].date().isoformat() and len(oos["equity"]) == 350
+    assert run["stats"]["total_return_pct"] == pytest.approx((oos["equity"][-1] / 10000 - 1) * 100, abs=0.01)
+    assert "detail" not in db_manager.get_quant_backtest_runs(limit=1)[0]
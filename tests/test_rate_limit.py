@@ -0,0 +1,114 @@
+"""Tests for the token bucket and concurrent retrying fetch helper."""
+import threading
+
+import pytest
+
+from api import rate_limit
+from api.rate_limit import RetryableHTTPError, TokenBucket, fetch_concurrently
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(2.0, capacity=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.5)
+    assert waits[4] == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    bucket = TokenBucket(0)
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
+
+
+def test_backoff_delay_is_jittered_and_capped(monkeypatch):
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: b)
+    assert rate_limit.backoff_delay(0, base=1.0, cap=5.0) == 1.0
+    assert rate_limit.backoff_delay(2, base=1.0, cap=5.0) == 4.0
+    assert rate_limit.backoff_delay(6, base=1.0, cap=5.0) == 5.0
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: a)
+    assert rate_limit.backoff_delay(2, base=1.0, cap=5.0) == 2.0
+
+
+def test_fetch_concurrently_retries_retryable_only():
+    calls = {}
+    lock = threading.Lock()
+    slept = []
+
+    def fetch(key):
+        with lock:
+            calls[key] = calls.get(key, 0) + 1
+            n = calls[key]
+        if key == "busy" and n < 3:
+            raise RetryableHTTPError(429, retry_after=0.0)
+        if key == "bad":
+            raise ValueError("not json")
+        return key.upper()
+
+    out = fetch_concurrently(
+        ["ok", "busy", "bad", "ok"], fetch, max_workers=3, max_retries=3, sleep=slept.append
+    )
+
+    assert out["results"] == {"ok": "OK", "busy": "BUSY"}
+    assert out["attempts"] == {"ok": 1, "busy": 3, "bad": 1}
+    assert out["failures"] == {"bad": "not json"}
+    assert len(slept) == 2
+    assert set(out["latency_ms"]) == {"ok", "busy", "bad"}
+
+
+def test_fetch_concurrently_gives_up_after_max_retries():
+    out = fetch_concurrently(
+        ["x"],
+        lambda key: (_ for _ in ()).throw(RetryableHTTPError(503)),
+        max_retries=2,
+        sleep=lambda s: None,
+    )
+    assert out["attempts"] == {"x": 3}
+    assert out["failures"] == {"x": "HTTP 503"}
+
+
+def test_fetch_concurrently_caps_server_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: a)
+    slept = []
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        if len(calls) == 1:
+            raise RetryableHTTPError(429, retry_after=86400.0)
+        return "ok"
+
+    out = fetch_concurrently(["x"], fetch, max_retries=2, sleep=slept.append)
+
+    assert out["results"] == {"x": "ok"}
+    assert slept == [rate_limit.BACKOFF_CAP_SECONDS]
+
+
+def test_adaptive_concurrency_halves_on_throttle_and_regrows():
+    limiter = rate_limit.AdaptiveConcurrency(4, maximum=6)
+    for _ in range(4):
+        limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 2
+    for _ in range(3):
+        limiter.release()
+    # Three successes at limit 2: one step up, one success towards the next.
+    assert limiter.limit == 3
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 6
@@ -0,0 +1,89 @@
+"""Tests for api.risk_decomposition: shrinkage covariance and risk contributions."""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import risk_decomposition
+from services import db_manager
+
+
+def _reference_ledoit_wolf(x):
+    """Textbook Ledoit-Wolf (2004) toward mu * I, one observation at a time."""
+    x = x - x.mean(axis=0)
+    n, p = x.shape
+    s = x.T @ x / n
+    mu = np.trace(s) / p
+    d2 = np.linalg.norm(s - mu * np.eye(p), "fro") ** 2 / p
+    b2 = sum(np.linalg.norm(np.outer(row, row) - s, "fro") ** 2 for row in x) / n**2 / p
+    shrink = min(b2, d2) / d2
+    return shrink * mu * np.eye(p) + (1 - shrink) * s, shrink
+
+
+def test_shrunk_covariance_matches_reference_formula():
+    x = np.random.default_rng(0).normal(0, 0.01, (40, 12))
+    cov, shrinkage = risk_decomposition.shrunk_covariance(x)
+    want, want_shrinkage = _reference_ledoit_wolf(x)
+    assert shrinkage == pytest.approx(want_shrinkage, rel=1e-10)
+    np.testing.assert_allclose(cov, want, rtol=1e-10)
+    assert 0 < shrinkage < 1
+
+
+def test_risk_contributions_sum_to_portfolio_volatility():
+    x = np.random.default_rng(1).normal(0, 0.01, (100, 5))
+    cov, _ = risk_decomposition.shrunk_covariance(x)
+    w = np.array([0.4, 0.3, 0.1, 0.1, 0.1])
+    out = risk_decomposition.risk_contributions(cov, w)
+    assert out["volatility"] == pytest.approx(np.sqrt(w @ cov @ w))
+    assert out["component"].sum() == pytest.approx(out["volatility"])
+    # Marginal contribution is the gradient of portfolio volatility.
+    eps = 1e-7
+    bumped = w.copy()
+    bumped[0] += eps
+    grad = (np.sqrt(bumped @ cov @ bumped) - out["volatility"]) / eps
+    assert out["marginal"][0] == pytest.approx(grad, rel=1e-5)
+
+
+def test_returns_matrix_aligns_dates_and_keeps_gaps():
+    prices = pd.DataFrame(
+        {
+            "ticker": ["A", "A", "A", "B", "B"],
+            "date": pd.to_datetime(["2026-01-01", "2026-01-02", "2026-01-05", "2026-01-01", "2026-01-05"]),
+            "closing_price": [100.0, 110.0, 99.0, 50.0, 55.0],
+        }
+    )
+    m = risk_decomposition.returns_matrix(prices)
+    assert list(m.index.strftime("%Y-%m-%d")) == ["2026-01-02", "2026-01-05"]
+    assert m.loc["2026-01-02", "A"] == pytest.approx(0.10)
+    assert np.isnan(m.loc["2026-01-02", "B"])
+    # B's return spans its gap: from the last close it had.
+    assert m.loc["2026-01-05", "B"] == pytest.approx(0.10)
+
+
+def test_compute_risk_decomposition_from_db_is_cached_by_version(tmp_path):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    days = pd.bdate_range("2026-01-01", periods=60).strftime("%Y-%m-%d").tolist()
+    rng = np.random.default_rng(2)
+    rows = []
+    for ticker, shares in (("AAA", 10), ("BBB", 5), ("CCC", 1)):
+        db_manager.insert_stock(ticker, shares, cost_basis=100.0)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 60)))
+        rows += [(ticker, d, float(c)) for d, c in zip(days, closes)]
+    db_manager.insert_stock("NEW", 1, cost_basis=100.0)
+    db_manager.bulk_upsert_stock_prices(rows + [("NEW", days[-1], 10.0)])
+    today = dt.date.fromisoformat(days[-1])
+
+    out = risk_decomposition.compute_risk_decomposition(lookback=252, today=today)
+    assert out["cached"] is False
+    assert out["observations"] == 59
+    assert out["excluded"] == ["NEW"]
+    assert {p["ticker"] for p in out["positions"]} == {"AAA", "BBB", "CCC"}
+    assert sum(p["weight"] for p in out["positions"]) == pytest.approx(1.0)
+    assert sum(p["component_pct"] for p in out["positions"]) == pytest.approx(out["volatility_pct"], abs=1e-3)
+    assert 0 < out["diversification_ratio"] <= 1
+
+    assert risk_decomposition.compute_risk_decomposition(lookback=252, today=today)["cached"] is True
+    db_manager.bulk_upsert_stock_prices([("AAA", days[-1], 1.0)])
+    assert risk_decomposition.compute_risk_decomposition(lookback=252, today=today)["cached"] is False
@@ -0,0 +1,122 @@
+"""Tests for api.risk_engine: running risk state vs full pandas recompute."""
+import datetime as dt
+import math
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import risk_engine
+from services import db_manager
+
+
+def _init_temp_db(tmp_path):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+
+
+def _seed_portfolio(days, aapl, msft, spy):
+    db_manager.insert_stock("AAPL", 1, cost_basis=100.0)
+    db_manager.insert_stock("MSFT", 2, cost_basis=100.0)
+    conn = sqlite3.connect(db_manager.DATABASE)
+    conn.execute("UPDATE Stocks SET opened_at_utc = '2020-01-01T00:00:00+00:00'")
+    conn.commit()
+    conn.close()
+    db_manager.bulk_upsert_stock_prices(
+        [("AAPL", d, p) for d, p in zip(days, aapl)] + [("MSFT", d, p) for d, p in zip(days, msft)]
+    )
+    db_manager.bulk_upsert_benchmark_prices([("SPY", d, p) for d, p in zip(days, spy)], source="Test")
+
+
+def _reference(tickers):
+    pv = db_manager.get_portfolio_value_daily().sort_values("date")
+    returns = pv["portfolio_value"].pct_change()
+    drawdown = pv["portfolio_value"] / pv["portfolio_value"].cummax() - 1
+    spy = db_manager.get_benchmark_price_series("SPY")
+    spy["spy_returns"] = spy["closing_price"].pct_change()
+    merged = pd.merge(
+        pv.assign(returns=returns)[["date", "returns"]], spy[["date", "spy_returns"]], on="date"
+    ).dropna()
+    prices = db_manager.get_price_history_df(tickers)
+    prices["returns"] = prices.groupby("ticker")["closing_price"].pct_change()
+    return {
+        "volatility": float(returns.std() * math.sqrt(252)),
+        "max_drawdown": float(drawdown.min()),
+        "beta": float(merged["returns"].cov(merged["spy_returns"]) / merged["spy_returns"].var()),
+        "ticker_volatility": (prices.groupby("ticker")["returns"].std() * math.sqrt(252)).to_dict(),
+    }
+
+
+def _assert_matches(got, want):
+    for key in ("volatility", "max_drawdown", "beta"):
+        assert got[key] == pytest.approx(want[key], rel=1e-9), key
+    assert got["ticker_volatility"].keys() == want["ticker_volatility"].keys()
+    for ticker, vol in want["ticker_volatility"].items():
+        assert got["ticker_volatility"][ticker] == pytest.approx(vol, rel=1e-9)
+
+
+def _series(n, seed):
+    rng = np.random.default_rng(seed)
+    return (100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))).round(4).tolist()
+
+
+def test_incremental_advance_matches_full_recompute(tmp_path):
+    _init_temp_db(tmp_path)
+    days = pd.bdate_range("2025-01-01", periods=60).strftime("%Y-%m-%d").tolist()
+    aapl, msft, spy = _series(61, 1), _series(61, 2), _series(61, 3)
+    _seed_portfolio(days, aapl[:60], msft[:60], spy[:60])
+
+    today = dt.date.fromisoformat(days[-1]) + dt.timedelta(days=1)
+    first = risk_engine.current_metrics(["AAPL", "MSFT"], today)
+    assert first["full_rebuild"] is True
+    _assert_matches(first, _reference(["AAPL", "MSFT"]))
+
+    # A new trading day arrives: only that day is read and folded in.
+    new_day = today.isoformat()
+    db_manager.bulk_upsert_stock_prices([("AAPL", new_day, aapl[60]), ("MSFT", new_day, msft[60])])
+    db_manager.bulk_upsert_benchmark_prices([("SPY", new_day, spy[60])], source="Test")
+    intraday = risk_engine.current_metrics(["AAPL", "MSFT"], today)
+    assert intraday["full_rebuild"] is False
+    assert intraday["last_date"] == new_day
+    _assert_matches(intraday, _reference(["AAPL", "MSFT"]))
+
+    # Next day the row is final and folded into the stored state.
+    following = risk_engine.current_metrics(["AAPL", "MSFT"], today + dt.timedelta(days=1))
+    assert following["full_rebuild"] is False
+    assert db_manager.get_quant_risk_state()["as_of_date"] == new_day
+    _assert_matches(following, _reference(["AAPL", "MSFT"]))
+
+
+def test_editing_folded_history_forces_full_rebuild(tmp_path):
+    _init_temp_db(tmp_path)
+    days = pd.bdate_range("2025-01-01", periods=30).strftime("%Y-%m-%d").tolist()
+    _seed_portfolio(days, _series(30, 4), _series(30, 5), _series(30, 6))
+    today = dt.date.fromisoformat(days[-1]) + dt.timedelta(days=1)
+    risk_engine.current_metrics(["AAPL", "MSFT"], today)
+
+    again = risk_engine.current_metrics(["AAPL", "MSFT"], today)
+    assert again["full_rebuild"] is False
+
+    db_manager.bulk_upsert_stock_prices([("AAPL", days[5], 50.0)])
+    assert db_manager.get_quant_risk_state()["dirty_from"] == days[5]
+    edited = risk_engine.current_metrics(["AAPL", "MSFT"], today)
+    assert edited["full_rebuild"] is True
+    _assert_matches(edited, _reference(["AAPL", "MSFT"]))
+
+
+def test_unchanged_rewrites_do_not_dirty_state(tmp_path):
+    _init_temp_db(tmp_path)
+    days = pd.bdate_range("2025-01-01", periods=10).strftime("%Y-%m-%d").tolist()
+    aapl, msft, spy = _series(10, 7), _series(10, 8), _series(10, 9)
+    _seed_portfolio(days, aapl, msft, spy)
+    risk_engine.current_metrics(["AAPL", "MSFT"], dt.date(2025, 2, 1))
+    version = db_manager.get_quant_risk_state()["data_version"]
+
+    # Re-ingesting identical closes refreshes portfolio_value_daily without edits.
+    db_manager.bulk_upsert_stock_prices([("AAPL", d, p) for d, p in zip(days, aapl)])
+    db_manager.bulk_upsert_benchmark_prices([("SPY", d, p) for d, p in zip(days, spy)], source="Test")
+    state = db_manager.get_quant_risk_state()
+    assert state["data_version"] == version
+    assert state["dirty_from"] is None
+    assert risk_engine.current_metrics(["AAPL", "MSFT"], dt.date(2025, 2, 1))["full_rebuild"] is False
@@ -159,6 +159,46 @@ def test_api_quant_job_status_returns_json(client):
     assert "toast_eligible" in data
 
 
+def test_api_quant_job_status_lists_jobs_finished_since(client, monkeypatch):
+    from services import quant_job
+
+    monkeypatch.setitem(quant_job.JOB_RUNNERS, "backtest", lambda job_id, params, progress: "ok")
+    ids = [quant_job.submit_quant_job({"portfolio": {"AAA": 1.0}}, start_workers=False) for _ in range(2)]
+    while quant_job.run_next_job() is not None:
+        pass
+    assert "finished" not in client.get("/api/quant_job_status").get_json()
+    data = client.get("/api/quant_job_status?since=").get_json()
+    assert sorted(j["job_id"] for j in data["finished"]) == sorted(ids)
+    assert data["finished_cursor"] == data["finished"][-1]["finished_at"]
+    again = client.get("/api/quant_job_status", query_string={"since": data["finished_cursor"]}).get_json()
+    assert [j["job_id"] for j in again["finished"]] == [data["finished"][-1]["job_id"]]
+
+
+def test_api_quote_cache_stats_returns_json(client):
+    r = client.get("/api/quote_cache_stats")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert {"hits", "misses", "coalesced", "hit_rate", "ttl_seconds"} <= set(data)
+
+
+def test_quant_risk_decomposition_returns_json(client):
+    r = client.get("/quant/risk_decomposition")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["positions"] == []
+    assert {"volatility_pct", "diversification_ratio", "shrinkage", "excluded"} <= set(data)
+    assert client.get("/quant/risk_decomposition?lookback=5").status_code == 400
+
+
+def test_quant_var_returns_json(client):
+    r = client.get("/quant/var")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["horizon_days"] == 1
+    assert {"historical", "monte_carlo", "portfolio_value", "excluded"} <= set(data)
+    assert client.get("/quant/var?method=garch").status_code == 400
+
+
 def test_news_page_returns_200(client):
     r = client.get("/news")
     assert r.status_code == 200
@@ -273,6 +313,19 @@ def test_admin_backfill_prices_returns_ok(client, monkeypatch):
     assert data["tickers"] == 3
 
 
+def test_admin_rebuild_portfolio_value_daily(client):
+    from services import db_manager
+
+    db_manager.insert_stock("AAPL", 2, cost_basis=100.0)
+    db_manager.upsert_stock_price("AAPL", "2099-01-02", 50.0)
+    r = client.post("/admin/rebuild_portfolio_value_daily")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["status"] == "ok"
+    assert data["dates"] == 1
+    assert data["consistent"] is True
+
+
 def test_admin_wipe_all_keeps_etf_by_default(client, monkeypatch):
     import server
 
@@ -360,6 +413,15 @@ def test_api_news_articles_list_returns_json(client):
     assert isinstance(data["items"], list)
 
 
+def test_api_news_articles_search_returns_paginated_json(client):
+    r = client.get("/api/news_articles?q=rates")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["q"] == "rates"
+    assert data["page"] == 1
+    assert isinstance(data["items"], list)
+
+
 def test_api_news_articles_day_mode_returns_json(client):
     r = client.get("/api/news_articles")
     assert r.status_code == 200
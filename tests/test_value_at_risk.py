@@ -0,0 +1,91 @@
+"""Tests for api.value_at_risk: historical and Monte Carlo VaR / CVaR."""
+import datetime as dt
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import value_at_risk
+from services import db_manager
+
+
+def test_tail_risk_quantile_and_shortfall():
+    returns = -np.arange(1, 101) / 1000.0  # losses 0.1% .. 10%
+    var, cvar = value_at_risk.tail_risk(returns, 0.95)
+    assert var == pytest.approx(np.quantile(np.arange(1, 101) / 1000.0, 0.95))
+    assert cvar == pytest.approx(np.arange(96, 101).mean() / 1000.0)
+
+
+def test_monte_carlo_normal_matches_analytic_var():
+    rng = np.random.default_rng(3)
+    a = rng.normal(0, 0.01, (5, 5))
+    cov = a @ a.T + np.eye(5) * 1e-5
+    w = np.array([0.3, 0.3, 0.2, 0.1, 0.1])
+    sims = value_at_risk.monte_carlo_returns(cov, w, n_scenarios=100_000)
+    sigma = float(np.sqrt(w @ cov @ w))
+    assert sims.size == 100_000
+    assert sims.std() == pytest.approx(sigma, rel=0.02)
+    var, cvar = value_at_risk.tail_risk(sims, 0.99)
+    assert var == pytest.approx(2.3263 * sigma, rel=0.03)
+    assert cvar == pytest.approx(2.6652 * sigma, rel=0.04)
+
+
+def test_monte_carlo_is_reproducible_for_a_seed():
+    cov = np.diag([1e-4, 4e-4, 9e-4])
+    w = np.array([0.5, 0.3, 0.2])
+    a = value_at_risk.monte_carlo_returns(cov, w, n_scenarios=25_000, seed=9, batch_size=5_000)
+    b = value_at_risk.monte_carlo_returns(cov, w, n_scenarios=25_000, seed=9, batch_size=5_000)
+    np.testing.assert_array_equal(a, b)
+    c = value_at_risk.monte_carlo_returns(cov, w, n_scenarios=25_000, seed=10, batch_size=5_000)
+    assert not np.array_equal(a, c)
+    assert value_at_risk.portfolio_sigma(cov, w) == pytest.approx(np.sqrt(w @ cov @ w))
+
+
+def test_monte_carlo_bootstrap_resamples_history():
+    history = np.array([[0.01, 0.02], [-0.03, 0.01], [np.nan, -0.02]])
+    w = np.array([0.5, 0.5])
+    sims = value_at_risk.monte_carlo_returns(None, w, n_scenarios=1_000, method="bootstrap", history=history)
+    assert set(np.round(sims, 10)) <= set(np.round(np.nan_to_num(history) @ w, 10))
+    with pytest.raises(ValueError):
+        value_at_risk.monte_carlo_returns(None, w, n_scenarios=10, method="garch")
+
+
+def test_var_summary_from_db_is_cached_and_recorded_in_snapshot(tmp_path, monkeypatch):
+    db_manager.DATABASE = str(tmp_path / "test_finance_data.db")
+    db_manager.init_db()
+    days = pd.bdate_range("2026-01-01", periods=80).strftime("%Y-%m-%d").tolist()
+    rng = np.random.default_rng(4)
+    rows = []
+    for ticker in ("AAA", "BBB"):
+        db_manager.insert_stock(ticker, 10, cost_basis=100.0)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, 80)))
+        rows += [(ticker, d, float(c)) for d, c in zip(days, closes)]
+    conn = sqlite3.connect(db_manager.DATABASE)
+    conn.execute("UPDATE Stocks SET opened_at_utc = '2020-01-01T00:00:00+00:00'")
+    conn.commit()
+    conn.close()
+    db_manager.bulk_upsert_stock_prices(rows)
+    db_manager.bulk_upsert_benchmark_prices([("SPY", d, 100.0 + i) for i, d in enumerate(days)], source="Test")
+    today = dt.date.fromisoformat(days[-1])
+
+    out = value_at_risk.compute_var_summary(today, scenarios=20_000)
+    assert out["cached"] is False
+    assert out["observations"] == 79
+    assert out["excluded"] == []
+    hist95 = out["historical"]["95"]
+    assert 0 < hist95["var_pct"] <= hist95["cvar_pct"] <= out["historical"]["99"]["cvar_pct"]
+    assert hist95["var_value"] == pytest.approx(hist95["var_pct"] / 100 * out["portfolio_value"], abs=0.05)
+    assert out["monte_carlo"]["scenarios"] == 20_000
+    assert out["monte_carlo"]["levels"]["99"]["var_pct"] > 0
+    assert value_at_risk.compute_var_summary(today, scenarios=20_000)["cached"] is True
+
+    from api import quant_risk
+
+    monkeypatch.setattr(quant_risk, "compute_risk_summary", lambda: {"last_updated": days[-1]})
+    monkeypatch.setattr(value_at_risk, "compute_var_summary", lambda: out)
+    monkeypatch.setenv("QUANT_RISK_SNAPSHOT_RETENTION_DAYS", "0")
+    quant_risk.record_daily_risk_snapshot_for_insights()
+    payload = db_manager.get_quant_risk_snapshots(limit=1)[0]["payload"]
+    assert payload["var_95_pct"] == hist95["var_pct"]
+    assert payload["mc_cvar_99_pct"] == out["monte_carlo"]["levels"]["99"]["cvar_pct"]